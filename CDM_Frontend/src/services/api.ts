@@ -8,6 +8,33 @@ export interface ApiResponse<T> {
   message?: string;
 }
 
+export interface ColumnarResponse {
+  format: 'columnar';
+  count: number;
+  columns: string[];
+  dictionaries: Record<string, any[]>;
+  data: any[][];
+}
+
+// Expand a ?format=columnar grid response back into row objects
+export function decodeColumnar<T = Record<string, any>>(payload: ColumnarResponse): T[] {
+  const rows: T[] = new Array(payload.count);
+  const columns = payload.columns.map((name, index) => ({
+    name,
+    values: payload.data[index],
+    dictionary: payload.dictionaries[name],
+  }));
+  for (let i = 0; i < payload.count; i++) {
+    const row: Record<string, any> = {};
+    for (const column of columns) {
+      const value = column.values[i];
+      row[column.name] = column.dictionary ? column.dictionary[value] : value;
+    }
+    rows[i] = row as T;
+  }
+  return rows;
+}
+
 class ApiService {
   private async request<T>(endpoint: string, options: RequestInit = {}): Promise<T> {
     const url = `${API_BASE_URL}${endpoint}`;
@@ -43,6 +70,10 @@ class ApiService {
     return this.request('/objects');
   }
 
+  async getObjectsColumnar() {
+    return decodeColumnar(await this.request<ColumnarResponse>('/objects?format=columnar'));
+  }
+
   async getObject(id: string) {
     return this.request(`/objects/${id}`);
   }
@@ -168,6 +199,51 @@ class ApiService {
     return this.request(url);
   }
 
+  async getTypeahead(
+    field: 'beings' | 'avatars' | 'objects',
+    prefix: string = '',
+    scope: { being?: string; avatar?: string; limit?: number } = {}
+  ) {
+    const params = new URLSearchParams({ prefix });
+    if (scope.being) params.append('being', scope.being);
+    if (scope.avatar) params.append('avatar', scope.avatar);
+    if (scope.limit !== undefined) params.append('limit', String(scope.limit));
+    return this.request(`/objects/typeahead/${field}?${params.toString()}`);
+  }
+
+  async getTaxonomyTree(
+    kind: 'objects' | 'variables',
+    options: { being?: string; avatar?: string; part?: string; group?: string; depth?: number; format?: 'nested' | 'compact' } = {}
+  ) {
+    const params = new URLSearchParams();
+    Object.entries(options).forEach(([key, value]) => {
+      if (value !== undefined && value !== '') params.append(key, String(value));
+    });
+    const query = params.toString();
+    return this.request(`/taxonomy/${kind}${query ? `?${query}` : ''}`);
+  }
+
+  async getGraphNeighborhood(
+    seeds: string[],
+    options: { depth?: number; types?: string[]; maxNodes?: number; format?: 'columnar' | 'csr' } = {}
+  ) {
+    const params = new URLSearchParams({ seeds: seeds.join(',') });
+    if (options.depth !== undefined) params.append('depth', String(options.depth));
+    if (options.types?.length) params.append('types', options.types.join(','));
+    if (options.maxNodes !== undefined) params.append('maxNodes', String(options.maxNodes));
+    if (options.format) params.append('format', options.format);
+    return this.request(`/graph/neighborhood?${params.toString()}`);
+  }
+
+  // Search API
+  async search(query: string, options: { types?: string[]; limit?: number; offset?: number } = {}) {
+    const params = new URLSearchParams({ q: query });
+    if (options.types && options.types.length) params.append('types', options.types.join(','));
+    if (options.limit !== undefined) params.append('limit', String(options.limit));
+    if (options.offset !== undefined) params.append('offset', String(options.offset));
+    return this.request(`/search?${params.toString()}`);
+  }
+
   // Variables API (to be implemented)
   async getVariable(id: string) {
     return this.request(`/variables/${id}`);
@@ -244,6 +320,10 @@ class ApiService {
     return this.request('/variables');
   }
 
+  async getVariablesColumnar() {
+    return decodeColumnar(await this.request<ColumnarResponse>('/variables?format=columnar'));
+  }
+
   async createVariable(variableData: any) {
     return this.request('/variables', {
       method: 'POST',
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Serialization benchmark for the full-catalog grid reads
+Serves GET /objects and GET /variables from a synthetic in-memory result set
+and compares CPU time per request for three paths:
+  legacy   - response_model=List[Dict[str, Any]] + jsonable_encoder + json
+  encoded  - orjson bytes, rebuilt on every request (cold cache)
+  cached   - pre-serialized bytes reused for the catalog version
+The catalog lives in the in-memory graph backend so only the API layer is
+measured.
+
+Usage (from CDM_UI_Backend): python -m benchmarks.serialization [--rows 20000] [--requests 20]
+"""
+
+import argparse
+import os
+import random
+import time
+from typing import Any, Dict, List
+
+os.environ.setdefault("CDM_GRAPH_BACKEND", "memory")
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+import main
+import responses
+from repositories import GraphBackend, get_graph
+from routes import objects, variables
+
+def load_synthetic_catalog(graph: GraphBackend, rows: int, seed: int = 7):
+    """rows objects (two variants and two relationships each) and rows variables"""
+    rng = random.Random(seed)
+    beings = ["Human", "Party", "Asset", "Place", "Event"]
+    parts = ["Identity", "Finance", "Contact", "Status"]
+
+    def work(repos):
+        placed = []
+        for i in range(rows):
+            object_id = f"obj-{i:06d}"
+            being, avatar = rng.choice(beings), f"Avatar {rng.randrange(40)}"
+            repos.objects.create(object_id, "ALL, ALL, ALL, None", being, avatar, f"Object {i}", "Active")
+            for k in range(2):
+                repos.objects.create_variant(f"var-{i}-{k}", f"Variant {i}-{k}")
+                repos.objects.attach_variant(object_id, f"var-{i}-{k}")
+            placed.append((object_id, being, avatar, f"Object {i}"))
+        for i, (object_id, *_) in enumerate(placed):
+            for k in range(2):
+                target_id, to_being, to_avatar, to_object = placed[rng.randrange(rows)]
+                repos.objects.relate(object_id, target_id, f"rel-{i}-{k}", "Inter-Table", "Owner", to_being, to_avatar, to_object)
+            repos.objects.update_counts(object_id)
+
+        for i in range(rows):
+            repos.variables.create(f"var-{i:06d}", rng.choice(parts), f"Group {rng.randrange(60)}", {
+                "variable": f"Variable {i}", "section": f"Section {rng.randrange(12)}",
+                "formatI": rng.choice(["Text", "Number", "Date"]), "formatII": rng.choice(["Short", "Long"]),
+                "gType": "Attribute"
+            })
+            for _ in range(rng.randrange(4)):
+                repos.variables.link_object(f"var-{i:06d}", placed[rng.randrange(rows)][0])
+
+    graph.execute_write(work)
+
+def legacy_app() -> FastAPI:
+    """The grid routes as they were declared before the fast path"""
+    app = FastAPI()
+
+    @app.get("/objects", response_model=List[Dict[str, Any]])
+    async def legacy_objects():
+        return objects._read_objects(False)
+
+    @app.get("/variables", response_model=List[Dict[str, Any]])
+    async def legacy_variables():
+        return variables._read_variables(False)
+
+    return app
+
+def measure(client: TestClient, path: str, requests: int, before=None) -> Dict[str, float]:
+    cpu, wall, size = [], [], 0
+    for _ in range(requests):
+        if before:
+            before()
+        start_cpu, start_wall = time.process_time(), time.perf_counter()
+        response = client.get(path)
+        cpu.append(time.process_time() - start_cpu)
+        wall.append(time.perf_counter() - start_wall)
+        response.raise_for_status()
+        size = len(response.content)
+    cpu.sort()
+    wall.sort()
+    return {"cpu_ms": cpu[len(cpu) // 2] * 1000, "wall_ms": wall[len(wall) // 2] * 1000, "bytes": size}
+
+def main_benchmark():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--requests", type=int, default=20)
+    args = parser.parse_args()
+
+    load_synthetic_catalog(get_graph(), args.rows)
+
+    legacy = TestClient(legacy_app())
+    fast = TestClient(main.app)
+    print(f"{args.rows} rows, median of {args.requests} requests")
+    print(f"{'endpoint':<12} {'path':<8} {'cpu ms':>9} {'wall ms':>9} {'bytes':>10}")
+    for endpoint in ("objects", "variables"):
+        results = {
+            "legacy": measure(legacy, f"/{endpoint}", args.requests),
+            "encoded": measure(fast, f"/api/v1/{endpoint}", args.requests, before=responses._body_cache.clear),
+            "cached": measure(fast, f"/api/v1/{endpoint}", args.requests),
+        }
+        for name, result in results.items():
+            print(f"{endpoint:<12} {name:<8} {result['cpu_ms']:>9.1f} {result['wall_ms']:>9.1f} {result['bytes']:>10}")
+
+if __name__ == "__main__":
+    main_benchmark()
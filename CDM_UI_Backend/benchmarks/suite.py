@@ -0,0 +1,362 @@
+#!/usr/bin/env python3
+"""
+API benchmark suite
+Seeds a deterministic synthetic catalog (synthetic.py) at each
+scale into the in-memory graph backend and drives the real app in-process
+through every endpoint. Each scale runs in its own process so memory and
+caches start clean. Per endpoint it reports:
+  cold   - latency right after a catalog version bump (caches rebuilt)
+  warm   - p50/p90/p99/max latency of repeated requests at one version
+  queries, bytes, wireBytes - X-Query-Count, decoded and on-the-wire body size
+  allocKb - peak Python allocations while serving one cold request (tracemalloc)
+plus CSV upload throughput for objects, variables and variants. Results are
+written as JSON (default benchmarks/results/<commit>.json) so two runs can
+be compared with --compare.
+
+Usage (from CDM_UI_Backend):
+  python -m benchmarks.suite [--scales 1000,10000,100000] [--requests 30] [--csv-rows 1000]
+                             [--seed 42] [--output FILE] [--compare BASELINE.json]
+  python -m benchmarks.suite --compare BASELINE.json CURRENT.json
+"""
+
+import argparse
+import csv
+import io
+import json
+import os
+import platform
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, Tuple
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+
+# Server-side settings for the measured process
+BENCH_ENV = {
+    "CDM_GRAPH_BACKEND": "memory",
+    "CDM_MEMORY_SNAPSHOT": "",
+    "CDM_LOG_LEVEL": "ERROR",
+    "CDM_TRACE_EXPORTER": "none",
+    "CDM_QUERY_SAMPLE_RATE": "0",
+    "CDM_WARM_CACHES": "false",
+}
+
+# Endpoint -> (method, build(i) -> (path, request kwargs)); i counts requests
+Endpoint = Tuple[str, Callable[[int], Tuple[str, Dict[str, Any]]]]
+
+def percentile(ordered: List[float], q: float) -> float:
+    """Nearest-rank percentile of an ascending list"""
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, max(0, int(round(q * len(ordered))) - 1))]
+
+def _git_commit() -> str:
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], capture_output=True, text=True).stdout.strip()
+        return f"{commit}-dirty" if dirty else commit
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+def read_endpoints(catalog: Dict[str, Any], seed: int) -> Dict[str, Endpoint]:
+    rng = random.Random(seed)
+    objects = rng.sample(catalog["objects"], min(16, len(catalog["objects"])))
+    variables = rng.sample(catalog["variables"], min(16, len(catalog["variables"])))
+    being, avatar = objects[0]["being"], objects[0]["avatar"]
+    sector = catalog["drivers"]["Sector"][0]
+    words = ["object 00", "variant", "variable 01", "section", "avatr", "group 00"]
+
+    def get(path: Callable[[int], str]) -> Endpoint:
+        return "GET", lambda i: (path(i), {})
+
+    return {
+        "objects.grid": get(lambda i: "/api/v1/objects"),
+        "objects.grid.columnar": get(lambda i: "/api/v1/objects?format=columnar"),
+        "objects.detail": get(lambda i: f"/api/v1/objects/{objects[i % len(objects)]['id']}"),
+        "objects.taxonomy.beings": get(lambda i: "/api/v1/objects/taxonomy/beings"),
+        "objects.taxonomy.avatars": get(lambda i: f"/api/v1/objects/taxonomy/avatars?being={being}"),
+        "objects.taxonomy.objects": get(lambda i: f"/api/v1/objects/taxonomy/objects?being={being}&avatar={avatar}"),
+        "objects.typeahead": get(lambda i: f"/api/v1/objects/typeahead/objects?prefix=Object%200{i % 10}&being={being}"),
+        "variables.grid": get(lambda i: "/api/v1/variables"),
+        "variables.grid.columnar": get(lambda i: "/api/v1/variables?format=columnar"),
+        "variables.objectRelationships": get(lambda i: f"/api/v1/variables/{variables[i % len(variables)]['id']}/object-relationships"),
+        "taxonomy.objects": get(lambda i: "/api/v1/taxonomy/objects"),
+        "taxonomy.objects.subtree": get(lambda i: f"/api/v1/taxonomy/objects?being={being}&depth=2&format=compact"),
+        "taxonomy.variables": get(lambda i: "/api/v1/taxonomy/variables"),
+        "search": get(lambda i: f"/api/v1/search?q={words[i % len(words)]}"),
+        "graph.neighborhood": get(lambda i: f"/api/v1/graph/neighborhood?seeds={objects[i % len(objects)]['id']}&depth=2"),
+        "drivers.list": get(lambda i: "/api/v1/drivers/countries"),
+        "drivers.relationships": get(lambda i: f"/api/v1/drivers/sectors/relationships?name={sector}"),
+    }
+
+def write_endpoints(catalog: Dict[str, Any], seed: int) -> Dict[str, Endpoint]:
+    rng = random.Random(seed + 1)
+    objects = rng.sample(catalog["objects"], min(16, len(catalog["objects"])))
+    variables = rng.sample(catalog["variables"], min(16, len(catalog["variables"])))
+    sectors, domains = catalog["drivers"]["Sector"], catalog["drivers"]["Domain"]
+    countries = catalog["countries"]
+
+    def create_object(i):
+        return "/api/v1/objects", {"json": {
+            "sector": [sectors[i % len(sectors)]], "domain": [domains[i % len(domains)]],
+            "country": [countries[i % len(countries)]], "being": objects[0]["being"], "avatar": objects[0]["avatar"],
+            "object": f"Bench Object {i}", "variants": [f"Bench Variant {i}"],
+            "relationships": [{"type": "Inter-Table", "role": "Owner", "toBeing": objects[1]["being"],
+                               "toAvatar": objects[1]["avatar"], "toObject": objects[1]["object"]}]
+        }}
+
+    def create_variable(i):
+        return "/api/v1/variables", {"json": {
+            "driver": f"{sectors[i % len(sectors)]}, ALL, ALL, None", "part": "Identity", "section": "Bench",
+            "group": "Bench Group", "variable": f"Bench Variable {i}", "formatI": "Text", "formatII": "Short",
+            "gType": "Attribute"
+        }}
+
+    def relate(i):
+        target = objects[(i + 1) % len(objects)]
+        return f"/api/v1/objects/{objects[i % len(objects)]['id']}/relationships", {"json": {
+            "relationship_type": "Inter-Table", "role": f"Bench {i}",
+            "to_being": target["being"], "to_avatar": target["avatar"], "to_object": target["object"]
+        }}
+
+    return {
+        "objects.create": ("POST", create_object),
+        "objects.update": ("PUT", lambda i: (f"/api/v1/objects/{objects[i % len(objects)]['id']}", {"json": {"status": "Active" if i % 2 else "Inactive"}})),
+        "objects.variants.create": ("POST", lambda i: (f"/api/v1/objects/{objects[i % len(objects)]['id']}/variants", {"json": {"variant_name": f"Bench Variant {i}"}})),
+        "objects.relationships.create": ("POST", relate),
+        "variables.create": ("POST", create_variable),
+        "variables.update": ("PUT", lambda i: (f"/api/v1/variables/{variables[i % len(variables)]['id']}", {"json": {"section": f"Section {i % 12:02d}"}})),
+        "variables.objectRelationships.create": ("POST", lambda i: (
+            f"/api/v1/variables/{variables[i % len(variables)]['id']}/object-relationships",
+            {"json": {"to_being": objects[i % len(objects)]["being"], "to_avatar": objects[i % len(objects)]["avatar"], "to_object": objects[i % len(objects)]["object"]}}
+        )),
+    }
+
+def _request(client, method: str, build, i: int):
+    path, kwargs = build(i)
+    start = time.perf_counter()
+    response = client.request(method, path, **kwargs)
+    elapsed = (time.perf_counter() - start) * 1000
+    if response.status_code >= 400:
+        raise RuntimeError(f"{method} {path} -> {response.status_code}: {response.text[:200]}")
+    return elapsed, response
+
+def measure(client, method: str, build, requests: int, cold_requests: int, bump) -> Dict[str, Any]:
+    """Cold (after a version bump, with allocation tracing) then warm requests"""
+    cold, allocations = [], []
+    for i in range(cold_requests):
+        bump()
+        tracemalloc.start()
+        try:
+            elapsed, _ = _request(client, method, build, i)
+            allocations.append(tracemalloc.get_traced_memory()[1] / 1024)
+        finally:
+            tracemalloc.stop()
+        # Untraced repeat for the latency, tracemalloc slows allocation-heavy paths
+        bump()
+        elapsed, _ = _request(client, method, build, i)
+        cold.append(elapsed)
+
+    warm, queries = [], []
+    response = None
+    for i in range(requests):
+        elapsed, response = _request(client, method, build, cold_requests + i)
+        warm.append(elapsed)
+        queries.append(int(response.headers.get("x-query-count", 0)))
+
+    cold.sort()
+    warm.sort()
+    queries.sort()
+    allocations.sort()
+    return {
+        "method": method,
+        "path": build(0)[0],
+        "coldMs": round(percentile(cold, 0.5), 3),
+        "p50Ms": round(percentile(warm, 0.5), 3),
+        "p90Ms": round(percentile(warm, 0.9), 3),
+        "p99Ms": round(percentile(warm, 0.99), 3),
+        "maxMs": round(warm[-1], 3),
+        "queries": percentile(queries, 0.5),
+        "bytes": len(response.content),
+        "wireBytes": int(response.headers.get("content-length", len(response.content))),
+        "allocKb": round(percentile(allocations, 0.5), 1),
+    }
+
+def _csv_bytes(header: List[str], rows: List[List[str]]) -> bytes:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(header)
+    writer.writerows(rows)
+    return buffer.getvalue().encode()
+
+def csv_uploads(client, catalog: Dict[str, Any], rows: int) -> Dict[str, Any]:
+    """Rows per second for the three CSV imports, each with fresh rows"""
+    sectors, domains = catalog["drivers"]["Sector"], catalog["drivers"]["Domain"]
+    countries = catalog["countries"]
+    target = catalog["objects"][0]
+    uploads = {
+        "objects": ("/api/v1/objects/upload", _csv_bytes(
+            ["Sector", "Domain", "Country", "Object Clarifier", "Being", "Avatar", "Object"],
+            [[sectors[i % len(sectors)], "ALL" if i % 3 == 0 else domains[i % len(domains)], countries[i % len(countries)],
+              "None", target["being"], target["avatar"], f"CSV Object {i:06d}"] for i in range(rows)]
+        )),
+        "variables": ("/api/v1/variables/bulk-upload", _csv_bytes(
+            ["Sector", "Domain", "Country", "Variable Clarifier", "Part", "Section", "Group", "Variable",
+             "Format I", "Format II", "G-Type", "Validation", "Default", "Graph"],
+            [[sectors[i % len(sectors)], "ALL", countries[i % len(countries)], "None", "Identity", "CSV",
+              f"CSV Group {i % 20}", f"CSV Variable {i:06d}", "Text", "Short", "Attribute", "", "", "Yes"] for i in range(rows)]
+        )),
+        "variants": (f"/api/v1/objects/{target['id']}/variants/upload", _csv_bytes(
+            ["Variant"], [[f"CSV Variant {i:06d}"] for i in range(rows)]
+        )),
+    }
+
+    results = {}
+    for name, (path, body) in uploads.items():
+        start = time.perf_counter()
+        response = client.post(path, files={"file": (f"{name}.csv", body, "text/csv")})
+        seconds = time.perf_counter() - start
+        if response.status_code >= 400:
+            raise RuntimeError(f"POST {path} -> {response.status_code}: {response.text[:200]}")
+        created = response.json().get("created_count", 0)
+        results[name] = {
+            "rows": rows,
+            "created": created,
+            "seconds": round(seconds, 3),
+            "rowsPerSecond": round(created / seconds, 1) if seconds else 0.0,
+            "queries": int(response.headers.get("x-query-count", 0)),
+        }
+    return results
+
+def run_scale(scale: int, args) -> Dict[str, Any]:
+    """One scale in this process; the app is imported here, after BENCH_ENV"""
+    for key, value in BENCH_ENV.items():
+        os.environ[key] = value
+    from fastapi.testclient import TestClient
+    import main
+    import synthetic
+    from catalog import bump_catalog_version
+    from repositories import get_graph
+
+    generate_start = time.perf_counter()
+    catalog = synthetic.generate(scale, args.seed)
+    load_start = time.perf_counter()
+    graph = get_graph()
+    graph.start()
+    counts = synthetic.load(graph, catalog)
+    bump_catalog_version()
+    loaded = time.perf_counter()
+    counts["nodes"], counts["edges"] = len(graph.store.nodes), len(graph.store.edges)
+
+    endpoints = {}
+    with TestClient(main.app) as client:
+        for name, (method, build) in read_endpoints(catalog, args.seed).items():
+            endpoints[name] = measure(client, method, build, args.requests, args.cold_requests, bump_catalog_version)
+            print(f"  {scale:>7} {name:<38} p50 {endpoints[name]['p50Ms']:>9.2f} ms  cold {endpoints[name]['coldMs']:>9.2f} ms", file=sys.stderr)
+        for name, (method, build) in write_endpoints(catalog, args.seed).items():
+            # Writes bump the version themselves, so every request is cold
+            endpoints[name] = measure(client, method, build, args.requests, 0, bump_catalog_version)
+            print(f"  {scale:>7} {name:<38} p50 {endpoints[name]['p50Ms']:>9.2f} ms", file=sys.stderr)
+        uploads = csv_uploads(client, catalog, min(args.csv_rows, scale))
+
+    return {
+        "catalog": counts,
+        "generateSeconds": round(load_start - generate_start, 3),
+        "loadSeconds": round(loaded - load_start, 3),
+        "maxRssMb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        "endpoints": endpoints,
+        "csvUpload": uploads,
+    }
+
+def compare(baseline: Dict[str, Any], current: Dict[str, Any]):
+    """Print p50, query count and payload changes per scale and endpoint"""
+    print(f"{baseline['meta']['commit']} -> {current['meta']['commit']}")
+    print(f"{'scale':>7} {'endpoint':<38} {'p50 ms':>19} {'change':>8} {'queries':>9} {'bytes':>17}")
+    for scale, result in current["scales"].items():
+        before = baseline["scales"].get(scale)
+        if before is None:
+            continue
+        for name, now in result["endpoints"].items():
+            old = before["endpoints"].get(name)
+            if old is None:
+                continue
+            change = (now["p50Ms"] - old["p50Ms"]) / old["p50Ms"] * 100 if old["p50Ms"] else 0.0
+            print(
+                f"{scale:>7} {name:<38} {old['p50Ms']:>9.2f}{now['p50Ms']:>10.2f} {change:>+7.1f}% "
+                f"{old['queries']:>4g}{now['queries']:>5g} {old['bytes']:>8}{now['bytes']:>9}"
+            )
+        for name, now in result.get("csvUpload", {}).items():
+            old = before.get("csvUpload", {}).get(name)
+            if old:
+                print(f"{scale:>7} {'csv.' + name + ' rows/s':<38} {old['rowsPerSecond']:>9.0f}{now['rowsPerSecond']:>10.0f}")
+
+def main_benchmark():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scales", default="1000,10000,100000", help="comma-separated object counts")
+    parser.add_argument("--requests", type=int, default=30, help="warm requests per endpoint")
+    parser.add_argument("--cold-requests", type=int, default=3, help="requests after a version bump per read endpoint")
+    parser.add_argument("--csv-rows", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="results file (default benchmarks/results/<commit>.json)")
+    parser.add_argument("--compare", nargs="+", metavar="RESULTS", help="baseline results, optionally followed by the results to compare instead of running")
+    parser.add_argument("--run-scale", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_scale:
+        result = run_scale(args.run_scale, args)
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(result, f)
+        return
+
+    if args.compare and len(args.compare) == 2:
+        with open(args.compare[0], encoding="utf-8") as f, open(args.compare[1], encoding="utf-8") as g:
+            compare(json.load(f), json.load(g))
+        return
+
+    results = {
+        "meta": {
+            "commit": _git_commit(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "seed": args.seed,
+            "requests": args.requests,
+            "coldRequests": args.cold_requests,
+            "csvRows": args.csv_rows,
+        },
+        "scales": {},
+    }
+    for scale in (int(value) for value in args.scales.split(",")):
+        print(f"scale {scale}", file=sys.stderr)
+        with tempfile.NamedTemporaryFile(suffix=".json", delete=False) as handle:
+            scale_output = handle.name
+        try:
+            command = [
+                sys.executable, "-m", "benchmarks.suite", "--run-scale", str(scale), "--output", scale_output,
+                "--requests", str(args.requests), "--cold-requests", str(args.cold_requests),
+                "--csv-rows", str(args.csv_rows), "--seed", str(args.seed)
+            ]
+            subprocess.run(command, check=True, env=dict(os.environ, **BENCH_ENV))
+            with open(scale_output, encoding="utf-8") as f:
+                results["scales"][str(scale)] = json.load(f)
+        finally:
+            os.unlink(scale_output)
+
+    output = args.output or os.path.join(RESULTS_DIR, f"{results['meta']['commit']}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2, sort_keys=True)
+    print(f"wrote {output}", file=sys.stderr)
+
+    if args.compare:
+        with open(args.compare[0], encoding="utf-8") as f:
+            compare(json.load(f), results)
+
+if __name__ == "__main__":
+    main_benchmark()
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Multi-worker throughput benchmark
+Starts serve.py with 1, 2, ... workers, each holding the synthetic catalog
+from benchmarks.serialization in the in-memory graph backend, and drives it from
+several load-generator processes with keep-alive connections, reporting
+requests per second and median latency for each worker count. Throughput
+should grow roughly linearly until workers exceed the CPU cores available
+to the server (load generators share those cores, so leave some headroom).
+
+Usage (from CDM_UI_Backend):
+  python -m benchmarks.workers [--workers 1,2,4] [--rows 2000] [--path /api/v1/objects]
+                               [--clients 4] [--concurrency 16] [--seconds 10]
+"""
+
+import argparse
+import asyncio
+import multiprocessing
+import os
+import signal
+import socket
+import subprocess
+import sys
+import time
+from typing import Dict, List
+
+import httpx
+
+def __getattr__(name):
+    # Imported as "benchmarks.workers:app" inside each server worker
+    if name == "app":
+        return _stub_app()
+    raise AttributeError(name)
+
+def _stub_app():
+    from benchmarks.serialization import load_synthetic_catalog, main
+    from repositories import get_graph
+
+    load_synthetic_catalog(get_graph(), int(os.environ["CDM_BENCH_ROWS"]))
+    return main.app
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def _wait_ready(url: str, timeout: float = 60.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(url, timeout=1.0).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"server did not become ready at {url}")
+
+async def _load(url: str, concurrency: int, seconds: float) -> List[float]:
+    latencies: List[float] = []
+    deadline = time.monotonic() + seconds
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(limits=limits, timeout=30.0) as client:
+        async def worker():
+            while time.monotonic() < deadline:
+                start = time.perf_counter()
+                response = await client.get(url)
+                response.raise_for_status()
+                latencies.append(time.perf_counter() - start)
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return latencies
+
+def _client_process(args) -> List[float]:
+    url, concurrency, seconds = args
+    return asyncio.run(_load(url, concurrency, seconds))
+
+def measure(workers: int, args) -> Dict[str, float]:
+    port = _free_port()
+    env = dict(
+        os.environ, CDM_BENCH_ROWS=str(args.rows), CDM_GRAPH_BACKEND="memory", CDM_MEMORY_SNAPSHOT="", CDM_ENV="production", CDM_LOG_LEVEL="WARNING",
+        CDM_POOL_WARMUP_CONNECTIONS="0", CDM_WARM_CACHES="false", CDM_HOST="127.0.0.1"
+    )
+    server = subprocess.Popen(
+        [sys.executable, "-c", f"import serve; serve.run('benchmarks.workers:app', workers={workers}, port={port})"],
+        env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    base = f"http://127.0.0.1:{port}"
+    try:
+        _wait_ready(f"{base}/health")
+        # Every worker builds its cached body on its first request
+        _client_process((base + args.path, workers * 2, 1.0))
+        with multiprocessing.Pool(args.clients) as pool:
+            results = pool.map(_client_process, [(base + args.path, args.concurrency, args.seconds)] * args.clients)
+    finally:
+        server.send_signal(signal.SIGTERM)
+        try:
+            server.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            server.kill()
+
+    latencies = sorted(latency for result in results for latency in result)
+    return {
+        "rps": len(latencies) / args.seconds,
+        "p50_ms": latencies[len(latencies) // 2] * 1000 if latencies else 0.0,
+        "p99_ms": latencies[int(len(latencies) * 0.99)] * 1000 if latencies else 0.0,
+    }
+
+def main_benchmark():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", default=None, help="comma-separated worker counts (default 1,2,4... up to the CPU count)")
+    parser.add_argument("--rows", type=int, default=2000)
+    parser.add_argument("--path", default="/api/v1/objects")
+    parser.add_argument("--clients", type=int, default=4)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--seconds", type=float, default=10.0)
+    args = parser.parse_args()
+
+    if args.workers:
+        counts = [int(count) for count in args.workers.split(",")]
+    else:
+        cores, counts = os.cpu_count() or 1, [1]
+        while counts[-1] * 2 <= cores:
+            counts.append(counts[-1] * 2)
+
+    print(f"{os.cpu_count()} CPUs, GET {args.path}, {args.rows} rows, {args.clients}x{args.concurrency} connections, {args.seconds:g} s")
+    print(f"{'workers':>7} {'req/s':>10} {'p50 ms':>9} {'p99 ms':>9} {'scaling':>8}")
+    baseline = None
+    for count in counts:
+        result = measure(count, args)
+        baseline = baseline or result["rps"]
+        print(f"{count:>7} {result['rps']:>10.0f} {result['p50_ms']:>9.1f} {result['p99_ms']:>9.1f} {result['rps'] / baseline:>7.2f}x")
+
+if __name__ == "__main__":
+    main_benchmark()
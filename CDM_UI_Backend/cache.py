@@ -0,0 +1,96 @@
+"""
+Versioned in-process caches for the CDM_UI backend.
+
+Entries are stored together with the catalog version they were computed
+under and are treated as missing once the catalog version moves on.
+SingleFlight collapses identical reads that miss at the same time onto one
+computation.
+"""
+
+import asyncio
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+from instrumentation import profiling
+from metrics import single_flight_requests
+
+# Named caches, reported by metrics.py
+CACHES: Dict[str, "VersionedCache"] = {}
+
+class VersionedCache:
+    """Small LRU cache whose entries are valid for a single catalog version"""
+
+    def __init__(self, max_entries: int = 128, name: Optional[str] = None):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, Tuple[int, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        if name:
+            CACHES[name] = self
+
+    def get(self, key: Hashable, version: int) -> Optional[Any]:
+        if profiling():
+            # ?profile=1 requests must reach Neo4j to produce plans
+            return None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] != version:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key: Hashable, version: int, value: Any):
+        with self._lock:
+            self._entries[key] = (version, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get_or_compute(self, key: Hashable, version: int, compute: Callable[[], Any]) -> Any:
+        value = self.get(key, version)
+        if value is None:
+            value = compute()
+            self.set(key, version, value)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+class SingleFlight:
+    """
+    One computation per (key, catalog version) at a time: the first caller
+    runs compute in a worker thread, callers arriving before it finishes
+    await the same result instead of starting their own. The computation is
+    a task of its own, so a caller that disconnects does not cancel it for
+    the others. Call from the event loop only.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._flights: Dict[Tuple[Hashable, int], "asyncio.Future[Any]"] = {}
+
+    def _label(self, key: Hashable) -> str:
+        return str(key[0] if isinstance(key, tuple) and key else key)
+
+    async def run(self, key: Hashable, version: int, compute: Callable[[], Any]) -> Any:
+        flight = (key, version)
+        task = self._flights.get(flight)
+        if task is None:
+            # to_thread copies the context: the leader's request is charged with the queries
+            task = asyncio.ensure_future(asyncio.to_thread(compute))
+            self._flights[flight] = task
+            task.add_done_callback(lambda done: self._finish(flight, done))
+            single_flight_requests.inc((self.name, self._label(key), "leader"))
+        else:
+            single_flight_requests.inc((self.name, self._label(key), "coalesced"))
+        return await asyncio.shield(task)
+
+    def _finish(self, flight: Tuple[Hashable, int], task: "asyncio.Future[Any]"):
+        self._flights.pop(flight, None)
+        if not task.cancelled():
+            # Retrieved here so a failure nobody awaits any more is not reported as unhandled
+            task.exception()
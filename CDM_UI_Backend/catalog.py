@@ -0,0 +1,101 @@
+"""
+Catalog version tracking for the CDM_UI backend.
+
+Every successful write to the CDM graph bumps the catalog version so that
+derived read structures (search indexes, cached trees) know when to rebuild.
+
+Writes pass the changes they made to bump_catalog_version, which stamps them
+with the new version and appends them to a bounded, ordered change log.
+GET /changes serves the log so clients patch their copy of the grids
+instead of reloading the whole catalog. A write that cannot describe its
+effect (or a bump without changes) logs a "catalog reload" change, and a
+client that fell out of the retained window (or holds a version of another
+process, see EPOCH) is told to reload. change_listeners (push.py) receive
+the stamped changes of every bump.
+
+Configuration:
+  CDM_CHANGE_LOG_SIZE   changes retained for GET /changes (default 10000)
+"""
+
+import os
+import threading
+import time
+import uuid
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+CHANGE_LOG_SIZE = max(1, int(os.getenv("CDM_CHANGE_LOG_SIZE", "10000")))
+
+# Versions count from 0 in every process; clients echo the epoch so a restart forces a reload
+EPOCH = uuid.uuid4().hex[:12]
+
+_lock = threading.Lock()
+_version = 0
+_changes: Deque[Dict[str, Any]] = deque(maxlen=CHANGE_LOG_SIZE)
+# Changes up to and including this version may have been dropped from the log
+_truncated_through = 0
+
+# time.monotonic() of the bumps to the most recent versions, oldest first
+_bumped_at: Deque[float] = deque(maxlen=CHANGE_LOG_SIZE)
+
+# Called with the stamped changes of every bump, after the log has been updated
+change_listeners: List[Callable[[List[Dict[str, Any]]], None]] = []
+
+def change(entity: str, entity_id: Optional[str], operation: str, fields: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    A change log entry: entity is "object", "variable", "driver" or
+    "catalog" (operation "reload": clients must fetch everything again),
+    operation "create", "update" or "delete", fields the changed values
+    under their grid keys (the full row for creates)
+    """
+    return {"entity": entity, "id": entity_id, "op": operation, "fields": fields or {}}
+
+def reload_change() -> Dict[str, Any]:
+    return change("catalog", None, "reload")
+
+def get_catalog_version() -> int:
+    """Return the current in-process catalog version"""
+    return _version
+
+def bump_catalog_version(*changes: Dict[str, Any]) -> int:
+    """Record that the catalog changed and return the new version"""
+    global _version, _truncated_through
+    with _lock:
+        _version += 1
+        version = _version
+        _bumped_at.append(time.monotonic())
+        stamped = [{"version": version, **entry} for entry in changes or (reload_change(),)]
+        for entry in stamped:
+            if len(_changes) == _changes.maxlen:
+                _truncated_through = _changes[0]["version"]
+            _changes.append(entry)
+    for listener in change_listeners:
+        listener(stamped)
+    return version
+
+def bumped_at(version: int) -> Optional[float]:
+    """time.monotonic() when the catalog reached version, None when unknown or too old"""
+    with _lock:
+        index = len(_bumped_at) - 1 - (_version - version)
+        if version < 1 or index < 0 or index >= len(_bumped_at):
+            return None
+        return _bumped_at[index]
+
+def changes_since(since: int) -> Optional[List[Dict[str, Any]]]:
+    """
+    Changes with a version above since, oldest first, or None when they
+    cannot be replayed: since is unknown to this process, older than the
+    retained window, or followed by a catalog reload
+    """
+    with _lock:
+        if since > _version or since < _truncated_through:
+            return None
+        newer = []
+        for entry in reversed(_changes):
+            if entry["version"] <= since:
+                break
+            if entry["entity"] == "catalog":
+                return None
+            newer.append(entry)
+    newer.reverse()
+    return newer
@@ -0,0 +1,125 @@
+"""
+Cross-process cache coherency for the CDM_UI backend.
+
+The catalog version of catalog.py counts the writes of one process. With
+several workers (serve.py) or pods, a write through one of them leaves the
+caches and read replica of the others outdated. Every write transaction
+therefore also increments a stamp stored in the graph, on a :CatalogVersion
+node of the writing process (repositories/cypher.py): writers of different
+processes do not contend, and a process's own writes never look external.
+Each process remembers the other processes' stamps its caches reflect.
+When one of them grew, or a process it did not know has written, this
+process bumps its catalog version with a reload change: the body caches,
+search and typeahead indexes rebuild, GET /changes and change stream
+clients reload, and the read replica reloads. Stamps that disappear (a
+process shut down or its stale stamp was pruned) are no change.
+
+CoherenceMiddleware compares the stamp before catalog reads (GET
+/api/v1/...). Reads are rate-limited and batched: at most one stamp query
+per CDM_COHERENCE_INTERVAL_MS per process, which every request arriving
+while it runs awaits. A process thus serves data at most one interval (plus
+the query) behind writes made elsewhere, for one read of a node per
+process per interval. Backends without a shared stamp (memory) skip all of it.
+
+Configuration:
+  CDM_COHERENCE               check the graph stamp before catalog reads (default true)
+  CDM_COHERENCE_INTERVAL_MS   minimum time between two checks (default 1000, 0 checks before every read)
+"""
+
+import asyncio
+import logging
+import os
+import threading
+import time
+from typing import Dict, Optional
+from catalog import bump_catalog_version, reload_change
+from metrics import coherence_checks, coherence_reloads
+
+logger = logging.getLogger(__name__)
+
+ENABLED = os.getenv("CDM_COHERENCE", "true").lower() in ("1", "true", "yes")
+INTERVAL_SECONDS = int(os.getenv("CDM_COHERENCE_INTERVAL_MS", "1000")) / 1000
+
+class SharedVersion:
+    """The graph stamp this process reflects, see module docstring"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # The other processes' stamps; None until initialize() or the first check
+        self.known: Optional[Dict[str, int]] = None
+        # Changes by other processes detected so far; the read replica reloads when it moves
+        self.external = 0
+        self.supported = ENABLED
+        self._checked_at = float("-inf")
+        self._check: Optional["asyncio.Future[None]"] = None
+
+    def initialize(self, graph):
+        """Adopt the current stamps; call before the replica loads and caches warm"""
+        if not self.supported:
+            return
+        try:
+            stamps = graph.shared_version()
+        except Exception as e:
+            logger.warning("Reading the catalog version stamps failed, the first check reloads: %s", e)
+            return
+        if stamps is None:
+            self.supported = False
+            return
+        with self._lock:
+            self.known = stamps
+
+    def _observe(self, stamps: Dict[str, int]):
+        with self._lock:
+            known = self.known
+            self.known = stamps
+            if known is not None and all(known.get(process) == stamp for process, stamp in stamps.items()):
+                return
+            self.external += 1
+        coherence_reloads.inc(("check",))
+        logger.info("Catalog changed in another process, reloading caches")
+        bump_catalog_version(reload_change())
+
+    def _read(self, graph):
+        stamps = graph.shared_version()
+        coherence_checks.inc()
+        if stamps is None:
+            self.supported = False
+            return
+        self._observe(stamps)
+
+    async def ensure_fresh(self):
+        """Check the stamp unless a check ran within the interval; concurrent callers share one check"""
+        if not self.supported:
+            return
+        if self._check is None:
+            now = time.monotonic()
+            if now - self._checked_at < INTERVAL_SECONDS:
+                return
+            self._checked_at = now
+            from repositories import get_graph
+
+            self._check = asyncio.ensure_future(asyncio.to_thread(self._read, get_graph()))
+            self._check.add_done_callback(self._checked)
+        try:
+            await asyncio.shield(self._check)
+        except Exception:
+            # Logged once by _checked; reads go on with what this process has
+            pass
+
+    def _checked(self, check: "asyncio.Future[None]"):
+        self._check = None
+        if not check.cancelled() and check.exception() is not None:
+            logger.warning("Checking the catalog version stamp failed: %s", check.exception())
+
+shared_version = SharedVersion()
+
+class CoherenceMiddleware:
+    """Runs SharedVersion.ensure_fresh before API reads"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and scope.get("method") == "GET" and scope.get("path", "").startswith("/api/"):
+            await shared_version.ensure_fresh()
+        await self.app(scope, receive, send)
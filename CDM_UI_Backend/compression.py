@@ -0,0 +1,211 @@
+"""
+Negotiated response compression for the CDM_UI backend.
+
+ASGI middleware that gzip- or brotli-encodes responses according to the
+request's Accept-Encoding. Bodies below a size threshold are sent as-is,
+catalog responses carrying an ETag (see responses.serialized_response) are
+compressed once per catalog version, and streaming responses are compressed
+chunk by chunk instead of being buffered.
+"""
+
+import os
+import zlib
+from typing import Dict, List, Optional, Tuple
+from cache import VersionedCache
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - brotli is optional, gzip is always available
+    brotli = None
+
+MIN_SIZE = int(os.getenv("CDM_COMPRESSION_MIN_SIZE", "1024"))
+GZIP_LEVEL = int(os.getenv("CDM_GZIP_LEVEL", "6"))
+BROTLI_QUALITY = int(os.getenv("CDM_BROTLI_QUALITY", "5"))
+
+# Event streams must reach the client unbuffered
+UNCOMPRESSED_TYPES = ("text/event-stream",)
+
+def negotiate_encoding(accept_encoding: str) -> Optional[str]:
+    """Pick "br" or "gzip" from an Accept-Encoding header, honouring q-values"""
+    weights: Dict[str, float] = {}
+    for item in accept_encoding.split(","):
+        name, _, params = item.strip().partition(";")
+        name = name.strip().lower()
+        if not name:
+            continue
+        weight = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key == "q":
+                try:
+                    weight = float(value)
+                except ValueError:
+                    weight = 0.0
+        weights[name] = weight
+
+    wildcard = weights.get("*", 0.0)
+    candidates = (["br"] if brotli is not None else []) + ["gzip"]
+    best = None
+    for encoding in candidates:
+        weight = weights.get(encoding, wildcard)
+        if weight > 0 and (best is None or weight > best[1]):
+            best = (encoding, weight)
+    return best[0] if best else None
+
+def _compressible(content_type: str) -> bool:
+    content_type = content_type.lower()
+    if content_type.startswith(UNCOMPRESSED_TYPES):
+        return False
+    return (
+        content_type.startswith("text/")
+        or "json" in content_type
+        or "xml" in content_type
+        or "javascript" in content_type
+    )
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)
+    return compressor.compress(body) + compressor.flush()
+
+class _StreamCompressor:
+    """Incremental encoder that flushes after every chunk"""
+
+    def __init__(self, encoding: str):
+        self.encoding = encoding
+        if encoding == "br":
+            self._brotli = brotli.Compressor(quality=BROTLI_QUALITY)
+        else:
+            self._zlib = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)
+
+    def chunk(self, data: bytes) -> bytes:
+        if self.encoding == "br":
+            return self._brotli.process(data) + self._brotli.flush()
+        return self._zlib.compress(data) + self._zlib.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        if self.encoding == "br":
+            return self._brotli.finish()
+        return self._zlib.flush()
+
+# Compressed bodies of ETag-tagged catalog responses, keyed by (etag, encoding)
+_compressed_cache = VersionedCache(max_entries=64, name="compressed_body")
+
+class CompressionMiddleware:
+    def __init__(self, app, minimum_size: int = MIN_SIZE):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope.get("headers") or [])
+        encoding = negotiate_encoding(headers.get(b"accept-encoding", b"").decode("latin-1"))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message = None
+        stream: Optional[_StreamCompressor] = None
+        passthrough = False
+
+        async def send_wrapper(message):
+            nonlocal start_message, stream, passthrough
+            if message["type"] == "http.response.start":
+                start_message = message
+                return
+            if message["type"] != "http.response.body" or passthrough:
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+
+            if stream is not None:
+                data = stream.chunk(body)
+                if not more_body:
+                    data += stream.finish()
+                await send({"type": "http.response.body", "body": data, "more_body": more_body})
+                return
+
+            # First body message: decide whether to compress
+            response_headers = _Headers(start_message["headers"])
+            content_type = response_headers.get("content-type", "")
+            declared_size = response_headers.get("content-length")
+            skip = (
+                "content-encoding" in response_headers
+                or not _compressible(content_type)
+                or (not more_body and len(body) < self.minimum_size)
+                or (declared_size is not None and declared_size.isdigit() and int(declared_size) < self.minimum_size)
+            )
+            if skip:
+                passthrough = True
+                await send(start_message)
+                await send(message)
+                return
+
+            response_headers.add_vary("Accept-Encoding")
+            response_headers.set("content-encoding", encoding)
+
+            if more_body:
+                stream = _StreamCompressor(encoding)
+                response_headers.remove("content-length")
+                response_headers.remove("etag")
+                start_message["headers"] = response_headers.raw
+                await send(start_message)
+                await send({"type": "http.response.body", "body": stream.chunk(body), "more_body": True})
+                return
+
+            etag = response_headers.get("etag")
+            version = response_headers.get("x-catalog-version")
+            cacheable = "no-store" not in response_headers.get("cache-control", "")
+            if etag and version and version.isdigit() and cacheable:
+                cache_key = (etag, encoding)
+                compressed = _compressed_cache.get(cache_key, int(version))
+                if compressed is None:
+                    compressed = compress(body, encoding)
+                    _compressed_cache.set(cache_key, int(version), compressed)
+                response_headers.set("etag", f'{etag[:-1]}-{encoding}"' if etag.endswith('"') else f"{etag}-{encoding}")
+            else:
+                compressed = compress(body, encoding)
+
+            response_headers.set("content-length", str(len(compressed)))
+            start_message["headers"] = response_headers.raw
+            await send(start_message)
+            await send({"type": "http.response.body", "body": compressed, "more_body": False})
+
+        await self.app(scope, receive, send_wrapper)
+
+class _Headers:
+    """Minimal mutable view over raw ASGI header pairs"""
+
+    def __init__(self, raw: List[Tuple[bytes, bytes]]):
+        self.raw = list(raw)
+
+    def __contains__(self, name: str) -> bool:
+        return self.get(name) is not None
+
+    def get(self, name: str, default: Optional[str] = None) -> Optional[str]:
+        key = name.encode("latin-1")
+        for header, value in self.raw:
+            if header.lower() == key:
+                return value.decode("latin-1")
+        return default
+
+    def remove(self, name: str):
+        key = name.encode("latin-1")
+        self.raw = [(header, value) for header, value in self.raw if header.lower() != key]
+
+    def set(self, name: str, value: str):
+        self.remove(name)
+        self.raw.append((name.encode("latin-1"), value.encode("latin-1")))
+
+    def add_vary(self, value: str):
+        current = self.get("vary")
+        if current is None:
+            self.set("vary", value)
+        elif value.lower() not in current.lower():
+            self.set("vary", f"{current}, {value}")
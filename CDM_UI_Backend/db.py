@@ -1,11 +1,37 @@
+import logging
 import os
+import random
 import ssl
-from neo4j import GraphDatabase
+import time
+from typing import Any, Callable, Dict, Optional, TypeVar
+from neo4j import GraphDatabase, Query, READ_ACCESS, WRITE_ACCESS
+from neo4j.exceptions import ServiceUnavailable, SessionExpired, TransientError
 from dotenv import load_dotenv
+from instrumentation import InstrumentedDriver
+from metrics import register_pool_metrics, transaction_retries
+from tracing import current_trace_id
 
 # Load environment variables from .env file
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
+# Connections to Neo4j across the whole deployment; with CDM_WORKERS worker
+# processes (set by serve.py) each worker's driver gets an equal share
+NEO4J_POOL_BUDGET = int(os.getenv("CDM_NEO4J_POOL_BUDGET", "50"))
+WORKERS = max(1, int(os.getenv("CDM_WORKERS", "1")))
+MAX_CONNECTION_POOL_SIZE = max(1, NEO4J_POOL_BUDGET // WORKERS)
+CONNECTION_ACQUISITION_TIMEOUT = 60  # 1 minute
+
+# Unit-of-work settings, see execute_read / execute_write
+TRANSACTION_TIMEOUT = float(os.getenv("CDM_TX_TIMEOUT", "30"))  # seconds, enforced by the server
+TRANSACTION_MAX_RETRIES = int(os.getenv("CDM_TX_MAX_RETRIES", "4"))
+TRANSACTION_RETRY_DELAY = float(os.getenv("CDM_TX_RETRY_DELAY", "0.1"))  # first backoff, doubled per retry
+TRANSACTION_RETRY_MAX_DELAY = float(os.getenv("CDM_TX_RETRY_MAX_DELAY", "2.0"))
+TRANSACTION_APP = "cdm-ui-backend"
+
+T = TypeVar("T")
+
 class Neo4jConnection:
     def __init__(self):
         self.uri = os.getenv("NEO4J_URI", "bolt://localhost:7687")
@@ -16,47 +42,50 @@ class Neo4jConnection:
     def connect(self):
         """Initialize connection to Neo4j database"""
         try:
-            print(f"Attempting to connect to Neo4j at {self.uri}")
-            print(f"Username: {self.username}")
+            logger.info(
+                "Attempting to connect to Neo4j at %s as %s (pid %d, pool of %d connections)",
+                self.uri, self.username, os.getpid(), MAX_CONNECTION_POOL_SIZE
+            )
             
             # For Neo4j Aura, use neo4j+ssc scheme for self-signed certificates
             # This resolves SSL certificate verification issues
             working_uri = self.uri.replace("neo4j+s://", "neo4j+ssc://")
-            print(f"Using working URI: {working_uri}")
+            logger.debug("Using working URI: %s", working_uri)
             
-            self.driver = GraphDatabase.driver(
+            # Every session.run is timed per request, see instrumentation.py
+            self.driver = InstrumentedDriver(GraphDatabase.driver(
                 working_uri, 
                 auth=(self.username, self.password),
                 max_connection_lifetime=30 * 60,  # 30 minutes
-                max_connection_pool_size=50,
-                connection_acquisition_timeout=60,  # 1 minute
+                max_connection_pool_size=MAX_CONNECTION_POOL_SIZE,
+                connection_acquisition_timeout=CONNECTION_ACQUISITION_TIMEOUT,
                 connection_timeout=30,  # 30 seconds
                 keep_alive=True
-            )
+            ))
+            register_pool_metrics(self.driver, MAX_CONNECTION_POOL_SIZE, CONNECTION_ACQUISITION_TIMEOUT)
             
             # Test the connection with a simple query
             with self.driver.session() as session:
                 result = session.run("RETURN 1 as test")
                 record = result.single()
-                print(f"Successfully connected to Neo4j! Test result: {record['test']}")
+                logger.info("Successfully connected to Neo4j! Test result: %s", record['test'])
                 
                 # Get database info
                 try:
                     db_info = session.run("CALL db.info()")
                     info = db_info.single()
-                    print(f"Database: {info['name']}")
+                    logger.info("Database: %s", info['name'])
                 except:
-                    print("Could not retrieve database info (this is normal for some Neo4j versions)")
+                    logger.debug("Could not retrieve database info (this is normal for some Neo4j versions)")
             
             return True
         except Exception as e:
-            print(f"Failed to connect to Neo4j: {e}")
-            print("Please check:")
-            print("1. Network connectivity")
-            print("2. Neo4j Aura instance is running")
-            print("3. Credentials are correct")
-            print("4. URI format is correct (neo4j+s:// for Aura)")
-            print("\nFor now, the API will use dummy data until Neo4j connection is resolved.")
+            logger.error(
+                "Failed to connect to Neo4j: %s. Please check: 1. Network connectivity "
+                "2. Neo4j Aura instance is running 3. Credentials are correct "
+                "4. URI format is correct (neo4j+s:// for Aura). "
+                "For now, the API will use dummy data until Neo4j connection is resolved.", e
+            )
             return False
     
     def get_driver(self):
@@ -70,7 +99,8 @@ class Neo4jConnection:
         """Close the database connection"""
         if self.driver:
             self.driver.close()
-            print("Neo4j connection closed")
+            self.driver = None
+            logger.info("Neo4j connection closed")
 
 # Global connection instance
 neo4j_conn = Neo4jConnection()
@@ -85,3 +115,106 @@ def get_session():
     if driver:
         return driver.session()
     return None
+
+def warm_up_pool(connections: int) -> int:
+    """
+    Open up to `connections` pooled connections ahead of the first requests
+    and return how many were opened. Each explicit transaction pins its
+    connection until closed, so holding them all open at once forces the
+    pool to dial a new connection for every one.
+    """
+    driver = get_driver()
+    if not driver or connections <= 0:
+        return 0
+    sessions, transactions = [], []
+    try:
+        for _ in range(min(connections, MAX_CONNECTION_POOL_SIZE)):
+            session = driver.session()
+            sessions.append(session)
+            transactions.append(session.begin_transaction())
+    finally:
+        for tx in transactions:
+            tx.close()
+        for session in sessions:
+            session.close()
+    return len(transactions)
+
+def ping(timeout: float) -> None:
+    """Round-trip a trivial statement; raises when Neo4j is unreachable"""
+    driver = get_driver()
+    if not driver:
+        raise DatabaseUnavailableError("Failed to connect to Neo4j database")
+    with driver.session(default_access_mode=READ_ACCESS) as session:
+        session.run(Query("RETURN 1", timeout=timeout)).consume()
+
+class DatabaseUnavailableError(RuntimeError):
+    """Raised by execute_read / execute_write when no driver is available"""
+
+def is_retryable(error: Exception) -> bool:
+    """Transient server errors, leader switches and dropped connections"""
+    is_retryable_error = getattr(error, "is_retryable", None)
+    if callable(is_retryable_error):
+        return is_retryable_error()
+    return isinstance(error, (TransientError, ServiceUnavailable, SessionExpired))
+
+def _run_unit_of_work(access_mode: str, work: Callable[..., T], args, kwargs,
+                      timeout: Optional[float], metadata: Optional[Dict[str, Any]]) -> T:
+    driver = get_driver()
+    if not driver:
+        raise DatabaseUnavailableError("Failed to connect to Neo4j database")
+
+    unit = getattr(work, "__qualname__", getattr(work, "__name__", "work"))
+    tx_metadata = {"app": TRANSACTION_APP, "unit": unit}
+    trace_id = current_trace_id()
+    if trace_id:
+        tx_metadata["traceId"] = trace_id
+    if metadata:
+        tx_metadata.update(metadata)
+    tx_timeout = TRANSACTION_TIMEOUT if timeout is None else timeout
+
+    delay = TRANSACTION_RETRY_DELAY
+    attempt = 0
+    while True:
+        try:
+            with driver.session(default_access_mode=access_mode) as session:
+                with session.begin_transaction(metadata=tx_metadata, timeout=tx_timeout) as tx:
+                    result = work(tx, *args, **kwargs)
+                    tx.commit()
+                    return result
+        except Exception as e:
+            if attempt >= TRANSACTION_MAX_RETRIES or not is_retryable(e):
+                raise
+            attempt += 1
+            transaction_retries.inc((access_mode,))
+            # Exponential backoff with jitter so retrying workers spread out
+            sleep_for = delay * random.uniform(0.5, 1.5)
+            logger.warning(
+                "Retrying %s transaction %s (attempt %d/%d) in %.0f ms after %s: %s",
+                access_mode, unit, attempt, TRANSACTION_MAX_RETRIES, sleep_for * 1000, type(e).__name__, e
+            )
+            time.sleep(sleep_for)
+            delay = min(delay * 2, TRANSACTION_RETRY_MAX_DELAY)
+
+def execute_read(work: Callable[..., T], *args, timeout: Optional[float] = None,
+                 metadata: Optional[Dict[str, Any]] = None, **kwargs) -> T:
+    """
+    Run work(tx, *args, **kwargs) in one read transaction, routed to a reader
+    when the database is clustered. See execute_write for retries.
+    """
+    return _run_unit_of_work(READ_ACCESS, work, args, kwargs, timeout, metadata)
+
+def execute_write(work: Callable[..., T], *args, timeout: Optional[float] = None,
+                  metadata: Optional[Dict[str, Any]] = None, **kwargs) -> T:
+    """
+    Run work(tx, *args, **kwargs) in one write transaction and commit once.
+
+    Transient failures (leader switches, connection resets, deadlocks) roll
+    the transaction back and re-run `work` from the start with exponential
+    backoff, up to CDM_TX_MAX_RETRIES times, so `work` must not have side
+    effects outside the transaction. Any other exception (HTTPException
+    included) rolls back and propagates. The transaction is tagged with the
+    app name, the work function and the current trace id (visible in
+    SHOW TRANSACTIONS and the query log) and is killed by the server after
+    `timeout` seconds (default CDM_TX_TIMEOUT).
+    """
+    return _run_unit_of_work(WRITE_ACCESS, work, args, kwargs, timeout, metadata)
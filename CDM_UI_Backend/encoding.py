@@ -0,0 +1,56 @@
+"""
+Alternative response encodings for the grid endpoints of the CDM_UI backend.
+
+The columnar encoding sends each column once as a value array instead of
+repeating every key on every row, and replaces low-cardinality columns with
+integer codes into a per-column dictionary.
+"""
+
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+COLUMNAR_MEDIA_TYPE = "application/vnd.cdm.columnar+json"
+
+def wants_columnar(format: Optional[str], accept: Optional[str]) -> bool:
+    """?format= wins over the Accept header; the default stays row-oriented JSON"""
+    if format:
+        return format == "columnar"
+    return bool(accept) and COLUMNAR_MEDIA_TYPE in accept
+
+def encode_columnar(rows: Iterable[Dict[str, Any]], columns: Sequence[str], dictionary_columns: Sequence[str] = ()) -> Dict[str, Any]:
+    """
+    Encode rows as {"format", "count", "columns", "dictionaries", "data"}.
+    data[i] holds the values of columns[i] in row order; for columns listed in
+    dictionary_columns the values are indexes into dictionaries[column].
+    """
+    data: List[List[Any]] = [[] for _ in columns]
+    dictionaries: Dict[str, List[Any]] = {}
+    codes: Dict[str, Dict[Any, int]] = {}
+    encoded = []
+    for position, column in enumerate(columns):
+        if column in dictionary_columns:
+            dictionaries[column] = []
+            codes[column] = {}
+            encoded.append((data[position], column, codes[column], dictionaries[column]))
+        else:
+            encoded.append((data[position], column, None, None))
+
+    count = 0
+    for row in rows:
+        count += 1
+        for values, column, column_codes, table in encoded:
+            value = row.get(column)
+            if column_codes is not None:
+                code = column_codes.get(value)
+                if code is None:
+                    code = column_codes[value] = len(table)
+                    table.append(value)
+                value = code
+            values.append(value)
+
+    return {
+        "format": "columnar",
+        "count": count,
+        "columns": list(columns),
+        "dictionaries": dictionaries,
+        "data": data
+    }
@@ -0,0 +1,101 @@
+"""
+Stale-while-revalidate and read-your-writes for the CDM_UI backend.
+
+With CDM_STALE_WHILE_REVALIDATE on, a grid read that finds its cached body
+outdated by a write is answered from the last good body while one
+background task builds the new one (see responses.coalesced_response), so
+the first reader after a write does not pay for the full catalog query.
+Stale bodies carry X-Catalog-Version (the version they reflect),
+X-Catalog-Latest-Version and Age (seconds since they went stale), and are
+only served up to CDM_STALE_MAX_SECONDS after the write that outdated them.
+
+A client never gets a body older than its own writes: responses to writes
+set the cdm_catalog_version cookie (and X-Catalog-Version) to the version
+the write produced, and reads sending that cookie, or the version as
+X-Min-Catalog-Version, wait for a body at least that recent.
+
+Configuration:
+  CDM_STALE_WHILE_REVALIDATE   serve outdated grid bodies while rebuilding (default false)
+  CDM_STALE_MAX_SECONDS        longest a body may be served after the write that outdated it (default 30)
+"""
+
+import os
+from contextvars import ContextVar
+from http.cookies import SimpleCookie
+from typing import Any, Dict, List, Optional
+from catalog import EPOCH, change_listeners
+
+STALE_WHILE_REVALIDATE = os.getenv("CDM_STALE_WHILE_REVALIDATE", "false").lower() in ("1", "true", "yes")
+STALE_MAX_SECONDS = float(os.getenv("CDM_STALE_MAX_SECONDS", "30"))
+
+COOKIE = "cdm_catalog_version"
+
+class _Session:
+    __slots__ = ("min_version", "written")
+
+    def __init__(self, min_version: int):
+        self.min_version = min_version
+        # Latest version produced by a write of this request
+        self.written: Optional[int] = None
+
+_current_session: ContextVar[Optional[_Session]] = ContextVar("cdm_session", default=None)
+
+def _parse_version(value: Optional[str]) -> int:
+    """Version from "epoch:version" (or a bare version), 0 when it belongs to another process"""
+    epoch, _, version = (value or "").strip().rpartition(":")
+    if not version.isdigit() or epoch not in ("", EPOCH):
+        return 0
+    return int(version)
+
+def min_version() -> int:
+    """Oldest catalog version the current request may be answered from"""
+    session = _current_session.get()
+    return session.min_version if session is not None else 0
+
+def _record_write(entries: List[Dict[str, Any]]):
+    """catalog change listener: remember the version a request's write produced"""
+    session = _current_session.get()
+    if session is not None and entries:
+        session.written = entries[-1]["version"]
+
+change_listeners.append(_record_write)
+
+class ReadYourWritesMiddleware:
+    """Tracks the catalog version each client has written, see module docstring"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope.get("headers") or [])
+        required = _parse_version(headers.get(b"x-min-catalog-version", b"").decode("latin-1"))
+        cookies = SimpleCookie()
+        try:
+            cookies.load(headers.get(b"cookie", b"").decode("latin-1"))
+        except Exception:
+            pass
+        if COOKIE in cookies:
+            required = max(required, _parse_version(cookies[COOKIE].value))
+        session = _Session(required)
+        token = _current_session.set(session)
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start" and session.written is not None:
+                value = f"{EPOCH}:{session.written}"
+                message["headers"] = [
+                    (name, header) for name, header in (message.get("headers") or [])
+                    if name.lower() != b"x-catalog-version"
+                ] + [
+                    (b"x-catalog-version", str(session.written).encode()),
+                    (b"set-cookie", f"{COOKIE}={value}; Path=/; HttpOnly; SameSite=Lax".encode()),
+                ]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current_session.reset(token)
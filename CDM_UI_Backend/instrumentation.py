@@ -0,0 +1,487 @@
+"""
+Cypher query instrumentation for the CDM_UI backend.
+
+The Neo4j driver returned by db.get_driver() is wrapped so that every
+session.run (including runs inside explicit and managed transactions)
+records a statement fingerprint, run duration, rows returned and the time
+spent consuming the result. QueryStatsMiddleware aggregates the records per
+HTTP request and logs requests that exceed the query-count budget (likely
+N+1 loops) or the latency threshold, with a per-statement breakdown, and
+adds a Server-Timing header splitting each response into pool acquisition,
+Cypher execution, result streaming, dict building and JSON encoding.
+
+Admins can append ?profile=1 (with the X-Admin-Token header) to run every
+statement of the request under PROFILE; JSON responses then come back as
+{"data": <response>, "profile": [...per-statement operator summary...]}.
+
+Configuration:
+  CDM_ENV                  development (default) or production
+  CDM_QUERY_SAMPLE_RATE    fraction of requests tracked (1.0 in development, 0.05 in production)
+  CDM_QUERY_BUDGET         statements per request before it is reported (default 25)
+  CDM_SLOW_REQUEST_MS      request latency before it is reported (default 1000)
+  CDM_ADMIN_TOKEN          enables ?profile=1 for requests sending it as X-Admin-Token
+"""
+
+import hmac
+import json
+import logging
+import os
+import random
+import re
+import time
+import zlib
+from contextvars import ContextVar
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs
+from tracing import start_span
+
+CDM_ENV = os.getenv("CDM_ENV", "development").lower()
+SAMPLE_RATE = float(os.getenv("CDM_QUERY_SAMPLE_RATE", "0.05" if CDM_ENV == "production" else "1.0"))
+QUERY_BUDGET = int(os.getenv("CDM_QUERY_BUDGET", "25"))
+SLOW_REQUEST_MS = float(os.getenv("CDM_SLOW_REQUEST_MS", "1000"))
+ADMIN_TOKEN = os.getenv("CDM_ADMIN_TOKEN")
+
+logger = logging.getLogger(__name__)
+
+# Statements already carrying a plan prefix are not wrapped again
+_PLAN_PREFIXES = ("PROFILE", "EXPLAIN")
+
+_LITERALS = re.compile(r"'(?:[^'\\]|\\.)*'|\"(?:[^\"\\]|\\.)*\"|\b\d+(?:\.\d+)?\b")
+_WHITESPACE = re.compile(r"\s+")
+
+@lru_cache(maxsize=1024)
+def fingerprint(query: str) -> Tuple[str, str]:
+    """(fingerprint id, normalized statement) with literals replaced by ?"""
+    statement = _WHITESPACE.sub(" ", _LITERALS.sub("?", query)).strip()
+    return f"{zlib.crc32(statement.encode()):08x}", statement
+
+class QueryRecord:
+    __slots__ = ("fingerprint", "statement", "duration", "rows", "consume_time", "profile")
+
+    def __init__(self, query: str):
+        self.fingerprint, self.statement = fingerprint(query)
+        self.duration = 0.0
+        self.rows = 0
+        self.consume_time = 0.0
+        self.profile = None
+
+def _flatten_plan(plan: Dict[str, Any], operators: List[Dict[str, Any]]):
+    operators.append({
+        "operator": plan.get("operatorType"),
+        "rows": plan.get("rows", 0),
+        "dbHits": plan.get("dbHits", 0)
+    })
+    for child in plan.get("children") or []:
+        _flatten_plan(child, operators)
+
+class RequestQueryStats:
+    """Statements issued while serving one HTTP request"""
+
+    def __init__(self, method: str, path: str):
+        self.method = method
+        self.path = path
+        self.queries: List[QueryRecord] = []
+        self.started = time.perf_counter()
+        self.acquire_time = 0.0
+        self.encode_time = 0.0
+        self.profile = False
+        self.profiled: List[Tuple[QueryRecord, Any]] = []
+
+    @property
+    def query_time(self) -> float:
+        return sum(record.duration + record.consume_time for record in self.queries)
+
+    def breakdown(self) -> List[Dict[str, Any]]:
+        """Per-fingerprint totals, most expensive first"""
+        groups: Dict[str, Dict[str, Any]] = {}
+        for record in self.queries:
+            group = groups.get(record.fingerprint)
+            if group is None:
+                group = groups[record.fingerprint] = {
+                    "fingerprint": record.fingerprint, "statement": record.statement,
+                    "count": 0, "ms": 0.0, "rows": 0
+                }
+            group["count"] += 1
+            group["ms"] += (record.duration + record.consume_time) * 1000
+            group["rows"] += record.rows
+        return sorted(groups.values(), key=lambda group: group["ms"], reverse=True)
+
+    def server_timing(self) -> str:
+        """
+        Server-Timing value for the work done so far. Pool acquisition happens
+        inside session.run, so it is taken out of the Cypher execution time;
+        dict building is whatever remains after the measured phases.
+        """
+        total = time.perf_counter() - self.started
+        run_time = sum(record.duration for record in self.queries)
+        streaming = sum(record.consume_time for record in self.queries)
+        cypher = max(run_time - self.acquire_time, 0.0)
+        build = max(total - run_time - streaming - self.encode_time, 0.0)
+        phases = (
+            ("acquire", self.acquire_time, "pool acquisition"),
+            ("cypher", cypher, f"Cypher execution ({len(self.queries)} statements)"),
+            ("stream", streaming, "result streaming"),
+            ("build", build, "dict building"),
+            ("encode", self.encode_time, "JSON encoding"),
+            ("total", total, "total"),
+        )
+        return ", ".join(f'{name};dur={seconds * 1000:.2f};desc="{desc}"' for name, seconds, desc in phases)
+
+    def profile_summary(self) -> List[Dict[str, Any]]:
+        """PROFILE operator breakdown (rows, db hits) of every profiled statement"""
+        summary = []
+        for record, result in self.profiled:
+            if record.profile is None:
+                _capture_profile(result, record)
+            entry = {"fingerprint": record.fingerprint, "statement": record.statement, "rows": record.rows}
+            if record.profile:
+                operators: List[Dict[str, Any]] = []
+                _flatten_plan(record.profile, operators)
+                entry["dbHits"] = sum(operator["dbHits"] or 0 for operator in operators)
+                entry["operators"] = operators
+            else:
+                entry["operators"] = None
+            summary.append(entry)
+        return summary
+
+_current_stats: ContextVar[Optional[RequestQueryStats]] = ContextVar("cdm_query_stats", default=None)
+
+def current_stats() -> Optional[RequestQueryStats]:
+    return _current_stats.get()
+
+def profiling() -> bool:
+    """True while serving a ?profile=1 request; caches are bypassed so statements actually run"""
+    stats = _current_stats.get()
+    return stats is not None and stats.profile
+
+def add_acquire_time(seconds: float):
+    stats = _current_stats.get()
+    if stats is not None:
+        stats.acquire_time += seconds
+
+def add_encode_time(seconds: float):
+    stats = _current_stats.get()
+    if stats is not None:
+        stats.encode_time += seconds
+
+def _capture_profile(result, record: QueryRecord):
+    """Read the PROFILE plan once the result is consumed; results closed with their transaction have none"""
+    try:
+        record.profile = result.consume().profile or {}
+    except Exception:
+        record.profile = {}
+
+class InstrumentedResult:
+    """Result proxy that adds consumption time and row counts to its QueryRecord"""
+
+    def __init__(self, result, record: QueryRecord, profile: bool = False):
+        self._result = result
+        self._record = record
+        self._profile = profile
+
+    def __getattr__(self, name):
+        return getattr(self._result, name)
+
+    def __iter__(self):
+        iterator = iter(self._result)
+        while True:
+            start = time.perf_counter()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                self._record.consume_time += time.perf_counter() - start
+                if self._profile:
+                    _capture_profile(self._result, self._record)
+                return
+            self._record.consume_time += time.perf_counter() - start
+            self._record.rows += 1
+            yield item
+
+    def _timed(self, method: str, *args, rows=None, **kwargs):
+        start = time.perf_counter()
+        try:
+            value = getattr(self._result, method)(*args, **kwargs)
+        finally:
+            self._record.consume_time += time.perf_counter() - start
+        self._record.rows += rows(value) if rows else 0
+        if self._profile and method != "fetch":
+            _capture_profile(self._result, self._record)
+        return value
+
+    def data(self, *keys):
+        return self._timed("data", *keys, rows=len)
+
+    def values(self, *keys):
+        return self._timed("values", *keys, rows=len)
+
+    def value(self, *args, **kwargs):
+        return self._timed("value", *args, rows=len, **kwargs)
+
+    def single(self, *args, **kwargs):
+        return self._timed("single", *args, rows=lambda record: 0 if record is None else 1, **kwargs)
+
+    def fetch(self, n):
+        return self._timed("fetch", n, rows=len)
+
+    def consume(self):
+        return self._timed("consume")
+
+# Called with every QueryRecord once its run has returned, tracked request or not
+query_observers: List[Callable[[QueryRecord], None]] = []
+
+def _instrumented_run(target, query, parameters, kwargs, parent=None):
+    stats = _current_stats.get()
+    if stats is None and not query_observers:
+        return target.run(query, parameters, **kwargs)
+    record = QueryRecord(query if isinstance(query, str) else str(getattr(query, "text", query)))
+    if stats is not None:
+        stats.queries.append(record)
+        if stats.profile and isinstance(query, str) and not query.lstrip().upper().startswith(_PLAN_PREFIXES):
+            query = "PROFILE " + query
+    span = start_span("neo4j.run", parent=parent, **{"db.fingerprint": record.fingerprint, "db.statement": record.statement[:500]})
+    start = time.perf_counter()
+    error = None
+    try:
+        result = target.run(query, parameters, **kwargs)
+    except Exception as e:
+        error = e
+        raise
+    finally:
+        record.duration = time.perf_counter() - start
+        span.end(error)
+        for observer in query_observers:
+            observer(record)
+    if stats is None:
+        return result
+    if stats.profile:
+        stats.profiled.append((record, result))
+    return InstrumentedResult(result, record, stats.profile)
+
+def record_call(statement: str, call: Callable[..., Any], *args, **kwargs):
+    """
+    Record call(*args, **kwargs) as one statement, for graph backends that do
+    not run Cypher (repositories.memory), so query counts, budgets and
+    per-fingerprint metrics cover them too
+    """
+    stats = _current_stats.get()
+    if stats is None and not query_observers:
+        return call(*args, **kwargs)
+    record = QueryRecord(statement)
+    if stats is not None:
+        stats.queries.append(record)
+    span = start_span("graph.call", **{"db.fingerprint": record.fingerprint, "db.statement": statement})
+    start = time.perf_counter()
+    error = None
+    try:
+        result = call(*args, **kwargs)
+    except Exception as e:
+        error = e
+        raise
+    finally:
+        record.duration = time.perf_counter() - start
+        span.end(error)
+        for observer in query_observers:
+            observer(record)
+    if isinstance(result, (list, tuple)):
+        record.rows = len(result)
+    return result
+
+class InstrumentedTransaction:
+    """
+    Transaction proxy; explicit transactions get a span that ends on commit,
+    rollback or close and parents the spans of their statements
+    """
+
+    def __init__(self, tx, span=None):
+        self._tx = tx
+        self._span = span
+
+    def __getattr__(self, name):
+        return getattr(self._tx, name)
+
+    def __enter__(self):
+        self._tx.__enter__()
+        return self
+
+    def __exit__(self, *exc):
+        try:
+            return self._tx.__exit__(*exc)
+        finally:
+            self._end_span(exc[1])
+
+    def _end_span(self, error=None):
+        if self._span is not None:
+            self._span.end(error)
+
+    def commit(self):
+        try:
+            return self._tx.commit()
+        finally:
+            self._end_span()
+
+    def rollback(self):
+        try:
+            return self._tx.rollback()
+        finally:
+            self._end_span()
+
+    def close(self):
+        try:
+            return self._tx.close()
+        finally:
+            self._end_span()
+
+    def run(self, query, parameters=None, **kwargs):
+        return _instrumented_run(self._tx, query, parameters, kwargs, parent=self._span)
+
+class InstrumentedSession:
+    def __init__(self, session):
+        self._session = session
+
+    def __getattr__(self, name):
+        return getattr(self._session, name)
+
+    def __enter__(self):
+        self._session.__enter__()
+        return self
+
+    def __exit__(self, *exc):
+        return self._session.__exit__(*exc)
+
+    def run(self, query, parameters=None, **kwargs):
+        return _instrumented_run(self._session, query, parameters, kwargs)
+
+    def begin_transaction(self, *args, **kwargs):
+        return InstrumentedTransaction(self._session.begin_transaction(*args, **kwargs), start_span("neo4j.transaction"))
+
+    def execute_read(self, work, *args, **kwargs):
+        with start_span("neo4j.execute_read", **{"db.work": getattr(work, "__name__", "work")}):
+            return self._session.execute_read(lambda tx, *a, **k: work(InstrumentedTransaction(tx), *a, **k), *args, **kwargs)
+
+    def execute_write(self, work, *args, **kwargs):
+        with start_span("neo4j.execute_write", **{"db.work": getattr(work, "__name__", "work")}):
+            return self._session.execute_write(lambda tx, *a, **k: work(InstrumentedTransaction(tx), *a, **k), *args, **kwargs)
+
+class InstrumentedDriver:
+    def __init__(self, driver):
+        self._driver = driver
+
+    def __getattr__(self, name):
+        return getattr(self._driver, name)
+
+    def session(self, *args, **kwargs):
+        return InstrumentedSession(self._driver.session(*args, **kwargs))
+
+def _report(stats: RequestQueryStats, elapsed_ms: float):
+    reasons = []
+    if len(stats.queries) > QUERY_BUDGET:
+        reasons.append(f"{len(stats.queries)} queries > budget {QUERY_BUDGET}")
+    if elapsed_ms > SLOW_REQUEST_MS:
+        reasons.append(f"{elapsed_ms:.0f} ms > {SLOW_REQUEST_MS:.0f} ms")
+    if not reasons:
+        return
+    lines = [
+        f"{group['count']:>4}x {group['ms']:>9.1f} ms {group['rows']:>7} rows  {group['fingerprint']}  {group['statement'][:160]}"
+        for group in stats.breakdown()
+    ]
+    logger.warning(
+        "%s %s: %s (%d queries, %.1f ms in Neo4j)\n%s", stats.method, stats.path, "; ".join(reasons),
+        len(stats.queries), stats.query_time * 1000, "\n".join(lines),
+        extra={"queries": len(stats.queries), "query_ms": round(stats.query_time * 1000, 1)}
+    )
+
+def _profile_requested(scope) -> bool:
+    values = parse_qs(scope.get("query_string", b"").decode("latin-1")).get("profile", [])
+    return any(value in ("1", "true") for value in values)
+
+def _is_admin(scope) -> bool:
+    if not ADMIN_TOKEN:
+        return False
+    token = dict(scope.get("headers") or []).get(b"x-admin-token", b"").decode("latin-1")
+    return hmac.compare_digest(token, ADMIN_TOKEN)
+
+# Headers of a profiled response that describe the unwrapped body; CompressionMiddleware
+# and browsers would otherwise cache the {data, profile} body as the catalog version's
+PROFILE_DROPPED_HEADERS = frozenset((b"content-length", b"etag", b"x-catalog-version", b"cache-control"))
+
+class QueryStatsMiddleware:
+    """
+    Collects the statements of every request for Server-Timing and
+    X-Query-Count; a sampled share of requests is checked against the
+    budget and latency threshold and logged.
+    """
+
+    def __init__(self, app, sample_rate: float = SAMPLE_RATE):
+        self.app = app
+        self.sample_rate = sample_rate
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestQueryStats(scope.get("method", ""), scope.get("path", ""))
+        if _profile_requested(scope):
+            if not _is_admin(scope):
+                body = json.dumps({"detail": "Profiling requires an admin token"}).encode()
+                await send({"type": "http.response.start", "status": 403, "headers": [
+                    (b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())
+                ]})
+                await send({"type": "http.response.body", "body": body})
+                return
+            stats.profile = True
+
+        sampled = self.sample_rate > 0 and random.random() < self.sample_rate
+        token = _current_stats.set(stats)
+        start_message = None
+        buffered: List[bytes] = []
+
+        def finish_headers(message):
+            message["headers"] = [
+                (name, value) for name, value in (message.get("headers") or [])
+                if not (stats.profile and name.lower() in PROFILE_DROPPED_HEADERS)
+            ] + [
+                (b"x-query-count", str(len(stats.queries)).encode()),
+                (b"server-timing", stats.server_timing().encode()),
+                (b"timing-allow-origin", b"*"),
+            ]
+            return message
+
+        async def send_wrapper(message):
+            nonlocal start_message
+            if not stats.profile:
+                if message["type"] == "http.response.start":
+                    finish_headers(message)
+                await send(message)
+                return
+
+            # Profiling: hold the response until it is complete, then attach the plans
+            if message["type"] == "http.response.start":
+                start_message = message
+                return
+            buffered.append(message.get("body", b""))
+            if message.get("more_body", False):
+                return
+            body = b"".join(buffered)
+            content_type = dict(start_message.get("headers") or []).get(b"content-type", b"")
+            if b"json" in content_type:
+                try:
+                    body = json.dumps({"data": json.loads(body or b"null"), "profile": stats.profile_summary()}).encode()
+                except ValueError:
+                    pass
+            finish_headers(start_message)
+            start_message["headers"] += [
+                (b"content-length", str(len(body)).encode()),
+                # The body is not the one the grid's ETag names: keep it out of every cache
+                (b"cache-control", b"no-store"),
+            ]
+            await send(start_message)
+            await send({"type": "http.response.body", "body": body})
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current_stats.reset(token)
+            if sampled:
+                _report(stats, (time.perf_counter() - stats.started) * 1000)
@@ -0,0 +1,149 @@
+"""
+Application lifespan for the CDM_UI backend.
+
+Startup connects the graph backend (Neo4j: pre-opens pooled connections;
+memory: loads its snapshot) and warms the read caches, so the first
+requests after a deploy do not pay for TLS setup, the connectivity probe or
+cold cache builds. Shutdown waits for in-flight requests, closes the
+backend (the connection pool, or writes the memory snapshot) and flushes
+the log queue. Open change streams (push.py) are ended as soon as draining
+starts so they neither hold up the drain nor stay on a process that is
+leaving; browsers reconnect elsewhere and resume.
+
+GET /health stays a pure liveness check. GET /ready reports whether this
+process should receive traffic: startup has finished, it is not draining and
+the backend answers a probe.
+
+Configuration:
+  CDM_POOL_WARMUP_CONNECTIONS   connections opened at startup (default 4, 0 disables)
+  CDM_WARM_CACHES               build the read caches at startup (default true)
+  CDM_READINESS_TIMEOUT         seconds the readiness probe may take (default 2)
+  CDM_DRAIN_GRACE_SECONDS       after SIGTERM keep serving, with /ready failing, this long
+                                so load balancers stop routing first (default 0)
+  CDM_DRAIN_TIMEOUT             seconds shutdown waits for in-flight requests (default 30)
+"""
+
+import asyncio
+import logging
+import os
+import signal
+import threading
+import time
+from contextlib import asynccontextmanager
+from typing import Any, Dict, Tuple
+import push
+from coherence import shared_version
+from logs import shutdown_logging
+from metrics import http_requests_in_flight
+from repositories import get_graph
+from routes import objects, search, taxonomy, variables
+
+logger = logging.getLogger(__name__)
+
+POOL_WARMUP_CONNECTIONS = int(os.getenv("CDM_POOL_WARMUP_CONNECTIONS", "4"))
+WARM_CACHES = os.getenv("CDM_WARM_CACHES", "true").lower() in ("1", "true", "yes")
+READINESS_TIMEOUT = float(os.getenv("CDM_READINESS_TIMEOUT", "2"))
+DRAIN_GRACE_SECONDS = float(os.getenv("CDM_DRAIN_GRACE_SECONDS", "0"))
+DRAIN_TIMEOUT = float(os.getenv("CDM_DRAIN_TIMEOUT", "30"))
+
+# Read paths built at startup; each must be safe to call without a request
+CACHE_WARMERS = (
+    ("objects", objects.warm_cache),
+    ("variables", variables.warm_cache),
+    ("taxonomy", taxonomy.warm_cache),
+    ("search", search.warm_cache),
+)
+
+class _State:
+    started = False
+    draining = False
+
+state = _State()
+
+def startup():
+    """Blocking startup work, run off the event loop"""
+    start = time.perf_counter()
+    graph = get_graph()
+    # Before the replica loads and the caches warm, so writes of other workers meanwhile are detected
+    shared_version.initialize(graph)
+    if not graph.start(POOL_WARMUP_CONNECTIONS):
+        logger.error("Starting without the %s backend; /ready fails until it becomes reachable", graph.name)
+        return
+
+    if WARM_CACHES:
+        for name, warm in CACHE_WARMERS:
+            warm_start = time.perf_counter()
+            try:
+                warm()
+            except Exception as e:
+                logger.exception("Warming %s cache failed: %s", name, e)
+                continue
+            logger.info("Warmed %s cache in %.0f ms", name, (time.perf_counter() - warm_start) * 1000)
+    logger.info("Startup finished in %.0f ms", (time.perf_counter() - start) * 1000)
+
+def shutdown():
+    get_graph().close()
+
+async def _drain():
+    """Wait for requests still being served, up to DRAIN_TIMEOUT"""
+    deadline = time.monotonic() + DRAIN_TIMEOUT
+    while http_requests_in_flight.value() > 0 and time.monotonic() < deadline:
+        await asyncio.sleep(0.05)
+    remaining = http_requests_in_flight.value()
+    if remaining > 0:
+        logger.warning("Closing the graph backend with %d requests still in flight", remaining)
+
+def _install_drain_handler():
+    """
+    Wrap the server's SIGTERM handler: fail readiness first, then hand the
+    signal on after DRAIN_GRACE_SECONDS so the server stops accepting only
+    once load balancers have noticed.
+    """
+    if DRAIN_GRACE_SECONDS <= 0 or threading.current_thread() is not threading.main_thread():
+        return
+    previous = signal.getsignal(signal.SIGTERM)
+    if not callable(previous):
+        return
+
+    def handle_sigterm(signum, frame):
+        if state.draining:
+            previous(signum, frame)
+            return
+        state.draining = True
+        push.close_all()
+        logger.info("SIGTERM received, draining for %.1f s before shutdown", DRAIN_GRACE_SECONDS)
+        timer = threading.Timer(DRAIN_GRACE_SECONDS, previous, (signum, frame))
+        timer.daemon = True
+        timer.start()
+
+    signal.signal(signal.SIGTERM, handle_sigterm)
+
+@asynccontextmanager
+async def lifespan(app):
+    await asyncio.to_thread(startup)
+    _install_drain_handler()
+    state.started = True
+    try:
+        yield
+    finally:
+        state.draining = True
+        push.close_all()
+        await _drain()
+        await asyncio.to_thread(shutdown)
+        logger.info("Shutdown complete")
+        shutdown_logging()
+
+async def readiness() -> Tuple[bool, Dict[str, Any]]:
+    """(ready, details) for GET /ready"""
+    if not state.started:
+        return False, {"status": "starting"}
+    if state.draining:
+        return False, {"status": "draining"}
+    start = time.perf_counter()
+    try:
+        await asyncio.wait_for(asyncio.to_thread(get_graph().ping, READINESS_TIMEOUT), READINESS_TIMEOUT)
+    except asyncio.TimeoutError:
+        return False, {"status": "unavailable", "database": f"no answer within {READINESS_TIMEOUT:g} s"}
+    except Exception as e:
+        return False, {"status": "unavailable", "database": f"{type(e).__name__}: {e}"}
+    return True, {"status": "ready", "databaseLatencyMs": round((time.perf_counter() - start) * 1000, 1)}
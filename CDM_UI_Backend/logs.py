@@ -0,0 +1,189 @@
+"""
+Structured, non-blocking logging for the CDM_UI backend.
+
+Request handlers log through standard `logging.getLogger(__name__)` loggers.
+configure_logging() routes every record through a bounded in-memory queue to
+a background thread that formats and writes it, so a handler never blocks
+the event loop on stdout; when the queue is full new records are dropped and
+counted instead of applying backpressure.
+
+Messages use %-style arguments, so a record at a disabled level is discarded
+before its message or payload is ever rendered. Large payloads are wrapped
+in payload(), which renders (and truncates) them only when the record is
+emitted. Debug output, and with it every payload dump, is off in production
+unless a module is explicitly raised to DEBUG.
+
+Configuration:
+  CDM_LOG_LEVEL        root level (default DEBUG in development, INFO in production)
+  CDM_LOG_LEVELS       per-module levels, e.g. "routes.objects=DEBUG,neo4j=WARNING"
+  CDM_LOG_FORMAT       text (default in development) or json (default in production)
+  CDM_LOG_QUEUE_SIZE   records buffered before new ones are dropped (default 10000)
+  CDM_LOG_PAYLOAD_CHARS  payload dumps stop rendering at this length (default 2000)
+"""
+
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import reprlib
+import sys
+from typing import Any, Dict, Optional
+from pydantic import BaseModel
+from tracing import current_trace_id
+
+CDM_ENV = os.getenv("CDM_ENV", "development").lower()
+LOG_LEVEL = os.getenv("CDM_LOG_LEVEL", "INFO" if CDM_ENV == "production" else "DEBUG").upper()
+LOG_LEVELS = os.getenv("CDM_LOG_LEVELS", "")
+LOG_FORMAT = os.getenv("CDM_LOG_FORMAT", "json" if CDM_ENV == "production" else "text").lower()
+QUEUE_SIZE = int(os.getenv("CDM_LOG_QUEUE_SIZE", "10000"))
+PAYLOAD_CHARS = int(os.getenv("CDM_LOG_PAYLOAD_CHARS", "2000"))
+
+# Chatty third-party loggers stay at WARNING unless listed in CDM_LOG_LEVELS
+QUIET_LOGGERS = ("neo4j", "httpx", "httpcore", "multipart", "asyncio")
+
+# Attributes every LogRecord has; anything else came in through `extra=`
+_RECORD_ATTRIBUTES = frozenset(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime", "trace_id"}
+
+def _jsonable(value: Any) -> Any:
+    # Models are opened one level at a time, so fields past the limit are never rendered
+    return dict(value) if isinstance(value, BaseModel) else str(value)
+
+# Not one-shot: iterencode then yields chunks lazily and encoding stops at the limit
+_PAYLOAD_ENCODER = json.JSONEncoder(default=_jsonable, ensure_ascii=False)
+
+class payload:
+    """
+    Defers rendering a (possibly large) object until the record is emitted,
+    and renders at most PAYLOAD_CHARS of it
+    """
+
+    __slots__ = ("value",)
+
+    def __init__(self, value: Any):
+        self.value = value
+
+    def __str__(self) -> str:
+        chunks, size = [], 0
+        try:
+            for chunk in _PAYLOAD_ENCODER.iterencode(self.value):
+                chunks.append(chunk)
+                size += len(chunk)
+                if size > PAYLOAD_CHARS:
+                    return f"{''.join(chunks)[:PAYLOAD_CHARS]}... (truncated)"
+        except (TypeError, ValueError):
+            return reprlib.repr(self.value)
+        return "".join(chunks)
+
+    __repr__ = __str__
+
+def _extra_fields(record: logging.LogRecord) -> Dict[str, Any]:
+    return {key: value for key, value in vars(record).items() if key not in _RECORD_ATTRIBUTES and not key.startswith("_")}
+
+class TextFormatter(logging.Formatter):
+    def __init__(self):
+        super().__init__("%(asctime)s %(levelname)-7s %(name)s: %(message)s", "%H:%M:%S")
+
+    def format(self, record: logging.LogRecord) -> str:
+        line = super().format(record)
+        fields = _extra_fields(record)
+        if getattr(record, "trace_id", None):
+            fields["trace_id"] = record.trace_id
+        if fields:
+            suffix = " ".join(f"{key}={value}" for key, value in fields.items())
+            head, sep, tail = line.partition("\n")
+            line = f"{head} {suffix}{sep}{tail}"
+        return line
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": round(record.created, 6),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage()
+        }
+        if getattr(record, "trace_id", None):
+            entry["traceId"] = record.trace_id
+        entry.update(_extra_fields(record))
+        if record.exc_text:
+            entry["exception"] = record.exc_text
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+class _DroppingQueueHandler(logging.handlers.QueueHandler):
+    """
+    Renders the message on the calling thread (arguments may be mutated
+    afterwards) and enqueues without blocking
+    """
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        message = record.getMessage()
+        exc_text = record.exc_text
+        if record.exc_info and not exc_text:
+            exc_text = logging.Formatter().formatException(record.exc_info)
+        trace_id = current_trace_id()
+        record = logging.makeLogRecord(vars(record))
+        record.msg, record.args = message, None
+        record.exc_info, record.exc_text = None, exc_text
+        record.trace_id = trace_id
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+_handler: Optional[_DroppingQueueHandler] = None
+_listener: Optional[logging.handlers.QueueListener] = None
+
+def _parse_levels(spec: str) -> Dict[str, str]:
+    levels = {}
+    for item in spec.split(","):
+        name, sep, level = item.strip().partition("=")
+        if sep and name.strip():
+            levels[name.strip()] = level.strip().upper()
+    return levels
+
+def configure_logging():
+    """Install the queue handler on the root logger; safe to call twice"""
+    global _handler, _listener
+    if _handler is not None:
+        return
+
+    output = logging.StreamHandler(sys.stdout)
+    output.setFormatter(JsonFormatter() if LOG_FORMAT == "json" else TextFormatter())
+
+    log_queue: queue.Queue = queue.Queue(maxsize=QUEUE_SIZE)
+    _handler = _DroppingQueueHandler(log_queue)
+    _listener = logging.handlers.QueueListener(log_queue, output, respect_handler_level=True)
+    _listener.start()
+
+    root = logging.getLogger()
+    root.addHandler(_handler)
+    root.setLevel(LOG_LEVEL)
+    for name in QUIET_LOGGERS:
+        logging.getLogger(name).setLevel(logging.WARNING)
+    for name, level in _parse_levels(LOG_LEVELS).items():
+        logging.getLogger(name).setLevel(level)
+
+    atexit.register(shutdown_logging)
+
+def shutdown_logging():
+    """Flush queued records and stop the writer thread"""
+    global _handler, _listener
+    if _listener is None:
+        return
+    logging.getLogger().removeHandler(_handler)
+    _listener.stop()
+    _handler = _listener = None
+
+def dropped_records() -> int:
+    return _handler.dropped if _handler is not None else 0
@@ -1,12 +1,26 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
-from routes import objects, drivers, variables
+from fastapi.responses import JSONResponse, PlainTextResponse
+from logs import configure_logging
+from coherence import CoherenceMiddleware
+from compression import CompressionMiddleware
+from freshness import ReadYourWritesMiddleware
+from instrumentation import QueryStatsMiddleware, query_observers
+from lifespan import lifespan, readiness
+from metrics import REGISTRY, MetricsMiddleware, observe_query
+from responses import FastJSONResponse
+from tracing import TracingMiddleware
+from routes import objects, drivers, variables, search, taxonomy, graph, changes, batch
+
+# Queue-backed structured logging, see logs.py
+configure_logging()
 
 app = FastAPI(
     title="CDM_U Backend API",
     description="Backend API for Canonical Data Model (CDM) management interface",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=FastJSONResponse,
+    lifespan=lifespan
 )
 
 # Configure CORS to allow frontend connections
@@ -19,16 +33,51 @@ app.add_middleware(
     expose_headers=["*"],
 )
 
+# Per-request Cypher statement counts and slow/N+1 request log
+app.add_middleware(QueryStatsMiddleware)
+
+# Route latency and in-flight requests for /metrics
+app.add_middleware(MetricsMiddleware)
+query_observers.append(observe_query)
+
+# Catch up with writes made through other workers before serving reads
+app.add_middleware(CoherenceMiddleware)
+
+# Catalog version each client has written, for read-your-writes under stale-while-revalidate
+app.add_middleware(ReadYourWritesMiddleware)
+
+# Negotiated gzip/brotli for large catalog payloads
+app.add_middleware(CompressionMiddleware)
+
+# Root span per request; outermost so it covers every other layer
+app.add_middleware(TracingMiddleware)
+
 # Include routers
 app.include_router(objects.router, prefix="/api/v1")
 app.include_router(drivers.router, prefix="/api/v1")
 app.include_router(variables.router, prefix="/api/v1")
+app.include_router(search.router, prefix="/api/v1")
+app.include_router(taxonomy.router, prefix="/api/v1")
+app.include_router(graph.router, prefix="/api/v1")
+app.include_router(changes.router, prefix="/api/v1")
+app.include_router(batch.router, prefix="/api/v1")
 
 @app.get("/health")
 async def health_check():
     """Health check endpoint"""
     return {"status": "ok", "message": "CDM_U Backend is running"}
 
+@app.get("/ready")
+async def readiness_check():
+    """Readiness endpoint: 503 while starting, draining or when Neo4j is unreachable"""
+    ready, details = await readiness()
+    return JSONResponse(details, status_code=200 if ready else 503)
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus scrape endpoint"""
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4")
+
 @app.get("/")
 async def root():
     """Root endpoint"""
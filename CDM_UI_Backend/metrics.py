@@ -0,0 +1,309 @@
+"""
+Prometheus-style metrics for the CDM_UI backend.
+
+A small in-process registry rendered in the text exposition format at
+GET /metrics. Hot-path updates are a dict lookup and a bisect under an
+uncontended lock; everything derived (cumulative buckets, cache counters,
+pool gauges) is computed only when /metrics is scraped.
+"""
+
+import logging
+import threading
+import time
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, List, Sequence, Tuple
+from instrumentation import add_acquire_time
+
+logger = logging.getLogger(__name__)
+
+Labels = Tuple[str, ...]
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+class _Metric:
+    type = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type}"]
+
+class Counter(_Metric):
+    type = "counter"
+
+    def __init__(self, name, documentation, labelnames=()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Labels, float] = {}
+
+    def inc(self, labels: Labels = (), amount: float = 1.0):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            items = list(self._values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}" for labels, value in items]
+
+class Gauge(Counter):
+    type = "gauge"
+
+    def set(self, value: float, labels: Labels = ()):
+        with self._lock:
+            self._values[labels] = value
+
+    def dec(self, labels: Labels = (), amount: float = 1.0):
+        self.inc(labels, -amount)
+
+    def value(self, labels: Labels = ()) -> float:
+        with self._lock:
+            return self._values.get(labels, 0.0)
+
+class Histogram(_Metric):
+    type = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # labels -> [per-bucket counts (last slot is +Inf), sum]
+        self._values: Dict[Labels, list] = {}
+
+    def observe(self, value: float, labels: Labels = ()):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(labels)
+            if entry is None:
+                entry = self._values[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+            entry[0][index] += 1
+            entry[1] += value
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            items = [(labels, list(counts), total) for labels, (counts, total) in self._values.items()]
+        lines = []
+        for labels, counts, total in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, labels, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, labels)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, labels)} {cumulative}")
+        return lines
+
+class CallbackMetric(_Metric):
+    """Counter or gauge whose samples are read from a callback at scrape time"""
+
+    def __init__(self, name, documentation, labelnames, type: str, collect: Callable[[], Iterable[Tuple[Labels, float]]]):
+        super().__init__(name, documentation, labelnames)
+        self.type = type
+        self.collect = collect
+
+    def samples(self) -> List[str]:
+        try:
+            items = list(self.collect())
+        except Exception as e:
+            logger.exception("Error collecting metric %s: %s", self.name, e)
+            return []
+        return [f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}" for labels, value in items]
+
+class Registry:
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in list(self._metrics.values()):
+            lines.extend(metric.header())
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+REGISTRY = Registry()
+
+http_request_duration = REGISTRY.register(Histogram(
+    "cdm_http_request_duration_seconds", "HTTP request latency by route template",
+    ("method", "route", "status")
+))
+http_requests_in_flight = REGISTRY.register(Gauge(
+    "cdm_http_requests_in_flight", "HTTP requests currently being served"
+))
+query_duration = REGISTRY.register(Histogram(
+    "cdm_neo4j_query_duration_seconds", "Time until Neo4j accepted a statement and started streaming, by statement fingerprint",
+    ("fingerprint",), buckets=QUERY_BUCKETS
+))
+transaction_retries = REGISTRY.register(Counter(
+    "cdm_neo4j_transaction_retries_total", "Transactions re-run after a transient Neo4j error, by access mode",
+    ("mode",)
+))
+
+replica_reads = REGISTRY.register(Counter(
+    "cdm_replica_reads_total", "Read units of work served by the in-process replica or by the primary backend",
+    ("source",)
+))
+replica_reloads = REGISTRY.register(Counter(
+    "cdm_replica_reloads_total", "Full reloads of the in-process replica from the primary backend, by reason",
+    ("reason",)
+))
+push_subscribers = REGISTRY.register(Gauge(
+    "cdm_push_subscribers", "Open GET /changes/stream connections"
+))
+push_events = REGISTRY.register(Counter(
+    "cdm_push_events_total", "Server-sent events pushed to change stream subscribers, by event",
+    ("event",)
+))
+push_dropped = REGISTRY.register(Counter(
+    "cdm_push_dropped_total", "Change stream subscribers disconnected by the server, by reason",
+    ("reason",)
+))
+single_flight_requests = REGISTRY.register(Counter(
+    "cdm_single_flight_requests_total",
+    "Reads that missed the cache, by whether they ran the computation (leader) or awaited an identical one in flight (coalesced)",
+    ("flight", "key", "role")
+))
+stale_responses = REGISTRY.register(Counter(
+    "cdm_stale_responses_total", "Reads answered from an outdated body while it was rebuilt (stale-while-revalidate), by response",
+    ("key",)
+))
+coherence_checks = REGISTRY.register(Counter(
+    "cdm_coherence_checks_total", "Reads of the shared catalog version stamp before serving catalog reads"
+))
+coherence_reloads = REGISTRY.register(Counter(
+    "cdm_coherence_reloads_total", "Cache reloads after another process changed the catalog, by what detected it",
+    ("detected_by",)
+))
+
+def observe_query(record):
+    """instrumentation query observer"""
+    query_duration.observe(record.duration, (record.fingerprint,))
+
+def _collect_caches(attribute: str):
+    from cache import CACHES
+    return [((name,), getattr(cache, attribute)) for name, cache in list(CACHES.items())]
+
+REGISTRY.register(CallbackMetric(
+    "cdm_cache_hits_total", "In-process cache hits", ("cache",), "counter", lambda: _collect_caches("hits")
+))
+REGISTRY.register(CallbackMetric(
+    "cdm_cache_misses_total", "In-process cache misses", ("cache",), "counter", lambda: _collect_caches("misses")
+))
+
+def _collect_dropped_logs():
+    from logs import dropped_records
+    return [((), dropped_records())]
+
+REGISTRY.register(CallbackMetric(
+    "cdm_log_records_dropped_total", "Log records dropped because the log queue was full", (), "counter", _collect_dropped_logs
+))
+
+def register_pool_metrics(driver, max_pool_size: int, acquisition_timeout: float):
+    """
+    Connection pool gauges and an acquisition-wait histogram for a neo4j
+    driver. The driver has no public pool API, so this reads its internal
+    pool and is a no-op when that is not available.
+    """
+    raw_driver = getattr(driver, "_driver", driver)
+    pool = getattr(raw_driver, "_pool", None)
+    if pool is None or not hasattr(pool, "connections") or not hasattr(pool, "acquire"):
+        logger.warning("Neo4j pool metrics unavailable for this driver version")
+        return
+
+    buckets = tuple(bound for bound in (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0, 30.0) if bound < acquisition_timeout)
+    acquisition_wait = REGISTRY.register(Histogram(
+        "cdm_neo4j_pool_acquisition_seconds", "Time spent waiting for a pooled Neo4j connection",
+        buckets=buckets + (acquisition_timeout,)
+    ))
+
+    acquire = pool.acquire
+
+    def timed_acquire(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return acquire(*args, **kwargs)
+        finally:
+            elapsed = time.perf_counter() - start
+            acquisition_wait.observe(elapsed)
+            add_acquire_time(elapsed)
+
+    pool.acquire = timed_acquire
+
+    def collect_connections():
+        in_use = idle = 0
+        for connections in list(pool.connections.values()):
+            for connection in list(connections):
+                if connection.in_use:
+                    in_use += 1
+                else:
+                    idle += 1
+        return [(("in_use",), in_use), (("idle",), idle)]
+
+    REGISTRY.register(CallbackMetric(
+        "cdm_neo4j_pool_connections", "Pooled Neo4j connections by state", ("state",), "gauge", collect_connections
+    ))
+    limits = REGISTRY.register(Gauge(
+        "cdm_neo4j_pool_config", "Configured Neo4j pool limits", ("setting",)
+    ))
+    limits.set(max_pool_size, ("max_connection_pool_size",))
+    limits.set(acquisition_timeout, ("connection_acquisition_timeout_seconds",))
+
+def route_template(scope) -> str:
+    """
+    Matched route template (e.g. /api/v1/objects/{object_id}); templates keep
+    label cardinality bounded, unmatched paths share one label
+    """
+    path = getattr(scope.get("route"), "path", None)
+    if path is None:
+        return "unmatched"
+    # Newer FastAPI versions keep included routers unflattened; the include
+    # prefix is then only available from the scope
+    included = (scope.get("fastapi") or {}).get("included_router")
+    prefix = getattr(getattr(included, "include_context", None), "prefix", "") or ""
+    return prefix + path if prefix and not path.startswith(prefix) else path
+
+class MetricsMiddleware:
+    """Records latency and in-flight requests per matched route template"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = "500"
+        start = time.perf_counter()
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = str(message["status"])
+            await send(message)
+
+        http_requests_in_flight.inc()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            http_requests_in_flight.dec()
+            http_request_duration.observe(time.perf_counter() - start, (scope.get("method", ""), route_template(scope), status))
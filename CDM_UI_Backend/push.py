@@ -0,0 +1,235 @@
+"""
+Change push channel for the CDM_UI backend.
+
+Fans the change log entries of catalog.bump_catalog_version out to the
+browsers subscribed to GET /changes/stream (server-sent events), so grids
+pick up other users' edits without polling GET /changes.
+
+Every subscriber owns a bounded asyncio queue filled on its event loop;
+writers only schedule the hand-off and never wait for a subscriber. A
+subscriber whose queue is full is dropped: its stream ends and the browser's
+EventSource reconnects with Last-Event-ID, which replays the missed changes
+from the change log (or sends a reload event when they are gone). Changes
+arriving within the coalescing window are sent as one event, with
+successive changes to the same entity merged.
+
+Writes made through other workers or pods reach this process's change log
+through the coherence stamp check (coherence.py), which otherwise only runs
+before API reads. While the process has subscribers, a watcher task runs
+that check every CDM_COHERENCE_INTERVAL_MS, so streams learn of other
+processes' writes even when no reads arrive here.
+
+Configuration:
+  CDM_PUSH_COALESCE_MS       window collecting changes into one event (default 250)
+  CDM_PUSH_BUFFER            changes queued per subscriber before it is dropped (default 1000)
+  CDM_PUSH_MAX_SUBSCRIBERS   open streams per process; further ones get 503 (default 1000)
+  CDM_PUSH_HEARTBEAT         seconds between keep-alive comments on idle streams (default 15)
+  CDM_PUSH_RETRY_MS          reconnect delay advertised to EventSource (default 3000)
+"""
+
+import asyncio
+import json
+import logging
+import os
+import threading
+from typing import Any, AsyncIterator, Dict, FrozenSet, List, Optional, Tuple
+from catalog import EPOCH, change_listeners, changes_since, get_catalog_version
+from coherence import INTERVAL_SECONDS, shared_version
+from metrics import push_dropped, push_events, push_subscribers
+
+logger = logging.getLogger(__name__)
+
+COALESCE_SECONDS = int(os.getenv("CDM_PUSH_COALESCE_MS", "250")) / 1000
+BUFFER_SIZE = max(1, int(os.getenv("CDM_PUSH_BUFFER", "1000")))
+MAX_SUBSCRIBERS = int(os.getenv("CDM_PUSH_MAX_SUBSCRIBERS", "1000"))
+HEARTBEAT_SECONDS = float(os.getenv("CDM_PUSH_HEARTBEAT", "15"))
+RETRY_MS = int(os.getenv("CDM_PUSH_RETRY_MS", "3000"))
+
+ENTITIES = frozenset(("object", "variable", "driver"))
+
+# Pause between the watcher's stamp checks
+WATCH_SECONDS = max(INTERVAL_SECONDS, 0.1)
+
+class Subscriber:
+    """One open stream; offer and close run on the subscriber's event loop"""
+
+    def __init__(self, entities: FrozenSet[str], loop: asyncio.AbstractEventLoop):
+        self.entities = entities
+        self.loop = loop
+        # Change log entries, then None once the stream must end
+        self.queue: "asyncio.Queue[Optional[Dict[str, Any]]]" = asyncio.Queue(maxsize=BUFFER_SIZE)
+        self.closed = False
+
+    def wants(self, entry: Dict[str, Any]) -> bool:
+        return entry["entity"] == "catalog" or entry["entity"] in self.entities
+
+    def offer(self, entries: List[Dict[str, Any]]):
+        for entry in entries:
+            if self.closed:
+                return
+            if not self.wants(entry):
+                continue
+            try:
+                self.queue.put_nowait(entry)
+            except asyncio.QueueFull:
+                logger.info("Dropping change stream subscriber with %d queued changes", self.queue.qsize())
+                self.close("overflow")
+
+    def close(self, reason: str):
+        if self.closed:
+            return
+        self.closed = True
+        # Queued changes are replayed from the change log when the client reconnects
+        while not self.queue.empty():
+            self.queue.get_nowait()
+        self.queue.put_nowait(None)
+        push_dropped.inc((reason,))
+
+_lock = threading.Lock()
+_subscribers: List[Subscriber] = []
+_watcher: Optional["asyncio.Task[None]"] = None
+
+async def _watch():
+    """Check the coherence stamp periodically until the last subscriber is gone"""
+    global _watcher
+    try:
+        while shared_version.supported:
+            await asyncio.sleep(WATCH_SECONDS)
+            with _lock:
+                if not _subscribers:
+                    return
+            await shared_version.ensure_fresh()
+    finally:
+        _watcher = None
+
+def subscribe(entities: FrozenSet[str]) -> Optional[Subscriber]:
+    """Register a subscriber on the running loop, None when the process is at MAX_SUBSCRIBERS"""
+    global _watcher
+    subscriber = Subscriber(entities, asyncio.get_running_loop())
+    with _lock:
+        if len(_subscribers) >= MAX_SUBSCRIBERS:
+            return None
+        _subscribers.append(subscriber)
+    push_subscribers.inc()
+    if _watcher is None and shared_version.supported:
+        _watcher = asyncio.ensure_future(_watch())
+    return subscriber
+
+def unsubscribe(subscriber: Subscriber):
+    with _lock:
+        if subscriber not in _subscribers:
+            return
+        _subscribers.remove(subscriber)
+    push_subscribers.dec()
+
+def _schedule(subscriber: Subscriber, callback, *args):
+    try:
+        subscriber.loop.call_soon_threadsafe(callback, *args)
+    except RuntimeError:
+        # The loop is closed; its streams are gone with it
+        unsubscribe(subscriber)
+
+def publish(entries: List[Dict[str, Any]]):
+    """catalog change listener; called by writers on any thread, never blocks on subscribers"""
+    with _lock:
+        subscribers = list(_subscribers)
+    for subscriber in subscribers:
+        _schedule(subscriber, subscriber.offer, entries)
+
+def close_all(reason: str = "shutdown"):
+    """End every open stream, e.g. when the process starts draining"""
+    with _lock:
+        subscribers = list(_subscribers)
+    for subscriber in subscribers:
+        _schedule(subscriber, subscriber.close, reason)
+
+change_listeners.append(publish)
+
+def coalesce(entries: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Merge successive changes to the same entity: updates fold into the
+    pending create or update, a delete replaces them. Entries keep the
+    version of their last change.
+    """
+    merged: List[Dict[str, Any]] = []
+    pending: Dict[Tuple[str, Any], Dict[str, Any]] = {}
+    for entry in entries:
+        key = (entry["entity"], entry["id"])
+        previous = pending.get(key)
+        if previous is not None and entry["op"] == "update" and previous["op"] in ("create", "update"):
+            previous["version"] = entry["version"]
+            previous["fields"] = {**previous["fields"], **entry["fields"]}
+            continue
+        if previous is not None and entry["op"] == "delete":
+            merged.remove(previous)
+        entry = dict(entry)
+        merged.append(entry)
+        pending[key] = entry
+    return merged
+
+def _event(name: str, version: int, data: Dict[str, Any]) -> str:
+    body = json.dumps({"epoch": EPOCH, "version": version, **data}, separators=(",", ":"), default=str)
+    return f"id: {EPOCH}:{version}\nevent: {name}\ndata: {body}\n\n"
+
+def _batch_event(entries: List[Dict[str, Any]]) -> str:
+    version = entries[-1]["version"]
+    if any(entry["entity"] == "catalog" for entry in entries):
+        push_events.inc(("reload",))
+        return _event("reload", version, {})
+    push_events.inc(("changes",))
+    return _event("changes", version, {"changes": coalesce(entries)})
+
+async def stream(subscriber: Subscriber, since: Optional[int], epoch: Optional[str] = None) -> AsyncIterator[str]:
+    """
+    Server-sent events for one subscriber: the changes after since first
+    (when given; a version of another or no epoch gets a reload event), then live
+    batches until the subscriber is dropped
+    """
+    last = since if since is not None else -1
+    try:
+        yield f"retry: {RETRY_MS}\n\n"
+        if since is not None:
+            missed = changes_since(since) if epoch == EPOCH else None
+            if missed is None:
+                push_events.inc(("reload",))
+                last = get_catalog_version()
+                yield _event("reload", last, {})
+            else:
+                missed = [entry for entry in missed if subscriber.wants(entry)]
+                if missed:
+                    last = missed[-1]["version"]
+                    yield _batch_event(missed)
+
+        queue = subscriber.queue
+        while True:
+            try:
+                entry = await asyncio.wait_for(queue.get(), HEARTBEAT_SECONDS)
+            except asyncio.TimeoutError:
+                yield ": keep-alive\n\n"
+                continue
+            if entry is None:
+                return
+            if COALESCE_SECONDS > 0:
+                await asyncio.sleep(COALESCE_SECONDS)
+            batch = [entry]
+            while not queue.empty():
+                entry = queue.get_nowait()
+                if entry is None:
+                    break
+                batch.append(entry)
+            # Skip changes already sent by the replay
+            batch = [entry for entry in batch if entry["version"] > last]
+            if batch:
+                last = batch[-1]["version"]
+                yield _batch_event(batch)
+            if entry is None:
+                return
+    finally:
+        unsubscribe(subscriber)
+
+def parse_last_event_id(value: Optional[str]) -> Tuple[Optional[str], Optional[int]]:
+    """(epoch, version) from a Last-Event-ID header sent by a reconnecting EventSource"""
+    epoch, _, version = (value or "").rpartition(":")
+    if not version.isdigit():
+        return None, None
+    return epoch or None, int(version)
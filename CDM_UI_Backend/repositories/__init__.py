@@ -0,0 +1,49 @@
+"""
+Catalog repositories for the CDM_UI backend.
+
+Routes reach the catalog through get_graph(): the Neo4j backend in
+production, or the in-memory backend to run, load-test and profile the full
+API without a database.
+
+The neo4j backend is wrapped in a ReplicatedGraph (replica.py) that serves
+reads from an in-process copy of the catalog.
+
+Configuration:
+  CDM_GRAPH_BACKEND   "neo4j" (default) or "memory"
+  CDM_READ_REPLICA    serve neo4j reads from an in-process replica (default true)
+"""
+
+import os
+import threading
+from typing import Optional
+from .base import (
+    ALL, DRIVER_LABELS, ConflictError, DriverRepository, GraphBackend, GraphRepository, NotFoundError,
+    ObjectRepository, Repositories, VARIABLE_FIELDS, VariableRepository, format_driver_string, is_clarifier
+)
+
+GRAPH_BACKEND = os.getenv("CDM_GRAPH_BACKEND", "neo4j").lower()
+READ_REPLICA = os.getenv("CDM_READ_REPLICA", "true").lower() in ("1", "true", "yes")
+
+_graph: Optional[GraphBackend] = None
+_graph_lock = threading.Lock()
+
+def create_graph(backend: str = GRAPH_BACKEND, replica: bool = READ_REPLICA) -> GraphBackend:
+    if backend == "memory":
+        from .memory import MemoryGraph
+        return MemoryGraph()
+    if backend == "neo4j":
+        from .cypher import Neo4jGraph
+        if replica:
+            from .replica import ReplicatedGraph
+            return ReplicatedGraph(Neo4jGraph())
+        return Neo4jGraph()
+    raise ValueError(f"Unknown CDM_GRAPH_BACKEND: {backend}")
+
+def get_graph() -> GraphBackend:
+    """The process-wide backend selected by CDM_GRAPH_BACKEND"""
+    global _graph
+    if _graph is None:
+        with _graph_lock:
+            if _graph is None:
+                _graph = create_graph()
+    return _graph
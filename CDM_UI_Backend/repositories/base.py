@@ -0,0 +1,398 @@
+"""
+Repository interfaces for the CDM_UI backend.
+
+Routes talk to the catalog through three repositories (objects, variables,
+drivers) plus a small graph repository for the neighborhood view. A backend
+binds one instance of each to a transaction and hands them to a unit of work:
+
+    def work(repos):
+        return repos.objects.get(object_id)
+
+    get_graph().execute_read(work)
+
+Both backends implement the same semantics: a driver list containing "ALL"
+links to every existing Sector / Domain / Country (RELEVANT_TO), target
+criteria of "ALL" match any Being / Avatar / Object, objects own variants
+through HAS_VARIANT and variables are attached to objects through
+HAS_SPECIFIC_VARIABLE.
+"""
+
+import uuid
+from abc import ABC, abstractmethod
+from typing import Any, Callable, Dict, List, Mapping, Optional, Tuple, TypeVar
+
+T = TypeVar("T")
+
+ALL = "ALL"
+
+# API driver type -> node label
+DRIVER_LABELS = {
+    "sectors": "Sector",
+    "domains": "Domain",
+    "countries": "Country",
+    "objectClarifiers": "ObjectClarifier",
+    "variableClarifiers": "VariableClarifier"
+}
+
+# Driver labels an object or a variable can be RELEVANT_TO
+OBJECT_DRIVER_LABELS = ("Sector", "Domain", "Country", "ObjectClarifier")
+VARIABLE_DRIVER_LABELS = ("Sector", "Domain", "Country", "VariableClarifier")
+
+# Variable properties settable through the API, by response key
+VARIABLE_FIELDS = ("variable", "section", "formatI", "formatII", "gType", "validation", "default", "graph", "status")
+
+# Stored property name for each of VARIABLE_FIELDS
+VARIABLE_PROPERTIES = {field: "name" if field == "variable" else field for field in VARIABLE_FIELDS}
+
+def format_driver_string(sectors: List[str], domains: List[str], countries: List[str], clarifier: Optional[str]) -> str:
+    """"Sector, Domain, Country, Clarifier" as stored on objects"""
+    sector_str = ALL if ALL in sectors else ", ".join(sectors)
+    domain_str = ALL if ALL in domains else ", ".join(domains)
+    country_str = ALL if ALL in countries else ", ".join(countries)
+    return f"{sector_str}, {domain_str}, {country_str}, {clarifier or 'None'}"
+
+def is_clarifier(value: Optional[str]) -> bool:
+    return bool(value) and value != "None"
+
+def relationship_item(row: Mapping[str, Any]) -> Dict[str, Any]:
+    """relationshipsList entry from id/type/role/toBeing/toAvatar/toObject"""
+    return {
+        "id": row["id"] or str(uuid.uuid4()),  # Use existing ID or generate new one
+        "type": row["type"],
+        "role": row["role"],
+        "toBeing": row["toBeing"],
+        "toAvatar": row["toAvatar"],
+        "toObject": row["toObject"]
+    }
+
+def variant_item(row: Mapping[str, Any]) -> Dict[str, Any]:
+    return {"id": row["id"] or str(uuid.uuid4()), "name": row["name"]}
+
+def variable_fields(properties: Mapping[str, Any]) -> Dict[str, Any]:
+    """Response fields of a variable from its stored properties"""
+    return {"id": properties.get("id"), **{field: properties.get(prop) for field, prop in VARIABLE_PROPERTIES.items()}}
+
+def variable_grid_row(row: Mapping[str, Any]) -> Dict[str, Any]:
+    """Variables grid row from variable fields, part, group, objectRelationships and driver name lists"""
+    sectors = row["sectors"] or []
+    domains = row["domains"] or []
+    countries = row["countries"] or []
+    variable_clarifiers = row["variableClarifiers"] or []
+
+    # Driver string in the expected format: "Sector, Domain, Country, VariableClarifier"
+    sector_str = ALL if ALL in sectors else (", ".join(sectors) if sectors else ALL)
+    domain_str = ALL if ALL in domains else (", ".join(domains) if domains else ALL)
+    country_str = ALL if ALL in countries else (", ".join(countries) if countries else ALL)
+    clarifier_str = variable_clarifiers[0] if variable_clarifiers else "None"
+
+    return {
+        "id": row["id"],
+        "driver": f"{sector_str}, {domain_str}, {country_str}, {clarifier_str}",
+        "part": row["part"],
+        "group": row["group"],
+        "section": row["section"],
+        "variable": row["variable"],
+        "formatI": row["formatI"],
+        "formatII": row["formatII"],
+        "gType": row["gType"],
+        "validation": row["validation"] or "",
+        "default": row["default"] or "",
+        "graph": row["graph"] or "Yes",
+        "status": row["status"] or "Active",
+        "objectRelationships": row["objectRelationships"],
+        "objectRelationshipsList": []
+    }
+
+class NotFoundError(LookupError):
+    """The entity a write refers to does not exist"""
+
+class ConflictError(ValueError):
+    """A create or rename would duplicate an existing entity"""
+
+class ObjectRepository(ABC):
+    @abstractmethod
+    def grid(self) -> List[Dict[str, Any]]:
+        """Every object with its relationships and variants, ordered by id"""
+
+    @abstractmethod
+    def get(self, object_id: str) -> Optional[Dict[str, Any]]:
+        """One object with its relationships and variants"""
+
+    @abstractmethod
+    def exists(self, object_id: str) -> bool:
+        pass
+
+    @abstractmethod
+    def duplicate(self, being: str, avatar: str, object_name: str, driver: Optional[str] = None) -> bool:
+        """Whether an object with this Being/Avatar/Object (and driver string) exists"""
+
+    @abstractmethod
+    def create(self, object_id: str, driver: str, being: str, avatar: str, object_name: str, status: str):
+        """Create the object and MERGE its Being -> Avatar -> Object taxonomy"""
+
+    @abstractmethod
+    def delete(self, object_id: str) -> Optional[Dict[str, Any]]:
+        """Delete the object, its variants and relationships; returns its properties"""
+
+    @abstractmethod
+    def set_driver(self, object_id: str, driver: str):
+        pass
+
+    @abstractmethod
+    def link_drivers(self, object_id: str, sectors: List[str], domains: List[str], countries: List[str], clarifier: Optional[str]):
+        """RELEVANT_TO from the named drivers, or from all drivers of a kind when the list contains ALL"""
+
+    @abstractmethod
+    def unlink_drivers(self, object_id: str):
+        pass
+
+    @abstractmethod
+    def match(self, to_being: str, to_avatar: str, to_object: str) -> List[Dict[str, Any]]:
+        """Objects matching relationship criteria (ALL matches anything) as target_id/being/avatar/object"""
+
+    @abstractmethod
+    def relationships(self, object_id: str) -> List[Dict[str, Any]]:
+        pass
+
+    @abstractmethod
+    def relate(self, source_id: str, target_id: str, relationship_id: str, relationship_type: str,
+               role: str, to_being: str, to_avatar: str, to_object: str):
+        """RELATES_TO edge carrying the criteria it was created from"""
+
+    @abstractmethod
+    def unrelate(self, object_id: str, relationship_id: str):
+        pass
+
+    @abstractmethod
+    def clear_relationships(self, object_id: str):
+        pass
+
+    @abstractmethod
+    def convert_legacy_relationships(self) -> int:
+        """Replace old Relationship nodes by RELATES_TO edges; returns how many were converted"""
+
+    @abstractmethod
+    def variants(self, object_id: str) -> List[Dict[str, Any]]:
+        pass
+
+    @abstractmethod
+    def find_variant(self, name: str) -> Optional[str]:
+        """Id of the (global) variant with this name"""
+
+    @abstractmethod
+    def has_variant(self, object_id: str, variant_id: str) -> bool:
+        pass
+
+    @abstractmethod
+    def create_variant(self, variant_id: str, name: str):
+        pass
+
+    @abstractmethod
+    def attach_variant(self, object_id: str, variant_id: str):
+        pass
+
+    @abstractmethod
+    def delete_variant(self, object_id: str, variant_id: str):
+        pass
+
+    @abstractmethod
+    def clear_variants(self, object_id: str):
+        pass
+
+    @abstractmethod
+    def update_counts(self, object_id: str) -> Tuple[int, int]:
+        """Store and return the object's (relationships, variants) counts"""
+
+    @abstractmethod
+    def beings(self) -> List[str]:
+        pass
+
+    @abstractmethod
+    def avatars(self, being: Optional[str] = None) -> List[str]:
+        pass
+
+    @abstractmethod
+    def names(self, being: Optional[str] = None, avatar: Optional[str] = None) -> List[str]:
+        """Distinct object names below a Being (and Avatar)"""
+
+    @abstractmethod
+    def taxonomy_triples(self) -> List[Tuple[str, str, str]]:
+        """(being, avatar, object) of every object"""
+
+    @abstractmethod
+    def being_avatars(self) -> List[Tuple[str, Optional[str]]]:
+        """(being, avatar) for every Being node, avatar None when it has none"""
+
+    @abstractmethod
+    def tree_rows(self) -> List[Dict[str, Any]]:
+        """Rows for taxonomy.build_object_tree"""
+
+    @abstractmethod
+    def search_documents(self) -> List[Dict[str, Any]]:
+        """Object and variant documents for the n-gram search index"""
+
+class VariableRepository(ABC):
+    @abstractmethod
+    def grid(self) -> List[Dict[str, Any]]:
+        """Every variable with its taxonomy and driver string, ordered by id"""
+
+    @abstractmethod
+    def get(self, variable_id: str) -> Optional[Dict[str, Any]]:
+        """Variable fields plus part and group"""
+
+    @abstractmethod
+    def properties(self, variable_id: str) -> Optional[Dict[str, Any]]:
+        """Raw stored properties"""
+
+    @abstractmethod
+    def exists(self, variable_id: str) -> bool:
+        pass
+
+    @abstractmethod
+    def create(self, variable_id: str, part: str, group: str, fields: Dict[str, Any]) -> Dict[str, Any]:
+        """MERGE Part -> Group and create the variable below it; returns its fields"""
+
+    @abstractmethod
+    def update(self, variable_id: str, fields: Dict[str, Any]) -> Dict[str, Any]:
+        """Set the given fields (VARIABLE_FIELDS keys); returns all fields"""
+
+    @abstractmethod
+    def delete(self, variable_id: str) -> bool:
+        pass
+
+    @abstractmethod
+    def link_drivers(self, variable_id: str, driver_string: str):
+        """MERGE RELEVANT_TO from the drivers in "Sector, Domain, Country, Clarifier", creating named drivers"""
+
+    @abstractmethod
+    def object_count(self, variable_id: str) -> int:
+        pass
+
+    @abstractmethod
+    def object_relationships(self, variable_id: str) -> List[Dict[str, Any]]:
+        pass
+
+    @abstractmethod
+    def link_object(self, variable_id: str, object_id: str, created_by: str = "frontend") -> bool:
+        """HAS_SPECIFIC_VARIABLE from the object unless one exists; True when created"""
+
+    @abstractmethod
+    def linked_objects(self, variable_id: str, to_being: str, to_avatar: str, to_object: str) -> List[str]:
+        """Ids of linked objects matching the criteria (ALL matches anything)"""
+
+    @abstractmethod
+    def unlink_object(self, variable_id: str, object_id: str):
+        pass
+
+    @abstractmethod
+    def tree_rows(self) -> List[Dict[str, Any]]:
+        """Rows for taxonomy.build_variable_tree"""
+
+    @abstractmethod
+    def search_documents(self) -> List[Dict[str, Any]]:
+        """Variable, part, group and section documents for the n-gram search index"""
+
+class DriverRepository(ABC):
+    @abstractmethod
+    def names(self, label: str) -> List[str]:
+        """Driver names in display order (explicit order first, then by name)"""
+
+    @abstractmethod
+    def exists(self, label: str, name: str) -> bool:
+        pass
+
+    @abstractmethod
+    def create(self, label: str, name: str):
+        pass
+
+    @abstractmethod
+    def rename(self, label: str, old_name: str, new_name: str):
+        pass
+
+    @abstractmethod
+    def delete(self, label: str, name: str):
+        """Delete the driver and every relationship it has"""
+
+    @abstractmethod
+    def set_order(self, label: str, name: str, order: int):
+        pass
+
+    @abstractmethod
+    def relationships(self, label: str, name: str) -> List[Dict[str, Any]]:
+        """Relationships to Objects, Variables and Lists"""
+
+class GraphRepository(ABC):
+    """Generic node/edge access for the neighborhood view"""
+
+    @abstractmethod
+    def seeds(self, ids: List[str], named: List[Tuple[str, str]]) -> List[Dict[str, Any]]:
+        """Nodes by id property or (label, name) as element/label/id/name rows"""
+
+    @abstractmethod
+    def expand(self, frontier: List[Any], types: List[str], row_limit: int) -> List[Dict[str, Any]]:
+        """One hop from the frontier elements as source/relationship/type/outgoing/element/label/id/name rows"""
+
+class Repositories:
+    """The repositories bound to one transaction"""
+
+    __slots__ = ("objects", "variables", "drivers", "graph")
+
+    def __init__(self, objects: ObjectRepository, variables: VariableRepository, drivers: DriverRepository, graph: GraphRepository):
+        self.objects = objects
+        self.variables = variables
+        self.drivers = drivers
+        self.graph = graph
+
+class GraphBackend(ABC):
+    """Runs units of work against one storage backend"""
+
+    name = "abstract"
+
+    @abstractmethod
+    def available(self) -> bool:
+        """Whether units of work can run (the database is reachable)"""
+
+    @abstractmethod
+    def start(self, warmup_connections: int = 0) -> bool:
+        """Connect (pre-opening pooled connections) or load data; False when unavailable"""
+
+    @abstractmethod
+    def close(self):
+        pass
+
+    @abstractmethod
+    def ping(self, timeout: float):
+        """Raise when the backend cannot serve requests"""
+
+    @abstractmethod
+    def execute_read(self, work: Callable[[Repositories], T]) -> T:
+        pass
+
+    @abstractmethod
+    def execute_write(self, work: Callable[[Repositories], T]) -> T:
+        """Run work in one transaction; any exception rolls everything back"""
+
+    @abstractmethod
+    def export(self) -> Dict[str, Any]:
+        """Every node and edge, consistent as of one transaction, in MemoryStore.dump() form"""
+
+    def execute_stamped_write(self, work: Callable[[Repositories], T]) -> Tuple[T, Optional[int]]:
+        """
+        execute_write, also returning the catalog version stamp the write
+        gave this process (consecutive in commit order), None when the
+        backend keeps no stamps
+        """
+        return self.execute_write(work), None
+
+    def shared_version(self) -> Optional[Dict[str, int]]:
+        """
+        Catalog version stamp of every other process writing through the
+        backend, by process; None when the backend is process-local
+        """
+        return None
+
+def unit_name(work: Callable) -> str:
+    return getattr(work, "__qualname__", getattr(work, "__name__", "work"))
+
+def matches(value: Optional[str], criterion: str) -> bool:
+    return criterion == ALL or value == criterion
@@ -0,0 +1,722 @@
+"""
+Neo4j implementation of the CDM_U repositories
+Every repository is bound to one managed transaction from db.execute_read /
+db.execute_write, so a unit of work commits or rolls back as a whole and is
+retried on transient errors. Every write unit also increments this
+process's catalog version stamp (see coherence.py) in the same transaction.
+
+Configuration:
+  CDM_EXPORT_TIMEOUT   seconds the full-graph read behind export() may take (default 300)
+"""
+
+import logging
+import os
+import uuid
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from catalog import EPOCH
+from db import execute_read, execute_write, get_driver, neo4j_conn, ping, warm_up_pool
+from .base import (
+    ALL, OBJECT_DRIVER_LABELS, VARIABLE_FIELDS, VARIABLE_PROPERTIES, DriverRepository, GraphBackend, GraphRepository,
+    ObjectRepository, Repositories, T, VariableRepository, is_clarifier, relationship_item, unit_name,
+    variable_fields, variable_grid_row, variant_item
+)
+
+logger = logging.getLogger(__name__)
+
+EXPORT_TIMEOUT = float(os.getenv("CDM_EXPORT_TIMEOUT", "300"))
+
+_RELATIONSHIP_COLUMNS = """
+    r.id as id, r.type as type, r.role as role,
+    other.being as toBeing, other.avatar as toAvatar, other.object as toObject
+"""
+
+def _criteria(to_being: str, to_avatar: str, to_object: str, alias: str = "o") -> Tuple[str, Dict[str, str]]:
+    """WHERE clause and parameters for relationship criteria; ALL matches anything"""
+    conditions, params = [], {}
+    for key, value in (("being", to_being), ("avatar", to_avatar), ("object", to_object)):
+        if value != ALL:
+            conditions.append(f"{alias}.{key} = $to_{key}")
+            params[f"to_{key}"] = value
+    return " AND ".join(conditions) if conditions else "true", params
+
+class Neo4jObjectRepository(ObjectRepository):
+    def __init__(self, tx):
+        self.tx = tx
+
+    def grid(self) -> List[Dict[str, Any]]:
+        result = self.tx.run("""
+            MATCH (o:Object)
+            OPTIONAL MATCH (o)-[r:RELATES_TO]->(other:Object)
+            WITH o, collect(CASE WHEN other IS NULL THEN null ELSE {
+                id: r.id, type: r.type, role: r.role, target: elementId(other),
+                toBeing: other.being, toAvatar: other.avatar, toObject: other.object
+            } END) as relationships
+            OPTIONAL MATCH (o)-[:HAS_VARIANT]->(v:Variant)
+            RETURN o.id as id, o.driver as driver, o.being as being,
+                   o.avatar as avatar, o.object as object, o.status as status,
+                   relationships, collect({id: v.id, name: v.name}) as variants
+            ORDER BY o.id
+        """)
+        objects = []
+        for record in result:
+            relationships = [relationship_item(rel) for rel in record["relationships"]]
+            targets = {rel["target"] for rel in record["relationships"]}
+            variants = [variant_item(var) for var in record["variants"] if var["name"] is not None]
+            objects.append({
+                "id": record["id"],
+                "driver": record["driver"],
+                "being": record["being"],
+                "avatar": record["avatar"],
+                "object": record["object"],
+                "relationships": len(targets),
+                "variants": len(variants),
+                "variables": 0,
+                "status": record["status"] or "Active",
+                "relationshipsList": relationships,
+                "variantsList": variants
+            })
+        return objects
+
+    def get(self, object_id: str) -> Optional[Dict[str, Any]]:
+        record = self.tx.run("""
+            MATCH (o:Object {id: $object_id})
+            RETURN o.id as id, o.driver as driver, o.being as being,
+                   o.avatar as avatar, o.object as object, o.status as status
+        """, object_id=object_id).single()
+        if not record:
+            return None
+        relationships = self.relationships(object_id)
+        variants = self.variants(object_id)
+        return {
+            "id": record["id"],
+            "driver": record["driver"],
+            "being": record["being"],
+            "avatar": record["avatar"],
+            "object": record["object"],
+            "status": record["status"],
+            "relationships": len(relationships),
+            "variants": len(variants),
+            "variables": 0,
+            "relationshipsList": relationships,
+            "variantsList": variants
+        }
+
+    def exists(self, object_id: str) -> bool:
+        return self.tx.run("MATCH (o:Object {id: $object_id}) RETURN o.id as id", object_id=object_id).single() is not None
+
+    def duplicate(self, being: str, avatar: str, object_name: str, driver: Optional[str] = None) -> bool:
+        if driver is None:
+            query = "MATCH (o:Object {being: $being, avatar: $avatar, object: $object}) RETURN o.id as id LIMIT 1"
+        else:
+            query = "MATCH (o:Object {being: $being, avatar: $avatar, object: $object, driver: $driver}) RETURN o.id as id LIMIT 1"
+        return self.tx.run(query, being=being, avatar=avatar, object=object_name, driver=driver).single() is not None
+
+    def create(self, object_id: str, driver: str, being: str, avatar: str, object_name: str, status: str):
+        self.tx.run("""
+            CREATE (o:Object {
+                id: $id,
+                name: $object,
+                driver: $driver,
+                being: $being,
+                avatar: $avatar,
+                object: $object,
+                status: $status
+            })
+            MERGE (b:Being {name: $being})
+            MERGE (a:Avatar {name: $avatar})
+            MERGE (b)-[:HAS_AVATAR]->(a)
+            MERGE (a)-[:HAS_OBJECT]->(o)
+        """, id=object_id, driver=driver, being=being, avatar=avatar, object=object_name, status=status)
+
+    def delete(self, object_id: str) -> Optional[Dict[str, Any]]:
+        existing = self.tx.run("MATCH (o:Object {id: $object_id}) RETURN o", object_id=object_id).single()
+        if not existing:
+            return None
+        # Variants go with the object; drivers and other objects stay
+        self.tx.run("""
+            MATCH (o:Object {id: $object_id})
+            OPTIONAL MATCH (o)-[:HAS_VARIANT]->(v:Variant)
+            DETACH DELETE v, o
+        """, object_id=object_id)
+        return dict(existing["o"])
+
+    def set_driver(self, object_id: str, driver: str):
+        self.tx.run("MATCH (o:Object {id: $object_id}) SET o.driver = $driver", object_id=object_id, driver=driver)
+
+    def link_drivers(self, object_id: str, sectors: List[str], domains: List[str], countries: List[str], clarifier: Optional[str]):
+        for label, names in (("Sector", sectors), ("Domain", domains), ("Country", countries)):
+            if ALL in names:
+                # label comes from the fixed tuple above
+                self.tx.run(f"""
+                    MATCH (d:{label})
+                    MATCH (o:Object {{id: $object_id}})
+                    CREATE (d)-[:RELEVANT_TO]->(o)
+                """, object_id=object_id)
+            elif names:
+                self.tx.run(f"""
+                    MATCH (d:{label}) WHERE d.name IN $names
+                    MATCH (o:Object {{id: $object_id}})
+                    CREATE (d)-[:RELEVANT_TO]->(o)
+                """, object_id=object_id, names=names)
+        if is_clarifier(clarifier):
+            self.tx.run("""
+                MATCH (oc:ObjectClarifier {name: $clarifier})
+                MATCH (o:Object {id: $object_id})
+                CREATE (oc)-[:RELEVANT_TO]->(o)
+            """, clarifier=clarifier, object_id=object_id)
+
+    def unlink_drivers(self, object_id: str):
+        self.tx.run("""
+            MATCH (o:Object {id: $object_id})<-[r:RELEVANT_TO]-(d)
+            WHERE any(label IN labels(d) WHERE label IN $labels)
+            DELETE r
+        """, object_id=object_id, labels=list(OBJECT_DRIVER_LABELS))
+
+    def match(self, to_being: str, to_avatar: str, to_object: str) -> List[Dict[str, Any]]:
+        where, params = _criteria(to_being, to_avatar, to_object, "target")
+        return self.tx.run(f"""
+            MATCH (target:Object)
+            WHERE {where}
+            RETURN target.id as target_id, target.being as being, target.avatar as avatar, target.object as object
+        """, **params).data()
+
+    def relationships(self, object_id: str) -> List[Dict[str, Any]]:
+        result = self.tx.run(f"""
+            MATCH (o:Object {{id: $object_id}})-[r:RELATES_TO]->(other:Object)
+            RETURN {_RELATIONSHIP_COLUMNS}
+        """, object_id=object_id)
+        return [relationship_item(record) for record in result]
+
+    def relate(self, source_id: str, target_id: str, relationship_id: str, relationship_type: str,
+               role: str, to_being: str, to_avatar: str, to_object: str):
+        self.tx.run("""
+            MATCH (source:Object {id: $source_id})
+            MATCH (target:Object {id: $target_id})
+            CREATE (source)-[:RELATES_TO {
+                id: $relationship_id,
+                type: $relationship_type,
+                role: $role,
+                toBeing: $to_being,
+                toAvatar: $to_avatar,
+                toObject: $to_object
+            }]->(target)
+        """, source_id=source_id, target_id=target_id, relationship_id=relationship_id,
+            relationship_type=relationship_type, role=role,
+            to_being=to_being, to_avatar=to_avatar, to_object=to_object)
+
+    def unrelate(self, object_id: str, relationship_id: str):
+        self.tx.run("""
+            MATCH (o:Object {id: $object_id})-[r:RELATES_TO]->(other:Object)
+            WHERE r.id = $relationship_id
+            DELETE r
+        """, object_id=object_id, relationship_id=relationship_id)
+
+    def clear_relationships(self, object_id: str):
+        self.tx.run("""
+            MATCH (o:Object {id: $object_id})-[r:RELATES_TO]->(other:Object)
+            DELETE r
+        """, object_id=object_id)
+
+    def convert_legacy_relationships(self) -> int:
+        old_relationships = self.tx.run("""
+            MATCH (o:Object)-[:HAS_RELATIONSHIP]->(r:Relationship)
+            RETURN o.id as source_id, r.type as type, r.role as role,
+                   r.toBeing as toBeing, r.toAvatar as toAvatar, r.toObject as toObject
+        """).data()
+        for rel in old_relationships:
+            for target in self.match(rel["toBeing"], rel["toAvatar"], rel["toObject"]):
+                self.relate(rel["source_id"], target["target_id"], str(uuid.uuid4()), rel["type"], rel["role"],
+                            rel["toBeing"], rel["toAvatar"], rel["toObject"])
+        self.tx.run("MATCH (r:Relationship) DETACH DELETE r")
+        self.tx.run("""
+            MATCH (o:Object)
+            SET o.relationships = COUNT { (o)-[:RELATES_TO]->(:Object) }
+        """)
+        return len(old_relationships)
+
+    def variants(self, object_id: str) -> List[Dict[str, Any]]:
+        result = self.tx.run("""
+            MATCH (o:Object {id: $object_id})-[:HAS_VARIANT]->(v:Variant)
+            RETURN v.id as id, v.name as name
+        """, object_id=object_id)
+        return [variant_item(record) for record in result]
+
+    def find_variant(self, name: str) -> Optional[str]:
+        record = self.tx.run("MATCH (v:Variant {name: $name}) RETURN v.id as id LIMIT 1", name=name).single()
+        return record["id"] if record else None
+
+    def has_variant(self, object_id: str, variant_id: str) -> bool:
+        return self.tx.run("""
+            MATCH (o:Object {id: $object_id})-[:HAS_VARIANT]->(v:Variant {id: $variant_id})
+            RETURN v.id as id LIMIT 1
+        """, object_id=object_id, variant_id=variant_id).single() is not None
+
+    def create_variant(self, variant_id: str, name: str):
+        self.tx.run("CREATE (v:Variant {id: $variant_id, name: $name})", variant_id=variant_id, name=name)
+
+    def attach_variant(self, object_id: str, variant_id: str):
+        self.tx.run("""
+            MATCH (o:Object {id: $object_id})
+            MATCH (v:Variant {id: $variant_id})
+            MERGE (o)-[:HAS_VARIANT]->(v)
+        """, object_id=object_id, variant_id=variant_id)
+
+    def delete_variant(self, object_id: str, variant_id: str):
+        self.tx.run("""
+            MATCH (o:Object {id: $object_id})-[:HAS_VARIANT]->(v:Variant {id: $variant_id})
+            DETACH DELETE v
+        """, object_id=object_id, variant_id=variant_id)
+
+    def clear_variants(self, object_id: str):
+        self.tx.run("""
+            MATCH (o:Object {id: $object_id})-[:HAS_VARIANT]->(v:Variant)
+            DETACH DELETE v
+        """, object_id=object_id)
+
+    def update_counts(self, object_id: str) -> Tuple[int, int]:
+        record = self.tx.run("""
+            MATCH (o:Object {id: $object_id})
+            SET o.relationships = COUNT { (o)-[:RELATES_TO]->(:Object) },
+                o.variants = COUNT { (o)-[:HAS_VARIANT]->(:Variant) }
+            RETURN o.relationships as relationships, o.variants as variants
+        """, object_id=object_id).single()
+        return (record["relationships"], record["variants"]) if record else (0, 0)
+
+    def beings(self) -> List[str]:
+        return [record["name"] for record in self.tx.run("MATCH (b:Being) RETURN b.name as name ORDER BY name")]
+
+    def avatars(self, being: Optional[str] = None) -> List[str]:
+        if being:
+            result = self.tx.run("""
+                MATCH (b:Being {name: $being})-[:HAS_AVATAR]->(a:Avatar)
+                RETURN a.name as name ORDER BY name
+            """, being=being)
+        else:
+            result = self.tx.run("MATCH (a:Avatar) RETURN a.name as name ORDER BY name")
+        return [record["name"] for record in result]
+
+    def names(self, being: Optional[str] = None, avatar: Optional[str] = None) -> List[str]:
+        if being and avatar:
+            result = self.tx.run("""
+                MATCH (b:Being {name: $being})-[:HAS_AVATAR]->(a:Avatar {name: $avatar})-[:HAS_OBJECT]->(o:Object)
+                RETURN DISTINCT o.object as name ORDER BY name
+            """, being=being, avatar=avatar)
+        elif being:
+            result = self.tx.run("""
+                MATCH (b:Being {name: $being})-[:HAS_AVATAR]->(a:Avatar)-[:HAS_OBJECT]->(o:Object)
+                RETURN DISTINCT o.object as name ORDER BY name
+            """, being=being)
+        else:
+            result = self.tx.run("MATCH (o:Object) RETURN DISTINCT o.object as name ORDER BY name")
+        return [record["name"] for record in result]
+
+    def taxonomy_triples(self) -> List[Tuple[str, str, str]]:
+        return [
+            (record["being"], record["avatar"], record["object"])
+            for record in self.tx.run("MATCH (o:Object) RETURN o.being as being, o.avatar as avatar, o.object as object")
+        ]
+
+    def being_avatars(self) -> List[Tuple[str, Optional[str]]]:
+        return [
+            (record["being"], record["avatar"])
+            for record in self.tx.run("""
+                MATCH (b:Being)
+                OPTIONAL MATCH (b)-[:HAS_AVATAR]->(a:Avatar)
+                RETURN b.name as being, a.name as avatar
+            """)
+        ]
+
+    def tree_rows(self) -> List[Dict[str, Any]]:
+        # Every object with its variants, plus Being/Avatar nodes so that
+        # empty branches are still listed
+        return self.tx.run("""
+            MATCH (o:Object)
+            OPTIONAL MATCH (o)-[:HAS_VARIANT]->(v:Variant)
+            RETURN o.being as being, o.avatar as avatar, o.id as id, o.object as object,
+                   collect(v.name) as variants
+            UNION ALL
+            MATCH (b:Being)
+            OPTIONAL MATCH (b)-[:HAS_AVATAR]->(a:Avatar)
+            RETURN b.name as being, a.name as avatar, null as id, null as object, [] as variants
+        """).data()
+
+    def search_documents(self) -> List[Dict[str, Any]]:
+        documents = self.tx.run("""
+            MATCH (o:Object)
+            RETURN 'object' as type, o.id as id, o.object as name, o.being as being, o.avatar as avatar
+        """).data()
+        documents.extend(self.tx.run("""
+            MATCH (v:Variant)
+            OPTIONAL MATCH (o:Object)-[:HAS_VARIANT]->(v)
+            WITH v, collect(o)[0] as o
+            RETURN 'variant' as type, v.id as id, v.name as name,
+                   o.id as objectId, o.object as object, o.being as being, o.avatar as avatar
+        """).data())
+        return documents
+
+class Neo4jVariableRepository(VariableRepository):
+    def __init__(self, tx):
+        self.tx = tx
+
+    def grid(self) -> List[Dict[str, Any]]:
+        result = self.tx.run("""
+            MATCH (p:Part)-[:HAS_GROUP]->(g:Group)-[:HAS_VARIABLE]->(v:Variable)
+            OPTIONAL MATCH (o:Object)-[:HAS_SPECIFIC_VARIABLE]->(v)
+            OPTIONAL MATCH (v)<-[:RELEVANT_TO]-(s:Sector)
+            OPTIONAL MATCH (v)<-[:RELEVANT_TO]-(d:Domain)
+            OPTIONAL MATCH (v)<-[:RELEVANT_TO]-(c:Country)
+            OPTIONAL MATCH (v)<-[:RELEVANT_TO]-(vc:VariableClarifier)
+            WITH v, p, g, count(DISTINCT o) as objectRelationships,
+                 collect(DISTINCT s.name) as sectors,
+                 collect(DISTINCT d.name) as domains,
+                 collect(DISTINCT c.name) as countries,
+                 collect(DISTINCT vc.name) as variableClarifiers
+            RETURN v.id as id, v.name as variable, v.section as section,
+                   v.formatI as formatI, v.formatII as formatII, v.gType as gType,
+                   v.validation as validation, v.default as default, v.graph as graph,
+                   v.status as status, p.name as part, g.name as group,
+                   objectRelationships, sectors, domains, countries, variableClarifiers
+            ORDER BY v.id
+        """)
+        return [variable_grid_row(record) for record in result]
+
+    def get(self, variable_id: str) -> Optional[Dict[str, Any]]:
+        record = self.tx.run("""
+            MATCH (p:Part)-[:HAS_GROUP]->(g:Group)-[:HAS_VARIABLE]->(v:Variable {id: $id})
+            RETURN v, p.name as part, g.name as group
+        """, id=variable_id).single()
+        if not record:
+            return None
+        return {**variable_fields(record["v"]), "part": record["part"], "group": record["group"]}
+
+    def properties(self, variable_id: str) -> Optional[Dict[str, Any]]:
+        record = self.tx.run("MATCH (v:Variable {id: $id}) RETURN v", id=variable_id).single()
+        return dict(record["v"]) if record else None
+
+    def exists(self, variable_id: str) -> bool:
+        return self.tx.run("MATCH (v:Variable {id: $id}) RETURN v.id as id", id=variable_id).single() is not None
+
+    def create(self, variable_id: str, part: str, group: str, fields: Dict[str, Any]) -> Dict[str, Any]:
+        record = self.tx.run("""
+            MERGE (p:Part {name: $part})
+            MERGE (g:Group {name: $group})
+            MERGE (p)-[:HAS_GROUP]->(g)
+            CREATE (v:Variable {
+                id: $id,
+                name: $variable,
+                section: $section,
+                formatI: $formatI,
+                formatII: $formatII,
+                gType: $gType,
+                validation: $validation,
+                default: $default,
+                graph: $graph,
+                status: $status
+            })
+            MERGE (g)-[:HAS_VARIABLE]->(v)
+            RETURN v
+        """, {**{field: fields.get(field) for field in VARIABLE_FIELDS}, "id": variable_id, "part": part, "group": group}).single()
+        return {**variable_fields(record["v"]), "part": part, "group": group}
+
+    def update(self, variable_id: str, fields: Dict[str, Any]) -> Dict[str, Any]:
+        properties = {VARIABLE_PROPERTIES[field]: value for field, value in fields.items()}
+        record = self.tx.run("""
+            MATCH (v:Variable {id: $id})
+            SET v += $properties
+            RETURN v
+        """, id=variable_id, properties=properties).single()
+        return variable_fields(record["v"]) if record else {}
+
+    def delete(self, variable_id: str) -> bool:
+        record = self.tx.run("""
+            MATCH (v:Variable {id: $id})
+            DETACH DELETE v
+            RETURN count(*) as deleted
+        """, id=variable_id).single()
+        return bool(record and record["deleted"])
+
+    def link_drivers(self, variable_id: str, driver_string: str):
+        parts = [part.strip() for part in driver_string.split(',')]
+        if len(parts) != 4:
+            raise ValueError(f"Invalid driver string format: {driver_string}")
+        sector_str, domain_str, country_str, clarifier = parts
+        for label, value in (("Sector", sector_str), ("Domain", domain_str), ("Country", country_str)):
+            if value == ALL:
+                self.tx.run(f"""
+                    MATCH (d:{label})
+                    MATCH (v:Variable {{id: $variable_id}})
+                    MERGE (d)-[:RELEVANT_TO]->(v)
+                """, variable_id=variable_id)
+            else:
+                self.tx.run(f"""
+                    MERGE (d:{label} {{name: $name}})
+                    WITH d
+                    MATCH (v:Variable {{id: $variable_id}})
+                    MERGE (d)-[:RELEVANT_TO]->(v)
+                """, name=value, variable_id=variable_id)
+        if is_clarifier(clarifier):
+            self.tx.run("""
+                MERGE (vc:VariableClarifier {name: $clarifier})
+                WITH vc
+                MATCH (v:Variable {id: $variable_id})
+                MERGE (vc)-[:RELEVANT_TO]->(v)
+            """, clarifier=clarifier, variable_id=variable_id)
+
+    def object_count(self, variable_id: str) -> int:
+        record = self.tx.run("""
+            MATCH (o:Object)-[:HAS_SPECIFIC_VARIABLE]->(v:Variable {id: $id})
+            RETURN count(o) as count
+        """, id=variable_id).single()
+        return record["count"] if record else 0
+
+    def object_relationships(self, variable_id: str) -> List[Dict[str, Any]]:
+        result = self.tx.run("""
+            MATCH (o:Object)-[r:HAS_SPECIFIC_VARIABLE]->(v:Variable {id: $variable_id})
+            RETURN o.being as being, o.avatar as avatar, o.object as object, r.createdBy as createdBy
+        """, variable_id=variable_id)
+        return [
+            {"toBeing": record["being"], "toAvatar": record["avatar"], "toObject": record["object"], "createdBy": record["createdBy"]}
+            for record in result
+        ]
+
+    def link_object(self, variable_id: str, object_id: str, created_by: str = "frontend") -> bool:
+        record = self.tx.run("""
+            MATCH (o:Object {id: $object_id})
+            MATCH (v:Variable {id: $variable_id})
+            WHERE NOT (o)-[:HAS_SPECIFIC_VARIABLE]->(v)
+            CREATE (o)-[:HAS_SPECIFIC_VARIABLE {createdBy: $created_by}]->(v)
+            RETURN count(*) as created
+        """, object_id=object_id, variable_id=variable_id, created_by=created_by).single()
+        return bool(record and record["created"])
+
+    def linked_objects(self, variable_id: str, to_being: str, to_avatar: str, to_object: str) -> List[str]:
+        where, params = _criteria(to_being, to_avatar, to_object)
+        result = self.tx.run(f"""
+            MATCH (o:Object)-[:HAS_SPECIFIC_VARIABLE]->(v:Variable {{id: $variable_id}})
+            WHERE {where}
+            RETURN DISTINCT o.id as id
+        """, variable_id=variable_id, **params)
+        return [record["id"] for record in result]
+
+    def unlink_object(self, variable_id: str, object_id: str):
+        self.tx.run("""
+            MATCH (o:Object {id: $object_id})-[r:HAS_SPECIFIC_VARIABLE]->(v:Variable {id: $variable_id})
+            DELETE r
+        """, object_id=object_id, variable_id=variable_id)
+
+    def tree_rows(self) -> List[Dict[str, Any]]:
+        # Follows variable_taxonomy_query.cypher
+        return self.tx.run("""
+            MATCH (p:Part)
+            OPTIONAL MATCH (p)-[:HAS_GROUP]->(g:Group)
+            OPTIONAL MATCH (g)-[:HAS_VARIABLE]->(v:Variable)
+            RETURN p.name as part, g.name as group, v.id as id, v.name as variable
+        """).data()
+
+    def search_documents(self) -> List[Dict[str, Any]]:
+        documents = self.tx.run("""
+            MATCH (v:Variable)
+            OPTIONAL MATCH (p:Part)-[:HAS_GROUP]->(g:Group)-[:HAS_VARIABLE]->(v)
+            WITH v, collect(p.name)[0] as part, collect(g.name)[0] as group
+            RETURN 'variable' as type, v.id as id, v.name as name, part, group, v.section as section
+        """).data()
+        documents.extend(self.tx.run("MATCH (p:Part) RETURN 'part' as type, p.name as id, p.name as name").data())
+        documents.extend(self.tx.run("MATCH (g:Group) RETURN 'group' as type, g.name as id, g.name as name").data())
+        documents.extend(self.tx.run("""
+            MATCH (v:Variable) WHERE v.section IS NOT NULL AND v.section <> ''
+            RETURN DISTINCT 'section' as type, v.section as id, v.section as name
+        """).data())
+        return documents
+
+class Neo4jDriverRepository(DriverRepository):
+    # Labels are always values of base.DRIVER_LABELS, so they are safe to
+    # interpolate into the statements
+
+    def __init__(self, tx):
+        self.tx = tx
+
+    def names(self, label: str) -> List[str]:
+        result = self.tx.run(f"MATCH (d:{label}) RETURN d.name as name ORDER BY COALESCE(d.order, 999999), d.name")
+        return [record["name"] for record in result]
+
+    def exists(self, label: str, name: str) -> bool:
+        return self.tx.run(f"MATCH (d:{label} {{name: $name}}) RETURN d.name as name LIMIT 1", name=name).single() is not None
+
+    def create(self, label: str, name: str):
+        self.tx.run(f"CREATE (d:{label} {{name: $name}})", name=name)
+
+    def rename(self, label: str, old_name: str, new_name: str):
+        self.tx.run(f"MATCH (d:{label} {{name: $old_name}}) SET d.name = $new_name", old_name=old_name, new_name=new_name)
+
+    def delete(self, label: str, name: str):
+        self.tx.run(f"MATCH (d:{label} {{name: $name}}) DETACH DELETE d", name=name)
+
+    def set_order(self, label: str, name: str, order: int):
+        self.tx.run(f"MATCH (d:{label} {{name: $name}}) SET d.order = $order", name=name, order=order)
+
+    def relationships(self, label: str, name: str) -> List[Dict[str, Any]]:
+        result = self.tx.run(f"""
+            MATCH (d:{label} {{name: $name}})
+            OPTIONAL MATCH (d)-[r]-(related)
+            WHERE related:Object OR related:Variable OR related:List
+            RETURN type(r) as relationship_type,
+                   labels(related) as related_labels,
+                   related.id as related_id,
+                   related.object as object_name,
+                   related.variable as variable_name,
+                   related.list as list_name
+        """, name=name)
+        return [
+            {
+                "type": record["relationship_type"],
+                "related_type": record["related_labels"][0] if record["related_labels"] else "Unknown",
+                "related_id": record["related_id"],
+                "name": record["object_name"] or record["variable_name"] or record["list_name"]
+            }
+            for record in result
+        ]
+
+# Nodes addressed by their id property in the neighborhood view
+_ID_LABELS = ("Object", "Variable", "Variant")
+
+_SEED_BY_ID_QUERY = "\n    UNION ALL\n".join(
+    f"""
+    MATCH (n:{label}) WHERE n.id IN $ids
+    RETURN elementId(n) as element, '{label}' as label, n.id as id, coalesce(n.object, n.name) as name
+    """
+    for label in _ID_LABELS
+)
+
+class Neo4jGraphRepository(GraphRepository):
+    def __init__(self, tx):
+        self.tx = tx
+
+    def seeds(self, ids: List[str], named: List[Tuple[str, str]]) -> List[Dict[str, Any]]:
+        found = []
+        if ids:
+            found.extend(self.tx.run(_SEED_BY_ID_QUERY, ids=ids).data())
+        for label, name in named:
+            # label is checked against graph.NAME_LABELS by the caller
+            found.extend(self.tx.run(
+                f"MATCH (n:{label} {{name: $name}}) "
+                f"RETURN elementId(n) as element, '{label}' as label, null as id, n.name as name",
+                name=name
+            ).data())
+        return found
+
+    def expand(self, frontier: List[Any], types: List[str], row_limit: int) -> List[Dict[str, Any]]:
+        return self.tx.run("""
+            UNWIND $frontier as element
+            MATCH (n) WHERE elementId(n) = element
+            MATCH (n)-[r]-(m)
+            WHERE type(r) IN $types
+            RETURN element as source, elementId(r) as relationship, type(r) as type,
+                   startNode(r) = n as outgoing, elementId(m) as element,
+                   labels(m)[0] as label, m.id as id, coalesce(m.object, m.name) as name
+            LIMIT $row_limit
+        """, frontier=frontier, types=types, row_limit=row_limit).data()
+
+# Catalog version stamps, one :CatalogVersion node per writing process (id: its catalog.EPOCH),
+# so writers of different processes never wait on each other's stamp; schema.py makes the MERGE
+# safe. The stamp of a process counts its committed write units: 1, 2, 3... in commit order.
+BUMP_CATALOG_VERSION_QUERY = """
+    MERGE (v:CatalogVersion {id: $process})
+    SET v.version = coalesce(v.version, 0) + 1, v.updated = timestamp()
+    RETURN v.version as version
+"""
+
+# What other processes wrote: each one's stamp, which only grows while its node exists
+_READ_CATALOG_VERSION_QUERY = """
+    MATCH (v:CatalogVersion) WHERE v.id <> $process
+    RETURN v.id as process, v.version as version
+"""
+
+# A process removes its stamp when it shuts down; stamps left behind by processes that died
+# and did not write for this long are dropped at startup
+STAMP_RETENTION_MS = 7 * 24 * 3600 * 1000
+
+_PRUNE_CATALOG_VERSIONS_QUERY = """
+    MATCH (v:CatalogVersion) WHERE v.updated IS NULL OR v.updated < timestamp() - $retention
+    DELETE v
+"""
+
+_REMOVE_CATALOG_VERSION_QUERY = """
+    MATCH (v:CatalogVersion {id: $process}) DELETE v
+"""
+
+def _read_catalog_versions(tx) -> Dict[str, int]:
+    return {record["process"]: record["version"] for record in tx.run(_READ_CATALOG_VERSION_QUERY, process=EPOCH)}
+
+def bump_catalog_version_stamp(tx, process: str = EPOCH) -> int:
+    """Increment the stamp of process in tx; the stamp after the increment"""
+    return tx.run(BUMP_CATALOG_VERSION_QUERY, process=process).single()["version"]
+
+_EXPORT_NODES_QUERY = """
+    MATCH (n) WHERE size(labels(n)) > 0 AND NOT n:CatalogVersion
+    RETURN elementId(n) as id, labels(n)[0] as label, properties(n) as props
+"""
+
+_EXPORT_EDGES_QUERY = """
+    MATCH (a)-[r]->(b) WHERE size(labels(a)) > 0 AND size(labels(b)) > 0
+    RETURN type(r) as type, elementId(a) as start, elementId(b) as end, properties(r) as props
+"""
+
+def _export(tx) -> Dict[str, Any]:
+    return {"nodes": tx.run(_EXPORT_NODES_QUERY).data(), "edges": tx.run(_EXPORT_EDGES_QUERY).data()}
+
+def _bind(tx) -> Repositories:
+    return Repositories(
+        Neo4jObjectRepository(tx), Neo4jVariableRepository(tx), Neo4jDriverRepository(tx), Neo4jGraphRepository(tx)
+    )
+
+class Neo4jGraph(GraphBackend):
+    """Units of work run as managed Neo4j transactions, see db.execute_write"""
+
+    name = "neo4j"
+
+    def available(self) -> bool:
+        return get_driver() is not None
+
+    def start(self, warmup_connections: int = 0) -> bool:
+        if neo4j_conn.get_driver() is None:
+            return False
+        opened = warm_up_pool(warmup_connections)
+        logger.info("Opened %d pooled Neo4j connections", opened)
+        try:
+            execute_write(lambda tx: tx.run(_PRUNE_CATALOG_VERSIONS_QUERY, retention=STAMP_RETENTION_MS).consume(),
+                          metadata={"unit": "prune_catalog_versions"})
+        except Exception as e:
+            logger.warning("Pruning old catalog version stamps failed: %s", e)
+        return True
+
+    def close(self):
+        if neo4j_conn.get_driver() is not None:
+            try:
+                execute_write(lambda tx: tx.run(_REMOVE_CATALOG_VERSION_QUERY, process=EPOCH).consume(),
+                              metadata={"unit": "remove_catalog_version"})
+            except Exception as e:
+                logger.warning("Removing the catalog version stamp failed: %s", e)
+        neo4j_conn.close()
+
+    def ping(self, timeout: float):
+        ping(timeout)
+
+    def execute_read(self, work: Callable[[Repositories], T]) -> T:
+        return execute_read(lambda tx: work(_bind(tx)), metadata={"unit": unit_name(work)})
+
+    def execute_write(self, work: Callable[[Repositories], T]) -> T:
+        return self.execute_stamped_write(work)[0]
+
+    def execute_stamped_write(self, work: Callable[[Repositories], T]) -> Tuple[T, Optional[int]]:
+        def unit(tx):
+            result = work(_bind(tx))
+            # Last, so the stamp node stays locked as briefly as possible
+            return result, bump_catalog_version_stamp(tx)
+
+        return execute_write(unit, metadata={"unit": unit_name(work)})
+
+    def shared_version(self) -> Optional[Dict[str, int]]:
+        return execute_read(_read_catalog_versions, metadata={"unit": "catalog_version"})
+
+    def export(self) -> Dict[str, Any]:
+        return execute_read(_export, timeout=EXPORT_TIMEOUT, metadata={"unit": "export"})
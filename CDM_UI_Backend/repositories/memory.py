@@ -0,0 +1,917 @@
+"""
+In-memory implementation of the CDM_U repositories
+Holds the catalog as a small property graph (one label per node, typed
+directed edges) in dicts, so the full API can run, be load-tested and be
+profiled without a network or a Neo4j server. Every lookup the routes make
+is indexed: nodes by label, Object by id/being/avatar/object, Variable and
+Variant by id, Variant and every named label (drivers, Being, Avatar, Part,
+Group) by name, and edges by type on both of their end nodes.
+
+A write unit of work runs under the store lock with an undo journal; any
+exception replays the journal backwards, so a failed unit leaves no trace,
+like a rolled back Neo4j transaction. Reads take the same lock. Every
+repository call is recorded as one statement (instrumentation.record_call),
+so X-Query-Count and the query budget mean the same as on Neo4j.
+
+Configuration:
+  CDM_MEMORY_SNAPSHOT   JSON file loaded at startup and written at shutdown
+                        (default: none; start from the seeded countries and
+                        Being/Avatar taxonomy)
+"""
+
+import itertools
+import json
+import logging
+import os
+import threading
+import uuid
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+from instrumentation import record_call
+from .base import (
+    ALL, OBJECT_DRIVER_LABELS, VARIABLE_PROPERTIES, DriverRepository, GraphBackend, GraphRepository,
+    ObjectRepository, Repositories, T, VariableRepository, is_clarifier, matches, relationship_item,
+    variable_fields, variable_grid_row, variant_item
+)
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_PATH = os.getenv("CDM_MEMORY_SNAPSHOT", "")
+
+# Property indexes besides the label index; (label, property) -> value -> nodes
+INDEXED_PROPERTIES = {
+    "Object": ("id", "being", "avatar", "object"),
+    "Variable": ("id",),
+    "Variant": ("id", "name"),
+    **{
+        label: ("name",)
+        for label in ("Sector", "Domain", "Country", "ObjectClarifier", "VariableClarifier", "Being", "Avatar", "Part", "Group")
+    }
+}
+
+class Node:
+    __slots__ = ("id", "label", "props", "out", "inc")
+
+    def __init__(self, id: int, label: str, props: Dict[str, Any]):
+        self.id = id
+        self.label = label
+        self.props = props
+        # edge type -> {edge id: Edge}
+        self.out: Dict[str, Dict[int, "Edge"]] = {}
+        self.inc: Dict[str, Dict[int, "Edge"]] = {}
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return self.props.get(key, default)
+
+    def display_name(self) -> Optional[str]:
+        """coalesce(n.object, n.name)"""
+        value = self.props.get("object")
+        return value if value is not None else self.props.get("name")
+
+class Edge:
+    __slots__ = ("id", "type", "start", "end", "props")
+
+    def __init__(self, id: int, type: str, start: Node, end: Node, props: Dict[str, Any]):
+        self.id = id
+        self.type = type
+        self.start = start
+        self.end = end
+        self.props = props
+
+class MemoryStore:
+    """Indexed property graph with journaled writes"""
+
+    def __init__(self):
+        self.lock = threading.RLock()
+        self.nodes: Dict[int, Node] = {}
+        self.edges: Dict[int, Edge] = {}
+        self.labels: Dict[str, Dict[int, Node]] = defaultdict(dict)
+        self.indexes: Dict[Tuple[str, str], Dict[Any, Dict[int, Node]]] = {
+            (label, key): {} for label, keys in INDEXED_PROPERTIES.items() for key in keys
+        }
+        self._ids = itertools.count(1)
+        self._journal: Optional[List[Callable[[], None]]] = None
+
+    # Lookups
+
+    def all(self, label: str) -> List[Node]:
+        return list(self.labels[label].values())
+
+    def find(self, label: str, key: str, value: Any) -> List[Node]:
+        index = self.indexes.get((label, key))
+        if index is not None:
+            return list(index.get(value, {}).values())
+        return [node for node in self.labels[label].values() if node.props.get(key) == value]
+
+    def first(self, label: str, key: str, value: Any) -> Optional[Node]:
+        found = self.find(label, key, value)
+        return found[0] if found else None
+
+    def out(self, node: Node, type: str, label: Optional[str] = None) -> List[Edge]:
+        return [edge for edge in node.out.get(type, {}).values() if label is None or edge.end.label == label]
+
+    def inc(self, node: Node, type: str, label: Optional[str] = None) -> List[Edge]:
+        return [edge for edge in node.inc.get(type, {}).values() if label is None or edge.start.label == label]
+
+    def edge_between(self, start: Node, type: str, end: Node) -> Optional[Edge]:
+        # Scan the smaller side: drivers have an edge to most of the catalog
+        outgoing, incoming = start.out.get(type, {}), end.inc.get(type, {})
+        if len(outgoing) <= len(incoming):
+            return next((edge for edge in outgoing.values() if edge.end is end), None)
+        return next((edge for edge in incoming.values() if edge.start is start), None)
+
+    # Journaled writes
+
+    def create_node(self, label: str, props: Dict[str, Any]) -> Node:
+        node = Node(next(self._ids), label, dict(props))
+        self._add_node(node)
+        self._log(lambda: self._remove_node(node))
+        return node
+
+    def delete_node(self, node: Node):
+        """DETACH DELETE"""
+        for edges in list(node.out.values()) + list(node.inc.values()):
+            for edge in list(edges.values()):
+                self.delete_edge(edge)
+        self._remove_node(node)
+        self._log(lambda: self._add_node(node))
+
+    def set(self, node: Node, key: str, value: Any):
+        had, old = key in node.props, node.props.get(key)
+        self._set(node, key, value)
+        self._log(lambda: self._set(node, key, old) if had else self._unset(node, key))
+
+    def create_edge(self, type: str, start: Node, end: Node, props: Optional[Dict[str, Any]] = None) -> Edge:
+        edge = Edge(next(self._ids), type, start, end, dict(props or {}))
+        self._add_edge(edge)
+        self._log(lambda: self._remove_edge(edge))
+        return edge
+
+    def delete_edge(self, edge: Edge):
+        self._remove_edge(edge)
+        self._log(lambda: self._add_edge(edge))
+
+    def merge_node(self, label: str, name: str) -> Node:
+        return self.first(label, "name", name) or self.create_node(label, {"name": name})
+
+    def merge_edge(self, type: str, start: Node, end: Node) -> Edge:
+        return self.edge_between(start, type, end) or self.create_edge(type, start, end)
+
+    @contextmanager
+    def transaction(self):
+        """Hold the lock; undo every write made inside when the block raises"""
+        with self.lock:
+            self._journal = []
+            try:
+                yield
+            except BaseException:
+                for undo in reversed(self._journal):
+                    undo()
+                raise
+            finally:
+                self._journal = None
+
+    def _log(self, undo: Callable[[], None]):
+        if self._journal is not None:
+            self._journal.append(undo)
+
+    def _add_node(self, node: Node):
+        self.nodes[node.id] = node
+        self.labels[node.label][node.id] = node
+        for key, value in node.props.items():
+            self._index(node, key, value)
+
+    def _remove_node(self, node: Node):
+        del self.nodes[node.id]
+        del self.labels[node.label][node.id]
+        for key, value in node.props.items():
+            self._unindex(node, key, value)
+
+    def _set(self, node: Node, key: str, value: Any):
+        if key in node.props:
+            self._unindex(node, key, node.props[key])
+        node.props[key] = value
+        self._index(node, key, value)
+
+    def _unset(self, node: Node, key: str):
+        self._unindex(node, key, node.props.pop(key))
+
+    def _index(self, node: Node, key: str, value: Any):
+        index = self.indexes.get((node.label, key))
+        if index is not None:
+            index.setdefault(value, {})[node.id] = node
+
+    def _unindex(self, node: Node, key: str, value: Any):
+        index = self.indexes.get((node.label, key))
+        if index is not None:
+            bucket = index.get(value)
+            if bucket is not None:
+                bucket.pop(node.id, None)
+                if not bucket:
+                    del index[value]
+
+    def _add_edge(self, edge: Edge):
+        self.edges[edge.id] = edge
+        edge.start.out.setdefault(edge.type, {})[edge.id] = edge
+        edge.end.inc.setdefault(edge.type, {})[edge.id] = edge
+
+    def _remove_edge(self, edge: Edge):
+        del self.edges[edge.id]
+        del edge.start.out[edge.type][edge.id]
+        del edge.end.inc[edge.type][edge.id]
+
+    # Snapshots
+
+    def dump(self) -> Dict[str, Any]:
+        return {
+            "nodes": [{"id": node.id, "label": node.label, "props": node.props} for node in self.nodes.values()],
+            "edges": [
+                {"type": edge.type, "start": edge.start.id, "end": edge.end.id, "props": edge.props}
+                for edge in self.edges.values()
+            ]
+        }
+
+    def load(self, data: Dict[str, Any]):
+        nodes = {}
+        for item in data["nodes"]:
+            nodes[item["id"]] = self.create_node(item["label"], item["props"])
+        for item in data["edges"]:
+            self.create_edge(item["type"], nodes[item["start"]], nodes[item["end"]], item["props"])
+
+def _sorted_distinct(values: Iterable[Any]) -> List[Any]:
+    """DISTINCT ... ORDER BY, nulls last"""
+    return sorted(set(values), key=lambda value: (value is None, value or ""))
+
+def _by_id(nodes: Iterable[Node]) -> List[Node]:
+    """ORDER BY n.id, nulls last"""
+    return sorted(nodes, key=lambda node: (node.get("id") is None, node.get("id") or ""))
+
+def _relationship_row(edge: Edge) -> Dict[str, Any]:
+    return {
+        "id": edge.props.get("id"),
+        "type": edge.props.get("type"),
+        "role": edge.props.get("role"),
+        "toBeing": edge.end.get("being"),
+        "toAvatar": edge.end.get("avatar"),
+        "toObject": edge.end.get("object")
+    }
+
+class MemoryObjectRepository(ObjectRepository):
+    def __init__(self, store: MemoryStore):
+        self.store = store
+
+    def _object(self, object_id: str) -> Optional[Node]:
+        return self.store.first("Object", "id", object_id)
+
+    def _variant_rows(self, node: Node) -> List[Dict[str, Any]]:
+        return [
+            {"id": edge.end.get("id"), "name": edge.end.get("name")}
+            for edge in self.store.out(node, "HAS_VARIANT", "Variant")
+        ]
+
+    def grid(self) -> List[Dict[str, Any]]:
+        objects = []
+        for node in _by_id(self.store.all("Object")):
+            edges = self.store.out(node, "RELATES_TO", "Object")
+            variants = [variant_item(row) for row in self._variant_rows(node) if row["name"] is not None]
+            objects.append({
+                "id": node.get("id"),
+                "driver": node.get("driver"),
+                "being": node.get("being"),
+                "avatar": node.get("avatar"),
+                "object": node.get("object"),
+                "relationships": len({edge.end.id for edge in edges}),
+                "variants": len(variants),
+                "variables": 0,
+                "status": node.get("status") or "Active",
+                "relationshipsList": [relationship_item(_relationship_row(edge)) for edge in edges],
+                "variantsList": variants
+            })
+        return objects
+
+    def get(self, object_id: str) -> Optional[Dict[str, Any]]:
+        node = self._object(object_id)
+        if node is None:
+            return None
+        relationships = self.relationships(object_id)
+        variants = self.variants(object_id)
+        return {
+            "id": node.get("id"),
+            "driver": node.get("driver"),
+            "being": node.get("being"),
+            "avatar": node.get("avatar"),
+            "object": node.get("object"),
+            "status": node.get("status"),
+            "relationships": len(relationships),
+            "variants": len(variants),
+            "variables": 0,
+            "relationshipsList": relationships,
+            "variantsList": variants
+        }
+
+    def exists(self, object_id: str) -> bool:
+        return self._object(object_id) is not None
+
+    def duplicate(self, being: str, avatar: str, object_name: str, driver: Optional[str] = None) -> bool:
+        return any(
+            node.get("being") == being and node.get("avatar") == avatar
+            and (driver is None or node.get("driver") == driver)
+            for node in self.store.find("Object", "object", object_name)
+        )
+
+    def create(self, object_id: str, driver: str, being: str, avatar: str, object_name: str, status: str):
+        node = self.store.create_node("Object", {
+            "id": object_id,
+            "name": object_name,
+            "driver": driver,
+            "being": being,
+            "avatar": avatar,
+            "object": object_name,
+            "status": status
+        })
+        being_node = self.store.merge_node("Being", being)
+        avatar_node = self.store.merge_node("Avatar", avatar)
+        self.store.merge_edge("HAS_AVATAR", being_node, avatar_node)
+        self.store.merge_edge("HAS_OBJECT", avatar_node, node)
+
+    def delete(self, object_id: str) -> Optional[Dict[str, Any]]:
+        node = self._object(object_id)
+        if node is None:
+            return None
+        properties = dict(node.props)
+        for edge in self.store.out(node, "HAS_VARIANT", "Variant"):
+            self.store.delete_node(edge.end)
+        self.store.delete_node(node)
+        return properties
+
+    def set_driver(self, object_id: str, driver: str):
+        node = self._object(object_id)
+        if node is not None:
+            self.store.set(node, "driver", driver)
+
+    def link_drivers(self, object_id: str, sectors: List[str], domains: List[str], countries: List[str], clarifier: Optional[str]):
+        node = self._object(object_id)
+        if node is None:
+            return
+        for label, names in (("Sector", sectors), ("Domain", domains), ("Country", countries)):
+            if ALL in names:
+                drivers = self.store.all(label)
+            else:
+                drivers = [driver for name in dict.fromkeys(names) for driver in self.store.find(label, "name", name)]
+            for driver in drivers:
+                self.store.create_edge("RELEVANT_TO", driver, node)
+        if is_clarifier(clarifier):
+            for driver in self.store.find("ObjectClarifier", "name", clarifier):
+                self.store.create_edge("RELEVANT_TO", driver, node)
+
+    def unlink_drivers(self, object_id: str):
+        node = self._object(object_id)
+        if node is None:
+            return
+        for edge in self.store.inc(node, "RELEVANT_TO"):
+            if edge.start.label in OBJECT_DRIVER_LABELS:
+                self.store.delete_edge(edge)
+
+    def _matching(self, to_being: str, to_avatar: str, to_object: str) -> List[Node]:
+        # Start from the most selective index the criteria allow
+        if to_object != ALL:
+            candidates = self.store.find("Object", "object", to_object)
+        elif to_avatar != ALL:
+            candidates = self.store.find("Object", "avatar", to_avatar)
+        elif to_being != ALL:
+            candidates = self.store.find("Object", "being", to_being)
+        else:
+            return self.store.all("Object")
+        return [
+            node for node in candidates
+            if matches(node.get("being"), to_being) and matches(node.get("avatar"), to_avatar)
+            and matches(node.get("object"), to_object)
+        ]
+
+    def match(self, to_being: str, to_avatar: str, to_object: str) -> List[Dict[str, Any]]:
+        return [
+            {"target_id": node.get("id"), "being": node.get("being"), "avatar": node.get("avatar"), "object": node.get("object")}
+            for node in self._matching(to_being, to_avatar, to_object)
+        ]
+
+    def relationships(self, object_id: str) -> List[Dict[str, Any]]:
+        node = self._object(object_id)
+        if node is None:
+            return []
+        return [relationship_item(_relationship_row(edge)) for edge in self.store.out(node, "RELATES_TO", "Object")]
+
+    def relate(self, source_id: str, target_id: str, relationship_id: str, relationship_type: str,
+               role: str, to_being: str, to_avatar: str, to_object: str):
+        source, target = self._object(source_id), self._object(target_id)
+        if source is None or target is None:
+            return
+        self.store.create_edge("RELATES_TO", source, target, {
+            "id": relationship_id,
+            "type": relationship_type,
+            "role": role,
+            "toBeing": to_being,
+            "toAvatar": to_avatar,
+            "toObject": to_object
+        })
+
+    def unrelate(self, object_id: str, relationship_id: str):
+        node = self._object(object_id)
+        if node is None:
+            return
+        for edge in self.store.out(node, "RELATES_TO", "Object"):
+            if edge.props.get("id") == relationship_id:
+                self.store.delete_edge(edge)
+
+    def clear_relationships(self, object_id: str):
+        node = self._object(object_id)
+        if node is None:
+            return
+        for edge in self.store.out(node, "RELATES_TO", "Object"):
+            self.store.delete_edge(edge)
+
+    def convert_legacy_relationships(self) -> int:
+        old_relationships = [
+            {"source_id": node.get("id"), **{key: edge.end.get(key) for key in ("type", "role", "toBeing", "toAvatar", "toObject")}}
+            for node in self.store.all("Object")
+            for edge in self.store.out(node, "HAS_RELATIONSHIP", "Relationship")
+        ]
+        for rel in old_relationships:
+            for target in self._matching(rel["toBeing"], rel["toAvatar"], rel["toObject"]):
+                self.relate(rel["source_id"], target.get("id"), str(uuid.uuid4()), rel["type"], rel["role"],
+                            rel["toBeing"], rel["toAvatar"], rel["toObject"])
+        for node in self.store.all("Relationship"):
+            self.store.delete_node(node)
+        for node in self.store.all("Object"):
+            self.store.set(node, "relationships", len(self.store.out(node, "RELATES_TO", "Object")))
+        return len(old_relationships)
+
+    def variants(self, object_id: str) -> List[Dict[str, Any]]:
+        node = self._object(object_id)
+        if node is None:
+            return []
+        return [variant_item(row) for row in self._variant_rows(node)]
+
+    def find_variant(self, name: str) -> Optional[str]:
+        node = self.store.first("Variant", "name", name)
+        return node.get("id") if node is not None else None
+
+    def _owned_variants(self, object_id: str, variant_id: str) -> List[Node]:
+        node = self._object(object_id)
+        if node is None:
+            return []
+        return [edge.end for edge in self.store.out(node, "HAS_VARIANT", "Variant") if edge.end.get("id") == variant_id]
+
+    def has_variant(self, object_id: str, variant_id: str) -> bool:
+        return bool(self._owned_variants(object_id, variant_id))
+
+    def create_variant(self, variant_id: str, name: str):
+        self.store.create_node("Variant", {"id": variant_id, "name": name})
+
+    def attach_variant(self, object_id: str, variant_id: str):
+        node, variant = self._object(object_id), self.store.first("Variant", "id", variant_id)
+        if node is not None and variant is not None:
+            self.store.merge_edge("HAS_VARIANT", node, variant)
+
+    def delete_variant(self, object_id: str, variant_id: str):
+        for variant in self._owned_variants(object_id, variant_id):
+            self.store.delete_node(variant)
+
+    def clear_variants(self, object_id: str):
+        node = self._object(object_id)
+        if node is None:
+            return
+        for edge in self.store.out(node, "HAS_VARIANT", "Variant"):
+            self.store.delete_node(edge.end)
+
+    def update_counts(self, object_id: str) -> Tuple[int, int]:
+        node = self._object(object_id)
+        if node is None:
+            return 0, 0
+        relationships = len(self.store.out(node, "RELATES_TO", "Object"))
+        variants = len(self.store.out(node, "HAS_VARIANT", "Variant"))
+        self.store.set(node, "relationships", relationships)
+        self.store.set(node, "variants", variants)
+        return relationships, variants
+
+    def beings(self) -> List[str]:
+        return sorted(node.get("name") for node in self.store.all("Being"))
+
+    def _avatar_nodes(self, being: str) -> List[Node]:
+        return [
+            edge.end
+            for being_node in self.store.find("Being", "name", being)
+            for edge in self.store.out(being_node, "HAS_AVATAR", "Avatar")
+        ]
+
+    def avatars(self, being: Optional[str] = None) -> List[str]:
+        nodes = self._avatar_nodes(being) if being else self.store.all("Avatar")
+        return sorted(node.get("name") for node in nodes)
+
+    def names(self, being: Optional[str] = None, avatar: Optional[str] = None) -> List[str]:
+        if being:
+            return _sorted_distinct(
+                edge.end.get("object")
+                for avatar_node in self._avatar_nodes(being)
+                if not avatar or avatar_node.get("name") == avatar
+                for edge in self.store.out(avatar_node, "HAS_OBJECT", "Object")
+            )
+        return _sorted_distinct(node.get("object") for node in self.store.all("Object"))
+
+    def taxonomy_triples(self) -> List[Tuple[str, str, str]]:
+        return [(node.get("being"), node.get("avatar"), node.get("object")) for node in self.store.all("Object")]
+
+    def being_avatars(self) -> List[Tuple[str, Optional[str]]]:
+        pairs = []
+        for being_node in self.store.all("Being"):
+            avatars = self.store.out(being_node, "HAS_AVATAR", "Avatar")
+            pairs.extend((being_node.get("name"), edge.end.get("name")) for edge in avatars)
+            if not avatars:
+                pairs.append((being_node.get("name"), None))
+        return pairs
+
+    def tree_rows(self) -> List[Dict[str, Any]]:
+        rows = [
+            {
+                "being": node.get("being"),
+                "avatar": node.get("avatar"),
+                "id": node.get("id"),
+                "object": node.get("object"),
+                "variants": [name for name in (edge.end.get("name") for edge in self.store.out(node, "HAS_VARIANT", "Variant")) if name is not None]
+            }
+            for node in self.store.all("Object")
+        ]
+        rows.extend(
+            {"being": being, "avatar": avatar, "id": None, "object": None, "variants": []}
+            for being, avatar in self.being_avatars()
+        )
+        return rows
+
+    def search_documents(self) -> List[Dict[str, Any]]:
+        documents = [
+            {"type": "object", "id": node.get("id"), "name": node.get("object"), "being": node.get("being"), "avatar": node.get("avatar")}
+            for node in self.store.all("Object")
+        ]
+        for variant in self.store.all("Variant"):
+            owners = self.store.inc(variant, "HAS_VARIANT", "Object")
+            owner = owners[0].start if owners else None
+            documents.append({
+                "type": "variant",
+                "id": variant.get("id"),
+                "name": variant.get("name"),
+                "objectId": owner.get("id") if owner else None,
+                "object": owner.get("object") if owner else None,
+                "being": owner.get("being") if owner else None,
+                "avatar": owner.get("avatar") if owner else None
+            })
+        return documents
+
+class MemoryVariableRepository(VariableRepository):
+    def __init__(self, store: MemoryStore):
+        self.store = store
+
+    def _variable(self, variable_id: str) -> Optional[Node]:
+        return self.store.first("Variable", "id", variable_id)
+
+    def _taxonomy(self, node: Node) -> List[Tuple[Node, Node]]:
+        """(part, group) for every Part -> Group -> Variable path"""
+        return [
+            (part_edge.start, group_edge.start)
+            for group_edge in self.store.inc(node, "HAS_VARIABLE", "Group")
+            for part_edge in self.store.inc(group_edge.start, "HAS_GROUP", "Part")
+        ]
+
+    def _driver_names(self, node: Node, label: str) -> List[str]:
+        # collect(DISTINCT d.name)
+        return list(dict.fromkeys(
+            edge.start.get("name") for edge in self.store.inc(node, "RELEVANT_TO", label) if edge.start.get("name") is not None
+        ))
+
+    def grid(self) -> List[Dict[str, Any]]:
+        variables = []
+        for node in _by_id(self.store.all("Variable")):
+            taxonomy = self._taxonomy(node)
+            if not taxonomy:
+                continue
+            objects = len({edge.start.id for edge in self.store.inc(node, "HAS_SPECIFIC_VARIABLE", "Object")})
+            drivers = {
+                "sectors": self._driver_names(node, "Sector"),
+                "domains": self._driver_names(node, "Domain"),
+                "countries": self._driver_names(node, "Country"),
+                "variableClarifiers": self._driver_names(node, "VariableClarifier")
+            }
+            for part, group in taxonomy:
+                variables.append(variable_grid_row({
+                    **variable_fields(node.props), **drivers,
+                    "part": part.get("name"), "group": group.get("name"), "objectRelationships": objects
+                }))
+        return variables
+
+    def get(self, variable_id: str) -> Optional[Dict[str, Any]]:
+        node = self._variable(variable_id)
+        taxonomy = self._taxonomy(node) if node is not None else []
+        if not taxonomy:
+            return None
+        part, group = taxonomy[0]
+        return {**variable_fields(node.props), "part": part.get("name"), "group": group.get("name")}
+
+    def properties(self, variable_id: str) -> Optional[Dict[str, Any]]:
+        node = self._variable(variable_id)
+        return dict(node.props) if node is not None else None
+
+    def exists(self, variable_id: str) -> bool:
+        return self._variable(variable_id) is not None
+
+    def create(self, variable_id: str, part: str, group: str, fields: Dict[str, Any]) -> Dict[str, Any]:
+        part_node = self.store.merge_node("Part", part)
+        group_node = self.store.merge_node("Group", group)
+        self.store.merge_edge("HAS_GROUP", part_node, group_node)
+        node = self.store.create_node("Variable", {
+            "id": variable_id, **{prop: fields.get(field) for field, prop in VARIABLE_PROPERTIES.items()}
+        })
+        self.store.merge_edge("HAS_VARIABLE", group_node, node)
+        return {**variable_fields(node.props), "part": part, "group": group}
+
+    def update(self, variable_id: str, fields: Dict[str, Any]) -> Dict[str, Any]:
+        node = self._variable(variable_id)
+        if node is None:
+            return {}
+        for field, value in fields.items():
+            self.store.set(node, VARIABLE_PROPERTIES[field], value)
+        return variable_fields(node.props)
+
+    def delete(self, variable_id: str) -> bool:
+        node = self._variable(variable_id)
+        if node is None:
+            return False
+        self.store.delete_node(node)
+        return True
+
+    def link_drivers(self, variable_id: str, driver_string: str):
+        parts = [part.strip() for part in driver_string.split(',')]
+        if len(parts) != 4:
+            raise ValueError(f"Invalid driver string format: {driver_string}")
+        node = self._variable(variable_id)
+        if node is None:
+            return
+        sector_str, domain_str, country_str, clarifier = parts
+        for label, value in (("Sector", sector_str), ("Domain", domain_str), ("Country", country_str)):
+            drivers = self.store.all(label) if value == ALL else [self.store.merge_node(label, value)]
+            for driver in drivers:
+                self.store.merge_edge("RELEVANT_TO", driver, node)
+        if is_clarifier(clarifier):
+            self.store.merge_edge("RELEVANT_TO", self.store.merge_node("VariableClarifier", clarifier), node)
+
+    def _object_edges(self, variable_id: str) -> List[Edge]:
+        node = self._variable(variable_id)
+        return self.store.inc(node, "HAS_SPECIFIC_VARIABLE", "Object") if node is not None else []
+
+    def object_count(self, variable_id: str) -> int:
+        return len(self._object_edges(variable_id))
+
+    def object_relationships(self, variable_id: str) -> List[Dict[str, Any]]:
+        return [
+            {
+                "toBeing": edge.start.get("being"),
+                "toAvatar": edge.start.get("avatar"),
+                "toObject": edge.start.get("object"),
+                "createdBy": edge.props.get("createdBy")
+            }
+            for edge in self._object_edges(variable_id)
+        ]
+
+    def link_object(self, variable_id: str, object_id: str, created_by: str = "frontend") -> bool:
+        node = self._variable(variable_id)
+        object_node = self.store.first("Object", "id", object_id)
+        if node is None or object_node is None or self.store.edge_between(object_node, "HAS_SPECIFIC_VARIABLE", node):
+            return False
+        self.store.create_edge("HAS_SPECIFIC_VARIABLE", object_node, node, {"createdBy": created_by})
+        return True
+
+    def linked_objects(self, variable_id: str, to_being: str, to_avatar: str, to_object: str) -> List[str]:
+        return list(dict.fromkeys(
+            edge.start.get("id")
+            for edge in self._object_edges(variable_id)
+            if matches(edge.start.get("being"), to_being) and matches(edge.start.get("avatar"), to_avatar)
+            and matches(edge.start.get("object"), to_object)
+        ))
+
+    def unlink_object(self, variable_id: str, object_id: str):
+        for edge in self._object_edges(variable_id):
+            if edge.start.get("id") == object_id:
+                self.store.delete_edge(edge)
+
+    def tree_rows(self) -> List[Dict[str, Any]]:
+        rows = []
+        for part in self.store.all("Part"):
+            groups = [edge.end for edge in self.store.out(part, "HAS_GROUP", "Group")]
+            if not groups:
+                rows.append({"part": part.get("name"), "group": None, "id": None, "variable": None})
+            for group in groups:
+                variables = [edge.end for edge in self.store.out(group, "HAS_VARIABLE", "Variable")]
+                if not variables:
+                    rows.append({"part": part.get("name"), "group": group.get("name"), "id": None, "variable": None})
+                rows.extend(
+                    {"part": part.get("name"), "group": group.get("name"), "id": node.get("id"), "variable": node.get("name")}
+                    for node in variables
+                )
+        return rows
+
+    def search_documents(self) -> List[Dict[str, Any]]:
+        documents = []
+        for node in self.store.all("Variable"):
+            taxonomy = self._taxonomy(node)
+            part, group = taxonomy[0] if taxonomy else (None, None)
+            documents.append({
+                "type": "variable",
+                "id": node.get("id"),
+                "name": node.get("name"),
+                "part": part.get("name") if part else None,
+                "group": group.get("name") if group else None,
+                "section": node.get("section")
+            })
+        for label in ("Part", "Group"):
+            documents.extend(
+                {"type": label.lower(), "id": node.get("name"), "name": node.get("name")} for node in self.store.all(label)
+            )
+        sections = dict.fromkeys(node.get("section") for node in self.store.all("Variable") if node.get("section"))
+        documents.extend({"type": "section", "id": section, "name": section} for section in sections)
+        return documents
+
+class MemoryDriverRepository(DriverRepository):
+    def __init__(self, store: MemoryStore):
+        self.store = store
+
+    def names(self, label: str) -> List[str]:
+        nodes = sorted(
+            self.store.all(label),
+            key=lambda node: (node.get("order") if node.get("order") is not None else 999999, node.get("name") or "")
+        )
+        return [node.get("name") for node in nodes]
+
+    def exists(self, label: str, name: str) -> bool:
+        return self.store.first(label, "name", name) is not None
+
+    def create(self, label: str, name: str):
+        self.store.create_node(label, {"name": name})
+
+    def rename(self, label: str, old_name: str, new_name: str):
+        for node in self.store.find(label, "name", old_name):
+            self.store.set(node, "name", new_name)
+
+    def delete(self, label: str, name: str):
+        for node in self.store.find(label, "name", name):
+            self.store.delete_node(node)
+
+    def set_order(self, label: str, name: str, order: int):
+        for node in self.store.find(label, "name", name):
+            self.store.set(node, "order", order)
+
+    def relationships(self, label: str, name: str) -> List[Dict[str, Any]]:
+        relationships = []
+        for node in self.store.find(label, "name", name):
+            found = [
+                {
+                    "type": edge.type,
+                    "related_type": other.label,
+                    "related_id": other.get("id"),
+                    "name": other.get("object") or other.get("variable") or other.get("list")
+                }
+                for edges, end in ((node.out, "end"), (node.inc, "start"))
+                for typed in edges.values()
+                for edge in typed.values()
+                for other in (getattr(edge, end),)
+                if other.label in ("Object", "Variable", "List")
+            ]
+            # OPTIONAL MATCH: a driver without relationships still yields one row
+            relationships.extend(found or [{"type": None, "related_type": "Unknown", "related_id": None, "name": None}])
+        return relationships
+
+class MemoryGraphRepository(GraphRepository):
+    def __init__(self, store: MemoryStore):
+        self.store = store
+
+    def seeds(self, ids: List[str], named: List[Tuple[str, str]]) -> List[Dict[str, Any]]:
+        found = [
+            {"element": node.id, "label": label, "id": node.get("id"), "name": node.display_name()}
+            for label in ("Object", "Variable", "Variant")
+            for id in ids
+            for node in self.store.find(label, "id", id)
+        ]
+        found.extend(
+            {"element": node.id, "label": label, "id": None, "name": node.get("name")}
+            for label, name in named
+            for node in self.store.find(label, "name", name)
+        )
+        return found
+
+    def expand(self, frontier: List[Any], types: List[str], row_limit: int) -> List[Dict[str, Any]]:
+        rows = []
+        for element in frontier:
+            node = self.store.nodes.get(element)
+            if node is None:
+                continue
+            for type in types:
+                for outgoing, edges in ((True, node.out.get(type, {})), (False, node.inc.get(type, {}))):
+                    for edge in edges.values():
+                        other = edge.end if outgoing else edge.start
+                        rows.append({
+                            "source": element, "relationship": edge.id, "type": edge.type, "outgoing": outgoing,
+                            "element": other.id, "label": other.label, "id": other.get("id"), "name": other.display_name()
+                        })
+                        if len(rows) >= row_limit:
+                            return rows
+        return rows
+
+def seed_reference_data(store: MemoryStore):
+    """Pre-defined countries and the Being/Avatar taxonomy, as setup_database.py creates them"""
+    from schema import BEING_AVATARS, BEINGS, COUNTRIES
+
+    for country in COUNTRIES:
+        store.merge_node("Country", country)
+    for being in BEINGS:
+        store.merge_node("Being", being)
+    for being, avatar in BEING_AVATARS:
+        store.merge_edge("HAS_AVATAR", store.merge_node("Being", being), store.merge_node("Avatar", avatar))
+
+class _RecordedRepository:
+    """Repository proxy recording each method call as a statement"""
+
+    def __init__(self, repository):
+        self._repository = repository
+        self._prefix = type(repository).__name__
+
+    def __getattr__(self, name):
+        attribute = getattr(self._repository, name)
+        if not callable(attribute):
+            return attribute
+        statement = f"{self._prefix}.{name}"
+        recorded = lambda *args, **kwargs: record_call(statement, attribute, *args, **kwargs)
+        # Cache on the proxy so later calls skip __getattr__
+        setattr(self, name, recorded)
+        return recorded
+
+class MemoryGraph(GraphBackend):
+    """Units of work run against a MemoryStore held by this process"""
+
+    name = "memory"
+
+    def __init__(self, snapshot: str = SNAPSHOT_PATH, data: Optional[Dict[str, Any]] = None):
+        self.store = MemoryStore()
+        self.snapshot = snapshot
+        self.repositories = Repositories(*(
+            _RecordedRepository(repository(self.store)) for repository in (
+                MemoryObjectRepository, MemoryVariableRepository, MemoryDriverRepository, MemoryGraphRepository
+            )
+        ))
+        self._loaded = False
+        if data is not None:
+            # Loaded from another backend (see replica.py) instead of a snapshot
+            self.store.load(data)
+            self._loaded = True
+
+    def available(self) -> bool:
+        return True
+
+    def start(self, warmup_connections: int = 0) -> bool:
+        """Load the snapshot, or seed the reference data into an empty store"""
+        with self.store.lock:
+            if self._loaded:
+                return True
+            self._loaded = True
+            if self.snapshot and os.path.exists(self.snapshot):
+                with open(self.snapshot, encoding="utf-8") as f:
+                    self.store.load(json.load(f))
+                logger.info("Loaded %d nodes from %s", len(self.store.nodes), self.snapshot)
+            elif not self.store.nodes:
+                seed_reference_data(self.store)
+            return True
+
+    def close(self):
+        if not self.snapshot:
+            return
+        with self.store.lock:
+            data = self.store.dump()
+        temporary = f"{self.snapshot}.tmp"
+        with open(temporary, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        os.replace(temporary, self.snapshot)
+        logger.info("Wrote %d nodes to %s", len(data["nodes"]), self.snapshot)
+
+    def ping(self, timeout: float):
+        pass
+
+    def export(self) -> Dict[str, Any]:
+        self.start()
+        with self.store.lock:
+            return self.store.dump()
+
+    def execute_read(self, work: Callable[[Repositories], T]) -> T:
+        self.start()
+        with self.store.lock:
+            return work(self.repositories)
+
+    def execute_write(self, work: Callable[[Repositories], T]) -> T:
+        self.start()
+        with self.store.transaction():
+            return work(self.repositories)
@@ -0,0 +1,293 @@
+"""
+In-process read replica for the CDM_UI backend.
+
+ReplicatedGraph wraps the primary backend (Neo4j) and keeps an indexed copy
+of the whole catalog in a MemoryStore (entities by id, being/avatar/object
+and name indexes, RELATES_TO / HAS_VARIANT / HAS_SPECIFIC_VARIABLE
+adjacency on every node). The copy is bulk-loaded from primary.export() at
+startup. Read units of work run against the copy, so the list, detail and
+taxonomy GETs do not touch Neo4j.
+
+Writes stay on the primary. Each write unit of work records the mutating
+repository calls it makes (MUTATIONS); once the transaction has committed
+the same calls are replayed on the copy in one memory transaction
+(write-through). Writes of a process run concurrently on the primary; the
+copy applies them in commit order, given by the consecutive version stamps
+the primary hands out (execute_stamped_write), holding back a write that
+committed after one still on its way. Only the replay takes the lock.
+
+Consistency check: the replica remembers the catalog version it was last
+known to match. When a read sees a newer version, the replica only catches
+up if every write committed through this process has been applied;
+otherwise the read goes to the primary. A replay that fails (or a mutation
+that cannot be replayed, like the legacy relationship conversion that mints
+ids inside the transaction) marks the copy diverged and reloads it in the
+background, with reads on the primary meanwhile. So does a write by
+another process (coherence.py). The export behind a reload runs without
+the lock and is only swapped in when no write of this process committed
+while it ran (such a write may or may not be in it); otherwise it is
+retried. ?profile=1 reads always go to the primary so they produce plans.
+
+Configuration:
+  CDM_READ_REPLICA   see repositories/__init__.py (default true)
+"""
+
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from catalog import get_catalog_version
+from coherence import shared_version
+from instrumentation import profiling
+from metrics import replica_reads, replica_reloads
+from .base import GraphBackend, Repositories, T, unit_name
+from .memory import (
+    MemoryDriverRepository, MemoryGraph, MemoryGraphRepository, MemoryObjectRepository, MemoryVariableRepository
+)
+
+logger = logging.getLogger(__name__)
+
+# Repository methods that change the graph, by Repositories attribute; every other method is a read
+MUTATIONS = {
+    "objects": frozenset((
+        "create", "delete", "set_driver", "link_drivers", "unlink_drivers", "relate", "unrelate",
+        "clear_relationships", "convert_legacy_relationships", "create_variant", "attach_variant",
+        "delete_variant", "clear_variants", "update_counts"
+    )),
+    "variables": frozenset(("create", "update", "delete", "link_drivers", "link_object", "unlink_object")),
+    "drivers": frozenset(("create", "rename", "delete", "set_order")),
+    "graph": frozenset()
+}
+
+# Mutations whose effect depends on ids generated inside the transaction; the replica reloads instead
+UNREPLAYABLE = frozenset({("objects", "convert_legacy_relationships")})
+
+Call = Tuple[str, str, tuple, dict]
+
+# Exports tried per reload before giving up until RELOAD_COOLDOWN seconds have passed
+RELOAD_ATTEMPTS = 5
+RELOAD_COOLDOWN = 60.0
+
+class _JournaledRepository:
+    """Repository proxy appending each successful mutating call to a journal"""
+
+    def __init__(self, name: str, repository: Any, journal: List[Call]):
+        self._name = name
+        self._repository = repository
+        self._journal = journal
+
+    def __getattr__(self, method: str):
+        attribute = getattr(self._repository, method)
+        if method not in MUTATIONS[self._name]:
+            return attribute
+
+        def journaled(*args, **kwargs):
+            result = attribute(*args, **kwargs)
+            self._journal.append((self._name, method, args, kwargs))
+            return result
+
+        return journaled
+
+class ReplicatedGraph(GraphBackend):
+    """Reads from an in-memory copy of the primary, writes through to both"""
+
+    def __init__(self, primary: GraphBackend):
+        self.primary = primary
+        self.name = primary.name
+        self.replica: Optional[MemoryGraph] = None
+        self._writer: Optional[Repositories] = None
+        # Guards the copy and the counters below; held for replays and the swap of a reload, never for I/O
+        self._lock = threading.Lock()
+        self._reloading = threading.Lock()
+        self._retry_reload_at = 0.0
+        self.version: Optional[int] = None
+        # Writes of this process that committed / were replayed on the copy
+        self.committed = 0
+        self.applied = 0
+        # Writes started and not yet handed to the copy
+        self._in_flight = 0
+        # Last stamp handed to the copy (stamps of this process start at 1), and
+        # journals of writes that committed before an earlier one arrived
+        self._stamp = 0
+        self._held: Dict[int, List[Call]] = {}
+        self.diverged = False
+        # shared_version.external the copy reflects
+        self.external = 0
+
+    def available(self) -> bool:
+        return self.primary.available()
+
+    def start(self, warmup_connections: int = 0) -> bool:
+        if not self.primary.start(warmup_connections):
+            return False
+        if self.replica is None:
+            try:
+                self.reload("startup")
+            except Exception as e:
+                logger.exception("Loading the read replica failed, reads go to %s: %s", self.primary.name, e)
+        return True
+
+    def close(self):
+        self.primary.close()
+
+    def ping(self, timeout: float):
+        self.primary.ping(timeout)
+
+    def export(self):
+        return self.primary.export()
+
+    def shared_version(self) -> Optional[Dict[str, int]]:
+        return self.primary.shared_version()
+
+    def reload(self, reason: str) -> bool:
+        """
+        Replace the copy by a fresh bulk read of the primary; False when
+        writes of this process kept committing during every export
+        """
+        for attempt in range(RELOAD_ATTEMPTS):
+            if attempt:
+                time.sleep(min(0.5 * 2 ** attempt, 10.0))
+            start = time.perf_counter()
+            with self._lock:
+                committed = self.committed
+                # Taken before the export: a change detected while it runs triggers another reload
+                external = shared_version.external
+            replica = MemoryGraph(snapshot="", data=self.primary.export())
+            store = replica.store
+            with self._lock:
+                if self.committed != committed or self._held:
+                    logger.info("Writes committed while exporting the read replica, exporting again")
+                    continue
+                self.replica = replica
+                # Replays skip the statement recording of replica.repositories: they are not queries of the request
+                self._writer = Repositories(
+                    MemoryObjectRepository(store), MemoryVariableRepository(store),
+                    MemoryDriverRepository(store), MemoryGraphRepository(store)
+                )
+                self.applied = self.committed
+                self.version = get_catalog_version()
+                self.external = external
+                self.diverged = False
+            replica_reloads.inc((reason,))
+            logger.info("Loaded read replica (%d nodes, %d edges) in %.0f ms",
+                        len(store.nodes), len(store.edges), (time.perf_counter() - start) * 1000)
+            return True
+        logger.warning("Writes kept committing during %d read replica exports, reads stay on %s",
+                       RELOAD_ATTEMPTS, self.primary.name)
+        return False
+
+    def _reload_in_background(self, reason: str):
+        if time.monotonic() < self._retry_reload_at or not self._reloading.acquire(blocking=False):
+            return
+
+        def run():
+            loaded = False
+            try:
+                loaded = self.reload(reason)
+            except Exception as e:
+                logger.exception("Reloading the read replica failed: %s", e)
+            finally:
+                self._retry_reload_at = 0.0 if loaded else time.monotonic() + RELOAD_COOLDOWN
+                self._reloading.release()
+
+        threading.Thread(target=run, name="replica-reload", daemon=True).start()
+
+    def _consistent_replica(self) -> Optional[MemoryGraph]:
+        replica = self.replica
+        if replica is None or profiling():
+            return None
+        if shared_version.external != self.external:
+            self.diverged = True
+            self._reload_in_background("external")
+            return None
+        if self.diverged:
+            # A reload that gave up is retried after its cooldown
+            self._reload_in_background("diverged")
+            return None
+        version = get_catalog_version()
+        if version != self.version:
+            if self.diverged or self.applied != self.committed:
+                return None
+            self.version = version
+        return replica
+
+    def execute_read(self, work: Callable[[Repositories], T]) -> T:
+        replica = self._consistent_replica()
+        if replica is None:
+            replica_reads.inc(("primary",))
+            return self.primary.execute_read(work)
+        replica_reads.inc(("replica",))
+        return replica.execute_read(work)
+
+    def execute_write(self, work: Callable[[Repositories], T]) -> T:
+        journal: List[Call] = []
+
+        def journaled(repos: Repositories) -> T:
+            # The primary may re-run the unit after a transient error
+            del journal[:]
+            return work(Repositories(*(
+                _JournaledRepository(name, getattr(repos, name), journal) for name in Repositories.__slots__
+            )))
+
+        journaled.__qualname__ = unit_name(work)
+        with self._lock:
+            self._in_flight += 1
+        try:
+            result, stamp = self.primary.execute_stamped_write(journaled)
+        except BaseException:
+            with self._lock:
+                self._in_flight -= 1
+                self._check_gap()
+            raise
+        with self._lock:
+            self._in_flight -= 1
+            self.committed += 1
+            self._hand_over(stamp, list(journal))
+        return result
+
+    def execute_stamped_write(self, work: Callable[[Repositories], T]) -> Tuple[T, Optional[int]]:
+        return self.execute_write(work), None
+
+    def _hand_over(self, stamp: Optional[int], journal: List[Call]):
+        """Replay journals on the copy in stamp order; called with the lock held"""
+        if stamp is None:
+            # No order known: replay as the writes come
+            self._apply(journal)
+            return
+        if stamp <= self._stamp:
+            logger.warning("Write stamp %s arrived after stamp %s, reloading the read replica", stamp, self._stamp)
+            self._diverge("diverged")
+            return
+        self._held[stamp] = journal
+        while self._stamp + 1 in self._held:
+            self._stamp += 1
+            self._apply(self._held.pop(self._stamp))
+        self._check_gap()
+
+    def _check_gap(self):
+        """Held journals with no write left in flight wait for a stamp that will not come"""
+        if self._held and not self._in_flight:
+            logger.warning("Write stamp %s never arrived, reloading the read replica", self._stamp + 1)
+            self._stamp = max(self._held)
+            self._held.clear()
+            self._diverge("diverged")
+
+    def _diverge(self, reason: str):
+        self.diverged = True
+        self._reload_in_background(reason)
+
+    def _apply(self, journal: List[Call]):
+        if self.replica is None or self.diverged:
+            return
+        if any((name, method) in UNREPLAYABLE for name, method, _, _ in journal):
+            self._diverge("unreplayable")
+            return
+        try:
+            with self.replica.store.transaction():
+                for name, method, args, kwargs in journal:
+                    getattr(getattr(self._writer, name), method)(*args, **kwargs)
+        except Exception as e:
+            logger.exception("Replaying a write on the read replica failed, reloading it: %s", e)
+            self._diverge("diverged")
+            return
+        self.applied += 1
@@ -0,0 +1,135 @@
+"""
+Fast JSON response path for the CDM_UI read endpoints.
+
+Large catalog reads skip FastAPI's response_model validation and
+jsonable_encoder pass: the payload is encoded once with orjson (stdlib json
+when orjson is not installed) and the resulting bytes are reused for every
+request until the catalog version changes. Concurrent requests missing the
+cached body together are collapsed onto one build (cache.SingleFlight), and
+freshness.py can let them answer from the previous body meanwhile.
+"""
+
+import asyncio
+import contextvars
+import functools
+import json
+import logging
+import time
+import zlib
+from typing import Any, Callable, Dict, Hashable, Optional, Set, Tuple
+from fastapi.responses import JSONResponse, Response
+import freshness
+from cache import SingleFlight, VersionedCache
+from catalog import EPOCH, bumped_at, get_catalog_version
+from instrumentation import add_encode_time, profiling
+from metrics import stale_responses
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+def dumps(content: Any) -> bytes:
+    start = time.perf_counter()
+    try:
+        if orjson is not None:
+            return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+        return json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    finally:
+        # Reported as the "encode" phase of Server-Timing
+        add_encode_time(time.perf_counter() - start)
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered with orjson"""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+# Serialized bodies of full-catalog reads, valid for one catalog version
+_body_cache = VersionedCache(max_entries=32, name="response_body")
+_flights = SingleFlight("response_body")
+# Newest body per key whatever its version, for stale-while-revalidate
+_last_good: Dict[Hashable, Tuple[int, bytes]] = {}
+# Background rebuilds started for stale reads; referenced until done
+_revalidations: Set["asyncio.Task[bytes]"] = set()
+
+def _build_body(key: Hashable, version: int, build: Callable[[], Any]) -> bytes:
+    body = _body_cache.get(key, version)
+    if body is None:
+        body = dumps(build())
+        _body_cache.set(key, version, body)
+    previous = _last_good.get(key)
+    if previous is None or previous[0] <= version:
+        _last_good[key] = (version, body)
+    return body
+
+def _body_response(key: Hashable, version: int, body: bytes, media_type: str, headers: Optional[Dict[str, str]] = None) -> Response:
+    etag = f'"{zlib.crc32(repr(key).encode()):08x}-{version}"'
+    return Response(
+        content=body,
+        media_type=media_type,
+        headers={"ETag": etag, "X-Catalog-Version": str(version), "X-Catalog-Epoch": EPOCH, **(headers or {})}
+    )
+
+def _stale_body(key: Hashable, version: int) -> Optional[Tuple[int, bytes, float]]:
+    """(version, body, seconds stale) of the last good body when it may be served in place of version"""
+    entry = _last_good.get(key)
+    if entry is None or entry[0] >= version or entry[0] < freshness.min_version():
+        return None
+    outdated_at = bumped_at(entry[0] + 1)
+    if outdated_at is None:
+        return None
+    age = time.monotonic() - outdated_at
+    if age > freshness.STALE_MAX_SECONDS:
+        return None
+    return entry[0], entry[1], age
+
+def _revalidated(task: "asyncio.Task[bytes]"):
+    _revalidations.discard(task)
+    if not task.cancelled() and task.exception() is not None:
+        logger.warning("Rebuilding a stale response failed: %s", task.exception())
+
+def serialized_response(key: Hashable, build: Callable[[], Any], media_type: str = "application/json") -> Response:
+    """
+    Return the cached body for key at the current catalog version, or build
+    the payload, encode it and cache the bytes. The version is read before
+    building so a write racing with the build only costs one extra rebuild.
+    The ETag and X-Catalog-Version headers let CompressionMiddleware reuse
+    the compressed body for the same version.
+    """
+    version = get_catalog_version()
+    return _body_response(key, version, _build_body(key, version, build), media_type)
+
+async def coalesced_response(key: Hashable, build: Callable[[], Any], media_type: str = "application/json") -> Response:
+    """
+    serialized_response for request handlers. A miss is built in a worker
+    thread instead of on the event loop, and identical requests arriving
+    meanwhile (same key at the same catalog version) share that build and
+    its encoded body. ?profile=1 requests always build their own, also in
+a worker thread.
+    In stale-while-revalidate mode (freshness.py) a miss is answered from
+    the last good body when it is recent enough and not older than the
+    client's own writes, and the build continues in the background.
+    """
+    version = get_catalog_version()
+    body = _body_cache.get(key, version)
+    if body is None:
+        if profiling():
+            # to_thread runs the build in a copy of this context, so the profile still collects its queries
+            return await asyncio.to_thread(serialized_response, key, build, media_type)
+        compute = functools.partial(_build_body, key, version, build)
+        stale = _stale_body(key, version) if freshness.STALE_WHILE_REVALIDATE else None
+        if stale is not None:
+            # The rebuild runs in a fresh context: its queries are not this request's
+            task = asyncio.get_running_loop().create_task(_flights.run(key, version, compute), context=contextvars.Context())
+            _revalidations.add(task)
+            task.add_done_callback(_revalidated)
+            stale_version, body, age = stale
+            stale_responses.inc((str(key[0] if isinstance(key, tuple) else key),))
+            return _body_response(key, stale_version, body, media_type, {
+                "Age": str(int(age)), "X-Catalog-Latest-Version": str(version)
+            })
+        body = await _flights.run(key, version, compute)
+    return _body_response(key, version, body, media_type)
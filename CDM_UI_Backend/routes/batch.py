@@ -0,0 +1,214 @@
+from fastapi import APIRouter, HTTPException
+from typing import Any, Callable, Dict, List, Literal, Optional, Tuple
+import logging
+import os
+from pydantic import BaseModel, Field, ValidationError
+from repositories import DRIVER_LABELS, ConflictError, NotFoundError, Repositories, get_graph
+from repositories.replica import MUTATIONS
+from catalog import bump_catalog_version, get_catalog_version
+from logs import payload
+from schema import ObjectCreateRequest, ObjectRelationshipCreateRequest, VariableCreateRequest, VariableUpdateRequest
+from routes.objects import (
+    RelationshipCreateRequest, VariantCreateRequest, add_variant_unit, create_object_unit, delete_object_unit,
+    object_typeahead, relate_object_unit, remove_variant_unit, unrelate_object_unit, update_object_unit
+)
+from routes.variables import (
+    create_variable_unit, delete_variable_unit, link_objects_unit, unlink_objects_unit, update_variable_unit
+)
+from routes.drivers import create_driver_unit, delete_driver_unit, rename_driver_unit
+
+router = APIRouter()
+logger = logging.getLogger(__name__)
+
+# Longest operation list accepted by POST /batch
+MAX_OPERATIONS = int(os.getenv("CDM_BATCH_MAX_OPERATIONS", "500"))
+
+OperationType = Literal[
+    "object.create", "object.update", "object.delete", "object.link", "object.unlink",
+    "object.addVariant", "object.removeVariant",
+    "variable.create", "variable.update", "variable.delete", "variable.link", "variable.unlink",
+    "driver.create", "driver.update", "driver.delete"
+]
+
+class BatchOperation(BaseModel):
+    op: OperationType
+    # Name later operations use to refer to this one's result: {"$ref": "<ref>"}
+    ref: Optional[str] = None
+    # Target object, variable or driver name; a {"$ref": ...} or omitted for creates
+    id: Optional[Any] = None
+    data: Dict[str, Any] = Field(default_factory=dict)
+
+class BatchRequest(BaseModel):
+    operations: List[BatchOperation]
+
+# Reads memoized for the length of a batch; any mutation of the same repository forgets them
+SHARED_LOOKUPS = {
+    "objects": frozenset(("exists", "match", "find_variant")),
+    "variables": frozenset(("exists",)),
+    "drivers": frozenset(("exists", "names"))
+}
+
+class _SharedLookups:
+    """Repository proxy answering repeated lookups of a batch from memory"""
+
+    def __init__(self, name: str, repository: Any):
+        self._name = name
+        self._repository = repository
+        self._memo: Dict[Tuple[str, tuple], Any] = {}
+
+    def __getattr__(self, method: str):
+        attribute = getattr(self._repository, method)
+        if method in SHARED_LOOKUPS[self._name]:
+            def memoized(*args):
+                key = (method, args)
+                if key not in self._memo:
+                    self._memo[key] = attribute(*args)
+                return self._memo[key]
+
+            return memoized
+        if method in MUTATIONS[self._name]:
+            def mutating(*args, **kwargs):
+                self._memo.clear()
+                return attribute(*args, **kwargs)
+
+            return mutating
+        return attribute
+
+def _shared(repos: Repositories) -> Repositories:
+    return Repositories(
+        _SharedLookups("objects", repos.objects),
+        _SharedLookups("variables", repos.variables),
+        _SharedLookups("drivers", repos.drivers),
+        repos.graph
+    )
+
+def _field(data: Dict[str, Any], key: str) -> Any:
+    if data.get(key) is None:
+        raise HTTPException(status_code=422, detail=f"data.{key} is required")
+    return data[key]
+
+def _driver_type(data: Dict[str, Any]) -> str:
+    driver_type = _field(data, "type")
+    if driver_type not in DRIVER_LABELS:
+        raise HTTPException(status_code=422, detail=f"data.type must be one of {', '.join(DRIVER_LABELS)}")
+    return driver_type
+
+def _delete_object(repos, target: str, data: Dict[str, Any]):
+    deleted, changes = delete_object_unit(repos, target)
+    return {"message": f"Object {target} deleted successfully", "deleted": deleted}, changes
+
+# op -> (unit(repos, target id, data) -> (result, changes), whether the op needs a target id)
+OPERATIONS: Dict[str, Tuple[Callable[..., Tuple[Any, List[Dict[str, Any]]]], bool]] = {
+    "object.create": (lambda repos, target, data: create_object_unit(repos, ObjectCreateRequest.model_validate(data)), False),
+    "object.update": (lambda repos, target, data: update_object_unit(repos, target, data), True),
+    "object.delete": (_delete_object, True),
+    "object.link": (lambda repos, target, data: relate_object_unit(repos, target, RelationshipCreateRequest.model_validate(data)), True),
+    "object.unlink": (lambda repos, target, data: unrelate_object_unit(repos, target, _field(data, "relationshipId")), True),
+    "object.addVariant": (lambda repos, target, data: add_variant_unit(repos, target, VariantCreateRequest.model_validate(data)), True),
+    "object.removeVariant": (lambda repos, target, data: remove_variant_unit(repos, target, _field(data, "variantId")), True),
+    "variable.create": (lambda repos, target, data: create_variable_unit(repos, VariableCreateRequest.model_validate(data)), False),
+    "variable.update": (lambda repos, target, data: update_variable_unit(repos, target, VariableUpdateRequest.model_validate(data)), True),
+    "variable.delete": (lambda repos, target, data: delete_variable_unit(repos, target), True),
+    "variable.link": (lambda repos, target, data: link_objects_unit(repos, target, ObjectRelationshipCreateRequest.model_validate(data)), True),
+    "variable.unlink": (lambda repos, target, data: unlink_objects_unit(repos, target, ObjectRelationshipCreateRequest.model_validate(data)), True),
+    "driver.create": (lambda repos, target, data: create_driver_unit(repos, _driver_type(data), _field(data, "name")), False),
+    "driver.update": (lambda repos, target, data: rename_driver_unit(repos, _driver_type(data), target, _field(data, "name")), True),
+    "driver.delete": (lambda repos, target, data: delete_driver_unit(repos, _driver_type(data), target), True)
+}
+
+def _result_id(op: str, result: Any) -> Optional[str]:
+    """Id later operations get for a {"$ref": ...} to this result: object/variable/variant id, driver name"""
+    if isinstance(result, BaseModel):
+        result = result.model_dump()
+    if not isinstance(result, dict):
+        return None
+    return result.get("name") if op.startswith("driver.") else result.get("id")
+
+def _resolve(value: Any, refs: Dict[str, Optional[str]]) -> Any:
+    """Replace every {"$ref": name} in value with the id of the named earlier result (refs holds only earlier ones)"""
+    if isinstance(value, dict):
+        if set(value) == {"$ref"}:
+            name = value["$ref"]
+            if name not in refs:
+                raise HTTPException(status_code=400, detail=f"Unknown reference '{name}'")
+            if refs[name] is None:
+                raise HTTPException(status_code=400, detail=f"Operation '{name}' has no id to refer to")
+            return refs[name]
+        return {key: _resolve(item, refs) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_resolve(item, refs) for item in value]
+    return value
+
+def _failure(index: int, operation: BatchOperation, status_code: int, detail: Any) -> HTTPException:
+    return HTTPException(status_code=status_code, detail={
+        "index": index, "op": operation.op, "ref": operation.ref, "status": status_code, "detail": detail
+    })
+
+@router.post("/batch")
+def run_batch(request: BatchRequest) -> Dict[str, Any]:
+    """
+    Run an ordered list of object, variable and driver operations in one
+    write transaction: either all of them are applied or none. Operations
+    name their result with ref and later ones use its id as {"$ref": name}
+    in id or data, so e.g. a variable can be created and linked to objects
+    in one round trip. Lookups repeated across operations are read once.
+    A failing operation rolls the batch back and its status is the
+    response status, with the operation's index and error as detail.
+    """
+    if len(request.operations) > MAX_OPERATIONS:
+        raise HTTPException(status_code=413, detail=f"At most {MAX_OPERATIONS} operations per batch")
+    names = set()
+    for operation in request.operations:
+        if operation.ref is not None:
+            if operation.ref in names:
+                raise HTTPException(status_code=400, detail=f"Duplicate reference '{operation.ref}'")
+            names.add(operation.ref)
+
+    graph = get_graph()
+    if not graph.available():
+        raise HTTPException(status_code=500, detail="Failed to connect to Neo4j database")
+
+    def work(repos):
+        shared = _shared(repos)
+        resolved: Dict[str, Optional[str]] = {}
+        results, changes = [], []
+        for index, operation in enumerate(request.operations):
+            unit, needs_id = OPERATIONS[operation.op]
+            try:
+                target = _resolve(operation.id, resolved)
+                if needs_id and not isinstance(target, str):
+                    raise HTTPException(status_code=422, detail="id is required")
+                result, unit_changes = unit(shared, target, _resolve(operation.data, resolved))
+            except HTTPException as e:
+                raise _failure(index, operation, e.status_code, e.detail)
+            except NotFoundError as e:
+                raise _failure(index, operation, 404, str(e))
+            except ConflictError as e:
+                raise _failure(index, operation, 409, str(e))
+            except ValidationError as e:
+                raise _failure(index, operation, 422, e.errors(include_url=False))
+            if operation.ref is not None:
+                resolved[operation.ref] = _result_id(operation.op, result)
+            results.append({"index": index, "op": operation.op, "ref": operation.ref, "result": result})
+            changes.extend(unit_changes)
+        return results, changes
+
+    try:
+        logger.debug("Running batch of %s operations: %s", len(request.operations), payload(request))
+        results, changes = graph.execute_write(work)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.exception("Error running batch: %s", e)
+        raise HTTPException(status_code=500, detail=f"Failed to run batch: {str(e)}")
+
+    version = bump_catalog_version(*changes) if changes else get_catalog_version()
+    # In-process indexes only change once the transaction has committed
+    for entry in results:
+        if entry["op"] == "object.create":
+            result = entry["result"]
+            object_typeahead.add_object(result["being"], result["avatar"], result["object"])
+        elif entry["op"] == "object.delete":
+            deleted = entry["result"].pop("deleted")
+            object_typeahead.remove_object(deleted.get("being"), deleted.get("avatar"), deleted.get("object"))
+    return {"results": results, "version": version}
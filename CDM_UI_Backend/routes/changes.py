@@ -0,0 +1,66 @@
+from fastapi import APIRouter, Header, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from typing import Any, Dict, Optional
+import logging
+import push
+from catalog import EPOCH, changes_since, get_catalog_version
+
+router = APIRouter()
+logger = logging.getLogger(__name__)
+
+@router.get("/changes")
+async def get_changes(
+    since: int = Query(..., ge=0, description="Catalog version the client's copy reflects (X-Catalog-Version)"),
+    epoch: Optional[str] = Query(None, description="X-Catalog-Epoch the version was read with; without it the client must reload")
+) -> Dict[str, Any]:
+    """
+    Changes made after version since, oldest first, for patching a local
+    copy of the grids. fullReload is true (and changes empty) when the
+    client must fetch the catalog again: its version is from another
+    process (or comes without the epoch, which would not tell), older than
+    the retained change log, or a write since then could not be described
+    as entity changes.
+    """
+    # Every worker counts versions on its own: a version is only meaningful with its epoch
+    changes = changes_since(since) if epoch == EPOCH else None
+    if changes is None:
+        version = get_catalog_version()
+        logger.debug("Full reload required for since=%s epoch=%s (version %s)", since, epoch, version)
+        return {"epoch": EPOCH, "since": since, "version": version, "fullReload": True, "changes": []}
+    return {
+        "epoch": EPOCH,
+        "since": since,
+        "version": changes[-1]["version"] if changes else since,
+        "fullReload": False,
+        "changes": changes
+    }
+
+@router.get("/changes/stream")
+async def stream_changes(
+    entities: Optional[str] = Query(None, description="Comma-separated entity types: object, variable, driver (default all)"),
+    since: Optional[int] = Query(None, ge=0, description="Catalog version to replay changes from before streaming"),
+    epoch: Optional[str] = Query(None, description="X-Catalog-Epoch the version was read with; without it since gets a reload event"),
+    last_event_id: Optional[str] = Header(None, alias="Last-Event-ID")
+):
+    """
+    Server-sent event stream of catalog changes. "changes" events carry the
+    same entries as GET /changes, coalesced; a "reload" event means the
+    client must fetch the grids again. Event ids are "epoch:version", so a
+    reconnecting EventSource resumes where it stopped.
+    """
+    wanted = frozenset(part.strip() for part in (entities or "").split(",") if part.strip()) or push.ENTITIES
+    unknown = wanted - push.ENTITIES
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown entity types: {', '.join(sorted(unknown))}")
+
+    resumed_epoch, resumed_version = push.parse_last_event_id(last_event_id)
+    if resumed_version is not None:
+        epoch, since = resumed_epoch, resumed_version
+    subscriber = push.subscribe(wanted)
+    if subscriber is None:
+        raise HTTPException(status_code=503, detail="Too many change stream subscribers")
+    return StreamingResponse(
+        push.stream(subscriber, since, epoch),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no", "X-Catalog-Epoch": EPOCH}
+    )
@@ -0,0 +1,202 @@
+from fastapi import APIRouter, HTTPException, Query
+from typing import List, Dict, Any, Optional, Literal, Tuple
+import logging
+from repositories import get_graph
+from cache import VersionedCache
+from catalog import get_catalog_version
+
+router = APIRouter()
+logger = logging.getLogger(__name__)
+
+GRAPH_RELATIONSHIP_TYPES = (
+    "RELATES_TO", "HAS_VARIANT", "HAS_SPECIFIC_VARIABLE", "RELEVANT_TO",
+    "HAS_GROUP", "HAS_VARIABLE", "HAS_AVATAR"
+)
+
+# Nodes addressed by their id property; everything else is addressed as "Label:name"
+ID_LABELS = ("Object", "Variable", "Variant")
+NAME_LABELS = (
+    "Sector", "Domain", "Country", "ObjectClarifier", "VariableClarifier",
+    "Part", "Group", "Being", "Avatar"
+)
+
+# Rows pulled per hop for every node still available in the budget; hitting
+# this cap marks the response as truncated
+ROWS_PER_NODE = 20
+
+_graph_cache = VersionedCache(max_entries=64, name="graph_neighborhood")
+
+def _node_key(label: str, id: Optional[str], name: Optional[str]) -> str:
+    return str(id) if id is not None else f"{label}:{name}"
+
+def _resolve_seeds(repos, seeds: List[str]) -> List[Dict[str, Any]]:
+    """Match seed keys (ids, or Label:name for drivers and taxonomy nodes) to graph nodes"""
+    ids = []
+    named: List[Tuple[str, str]] = []
+    for seed in seeds:
+        label, _, name = seed.partition(":")
+        if name and label in NAME_LABELS:
+            named.append((label, name))
+        else:
+            ids.append(seed)
+
+    return repos.graph.seeds(ids, named)
+
+def build_neighborhood(repos, seeds: List[str], depth: int, types: List[str], max_nodes: int) -> Dict[str, Any]:
+    """
+    Breadth-first expansion from the seeds, one query per hop. Nodes are
+    collected into a deduplicated table (first visit wins) until max_nodes is
+    reached; edges are kept only when both endpoints made it into the table.
+    """
+    index: Dict[str, int] = {}
+    nodes: List[Tuple[str, str, Optional[str], int]] = []
+    edges: Dict[str, Tuple[int, int, str]] = {}
+    truncated = False
+
+    def add_node(record, hop: int) -> Optional[int]:
+        nonlocal truncated
+        position = index.get(record["element"])
+        if position is None:
+            if len(nodes) >= max_nodes:
+                truncated = True
+                return None
+            position = index[record["element"]] = len(nodes)
+            nodes.append((_node_key(record["label"], record["id"], record["name"]), record["label"], record["name"], hop))
+        return position
+
+    seed_records = _resolve_seeds(repos, seeds)
+    frontier = [record["element"] for record in seed_records if add_node(record, 0) is not None]
+    found = {nodes[i][0] for i in range(len(nodes))}
+    missing = [seed for seed in seeds if seed not in found]
+
+    for hop in range(1, depth + 1):
+        if not frontier or truncated:
+            break
+        row_limit = max(max_nodes - len(nodes), 1) * ROWS_PER_NODE
+        records = repos.graph.expand(frontier, types, row_limit)
+        if len(records) >= row_limit:
+            truncated = True
+
+        next_frontier = []
+        for record in records:
+            is_new = record["element"] not in index
+            target = add_node(record, hop)
+            if target is None:
+                continue
+            if is_new:
+                next_frontier.append(record["element"])
+            # A relationship between two frontier nodes is returned once per side
+            if record["relationship"] not in edges:
+                source = index[record["source"]]
+                pair = (source, target) if record["outgoing"] else (target, source)
+                edges[record["relationship"]] = (pair[0], pair[1], record["type"])
+        frontier = next_frontier
+
+    return {"nodes": nodes, "edges": sorted(edges.values()), "truncated": truncated, "missing": missing}
+
+def encode_neighborhood(graph: Dict[str, Any], format: str) -> Dict[str, Any]:
+    """
+    Columnar encoding: one array per node column, labels and relationship
+    types as code tables, edges as parallel source/target/type index arrays
+    (sorted by source). format="csr" replaces source with per-node offsets.
+    """
+    labels: List[str] = []
+    label_codes: Dict[str, int] = {}
+    types: List[str] = []
+    type_codes: Dict[str, int] = {}
+
+    def code(table: List[str], codes: Dict[str, int], value: str) -> int:
+        if value not in codes:
+            codes[value] = len(table)
+            table.append(value)
+        return codes[value]
+
+    nodes = graph["nodes"]
+    edges = graph["edges"]
+    node_columns = {
+        "id": [node[0] for node in nodes],
+        "label": [code(labels, label_codes, node[1]) for node in nodes],
+        "name": [node[2] for node in nodes],
+        "depth": [node[3] for node in nodes],
+    }
+
+    edge_types = [code(types, type_codes, edge[2]) for edge in edges]
+    targets = [edge[1] for edge in edges]
+    if format == "csr":
+        offsets = [0] * (len(nodes) + 1)
+        for source, _, _ in edges:
+            offsets[source + 1] += 1
+        for position in range(len(nodes)):
+            offsets[position + 1] += offsets[position]
+        edge_columns = {"offsets": offsets, "target": targets, "type": edge_types}
+    else:
+        edge_columns = {"source": [edge[0] for edge in edges], "target": targets, "type": edge_types}
+
+    return {
+        "labels": labels,
+        "relationshipTypes": types,
+        "nodeCount": len(nodes),
+        "edgeCount": len(edges),
+        "nodes": node_columns,
+        "edges": edge_columns,
+    }
+
+@router.get("/graph/neighborhood")
+def get_graph_neighborhood(
+    seeds: str = Query(..., min_length=1, description="Comma-separated node ids; drivers and taxonomy nodes as Label:name"),
+    depth: int = Query(1, ge=0, le=4),
+    types: Optional[str] = Query(None, description=f"Comma-separated subset of: {', '.join(GRAPH_RELATIONSHIP_TYPES)}"),
+    max_nodes: int = Query(500, ge=1, le=10000, alias="maxNodes"),
+    format: Literal["columnar", "csr"] = "columnar"
+):
+    """
+    Neighborhood of the seed nodes for graph visualization. Nodes come back
+    as a deduplicated columnar table and edges as integer index pairs into
+    it; expansion stops once maxNodes is reached and truncated is set.
+    """
+    seed_list = list(dict.fromkeys(s.strip() for s in seeds.split(",") if s.strip()))
+    if not seed_list:
+        raise HTTPException(status_code=400, detail="At least one seed is required")
+
+    if types:
+        requested = list(dict.fromkeys(t.strip().upper() for t in types.split(",") if t.strip()))
+        unknown = set(requested) - set(GRAPH_RELATIONSHIP_TYPES)
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown relationship types: {', '.join(sorted(unknown))}")
+    else:
+        requested = list(GRAPH_RELATIONSHIP_TYPES)
+
+    backend = get_graph()
+    if not backend.available():
+        raise HTTPException(status_code=500, detail="Failed to connect to Neo4j database")
+
+    version = get_catalog_version()
+    cache_key = (tuple(seed_list), depth, tuple(sorted(requested)), max_nodes, format)
+    cached = _graph_cache.get(cache_key, version)
+    if cached is not None:
+        return cached
+
+    try:
+        graph = backend.execute_read(lambda repos: build_neighborhood(repos, seed_list, depth, requested, max_nodes))
+
+        if not graph["nodes"]:
+            raise HTTPException(status_code=404, detail="None of the seed nodes were found")
+
+        response = {
+            "version": version,
+            "seeds": seed_list,
+            "depth": depth,
+            "maxNodes": max_nodes,
+            "format": format,
+            "truncated": graph["truncated"],
+            "missingSeeds": graph["missing"],
+            **encode_neighborhood(graph, format)
+        }
+        _graph_cache.set(cache_key, version, response)
+        return response
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.exception("Error building graph neighborhood: %s", e)
+        raise HTTPException(status_code=500, detail="Database error")
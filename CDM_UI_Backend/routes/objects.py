@@ -1,12 +1,19 @@
-from fastapi import APIRouter, HTTPException, status, UploadFile, File, Form, Body
-from typing import List, Dict, Any, Optional
+from fastapi import APIRouter, HTTPException, status, UploadFile, File, Form, Body, Query, Header
+from typing import List, Dict, Any, Optional, Literal, Tuple
+import logging
 import uuid
 import csv
 import io
 import json
 from pydantic import BaseModel
-from db import get_driver
-from schema import ObjectCreateRequest, ObjectResponse, CSVUploadResponse, CSVRowData
+from repositories import ALL, ConflictError, NotFoundError, format_driver_string, get_graph, is_clarifier
+from catalog import bump_catalog_version, change, change_listeners, reload_change
+from encoding import COLUMNAR_MEDIA_TYPE, encode_columnar, wants_columnar
+from responses import coalesced_response, serialized_response
+from schema import ObjectCreateRequest, ObjectResponse, ObjectListItem, CSVUploadResponse, CSVRowData, TypeaheadCompletion
+from search_index import TypeaheadIndex
+from logs import payload
+from tracing import span
 
 # Pydantic models for JSON body parameters
 class RelationshipCreateRequest(BaseModel):
@@ -20,424 +27,218 @@ class VariantCreateRequest(BaseModel):
     variant_name: str
 
 router = APIRouter()
+logger = logging.getLogger(__name__)
 
-@router.get("/objects", response_model=List[Dict[str, Any]])
-async def get_objects():
+# Grid columns for ?format=columnar; the dictionary columns repeat a handful of values (object
+# drivers are nearly unique per row, unlike variable drivers, so they stay plain)
+OBJECT_COLUMNS = (
+    "id", "driver", "being", "avatar", "object", "relationships", "variants",
+    "variables", "status", "relationshipsList", "variantsList"
+)
+OBJECT_DICTIONARY_COLUMNS = ("being", "avatar", "status")
+
+def _load_typeahead_taxonomy():
+    """Bulk read of object taxonomy triples and Being/Avatar nodes for the typeahead index"""
+    graph = get_graph()
+    if not graph.available():
+        return [], []
+
+    def work(repos):
+        return repos.objects.taxonomy_triples(), repos.objects.being_avatars()
+
+    return graph.execute_read(work)
+
+# Typeahead index for taxonomy pickers, kept current by the object write routes
+object_typeahead = TypeaheadIndex(_load_typeahead_taxonomy)
+
+def _reload_typeahead(entries: List[Dict[str, Any]]):
     """
-    Get all objects from the CDM.
+    catalog change listener: a reload change stands for writes the routes
+    did not describe (other processes, scripts, seeding), so the typeahead
+    index is rebuilt on its next lookup
     """
-    driver = get_driver()
-    if not driver:
+    if any(entry["entity"] == "catalog" for entry in entries):
+        object_typeahead.invalidate()
+
+change_listeners.append(_reload_typeahead)
+
+def _read_objects(columnar: bool):
+    """Full objects grid, row-oriented or columnar"""
+    graph = get_graph()
+    if not graph.available():
         raise HTTPException(status_code=500, detail="Failed to connect to Neo4j database")
 
     try:
-        with driver.session() as session:
-            # Get all objects with their relationships and variants counts
-            result = session.run("""
-                MATCH (o:Object)
-                OPTIONAL MATCH (o)-[:RELATES_TO]->(other:Object)
-                OPTIONAL MATCH (o)-[:HAS_VARIANT]->(v:Variant)
-                RETURN o.id as id, o.driver as driver, o.being as being,
-                       o.avatar as avatar, o.object as object, o.status as status,
-                       count(DISTINCT other) as relationships,
-                       count(DISTINCT v) as variants,
-                       0 as variables
-                ORDER BY o.id
-            """)
-
-            objects = []
-            for record in result:
-                obj = {
-                    "id": record["id"],
-                    "driver": record["driver"],
-                    "being": record["being"],
-                    "avatar": record["avatar"],
-                    "object": record["object"],
-                    "relationships": record["relationships"] or 0,
-                    "variants": record["variants"] or 0,
-                    "variables": record["variables"] or 0,
-                    "status": record["status"] or "Active",
-                    "relationshipsList": [],  # Will be populated separately
-                    "variantsList": []        # Will be populated separately
-                }
-                objects.append(obj)
-
-            # Get relationships for each object
-            for obj in objects:
-                # Get direct RELATES_TO relationships
-                relationships_result = session.run("""
-                    MATCH (o:Object {id: $object_id})-[r:RELATES_TO]->(other:Object)
-                    RETURN r.id as id, r.type as type, r.role as role,
-                           other.being as toBeing, other.avatar as toAvatar, other.object as toObject
-                """, object_id=obj["id"])
-
-                relationships = []
-                for rel_record in relationships_result:
-                    relationships.append({
-                        "id": rel_record["id"] or str(uuid.uuid4()),  # Use existing ID or generate new one
-                        "type": rel_record["type"],
-                        "role": rel_record["role"],
-                        "toBeing": rel_record["toBeing"],
-                        "toAvatar": rel_record["toAvatar"],
-                        "toObject": rel_record["toObject"]
-                    })
-                
-                obj["relationshipsList"] = relationships
-
-                # Get variants for each object
-                variants_result = session.run("""
-                    MATCH (o:Object {id: $object_id})-[:HAS_VARIANT]->(v:Variant)
-                    RETURN v.name as name
-                """, object_id=obj["id"])
-
-                variants = []
-                for var_record in variants_result:
-                    variants.append({
-                        "id": str(uuid.uuid4()),
-                        "name": var_record["name"]
-                    })
-                obj["variantsList"] = variants
+        def work(repos):
+            return repos.objects.grid()
 
-            print(f"Retrieved {len(objects)} objects from Neo4j")
-            return objects
+        objects = graph.execute_read(work)
+        logger.debug("Retrieved %s objects from %s", len(objects), graph.name)
+        if columnar:
+            return encode_columnar(objects, OBJECT_COLUMNS, OBJECT_DICTIONARY_COLUMNS)
+        return objects
 
     except Exception as e:
-        print(f"Error querying Neo4j: {e}")
+        logger.exception("Error querying Neo4j: %s", e)
         raise HTTPException(status_code=500, detail="Database error")
 
+@router.get("/objects", response_model=List[ObjectListItem])
+async def get_objects(
+    format: Optional[Literal["json", "columnar"]] = None,
+    accept: Optional[str] = Header(None)
+):
+    """
+    Get all objects from the CDM.
+    Pass format=columnar (or Accept: application/vnd.cdm.columnar+json) for
+    the column-oriented encoding.
+    """
+    columnar = wants_columnar(format, accept)
+    # Encoded once per catalog version; bypasses response_model validation
+    return await coalesced_response(
+        ("objects", columnar),
+        lambda: _read_objects(columnar),
+        media_type=COLUMNAR_MEDIA_TYPE if columnar else "application/json"
+    )
+
+def warm_cache():
+    """Build the objects grid body and the typeahead index ahead of the first request"""
+    serialized_response(("objects", False), lambda: _read_objects(False))
+    object_typeahead.load()
+
 @router.get("/objects/{object_id}", response_model=Dict[str, Any])
-async def get_object(object_id: str):
+def get_object(object_id: str):
     """
     Get a specific object by ID.
     """
-    driver = get_driver()
-    if not driver:
+    graph = get_graph()
+    if not graph.available():
         raise HTTPException(status_code=500, detail="Failed to connect to Neo4j database")
 
     try:
-        with driver.session() as session:
-            result = session.run("""
-                MATCH (o:Object {id: $object_id})
-                RETURN o.id as id, o.driver as driver, o.being as being,
-                       o.avatar as avatar, o.object as object, o.status as status
-            """, object_id=object_id)
-
-            record = result.single()
-            if not record:
-                raise HTTPException(status_code=404, detail="Object not found")
-
-            # Get relationship count
-            rel_count_result = session.run("""
-                MATCH (o:Object {id: $object_id})-[:RELATES_TO]->(other:Object)
-                RETURN count(other) as rel_count
-            """, object_id=object_id).single()
-            
-            # Get variant count
-            var_count_result = session.run("""
-                MATCH (o:Object {id: $object_id})-[:HAS_VARIANT]->(v:Variant)
-                RETURN count(v) as var_count
-            """, object_id=object_id).single()
-
-            obj = {
-                "id": record["id"],
-                "driver": record["driver"],
-                "being": record["being"],
-                "avatar": record["avatar"],
-                "object": record["object"],
-                "status": record["status"],
-                "relationships": rel_count_result["rel_count"] if rel_count_result else 0,
-                "variants": var_count_result["var_count"] if var_count_result else 0,
-                "variables": 0,
-                "relationshipsList": [],
-                "variantsList": []
-            }
-
-            # Get relationships
-            relationships_result = session.run("""
-                MATCH (o:Object {id: $object_id})-[r:RELATES_TO]->(other:Object)
-                RETURN r.id as id, r.type as type, r.role as role,
-                       other.being as toBeing, other.avatar as toAvatar, other.object as toObject
-            """, object_id=object_id)
-
-            relationships = []
-            for rel_record in relationships_result:
-                relationships.append({
-                    "id": rel_record["id"] or str(uuid.uuid4()),  # Use existing ID or generate new one
-                    "type": rel_record["type"],
-                    "role": rel_record["role"],
-                    "toBeing": rel_record["toBeing"],
-                    "toAvatar": rel_record["toAvatar"],
-                    "toObject": rel_record["toObject"]
-                })
-            
-            obj["relationshipsList"] = relationships
-
-            # Get variants
-            variants_result = session.run("""
-                MATCH (o:Object {id: $object_id})-[:HAS_VARIANT]->(v:Variant)
-                RETURN v.name as name
-            """, object_id=object_id)
-
-            variants = []
-            for var_record in variants_result:
-                variants.append({
-                    "id": str(uuid.uuid4()),
-                    "name": var_record["name"]
-                })
-            obj["variantsList"] = variants
+        def work(repos):
+            return repos.objects.get(object_id)
 
-            return obj
+        obj = graph.execute_read(work)
+        if not obj:
+            raise HTTPException(status_code=404, detail="Object not found")
+        return obj
 
     except HTTPException:
         raise
     except Exception as e:
-        print(f"Error querying Neo4j: {e}")
+        logger.exception("Error querying Neo4j: %s", e)
         raise HTTPException(status_code=500, detail="Database error")
 
+def _relate_matching(repos, source_id: str, rel: Dict[str, Any]) -> List[str]:
+    """RELATES_TO from the source to every object matching the relationship criteria (ALL matches anything); the new edge ids"""
+    to_being = rel.get("toBeing", ALL)
+    to_avatar = rel.get("toAvatar", ALL)
+    to_object = rel.get("toObject", ALL)
+    target_results = repos.objects.match(to_being, to_avatar, to_object)
+    logger.debug("Found %s matching objects for relationship (toBeing: %s, toAvatar: %s, toObject: %s): %s", len(target_results), to_being, to_avatar, to_object, payload(target_results))
+
+    # Create relationships to ALL matching objects
+    relationship_ids = []
+    for target_result in target_results:
+        relationship_id = str(uuid.uuid4())
+        repos.objects.relate(
+            source_id, target_result["target_id"], relationship_id,
+            rel.get("type", "Inter-Table"), rel.get("role", ""), to_being, to_avatar, to_object
+        )
+        relationship_ids.append(relationship_id)
+    return relationship_ids
+
+def _list_fields(repos, object_id: str) -> Dict[str, Any]:
+    """
+    Stored counts and relationship/variant lists of an object after a write,
+    the grid fields of its change log entry (ids as later edits address them)
+    """
+    fields = {}
+    fields["relationships"], fields["variants"] = repos.objects.update_counts(object_id)
+    row = repos.objects.get(object_id) or {}
+    fields["relationshipsList"] = row.get("relationshipsList", [])
+    fields["variantsList"] = row.get("variantsList", [])
+    return fields
+
+def create_object_unit(repos, object_data: ObjectCreateRequest) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+    """Create an object with its drivers, variants and relationships; (response, changes)"""
+    # Validate required fields
+    required_fields = ["sector", "domain", "country", "being", "avatar", "object"]
+    for field in required_fields:
+        value = getattr(object_data, field, None)
+        if not value:
+            raise HTTPException(status_code=400, detail=f"Missing required field: {field}")
+    
+    # Handle optional fields
+    objectClarifier = getattr(object_data, 'objectClarifier', None)
+    if objectClarifier is not None and not objectClarifier:
+        objectClarifier = None
+    
+    # Generate unique ID
+    new_id = str(uuid.uuid4())
+    driver_string = format_driver_string(object_data.sector, object_data.domain, object_data.country, objectClarifier)
+    
+    # Check for duplicate objects (same being, avatar, object combination)
+    if repos.objects.duplicate(object_data.being, object_data.avatar, object_data.object):
+        raise ConflictError("Object with this Being/Avatar/Object combination already exists")
+    
+    # Create the Object node with its Being -> Avatar -> Object taxonomy
+    status_value = getattr(object_data, 'status', 'Active')
+    repos.objects.create(new_id, driver_string, object_data.being, object_data.avatar, object_data.object, status_value)
+    
+    # Driver relationships, fanned out to every driver of a kind for ALL
+    repos.objects.link_drivers(new_id, object_data.sector, object_data.domain, object_data.country, objectClarifier)
+    
+    # Create variants if provided
+    variants = getattr(object_data, 'variants', [])
+    for variant_name in variants or []:
+        variant_id = str(uuid.uuid4())
+        repos.objects.create_variant(variant_id, variant_name)
+        repos.objects.attach_variant(new_id, variant_id)
+    
+    # Create relationships if provided
+    relationships = getattr(object_data, 'relationships', [])
+    for rel in relationships or []:
+        _relate_matching(repos, new_id, rel)
+    
+    # Store the actual counts on the object; the row is re-read so its lists carry the stored ids
+    result = {
+        "id": new_id,
+        "driver": driver_string,
+        "being": object_data.being,
+        "avatar": object_data.avatar,
+        "object": object_data.object,
+        "status": status_value,
+        "variables": 0,
+        **_list_fields(repos, new_id)
+    }
+    return result, [change("object", new_id, "create", result)]
+
 @router.post("/objects", response_model=ObjectResponse, status_code=status.HTTP_201_CREATED)
-async def create_object(object_data: ObjectCreateRequest):
+def create_object(object_data: ObjectCreateRequest):
     """
     Create a new object with proper Neo4j relationships.
     """
-    driver = get_driver()
-    if not driver:
+    graph = get_graph()
+    if not graph.available():
         raise HTTPException(status_code=500, detail="Failed to connect to Neo4j database")
     
     try:
-        with driver.session() as session:
-            # Validate required fields
-            required_fields = ["sector", "domain", "country", "being", "avatar", "object"]
-            for field in required_fields:
-                value = getattr(object_data, field, None)
-                if not value:
-                    raise HTTPException(status_code=400, detail=f"Missing required field: {field}")
-            
-            # Handle optional fields
-            objectClarifier = getattr(object_data, 'objectClarifier', None)
-            if objectClarifier is not None and not objectClarifier:
-                objectClarifier = None
-            
-            # Generate unique ID
-            new_id = str(uuid.uuid4())
-            
-            # Concatenate driver string
-            sector_str = "ALL" if "ALL" in object_data.sector else ", ".join(object_data.sector)
-            domain_str = "ALL" if "ALL" in object_data.domain else ", ".join(object_data.domain)
-            country_str = "ALL" if "ALL" in object_data.country else ", ".join(object_data.country)
-            clarifier_str = objectClarifier or "None"
-            driver_string = f"{sector_str}, {domain_str}, {country_str}, {clarifier_str}"
-            
-            # Check for duplicate objects (same being, avatar, object combination)
-            existing = session.run("""
-                MATCH (o:Object {being: $being, avatar: $avatar, object: $object})
-                RETURN o.id as id
-            """, being=object_data.being, avatar=object_data.avatar, object=object_data.object)
-            
-            if existing.single():
-                raise HTTPException(status_code=409, detail="Object with this Being/Avatar/Object combination already exists")
-            
-            # Create the Object node
-            session.run("""
-                CREATE (o:Object {
-                    id: $id,
-                    name: $object,
-                    driver: $driver,
-                    being: $being,
-                    avatar: $avatar,
-                    object: $object,
-                    status: $status
-                })
-            """, 
-            id=new_id,
-            driver=driver_string,
-            being=object_data.being,
-            avatar=object_data.avatar,
-            object=object_data.object,
-            status=getattr(object_data, 'status', 'Active'))
-            
-            # Create Being, Avatar, Object taxonomy relationships if they don't exist
-            session.run("""
-                MERGE (b:Being {name: $being})
-                MERGE (a:Avatar {name: $avatar})
-                MERGE (o:Object {id: $object_id, name: $object_name})
-                MERGE (b)-[:HAS_AVATAR]->(a)
-                MERGE (a)-[:HAS_OBJECT]->(o)
-            """, being=object_data.being, avatar=object_data.avatar, object_id=new_id, object_name=object_data.object)
-            
-            # Create driver relationships
-            # Sector relationships
-            if "ALL" in object_data.sector:
-                # Create relationships to ALL existing sectors
-                session.run("""
-                    MATCH (s:Sector)
-                    MATCH (o:Object {id: $object_id})
-                    WITH s, o
-                    CREATE (s)-[:RELEVANT_TO]->(o)
-                """, object_id=new_id)
-            else:
-                # Create relationships to selected sectors only
-                for sector in object_data.sector:
-                    session.run("""
-                        MATCH (s:Sector {name: $sector})
-                        MATCH (o:Object {id: $object_id})
-                        WITH s, o
-                        CREATE (s)-[:RELEVANT_TO]->(o)
-                    """, sector=sector, object_id=new_id)
-            
-            # Domain relationships
-            if "ALL" in object_data.domain:
-                # Create relationships to ALL existing domains
-                session.run("""
-                    MATCH (d:Domain)
-                    MATCH (o:Object {id: $object_id})
-                    WITH d, o
-                    CREATE (d)-[:RELEVANT_TO]->(o)
-                """, object_id=new_id)
-            else:
-                # Create relationships to selected domains only
-                for domain in object_data.domain:
-                    session.run("""
-                        MATCH (d:Domain {name: $domain})
-                        MATCH (o:Object {id: $object_id})
-                        WITH d, o
-                        CREATE (d)-[:RELEVANT_TO]->(o)
-                    """, domain=domain, object_id=new_id)
-            
-            # Country relationships
-            if "ALL" in object_data.country:
-                # Create relationships to ALL existing countries
-                session.run("""
-                    MATCH (c:Country)
-                    MATCH (o:Object {id: $object_id})
-                    WITH c, o
-                    CREATE (c)-[:RELEVANT_TO]->(o)
-                """, object_id=new_id)
-            else:
-                # Create relationships to selected countries only
-                for country in object_data.country:
-                    session.run("""
-                        MATCH (c:Country {name: $country})
-                        MATCH (o:Object {id: $object_id})
-                        WITH c, o
-                        CREATE (c)-[:RELEVANT_TO]->(o)
-                    """, country=country, object_id=new_id)
-            
-            # Object Clarifier relationship
-            if objectClarifier and objectClarifier != "None":
-                session.run("""
-                    MATCH (oc:ObjectClarifier {name: $clarifier})
-                    MATCH (o:Object {id: $object_id})
-                    WITH oc, o
-                    CREATE (oc)-[:RELEVANT_TO]->(o)
-                """, clarifier=objectClarifier, object_id=new_id)
-            
-            # Create variants if provided
-            variants = getattr(object_data, 'variants', [])
-            if variants:
-                for variant_name in variants:
-                    variant_id = str(uuid.uuid4())
-                    session.run("""
-                        CREATE (v:Variant {id: $variant_id, name: $name})
-                        WITH v
-                        MATCH (o:Object {id: $object_id})
-                        CREATE (o)-[:HAS_VARIANT]->(v)
-                    """, variant_id=variant_id, name=variant_name, object_id=new_id)
-            
-            # Create relationships if provided
-            relationships = getattr(object_data, 'relationships', [])
-            if relationships:
-                for rel in relationships:
-                    # Find ALL target objects that match the criteria
-                    to_being = rel.get("toBeing", "ALL")
-                    to_avatar = rel.get("toAvatar", "ALL")
-                    to_object = rel.get("toObject", "ALL")
-                    
-                    # Build the query dynamically based on the criteria
-                    where_conditions = []
-                    params = {}
-                    
-                    if to_being != "ALL":
-                        where_conditions.append("target.being = $to_being")
-                        params["to_being"] = to_being
-                    
-                    if to_avatar != "ALL":
-                        where_conditions.append("target.avatar = $to_avatar")
-                        params["to_avatar"] = to_avatar
-                    
-                    if to_object != "ALL":
-                        where_conditions.append("target.object = $to_object")
-                        params["to_object"] = to_object
-                    
-                    where_clause = " AND ".join(where_conditions) if where_conditions else "true"
-                    
-                    query = f"""
-                        MATCH (target:Object)
-                        WHERE {where_clause}
-                        RETURN target.id as target_id, target.being as being, target.avatar as avatar, target.object as object
-                    """
-                    
-                    target_results = session.run(query, **params).data()
-                    
-                    print(f"DEBUG: Found {len(target_results)} matching objects for relationship:")
-                    print(f"  toBeing: {rel.get('toBeing', 'ALL')}, toAvatar: {rel.get('toAvatar', 'ALL')}, toObject: {rel.get('toObject', 'ALL')}")
-                    for result in target_results:
-                        print(f"  - {result['being']}, {result['avatar']}, {result['object']} (ID: {result['target_id']})")
-                    
-                    # Create relationships to ALL matching objects
-                    for target_result in target_results:
-                        target_id = target_result["target_id"]
-                        # Generate unique relationship ID
-                        relationship_id = str(uuid.uuid4())
-                        session.run("""
-                            MATCH (source:Object {id: $source_id})
-                            MATCH (target:Object {id: $target_id})
-                            CREATE (source)-[:RELATES_TO {
-                                id: $relationship_id,
-                                type: $relationship_type,
-                                role: $role,
-                                toBeing: $to_being,
-                                toAvatar: $to_avatar,
-                                toObject: $to_object
-                            }]->(target)
-                        """, source_id=new_id, target_id=target_id, relationship_id=relationship_id,
-                            relationship_type=rel.get("type", "Inter-Table"),
-                            role=rel.get("role", ""),
-                            to_being=rel.get("toBeing", "ALL"),
-                            to_avatar=rel.get("toAvatar", "ALL"),
-                            to_object=rel.get("toObject", "ALL"))
-            
-            # Calculate actual relationship count
-            rel_count_result = session.run("""
-                MATCH (o:Object {id: $object_id})-[:RELATES_TO]->(other:Object)
-                RETURN count(other) as rel_count
-            """, object_id=new_id).single()
-            
-            rel_count = rel_count_result["rel_count"] if rel_count_result else 0
-            
-            # Update the object's relationship count in the database
-            session.run("""
-                MATCH (o:Object {id: $object_id})
-                SET o.relationships = $rel_count
-            """, object_id=new_id, rel_count=rel_count)
-            
-            return {
-                "id": new_id,
-                "driver": driver_string,
-                "being": object_data.being,
-                "avatar": object_data.avatar,
-                "object": object_data.object,
-                "status": getattr(object_data, 'status', 'Active'),
-                "relationships": rel_count,
-                "variants": len(variants),
-                "variables": 0,
-                "relationshipsList": relationships,
-                "variantsList": [{"id": str(uuid.uuid4()), "name": v} for v in variants]
-            }
+        def work(repos):
+            return create_object_unit(repos, object_data)
+
+        result, changes = graph.execute_write(work)
+        bump_catalog_version(*changes)
+        # In-process indexes only change once the transaction has committed
+        object_typeahead.add_object(object_data.being, object_data.avatar, object_data.object)
+        return result
             
     except HTTPException:
         raise
+    except ConflictError as e:
+        raise HTTPException(status_code=409, detail=str(e))
     except Exception as e:
-        print(f"Error creating object in Neo4j: {e}")
+        logger.exception("Error creating object in Neo4j: %s", e)
         raise HTTPException(status_code=500, detail="Failed to create object")
 
 @router.put("/objects/{object_id}/test", response_model=Dict[str, Any])
@@ -449,433 +250,224 @@ async def test_update_object(
     """Test endpoint for relationships and variants bulk update"""
     return {"message": "Test endpoint working", "relationships": relationships, "variants": variants}
 
+def update_object_unit(repos, object_id: str, request_data: Optional[Dict[str, Any]]) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+    """
+    Replace an object's driver (when request_data has "driver") or its
+    relationships and variants; (response, changes)
+    """
+    # Grid fields the update changed, for the change log
+    changed = {}
+
+    # Check if object exists
+    if not repos.objects.exists(object_id):
+        raise NotFoundError("Object not found")
+
+    # Handle driver updates
+    has_driver = request_data and 'driver' in request_data
+    if has_driver:
+        logger.debug("Processing driver update")
+        driver_string = request_data.get('driver', '')
+        
+        # Update the driver string and replace the driver relationships
+        repos.objects.set_driver(object_id, driver_string)
+        repos.objects.unlink_drivers(object_id)
+        changed["driver"] = driver_string
+        
+        # Parse driver string to recreate relationships
+        parts = driver_string.split(', ')
+        if len(parts) >= 4:
+            sector_str, domain_str, country_str, clarifier_str = (part.strip() for part in parts[:4])
+            repos.objects.link_drivers(
+                object_id,
+                [s.strip() for s in sector_str.split(',')],
+                [d.strip() for d in domain_str.split(',')],
+                [c.strip() for c in country_str.split(',')],
+                clarifier_str
+            )
+        
+        return {"message": "Object driver updated successfully"}, [change("object", object_id, "update", changed)]
+
+    # Handle relationships and variants bulk update
+    logger.debug("request_data=%s", payload(request_data))
+    has_relationships = request_data and 'relationships' in request_data
+    has_variants = request_data and 'variants' in request_data
+    logger.debug("has_relationships=%s, has_variants=%s", has_relationships, has_variants)
+
+    # Clear existing relationships and variants
+    repos.objects.clear_relationships(object_id)
+    repos.objects.clear_variants(object_id)
+
+    if not (has_relationships or has_variants):
+        # If no relationships or variants provided, just clear them
+        changed.update(_list_fields(repos, object_id))
+        return {"message": "Object relationships and variants cleared successfully"}, [change("object", object_id, "update", changed)]
+
+    logger.debug("Processing relationships and variants update")
+    parsed_relationships = request_data.get('relationships', []) or []
+    parsed_variants = request_data.get('variants', []) or []
+    
+    # First, deduplicate relationships in the request data
+    unique_relationships = []
+    seen_relationships = set()
+    for rel in parsed_relationships:
+        # Create a unique key for this relationship
+        rel_key = (
+            rel.get("role", ""),
+            rel.get("toBeing", ALL),
+            rel.get("toAvatar", ALL),
+            rel.get("toObject", ALL),
+            rel.get("type", "Inter-Table")
+        )
+        
+        if rel_key not in seen_relationships:
+            seen_relationships.add(rel_key)
+            unique_relationships.append(rel)
+        else:
+            logger.debug("Skipping duplicate relationship: %s", rel)
+    
+    logger.debug("Original relationships: %s, Unique relationships: %s", len(parsed_relationships), len(unique_relationships))
+    
+    # Create new relationships
+    for i, rel in enumerate(unique_relationships):
+        logger.debug("Processing relationship %s: %s", i + 1, rel)
+        _relate_matching(repos, object_id, rel)
+    
+    # Create new variants
+    for var in parsed_variants:
+        variant_id = str(uuid.uuid4())
+        repos.objects.create_variant(variant_id, var.get("name", ""))
+        repos.objects.attach_variant(object_id, variant_id)
+    
+    changed.update(_list_fields(repos, object_id))
+    return {"message": "Object relationships and variants updated successfully"}, [change("object", object_id, "update", changed)]
+
 @router.put("/objects/{object_id}", response_model=Dict[str, Any])
-async def update_object(
+def update_object(
     object_id: str, 
     request_data: Optional[Dict[str, Any]] = Body(None)
 ):
     """
     Update an existing object.
     """
-    driver = get_driver()
-    if not driver:
+    graph = get_graph()
+    if not graph.available():
         raise HTTPException(status_code=500, detail="Failed to connect to Neo4j database")
 
     try:
-        with driver.session() as session:
-            # Check if object exists
-            existing = session.run("MATCH (o:Object {id: $object_id}) RETURN o", object_id=object_id).single()
-            if not existing:
-                raise HTTPException(status_code=404, detail="Object not found")
-
-            # Handle driver updates
-            has_driver = request_data and 'driver' in request_data
-            if has_driver:
-                print(f"DEBUG: Processing driver update")
-                driver_string = request_data.get('driver', '')
-                
-                # Update the driver string on the object
-                session.run("""
-                    MATCH (o:Object {id: $object_id})
-                    SET o.driver = $driver
-                """, object_id=object_id, driver=driver_string)
-                
-                # Clear existing driver relationships
-                session.run("""
-                    MATCH (o:Object {id: $object_id})<-[r:RELEVANT_TO]-(d)
-                    WHERE d:Sector OR d:Domain OR d:Country OR d:ObjectClarifier
-                    DELETE r
-                """, object_id=object_id)
-                
-                # Parse driver string to recreate relationships
-                parts = driver_string.split(', ')
-                if len(parts) >= 4:
-                    sector_str = parts[0].strip()
-                    domain_str = parts[1].strip()
-                    country_str = parts[2].strip()
-                    clarifier_str = parts[3].strip()
-                    
-                    # Create new driver relationships
-                    # Sector relationships
-                    if sector_str == "ALL":
-                        # Create relationships to ALL existing sectors
-                        session.run("""
-                            MATCH (s:Sector)
-                            MATCH (o:Object {id: $object_id})
-                            WITH s, o
-                            CREATE (s)-[:RELEVANT_TO]->(o)
-                        """, object_id=object_id)
-                    else:
-                        # Create relationships to selected sectors only
-                        sectors = [s.strip() for s in sector_str.split(',')]
-                        for sector in sectors:
-                            session.run("""
-                                MATCH (s:Sector {name: $sector})
-                                MATCH (o:Object {id: $object_id})
-                                WITH s, o
-                                CREATE (s)-[:RELEVANT_TO]->(o)
-                            """, sector=sector, object_id=object_id)
-                    
-                    # Domain relationships
-                    if domain_str == "ALL":
-                        # Create relationships to ALL existing domains
-                        session.run("""
-                            MATCH (d:Domain)
-                            MATCH (o:Object {id: $object_id})
-                            WITH d, o
-                            CREATE (d)-[:RELEVANT_TO]->(o)
-                        """, object_id=object_id)
-                    else:
-                        # Create relationships to selected domains only
-                        domains = [d.strip() for d in domain_str.split(',')]
-                        for domain in domains:
-                            session.run("""
-                                MATCH (d:Domain {name: $domain})
-                                MATCH (o:Object {id: $object_id})
-                                WITH d, o
-                                CREATE (d)-[:RELEVANT_TO]->(o)
-                            """, domain=domain, object_id=object_id)
-                    
-                    # Country relationships
-                    if country_str == "ALL":
-                        # Create relationships to ALL existing countries
-                        session.run("""
-                            MATCH (c:Country)
-                            MATCH (o:Object {id: $object_id})
-                            WITH c, o
-                            CREATE (c)-[:RELEVANT_TO]->(o)
-                        """, object_id=object_id)
-                    else:
-                        # Create relationships to selected countries only
-                        countries = [c.strip() for c in country_str.split(',')]
-                        for country in countries:
-                            session.run("""
-                                MATCH (c:Country {name: $country})
-                                MATCH (o:Object {id: $object_id})
-                                WITH c, o
-                                CREATE (c)-[:RELEVANT_TO]->(o)
-                            """, country=country, object_id=object_id)
-                    
-                    # Object Clarifier relationship
-                    if clarifier_str and clarifier_str != "None":
-                        session.run("""
-                            MATCH (oc:ObjectClarifier {name: $clarifier})
-                            MATCH (o:Object {id: $object_id})
-                            WITH oc, o
-                            CREATE (oc)-[:RELEVANT_TO]->(o)
-                        """, clarifier=clarifier_str, object_id=object_id)
-                
-                return {"message": "Object driver updated successfully"}
-
-            # Handle relationships and variants bulk update
-            print(f"DEBUG: request_data={request_data}")
-            has_relationships = request_data and 'relationships' in request_data
-            has_variants = request_data and 'variants' in request_data
-            print(f"DEBUG: has_relationships={has_relationships}, has_variants={has_variants}")
-            if has_relationships or has_variants:
-                print(f"DEBUG: Processing relationships and variants update")
-                # Get from request_data
-                parsed_relationships = request_data.get('relationships', []) if request_data else []
-                parsed_variants = request_data.get('variants', []) if request_data else []
-                
-                # First, deduplicate relationships in the request data
-                unique_relationships = []
-                seen_relationships = set()
-                
-                if parsed_relationships:
-                    for rel in parsed_relationships:
-                        # Create a unique key for this relationship
-                        rel_key = (
-                            rel.get("role", ""),
-                            rel.get("toBeing", "ALL"),
-                            rel.get("toAvatar", "ALL"),
-                            rel.get("toObject", "ALL"),
-                            rel.get("type", "Inter-Table")
-                        )
-                        
-                        if rel_key not in seen_relationships:
-                            seen_relationships.add(rel_key)
-                            unique_relationships.append(rel)
-                        else:
-                            print(f"DEBUG: Skipping duplicate relationship: {rel}")
-                
-                print(f"DEBUG: Original relationships: {len(parsed_relationships)}, Unique relationships: {len(unique_relationships)}")
-                
-                # Clear existing relationships and variants
-                session.run("""
-                    MATCH (o:Object {id: $object_id})-[r:RELATES_TO]->(other:Object)
-                    DELETE r
-                """, object_id=object_id)
-                
-                session.run("""
-                    MATCH (o:Object {id: $object_id})-[:HAS_VARIANT]->(v:Variant)
-                    DETACH DELETE v
-                """, object_id=object_id)
-                
-                # Create new relationships
-                if unique_relationships:
-                    print(f"DEBUG: Processing {len(unique_relationships)} unique relationships")
-                    for i, rel in enumerate(unique_relationships):
-                        print(f"DEBUG: Processing relationship {i+1}: {rel}")
-                        # Find ALL target objects that match the criteria
-                        to_being = rel.get("toBeing", "ALL")
-                        to_avatar = rel.get("toAvatar", "ALL")
-                        to_object = rel.get("toObject", "ALL")
-                        
-                        # Build the query dynamically based on the criteria
-                        where_conditions = []
-                        params = {}
-                        
-                        if to_being != "ALL":
-                            where_conditions.append("target.being = $to_being")
-                            params["to_being"] = to_being
-                        
-                        if to_avatar != "ALL":
-                            where_conditions.append("target.avatar = $to_avatar")
-                            params["to_avatar"] = to_avatar
-                        
-                        if to_object != "ALL":
-                            where_conditions.append("target.object = $to_object")
-                            params["to_object"] = to_object
-                        
-                        where_clause = " AND ".join(where_conditions) if where_conditions else "true"
-                        
-                        query = f"""
-                            MATCH (target:Object)
-                            WHERE {where_clause}
-                            RETURN target.id as target_id, target.being as being, target.avatar as avatar, target.object as object
-                        """
-                        
-                        target_results = session.run(query, **params).data()
-                        
-                        print(f"DEBUG: Found {len(target_results)} matching objects for relationship:")
-                        print(f"  toBeing: {rel.get('toBeing', 'ALL')}, toAvatar: {rel.get('toAvatar', 'ALL')}, toObject: {rel.get('toObject', 'ALL')}")
-                        for result in target_results:
-                            print(f"  - {result['being']}, {result['avatar']}, {result['object']} (ID: {result['target_id']})")
-                        
-                        # Create relationships to ALL matching objects
-                        for j, target_result in enumerate(target_results):
-                            target_id = target_result["target_id"]
-                            
-                            # Generate unique relationship ID
-                            relationship_id = str(uuid.uuid4())
-                            print(f"DEBUG: Creating relationship {j+1}/{len(target_results)} from {object_id} to {target_id} with ID {relationship_id}")
-                            try:
-                                session.run("""
-                                    MATCH (source:Object {id: $source_id})
-                                    MATCH (target:Object {id: $target_id})
-                                    CREATE (source)-[:RELATES_TO {
-                                        id: $relationship_id,
-                                        type: $relationship_type,
-                                        role: $role,
-                                        toBeing: $to_being,
-                                        toAvatar: $to_avatar,
-                                        toObject: $to_object
-                                    }]->(target)
-                                """, source_id=object_id, target_id=target_id, relationship_id=relationship_id,
-                                    relationship_type=rel.get("type", "Inter-Table"),
-                                    role=rel.get("role", ""),
-                                    to_being=rel.get("toBeing", "ALL"),
-                                    to_avatar=rel.get("toAvatar", "ALL"),
-                                    to_object=rel.get("toObject", "ALL"))
-                                print(f"DEBUG: Successfully created relationship {j+1}")
-                            except Exception as e:
-                                print(f"DEBUG: Error creating relationship {j+1}: {e}")
-                
-                # Create new variants
-                if parsed_variants:
-                    for var in parsed_variants:
-                        variant_id = str(uuid.uuid4())
-                        session.run("""
-                            CREATE (v:Variant {
-                                id: $variant_id,
-                                name: $variant_name
-                            })
-                        """, variant_id=variant_id, variant_name=var.get("name", ""))
-                        
-                        session.run("""
-                            MATCH (o:Object {id: $object_id})
-                            MATCH (v:Variant {id: $variant_id})
-                            CREATE (o)-[:HAS_VARIANT]->(v)
-                        """, object_id=object_id, variant_id=variant_id)
-                
-                # Update counts
-                session.run("""
-                    MATCH (o:Object {id: $object_id})
-                    SET o.relationships = COUNT { (o)-[:RELATES_TO]->(:Object) },
-                        o.variants = COUNT { (o)-[:HAS_VARIANT]->(:Variant) }
-                """, object_id=object_id)
-                
-                return {"message": "Object relationships and variants updated successfully"}
-            
-            else:
-                # If no relationships or variants provided, just clear them
-                session.run("""
-                    MATCH (o:Object {id: $object_id})-[r:RELATES_TO]->(other:Object)
-                    DELETE r
-                """, object_id=object_id)
-                
-                session.run("""
-                    MATCH (o:Object {id: $object_id})-[:HAS_VARIANT]->(v:Variant)
-                    DETACH DELETE v
-                """, object_id=object_id)
-                
-                # Update counts
-                session.run("""
-                    MATCH (o:Object {id: $object_id})
-                    SET o.relationships = COUNT { (o)-[:RELATES_TO]->(:Object) },
-                        o.variants = COUNT { (o)-[:HAS_VARIANT]->(:Variant) }
-                """, object_id=object_id)
-                
-                return {"message": "Object relationships and variants cleared successfully"}
+        def work(repos):
+            return update_object_unit(repos, object_id, request_data)
 
+        result, changes = graph.execute_write(work)
+        bump_catalog_version(*changes)
+        return result
     except HTTPException:
         raise
+    except NotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
     except Exception as e:
-        print(f"Error updating object in Neo4j: {e}")
+        logger.exception("Error updating object in Neo4j: %s", e)
         raise HTTPException(status_code=500, detail="Failed to update object")
 
 @router.post("/objects/cleanup-relationships")
-async def cleanup_old_relationships():
+def cleanup_old_relationships():
     """Clean up old Relationship nodes and convert them to RELATES_TO edges"""
-    driver = get_driver()
-    if not driver:
+    graph = get_graph()
+    if not graph.available():
         raise HTTPException(status_code=500, detail="Failed to connect to Neo4j.")
     
     try:
-        with driver.session() as session:
-            # Get all old Relationship nodes and their connections
-            old_relationships = session.run("""
-                MATCH (o:Object)-[:HAS_RELATIONSHIP]->(r:Relationship)
-                RETURN o.id as source_id, r.type as type, r.role as role,
-                       r.toBeing as toBeing, r.toAvatar as toAvatar, r.toObject as toObject
-            """).data()
-            
-            print(f"Found {len(old_relationships)} old relationship nodes to convert")
-            
-            # Convert each old relationship to a RELATES_TO edge
-            for rel in old_relationships:
-                # Find ALL target objects that match the criteria (remove LIMIT 1)
-                target_results = session.run("""
-                    MATCH (target:Object)
-                    WHERE (target.being = $toBeing OR $toBeing = "ALL")
-                      AND (target.avatar = $toAvatar OR $toAvatar = "ALL")
-                      AND (target.object = $toObject OR $toObject = "ALL")
-                    RETURN target.id as target_id
-                """, toBeing=rel["toBeing"], toAvatar=rel["toAvatar"], toObject=rel["toObject"]).data()
-                
-                # Create relationships to ALL matching objects
-                for target_result in target_results:
-                    # Generate unique relationship ID
-                    relationship_id = str(uuid.uuid4())
-                    # Create the new RELATES_TO relationship
-                    session.run("""
-                        MATCH (source:Object {id: $source_id})
-                        MATCH (target:Object {id: $target_id})
-                        CREATE (source)-[:RELATES_TO {
-                            id: $relationship_id,
-                            type: $type,
-                            role: $role,
-                            toBeing: $toBeing,
-                            toAvatar: $toAvatar,
-                            toObject: $toObject
-                        }]->(target)
-                    """, source_id=rel["source_id"], target_id=target_result["target_id"], relationship_id=relationship_id,
-                        type=rel["type"], role=rel["role"],
-                        toBeing=rel["toBeing"], toAvatar=rel["toAvatar"], toObject=rel["toObject"])
-            
-            # Delete all old Relationship nodes
-            session.run("""
-                MATCH (r:Relationship)
-                DETACH DELETE r
-            """)
-            
-            # Update all object relationship counts
-            session.run("""
-                MATCH (o:Object)
-                SET o.relationships = COUNT { (o)-[:RELATES_TO]->(:Object) }
-            """)
-            
-            return {"message": f"Converted {len(old_relationships)} old relationships to RELATES_TO edges"}
+        def work(repos):
+            converted = repos.objects.convert_legacy_relationships()
+            logger.info("Converted %s old relationship nodes", converted)
+            return {"message": f"Converted {converted} old relationships to RELATES_TO edges"}
+
+        result = graph.execute_write(work)
+        # Touches any number of objects
+        bump_catalog_version(reload_change())
+        return result
     except Exception as e:
-        print(f"Error cleaning up relationships: {e}")
+        logger.exception("Error cleaning up relationships: %s", e)
         raise HTTPException(status_code=500, detail=f"Failed to cleanup relationships: {e}")
 
+def delete_object_unit(repos, object_id: str) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+    """Delete an object and its variants; (the deleted object's taxonomy, changes)"""
+    deleted = repos.objects.delete(object_id)
+    if deleted is None:
+        raise NotFoundError("Object not found")
+    return deleted, [change("object", object_id, "delete")]
+
 @router.delete("/objects/{object_id}")
-async def delete_object(object_id: str):
+def delete_object(object_id: str):
     """
     Delete an object and its variants, but preserve drivers and other entities.
     """
-    driver = get_driver()
-    if not driver:
+    graph = get_graph()
+    if not graph.available():
         raise HTTPException(status_code=500, detail="Failed to connect to Neo4j database")
 
     try:
-        with driver.session() as session:
-            # Check if object exists
-            existing = session.run("MATCH (o:Object {id: $object_id}) RETURN o", object_id=object_id).single()
-            if not existing:
-                raise HTTPException(status_code=404, detail="Object not found")
-
-            # Delete object and its variants, but preserve relationships to drivers
-            session.run("""
-                MATCH (o:Object {id: $object_id})
-                OPTIONAL MATCH (o)-[:HAS_VARIANT]->(v:Variant)
-                OPTIONAL MATCH (o)-[r:RELATES_TO]->(other:Object)
-                DELETE r
-                DETACH DELETE v, o
-            """, object_id=object_id)
-
-            return {"message": f"Object {object_id} deleted successfully"}
+        def work(repos):
+            return delete_object_unit(repos, object_id)
+
+        deleted, changes = graph.execute_write(work)
+        bump_catalog_version(*changes)
+        object_typeahead.remove_object(deleted.get("being"), deleted.get("avatar"), deleted.get("object"))
+        return {"message": f"Object {object_id} deleted successfully"}
 
     except HTTPException:
         raise
+    except NotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
     except Exception as e:
-        print(f"Error deleting object in Neo4j: {e}")
+        logger.exception("Error deleting object in Neo4j: %s", e)
         raise HTTPException(status_code=500, detail="Failed to delete object")
 
 @router.post("/objects/upload", response_model=CSVUploadResponse)
-async def upload_objects_csv(file: UploadFile = File(...)):
+def upload_objects_csv(file: UploadFile = File(...)):
     """
     Upload objects from CSV file.
     CSV must have columns: Sector, Domain, Country, Object Clarifier, Being, Avatar, Object
     """
-    print(f"DEBUG: CSV upload request received. File: {file.filename}, Content-Type: {file.content_type}")
+    logger.debug("CSV upload request received. File: %s, Content-Type: %s", file.filename, file.content_type)
 
-    driver = get_driver()
-    if not driver:
+    graph = get_graph()
+    if not graph.available():
         raise HTTPException(status_code=500, detail="Failed to connect to Neo4j database")
 
     try:
-        # Read CSV content
-        content = await file.read()
-        csv_content = content.decode('utf-8')
-        csv_reader = csv.DictReader(io.StringIO(csv_content))
-
-        # Validate required columns - support both formats
-        required_columns = ['Sector', 'Domain', 'Country', 'Object Clarifier', 'Being', 'Avatar', 'Object']
-        print(f"DEBUG: CSV fieldnames: {csv_reader.fieldnames}")
-
-        if not csv_reader.fieldnames:
-            raise HTTPException(
-                status_code=400,
-                detail="CSV file appears to be empty or has no headers"
-            )
-
-        # Check if all required columns are present
-        missing_columns = [col for col in required_columns if col not in csv_reader.fieldnames]
-        if missing_columns:
-            print(f"DEBUG: Missing columns: {missing_columns}")
-            raise HTTPException(
-                status_code=400,
-                detail=f"CSV must contain columns: {', '.join(required_columns)}. Missing: {', '.join(missing_columns)}"
-            )
+        with span("csv.parse", **{"csv.file": file.filename}) as parse_span:
+            # Read CSV content
+            content = file.file.read()
+            csv_content = content.decode('utf-8')
+            csv_reader = csv.DictReader(io.StringIO(csv_content))
+
+            # Validate required columns - support both formats
+            required_columns = ['Sector', 'Domain', 'Country', 'Object Clarifier', 'Being', 'Avatar', 'Object']
+            logger.debug("CSV fieldnames: %s", csv_reader.fieldnames)
+
+            if not csv_reader.fieldnames:
+                raise HTTPException(
+                    status_code=400,
+                    detail="CSV file appears to be empty or has no headers"
+                )
+
+            # Check if all required columns are present
+            missing_columns = [col for col in required_columns if col not in csv_reader.fieldnames]
+            if missing_columns:
+                logger.debug("Missing columns: %s", missing_columns)
+                raise HTTPException(
+                    status_code=400,
+                    detail=f"CSV must contain columns: {', '.join(required_columns)}. Missing: {', '.join(missing_columns)}"
+                )
+
+            rows = list(csv_reader)
+            parse_span.set("csv.rows", len(rows))
 
         created_objects = []
         errors = []
 
-        with driver.session() as session:
-            for row_num, row in enumerate(csv_reader, start=2):  # Start at 2 because of header
+        with span("csv.import", **{"csv.rows": len(rows)}) as import_span:
+            for row_num, row in enumerate(rows, start=2):  # Start at 2 because of header
                 try:
                     # Validate row data using Pydantic schema
                     try:
@@ -889,151 +481,35 @@ async def upload_objects_csv(file: UploadFile = File(...)):
                     domain = [d.strip() for d in csv_row.Domain.split(',') if d.strip()]
                     country = [c.strip() for c in csv_row.Country.split(',') if c.strip()]
                     object_clarifier = csv_row.ObjectClarifier.strip() if csv_row.ObjectClarifier and csv_row.ObjectClarifier.strip() else None
-
-                    # Validate driver values exist in database
-                    for sector_name in sector:
-                        if sector_name != "ALL":
-                            exists = session.run("MATCH (s:Sector {name: $name}) RETURN s", name=sector_name).single()
-                            if not exists:
-                                errors.append(f"Row {row_num}: Sector '{sector_name}' not found in drivers")
-                                continue
-
-                    for domain_name in domain:
-                        if domain_name != "ALL":
-                            exists = session.run("MATCH (d:Domain {name: $name}) RETURN d", name=domain_name).single()
-                            if not exists:
-                                errors.append(f"Row {row_num}: Domain '{domain_name}' not found in drivers")
-                                continue
-
-                    for country_name in country:
-                        if country_name != "ALL":
-                            exists = session.run("MATCH (c:Country {name: $name}) RETURN c", name=country_name).single()
-                            if not exists:
-                                errors.append(f"Row {row_num}: Country '{country_name}' not found in drivers")
-                                continue
-
-                    if object_clarifier and object_clarifier != "None":
-                        exists = session.run("MATCH (oc:ObjectClarifier {name: $name}) RETURN oc", name=object_clarifier).single()
-                        if not exists:
-                            errors.append(f"Row {row_num}: Object Clarifier '{object_clarifier}' not found in drivers")
-                            continue
-
-                    # Check for duplicate objects (full combination check)
-                    # First, get the driver string to check for exact duplicates
-                    sector_str = "ALL" if "ALL" in sector else ", ".join(sector)
-                    domain_str = "ALL" if "ALL" in domain else ", ".join(domain)
-                    country_str = "ALL" if "ALL" in country else ", ".join(country)
-                    clarifier_str = object_clarifier or "None"
-                    driver_string = f"{sector_str}, {domain_str}, {country_str}, {clarifier_str}"
-                    
-                    existing = session.run("""
-                        MATCH (o:Object {being: $being, avatar: $avatar, object: $object, driver: $driver})
-                        RETURN o.id as id
-                    """, being=csv_row.Being, avatar=csv_row.Avatar, object=csv_row.Object, driver=driver_string).single()
-
-                    if existing:
-                        errors.append(f"Row {row_num}: Object with Being='{csv_row.Being}', Avatar='{csv_row.Avatar}', Object='{csv_row.Object}' already exists")
-                        continue
-
-                    # Create object
+                    driver_string = format_driver_string(sector, domain, country, object_clarifier)
                     new_id = str(uuid.uuid4())
 
-                    # Create the Object node
-                    session.run("""
-                        CREATE (o:Object {
-                            id: $id,
-                            name: $object,
-                            driver: $driver,
-                            being: $being,
-                            avatar: $avatar,
-                            object: $object,
-                            status: $status
-                        })
-                    """, 
-                    id=new_id,
-                    object=csv_row.Object,
-                    driver=driver_string,
-                    being=csv_row.Being,
-                    avatar=csv_row.Avatar,
-                    status="Active")
-
-                    # Create taxonomy relationships
-                    session.run("""
-                        MERGE (b:Being {name: $being})
-                        MERGE (a:Avatar {name: $avatar})
-                        MERGE (o:Object {id: $object_id})
-                        MERGE (b)-[:HAS_AVATAR]->(a)
-                        MERGE (a)-[:HAS_OBJECT]->(o)
-                    """, being=csv_row.Being, avatar=csv_row.Avatar, object_id=new_id)
-
-                    # Create driver relationships
-                    if "ALL" not in sector:
-                        for sector_name in sector:
-                            session.run("""
-                                MATCH (s:Sector {name: $sector})
-                                MATCH (o:Object {id: $object_id})
-                                WITH s, o
-                                CREATE (s)-[:RELEVANT_TO]->(o)
-                            """, sector=sector_name, object_id=new_id)
-
-                    if "ALL" not in domain:
-                        for domain_name in domain:
-                            session.run("""
-                                MATCH (d:Domain {name: $domain})
-                                MATCH (o:Object {id: $object_id})
-                                WITH d, o
-                                CREATE (d)-[:RELEVANT_TO]->(o)
-                            """, domain=domain_name, object_id=new_id)
-
-                    if "ALL" not in country:
-                        for country_name in country:
-                            session.run("""
-                                MATCH (c:Country {name: $country})
-                                MATCH (o:Object {id: $object_id})
-                                WITH c, o
-                                CREATE (c)-[:RELEVANT_TO]->(o)
-                            """, country=country_name, object_id=new_id)
-
-                    if object_clarifier and object_clarifier != "None":
-                        session.run("""
-                            MATCH (oc:ObjectClarifier {name: $clarifier})
-                            MATCH (o:Object {id: $object_id})
-                            WITH oc, o
-                            CREATE (oc)-[:RELEVANT_TO]->(o)
-                        """, clarifier=object_clarifier, object_id=new_id)
-
-                    print(f"DEBUG: Successfully created object {new_id}")
-                    # Get relationships for the newly created object
-                    relationships_result = session.run("""
-                        MATCH (o:Object {id: $object_id})-[r:RELATES_TO]->(other:Object)
-                        RETURN r.id as id, r.type as type, r.role as role,
-                               other.being as toBeing, other.avatar as toAvatar, other.object as toObject
-                    """, object_id=new_id)
-
-                    relationships = []
-                    for rel_record in relationships_result:
-                        relationships.append({
-                            "id": rel_record["id"] or str(uuid.uuid4()),  # Use existing ID or generate new one
-                            "type": rel_record["type"],
-                            "role": rel_record["role"],
-                            "toBeing": rel_record["toBeing"],
-                            "toAvatar": rel_record["toAvatar"],
-                            "toObject": rel_record["toObject"]
-                        })
-
-                    # Get variants for the newly created object
-                    variants_result = session.run("""
-                        MATCH (o:Object {id: $object_id})-[:HAS_VARIANT]->(v:Variant)
-                        RETURN v.name as name
-                    """, object_id=new_id)
-
-                    variants = []
-                    for var_record in variants_result:
-                        variants.append({
-                            "id": str(uuid.uuid4()),
-                            "name": var_record["name"]
-                        })
+                    # One unit of work per row: a bad row is reported and skipped
+                    # without undoing the rows before it
+                    def work(repos):
+                        # Validate driver values exist in database
+                        for label, names in (("Sector", sector), ("Domain", domain), ("Country", country)):
+                            for name in names:
+                                if name != ALL and not repos.drivers.exists(label, name):
+                                    return f"{label} '{name}' not found in drivers"
+                        if is_clarifier(object_clarifier) and not repos.drivers.exists("ObjectClarifier", object_clarifier):
+                            return f"Object Clarifier '{object_clarifier}' not found in drivers"
+
+                        # Check for duplicate objects (full combination check)
+                        if repos.objects.duplicate(csv_row.Being, csv_row.Avatar, csv_row.Object, driver_string):
+                            return f"Object with Being='{csv_row.Being}', Avatar='{csv_row.Avatar}', Object='{csv_row.Object}' already exists"
+
+                        repos.objects.create(new_id, driver_string, csv_row.Being, csv_row.Avatar, csv_row.Object, "Active")
+                        repos.objects.link_drivers(new_id, sector, domain, country, object_clarifier)
+                        return None
+
+                    error = graph.execute_write(work)
+                    if error:
+                        errors.append(f"Row {row_num}: {error}")
+                        continue
 
+                    logger.debug("Successfully created object %s", new_id)
+                    object_typeahead.add_object(csv_row.Being, csv_row.Avatar, csv_row.Object)
                     created_objects.append({
                         "id": new_id,
                         "driver": driver_string,
@@ -1041,20 +517,25 @@ async def upload_objects_csv(file: UploadFile = File(...)):
                         "avatar": csv_row.Avatar,
                         "object": csv_row.Object,
                         "status": "Active",
-                        "relationships": len(relationships),
-                        "variants": len(variants),
+                        "relationships": 0,
+                        "variants": 0,
                         "variables": 0,
-                        "relationshipsList": relationships,
-                        "variantsList": variants
+                        "relationshipsList": [],
+                        "variantsList": []
                     })
 
                 except Exception as e:
                     errors.append(f"Row {row_num}: {str(e)}")
 
-        print(f"DEBUG: CSV upload completed. Created {len(created_objects)} objects.")
-        print(f"DEBUG: Created objects: {created_objects}")
-        print(f"DEBUG: Errors: {errors}")
+            import_span.set("csv.created", len(created_objects))
+            import_span.set("csv.errors", len(errors))
+
+        logger.debug("CSV upload completed. Created %s objects.", len(created_objects))
+        logger.debug("Created objects: %s", payload(created_objects))
+        logger.debug("Errors: %s", payload(errors))
         
+        if created_objects:
+            bump_catalog_version(*(change("object", row["id"], "create", row) for row in created_objects))
         return CSVUploadResponse(
             success=True,
             message=f"CSV upload completed. Created {len(created_objects)} objects.",
@@ -1067,501 +548,326 @@ async def upload_objects_csv(file: UploadFile = File(...)):
     except HTTPException:
         raise
     except Exception as e:
-        print(f"Error processing CSV upload: {e}")
+        logger.exception("Error processing CSV upload: %s", e)
         raise HTTPException(status_code=500, detail="Failed to process CSV upload")
 
 @router.get("/objects/taxonomy/beings", response_model=List[str])
-async def get_beings():
+def get_beings():
     """Get all available Beings for dropdowns"""
-    driver = get_driver()
-    if not driver:
+    graph = get_graph()
+    if not graph.available():
         return ["Master", "Mate", "Process", "Adjunct", "Rule", "Roster"]
     
     try:
-        with driver.session() as session:
-            result = session.run("MATCH (b:Being) RETURN b.name as name ORDER BY name")
-            return [record["name"] for record in result]
+        def work(repos):
+            return repos.objects.beings()
+
+        return graph.execute_read(work)
     except Exception as e:
-        print(f"Error fetching beings: {e}")
+        logger.warning("Error fetching beings: %s", e)
         return ["Master", "Mate", "Process", "Adjunct", "Rule", "Roster"]
 
 @router.get("/objects/taxonomy/avatars", response_model=List[str])
-async def get_avatars(being: Optional[str] = None):
+def get_avatars(being: Optional[str] = None):
     """Get all available Avatars for dropdowns, optionally filtered by Being"""
-    driver = get_driver()
-    if not driver:
+    graph = get_graph()
+    if not graph.available():
         return ["Company", "Company Affiliate", "Employee", "Product", "Customer", "Supplier"]
     
     try:
-        with driver.session() as session:
-            if being:
-                result = session.run("""
-                    MATCH (b:Being {name: $being})-[:HAS_AVATAR]->(a:Avatar)
-                    RETURN a.name as name ORDER BY name
-                """, being=being)
-            else:
-                result = session.run("MATCH (a:Avatar) RETURN a.name as name ORDER BY name")
-            return [record["name"] for record in result]
+        def work(repos):
+            return repos.objects.avatars(being)
+
+        return graph.execute_read(work)
     except Exception as e:
-        print(f"Error fetching avatars: {e}")
+        logger.warning("Error fetching avatars: %s", e)
         return ["Company", "Company Affiliate", "Employee", "Product", "Customer", "Supplier"]
 
 @router.get("/objects/taxonomy/objects", response_model=List[str])
-async def get_objects_by_taxonomy(being: Optional[str] = None, avatar: Optional[str] = None):
+def get_objects_by_taxonomy(being: Optional[str] = None, avatar: Optional[str] = None):
     """Get all available Objects for dropdowns, optionally filtered by Being and Avatar"""
-    driver = get_driver()
-    if not driver:
+    graph = get_graph()
+    if not graph.available():
         return []
     
     try:
-        with driver.session() as session:
-            if being and avatar:
-                result = session.run("""
-                    MATCH (b:Being {name: $being})-[:HAS_AVATAR]->(a:Avatar {name: $avatar})-[:HAS_OBJECT]->(o:Object)
-                    RETURN o.object as name ORDER BY name
-                """, being=being, avatar=avatar)
-            elif being:
-                result = session.run("""
-                    MATCH (b:Being {name: $being})-[:HAS_AVATAR]->(a:Avatar)-[:HAS_OBJECT]->(o:Object)
-                    RETURN o.object as name ORDER BY name
-                """, being=being)
-            else:
-                result = session.run("MATCH (o:Object) RETURN o.object as name ORDER BY name")
-            return [record["name"] for record in result]
+        def work(repos):
+            return repos.objects.names(being, avatar)
+
+        return graph.execute_read(work)
     except Exception as e:
-        print(f"Error fetching objects: {e}")
+        logger.warning("Error fetching objects: %s", e)
         return []
 
+@router.get("/objects/typeahead/{field}", response_model=List[TypeaheadCompletion])
+def typeahead(
+    field: Literal["beings", "avatars", "objects"],
+    prefix: str = "",
+    being: Optional[str] = None,
+    avatar: Optional[str] = None,
+    limit: int = Query(10, ge=1, le=100),
+    order: Literal["count", "alpha"] = "count"
+):
+    """
+    Top distinct completions with object counts for taxonomy pickers.
+    Avatars can be scoped by Being; Objects by Being and/or Avatar.
+    """
+    if not get_graph().available():
+        raise HTTPException(status_code=500, detail="Failed to connect to Neo4j database")
+
+    try:
+        return object_typeahead.complete(
+            field[:-1],
+            prefix=prefix,
+            being=being if field != "beings" else None,
+            avatar=avatar if field == "objects" else None,
+            limit=limit,
+            order=order
+        )
+    except Exception as e:
+        logger.exception("Error serving typeahead for %s: %s", field, e)
+        raise HTTPException(status_code=500, detail="Database error")
+
 # Relationship Management Endpoints
+def relate_object_unit(repos, object_id: str, request: RelationshipCreateRequest) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+    """RELATES_TO edges to every object matching the request; (response, changes)"""
+    rel = {
+        "type": request.relationship_type,
+        "role": request.role,
+        "toBeing": request.to_being,
+        "toAvatar": request.to_avatar,
+        "toObject": request.to_object
+    }
+    relationship_ids = _relate_matching(repos, object_id, rel)
+    if not relationship_ids:
+        raise NotFoundError("No target objects found matching criteria")
+    # One edge per matching object; id is the first, as stored
+    response = {"id": relationship_ids[0], "relationshipIds": relationship_ids, **rel}
+    return response, [change("object", object_id, "update", _list_fields(repos, object_id))]
+
+def unrelate_object_unit(repos, object_id: str, relationship_id: str) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+    # Delete the RELATES_TO relationship by unique identifier
+    repos.objects.unrelate(object_id, relationship_id)
+    return {"message": "Relationship deleted successfully"}, [change("object", object_id, "update", _list_fields(repos, object_id))]
+
 @router.post("/objects/{object_id}/relationships", response_model=Dict[str, Any])
-async def create_relationship(
+def create_relationship(
     object_id: str,
     request: RelationshipCreateRequest = Body(...)
 ):
     """Create a new relationship for an object"""
     # Debug request data
-    print(f"DEBUG: create_relationship called with:")
-    print(f"  object_id: {object_id}")
-    print(f"  relationship_type: '{request.relationship_type}' (type: {type(request.relationship_type)}, len: {len(request.relationship_type)})")
-    print(f"  role: '{request.role}' (type: {type(request.role)}, len: {len(request.role)})")
-    print(f"  to_being: '{request.to_being}' (type: {type(request.to_being)}, len: {len(request.to_being)})")
-    print(f"  to_avatar: '{request.to_avatar}' (type: {type(request.to_avatar)}, len: {len(request.to_avatar)})")
-    print(f"  to_object: '{request.to_object}' (type: {type(request.to_object)}, len: {len(request.to_object)})")
+    logger.debug(
+        "create_relationship called with object_id=%s relationship_type=%r role=%r to_being=%r to_avatar=%r to_object=%r",
+        object_id, request.relationship_type, request.role, request.to_being, request.to_avatar, request.to_object
+    )
     
-    driver = get_driver()
-    if not driver:
+    graph = get_graph()
+    if not graph.available():
         raise HTTPException(status_code=500, detail="Failed to connect to Neo4j.")
     
     try:
-        with driver.session() as session:
-            # Find ALL target objects that match the criteria
-            where_conditions = []
-            params = {}
-            
-            if request.to_being != "ALL":
-                where_conditions.append("target.being = $to_being")
-                params["to_being"] = request.to_being
-            
-            if request.to_avatar != "ALL":
-                where_conditions.append("target.avatar = $to_avatar")
-                params["to_avatar"] = request.to_avatar
-            
-            if request.to_object != "ALL":
-                where_conditions.append("target.object = $to_object")
-                params["to_object"] = request.to_object
-            
-            where_clause = " AND ".join(where_conditions) if where_conditions else "true"
-            
-            query = f"""
-                MATCH (target:Object)
-                WHERE {where_clause}
-                RETURN target.id as target_id, target.being as being, target.avatar as avatar, target.object as object
-            """
-            
-            target_results = session.run(query, **params).data()
-            
-            if not target_results:
-                raise HTTPException(status_code=404, detail="No target objects found matching criteria")
-            
-            print(f"DEBUG: Found {len(target_results)} matching objects for relationship:")
-            print(f"  toBeing: {request.to_being}, toAvatar: {request.to_avatar}, toObject: {request.to_object}")
-            for result in target_results:
-                print(f"  - {result['being']}, {result['avatar']}, {result['object']} (ID: {result['target_id']})")
-            
-            # Create relationships to ALL matching objects
-            for i, target_result in enumerate(target_results):
-                target_id = target_result["target_id"]
-                # Generate unique relationship ID
-                relationship_id = str(uuid.uuid4())
-                print(f"DEBUG: Creating relationship {i+1}/{len(target_results)} from {object_id} to {target_id} ({target_result['being']}, {target_result['avatar']}, {target_result['object']}) with ID {relationship_id}")
-                try:
-                    result = session.run("""
-                        MATCH (source:Object {id: $source_id})
-                        MATCH (target:Object {id: $target_id})
-                        CREATE (source)-[:RELATES_TO {
-                            id: $relationship_id,
-                            type: $relationship_type,
-                            role: $role,
-                            toBeing: $to_being,
-                            toAvatar: $to_avatar,
-                            toObject: $to_object
-                        }]->(target)
-                    """, source_id=object_id, target_id=target_id, relationship_id=relationship_id,
-                        relationship_type=request.relationship_type, role=request.role, to_being=request.to_being, 
-                        to_avatar=request.to_avatar, to_object=request.to_object)
-                    print(f"DEBUG: Successfully created relationship to {target_result['object']}")
-                except Exception as e:
-                    print(f"DEBUG: Error creating relationship to {target_result['object']}: {e}")
-            
-            # Update relationship count
-            count_result = session.run("""
-                MATCH (o:Object {id: $object_id})-[:RELATES_TO]->(other:Object)
-                RETURN count(other) as rel_count
-            """, object_id=object_id).single()
-            
-            rel_count = count_result["rel_count"] if count_result else 0
-            
-            session.run("""
-                MATCH (o:Object {id: $object_id})
-                SET o.relationships = $rel_count
-            """, object_id=object_id, rel_count=rel_count)
-            
-            return {
-                "id": str(uuid.uuid4()),  # Generate a new ID for the response
-                "type": request.relationship_type,
-                "role": request.role,
-                "toBeing": request.to_being,
-                "toAvatar": request.to_avatar,
-                "toObject": request.to_object
-            }
+        def work(repos):
+            return relate_object_unit(repos, object_id, request)
+
+        result, changes = graph.execute_write(work)
+        bump_catalog_version(*changes)
+        return result
+    except NotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
     except Exception as e:
-        print(f"Error creating relationship: {e}")
+        logger.exception("Error creating relationship: %s", e)
         raise HTTPException(status_code=500, detail=f"Failed to create relationship: {e}")
 
 @router.delete("/objects/{object_id}/relationships/{relationship_id}")
-async def delete_relationship(object_id: str, relationship_id: str):
+def delete_relationship(object_id: str, relationship_id: str):
     """Delete a relationship from an object"""
-    driver = get_driver()
-    if not driver:
+    graph = get_graph()
+    if not graph.available():
         raise HTTPException(status_code=500, detail="Failed to connect to Neo4j.")
     
     try:
-        with driver.session() as session:
-            # Delete the RELATES_TO relationship by unique identifier
-            session.run("""
-                MATCH (o:Object {id: $object_id})-[r:RELATES_TO]->(other:Object)
-                WHERE r.id = $relationship_id
-                DELETE r
-            """, object_id=object_id, relationship_id=relationship_id)
-            
-            # Update relationship count
-            count_result = session.run("""
-                MATCH (o:Object {id: $object_id})-[:RELATES_TO]->(other:Object)
-                RETURN count(other) as rel_count
-            """, object_id=object_id).single()
-            
-            rel_count = count_result["rel_count"] if count_result else 0
-            
-            session.run("""
-                MATCH (o:Object {id: $object_id})
-                SET o.relationships = $rel_count
-            """, object_id=object_id, rel_count=rel_count)
-            
-            return {"message": "Relationship deleted successfully"}
+        def work(repos):
+            return unrelate_object_unit(repos, object_id, relationship_id)
+
+        result, changes = graph.execute_write(work)
+        bump_catalog_version(*changes)
+        return result
     except Exception as e:
-        print(f"Error deleting relationship: {e}")
+        logger.exception("Error deleting relationship: %s", e)
         raise HTTPException(status_code=500, detail=f"Failed to delete relationship: {e}")
 
 # Variant Management Endpoints
+def add_variant_unit(repos, object_id: str, request: VariantCreateRequest) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+    """Attach the variant with this name (created when new) to an object; (response, changes)"""
+    # Variants are global: reuse one with this name if it exists
+    variant_id = repos.objects.find_variant(request.variant_name)
+    if variant_id:
+        if repos.objects.has_variant(object_id, variant_id):
+            raise ConflictError("Variant already exists for this object")
+    else:
+        variant_id = str(uuid.uuid4())
+        repos.objects.create_variant(variant_id, request.variant_name)
+    repos.objects.attach_variant(object_id, variant_id)
+    return {
+        "id": variant_id,
+        "name": request.variant_name
+    }, [change("object", object_id, "update", _list_fields(repos, object_id))]
+
+def remove_variant_unit(repos, object_id: str, variant_id: str) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+    repos.objects.delete_variant(object_id, variant_id)
+    return {"message": "Variant deleted successfully"}, [change("object", object_id, "update", _list_fields(repos, object_id))]
+
 @router.post("/objects/{object_id}/variants", response_model=Dict[str, Any])
-async def create_variant(object_id: str, request: VariantCreateRequest = Body(...)):
+def create_variant(object_id: str, request: VariantCreateRequest = Body(...)):
     """Create a new variant for an object"""
     # Debug request data
-    print(f"DEBUG: create_variant called with:")
-    print(f"  object_id: {object_id}")
-    print(f"  variant_name: '{request.variant_name}' (type: {type(request.variant_name)}, len: {len(request.variant_name)})")
+    logger.debug("create_variant called with object_id=%s variant_name=%r", object_id, request.variant_name)
     
-    driver = get_driver()
-    if not driver:
+    graph = get_graph()
+    if not graph.available():
         raise HTTPException(status_code=500, detail="Failed to connect to Neo4j.")
     
     try:
-        with driver.session() as session:
-            # Check if variant already exists globally
-            existing_variant = session.run("""
-                MATCH (v:Variant {name: $variant_name})
-                RETURN v.id as id
-            """, variant_name=request.variant_name).single()
-            
-            if existing_variant:
-                # Variant exists globally, check if already connected to this object
-                variant_id = existing_variant["id"]
-                already_connected = session.run("""
-                    MATCH (o:Object {id: $object_id})-[:HAS_VARIANT]->(v:Variant {id: $variant_id})
-                    RETURN v.id as id
-                """, object_id=object_id, variant_id=variant_id).single()
-                
-                if already_connected:
-                    raise HTTPException(status_code=409, detail="Variant already exists for this object")
-                
-                # Connect existing variant to object
-                session.run("""
-                    MATCH (o:Object {id: $object_id})
-                    MATCH (v:Variant {id: $variant_id})
-                    CREATE (o)-[:HAS_VARIANT]->(v)
-                """, object_id=object_id, variant_id=variant_id)
-            else:
-                # Create new variant
-                variant_id = str(uuid.uuid4())
-                
-                # Create variant node
-                session.run("""
-                    CREATE (v:Variant {
-                        id: $variant_id,
-                        name: $variant_name
-                    })
-                """, variant_id=variant_id, variant_name=request.variant_name)
-                
-                # Connect variant to object
-                session.run("""
-                    MATCH (o:Object {id: $object_id})
-                    MATCH (v:Variant {id: $variant_id})
-                    CREATE (o)-[:HAS_VARIANT]->(v)
-                """, object_id=object_id, variant_id=variant_id)
-            
-            # Update variant count
-            count_result = session.run("""
-                MATCH (o:Object {id: $object_id})-[:HAS_VARIANT]->(v:Variant)
-                RETURN count(v) as var_count
-            """, object_id=object_id).single()
-            
-            var_count = count_result["var_count"] if count_result else 0
-            
-            session.run("""
-                MATCH (o:Object {id: $object_id})
-                SET o.variants = $var_count
-            """, object_id=object_id, var_count=var_count)
-            
-            return {
-                "id": variant_id,
-                "name": request.variant_name
-            }
+        def work(repos):
+            return add_variant_unit(repos, object_id, request)
+
+        result, changes = graph.execute_write(work)
+        bump_catalog_version(*changes)
+        return result
+    except ConflictError as e:
+        raise HTTPException(status_code=409, detail=str(e))
     except Exception as e:
-        print(f"Error creating variant: {e}")
+        logger.exception("Error creating variant: %s", e)
         raise HTTPException(status_code=500, detail=f"Failed to create variant: {e}")
 
 @router.delete("/objects/{object_id}/variants/{variant_id}")
-async def delete_variant(object_id: str, variant_id: str):
+def delete_variant(object_id: str, variant_id: str):
     """Delete a variant from an object"""
-    driver = get_driver()
-    if not driver:
+    graph = get_graph()
+    if not graph.available():
         raise HTTPException(status_code=500, detail="Failed to connect to Neo4j.")
     
     try:
-        with driver.session() as session:
-            # Delete the variant
-            session.run("""
-                MATCH (o:Object {id: $object_id})-[:HAS_VARIANT]->(v:Variant {id: $variant_id})
-                DETACH DELETE v
-            """, object_id=object_id, variant_id=variant_id)
-            
-            # Update variant count
-            count_result = session.run("""
-                MATCH (o:Object {id: $object_id})-[:HAS_VARIANT]->(v:Variant)
-                RETURN count(v) as var_count
-            """, object_id=object_id).single()
-            
-            var_count = count_result["var_count"] if count_result else 0
-            
-            session.run("""
-                MATCH (o:Object {id: $object_id})
-                SET o.variants = $var_count
-            """, object_id=object_id, var_count=var_count)
-            
-            return {"message": "Variant deleted successfully"}
+        def work(repos):
+            return remove_variant_unit(repos, object_id, variant_id)
+
+        result, changes = graph.execute_write(work)
+        bump_catalog_version(*changes)
+        return result
     except Exception as e:
-        print(f"Error deleting variant: {e}")
+        logger.exception("Error deleting variant: %s", e)
         raise HTTPException(status_code=500, detail=f"Failed to delete variant: {e}")
 
 @router.post("/objects/{object_id}/variants/upload", response_model=CSVUploadResponse)
-async def bulk_upload_variants(object_id: str, file: UploadFile = File(...)):
+def bulk_upload_variants(object_id: str, file: UploadFile = File(...)):
     """Bulk upload variants for an object from CSV file"""
-    print(f"DEBUG: bulk_upload_variants called with object_id={object_id}, file={file.filename}")
+    logger.debug("bulk_upload_variants called with object_id=%s, file=%s", object_id, file.filename)
     if not file.filename.endswith('.csv'):
         raise HTTPException(status_code=400, detail="File must be a CSV file")
 
-    driver = get_driver()
-    if not driver:
+    graph = get_graph()
+    if not graph.available():
         raise HTTPException(status_code=500, detail="Failed to connect to Neo4j database")
 
     try:
-        # Read CSV content and parse it robustly
-        content = await file.read()
-        print(f"CSV content length: {len(content)}")
+        with span("csv.parse", **{"csv.file": file.filename}) as parse_span:
+            # Read CSV content and parse it robustly
+            content = file.file.read()
+            logger.debug("CSV content length: %s", len(content))
         
-        # Decode content and handle BOM
-        try:
-            text_content = content.decode('utf-8-sig')
-        except UnicodeDecodeError:
-            text_content = content.decode('utf-8')
+            # Decode content and handle BOM
+            try:
+                text_content = content.decode('utf-8-sig')
+            except UnicodeDecodeError:
+                text_content = content.decode('utf-8')
         
-        # Parse CSV manually to handle unquoted fields with spaces
-        # Normalize line endings first to handle Windows-style (\r\n) and Unix-style (\n) newlines
-        text_content = text_content.replace('\r\n', '\n').replace('\r', '\n')
+            # Parse CSV manually to handle unquoted fields with spaces
+            # Normalize line endings first to handle Windows-style (\r\n) and Unix-style (\n) newlines
+            text_content = text_content.replace('\r\n', '\n').replace('\r', '\n')
         
-        lines = text_content.strip().split('\n')
-        if not lines:
-            raise HTTPException(status_code=400, detail="Empty CSV file")
+            lines = text_content.strip().split('\n')
+            if not lines:
+                raise HTTPException(status_code=400, detail="Empty CSV file")
         
-        # Get headers from first line
-        headers = [h.strip() for h in lines[0].split(',')]
+            # Get headers from first line
+            headers = [h.strip() for h in lines[0].split(',')]
         
-        # Parse data rows
-        rows = []
-        for i, line in enumerate(lines[1:], start=2):
-            if not line.strip():
-                continue
+            # Parse data rows
+            rows = []
+            for i, line in enumerate(lines[1:], start=2):
+                if not line.strip():
+                    continue
             
-            # Simple split by comma - this handles unquoted fields with spaces
-            values = [v.strip() for v in line.split(',')]
+                # Simple split by comma - this handles unquoted fields with spaces
+                values = [v.strip() for v in line.split(',')]
             
-            # Create row dictionary
-            row = {}
-            for j, header in enumerate(headers):
-                row[header] = values[j] if j < len(values) else ""
-            rows.append(row)
+                # Create row dictionary
+                row = {}
+                for j, header in enumerate(headers):
+                    row[header] = values[j] if j < len(values) else ""
+                rows.append(row)
                     
-        print(f"Successfully parsed {len(rows)} rows from CSV")
+            logger.debug("Successfully parsed %s rows from CSV", len(rows))
+            parse_span.set("csv.rows", len(rows))
     except Exception as e:
-        print(f"Error in CSV parsing: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Error in CSV parsing: %s", e)
         raise HTTPException(status_code=400, detail=f"CSV parsing error: {str(e)}")
     
     # Database operations are outside the CSV parsing try-catch
     created_variants = []
     errors = []
     skipped_count = 0
+    fields = {}
     
-    try:
-        with driver.session() as session:
-            print(f"DEBUG: Starting session for object {object_id}")
-            # Get existing variants for this object to check for duplicates
-            existing_variants_result = session.run("""
-                MATCH (o:Object {id: $object_id})-[:HAS_VARIANT]->(v:Variant)
-                RETURN v.name as name
-            """, object_id=object_id)
-            
-            existing_variant_names = {record["name"].lower() for record in existing_variants_result}
-            
-            # Get all global variants to check for existing ones
-            global_variants_result = session.run("""
-                MATCH (v:Variant)
-                RETURN v.name as name, v.id as id
-            """)
-            
-            global_variants = {record["name"].lower(): record["id"] for record in global_variants_result}
-            print(f"DEBUG: Found {len(global_variants)} global variants: {list(global_variants.keys())}")
-            
-            for row_num, row in enumerate(rows, start=2):
-                # Get variant name from the row
-                variant_name = row.get('Variant', '').strip()
-                if not variant_name:
-                    errors.append(f"Row {row_num}: Variant name is required")
-                    continue
-                
-                # Check for duplicates (case-insensitive) - only for this specific object
-                if variant_name.lower() in existing_variant_names:
-                    skipped_count += 1
-                    print(f"Skipping duplicate variant for this object: {variant_name}")
+    def work(repos):
+        created, failed, skipped = [], [], 0
+        # Existing variants of this object, to skip duplicates (case-insensitive)
+        existing_variant_names = {variant["name"].lower() for variant in repos.objects.variants(object_id) if variant["name"]}
+
+        for row_num, row in enumerate(rows, start=2):
+            # Get variant name from the row
+            variant_name = row.get('Variant', '').strip()
+            if not variant_name:
+                failed.append(f"Row {row_num}: Variant name is required")
+                continue
+
+            if variant_name.lower() in existing_variant_names:
+                skipped += 1
+                logger.debug("Skipping duplicate variant for this object: %s", variant_name)
+                continue
+
+            # Variants are global: connect an existing one, otherwise create it
+            variant_id = repos.objects.find_variant(variant_name)
+            if variant_id:
+                logger.debug("Connecting existing global variant to object: %s", variant_name)
+                if repos.objects.has_variant(object_id, variant_id):
+                    logger.debug("Variant %s already connected to this object, skipping", variant_name)
+                    skipped += 1
                     continue
-                
-                # Check if variant exists globally by querying it directly
-                existing_variant = session.run("""
-                    MATCH (v:Variant {name: $variant_name})
-                    RETURN v.id as id
-                """, variant_name=variant_name).single()
-                
-                if existing_variant:
-                    # Variant exists globally, just connect it to this object
-                    print(f"Connecting existing global variant to object: {variant_name}")
-                    
-                    variant_id = existing_variant["id"]
-                    
-                    # Check if this variant is already connected to this object
-                    already_connected = session.run("""
-                        MATCH (o:Object {id: $object_id})-[:HAS_VARIANT]->(v:Variant {id: $variant_id})
-                        RETURN v.id as id
-                    """, object_id=object_id, variant_id=variant_id).single()
-                    
-                    if not already_connected:
-                        # Connect existing variant to object (MERGE to avoid duplicate relationships)
-                        session.run("""
-                            MATCH (o:Object {id: $object_id})
-                            MATCH (v:Variant {id: $variant_id})
-                            MERGE (o)-[:HAS_VARIANT]->(v)
-                        """, object_id=object_id, variant_id=variant_id)
-                        
-                        # Add to existing variants set to avoid duplicates within the same upload
-                        existing_variant_names.add(variant_name.lower())
-                        
-                        created_variants.append({
-                            "id": variant_id,
-                            "name": variant_name
-                        })
-                    else:
-                        print(f"Variant {variant_name} already connected to this object, skipping")
-                        skipped_count += 1
-                else:
-                    # Create new variant
-                    print(f"Creating new variant: {variant_name}")
-                    variant_id = str(uuid.uuid4())
-                    
-                    try:
-                        # Create variant node
-                        session.run("""
-                            CREATE (v:Variant {
-                                id: $variant_id,
-                                name: $variant_name
-                            })
-                        """, variant_id=variant_id, variant_name=variant_name)
-                        
-                        # Connect variant to object
-                        session.run("""
-                            MATCH (o:Object {id: $object_id})
-                            MATCH (v:Variant {id: $variant_id})
-                            CREATE (o)-[:HAS_VARIANT]->(v)
-                        """, object_id=object_id, variant_id=variant_id)
-                        
-                        # Add to existing variants set to avoid duplicates within the same upload
-                        existing_variant_names.add(variant_name.lower())
-                        
-                        created_variants.append({
-                            "id": variant_id,
-                            "name": variant_name
-                        })
-                    except Exception as create_error:
-                        print(f"Error creating variant {variant_name}: {create_error}")
-                        errors.append(f"Row {row_num}: Failed to create variant '{variant_name}': {str(create_error)}")
-            
-            # Update variant count for the object
-            if created_variants:
-                count_result = session.run("""
-                    MATCH (o:Object {id: $object_id})-[:HAS_VARIANT]->(v:Variant)
-                    RETURN count(v) as var_count
-                """, object_id=object_id).single()
-                
-                var_count = count_result["var_count"] if count_result else 0
-                
-                session.run("""
-                    MATCH (o:Object {id: $object_id})
-                    SET o.variants = $var_count
-                """, object_id=object_id, var_count=var_count)
-    
+            else:
+                logger.debug("Creating new variant: %s", variant_name)
+                variant_id = str(uuid.uuid4())
+                repos.objects.create_variant(variant_id, variant_name)
+            repos.objects.attach_variant(object_id, variant_id)
+
+            # Add to existing variants set to avoid duplicates within the same upload
+            existing_variant_names.add(variant_name.lower())
+            created.append({"id": variant_id, "name": variant_name})
+
+        # Update variant count for the object
+        return created, failed, skipped, _list_fields(repos, object_id) if created else {}
+
+    try:
+        with span("csv.import", **{"csv.rows": len(rows)}):
+            created_variants, errors, skipped_count, fields = graph.execute_write(work)
     except Exception as session_error:
-        print(f"DEBUG: Session error: {str(session_error)}")
+        logger.exception("Session error: %s", session_error)
         errors.append(f"Database session error: {str(session_error)}")
 
+    # Only a committed upload that attached variants changed the row
+    if fields:
+        bump_catalog_version(change("object", object_id, "update", fields))
     return CSVUploadResponse(
         success=True,
         message=f"Successfully created {len(created_variants)} variants. Skipped {skipped_count} duplicates.",
@@ -0,0 +1,229 @@
+from fastapi import APIRouter, HTTPException, Query
+from typing import List, Dict, Any, Optional, Set
+import logging
+import os
+from neo4j.exceptions import ClientError
+from db import execute_read
+from repositories import get_graph
+from cache import VersionedCache
+from catalog import get_catalog_version
+from freshness import min_version
+from schema import SearchResponse
+from search_index import VersionedIndex, normalize, score_match, tokenize
+
+router = APIRouter()
+logger = logging.getLogger(__name__)
+
+SEARCH_TYPES = ("object", "variant", "variable", "part", "group", "section")
+
+# "auto" uses the Neo4j full-text indexes when present and falls back to the
+# in-process n-gram index; "fulltext" and "ngram" force one backend. The
+# memory graph backend has no full-text indexes and always uses "ngram"
+SEARCH_BACKEND = os.getenv("CDM_SEARCH_BACKEND", "auto").lower()
+
+# Upper bound on candidates pulled from each full-text index per request
+FULLTEXT_WINDOW = 1000
+
+# Full-text candidate queries per hit type, see schema.create_constraints_and_indexes
+FULLTEXT_QUERIES = {
+    "object": ("object_name_fulltext", """
+        CALL db.index.fulltext.queryNodes($index, $lucene, {limit: $window}) YIELD node
+        RETURN 'object' as type, node.id as id, node.object as name,
+               node.being as being, node.avatar as avatar
+    """),
+    "variant": ("variant_name_fulltext", """
+        CALL db.index.fulltext.queryNodes($index, $lucene, {limit: $window}) YIELD node
+        OPTIONAL MATCH (o:Object)-[:HAS_VARIANT]->(node)
+        WITH node, collect(o)[0] as o
+        RETURN 'variant' as type, node.id as id, node.name as name,
+               o.id as objectId, o.object as object, o.being as being, o.avatar as avatar
+    """),
+    "variable": ("variable_name_fulltext", """
+        CALL db.index.fulltext.queryNodes($index, $lucene, {limit: $window}) YIELD node
+        OPTIONAL MATCH (p:Part)-[:HAS_GROUP]->(g:Group)-[:HAS_VARIABLE]->(node)
+        WITH node, collect(p.name)[0] as part, collect(g.name)[0] as group
+        RETURN 'variable' as type, node.id as id, node.name as name,
+               part, group, node.section as section
+    """),
+    "taxonomy": ("variable_taxonomy_fulltext", """
+        CALL db.index.fulltext.queryNodes($index, $lucene, {limit: $window}) YIELD node
+        RETURN CASE WHEN node:Part THEN 'part' ELSE 'group' END as type,
+               node.name as id, node.name as name
+    """),
+}
+
+# Sections are Variable properties rather than nodes, so the distinct values
+# are scored in Python for both backends; the list is kept per catalog version
+SECTIONS_QUERY = """
+    MATCH (v:Variable) WHERE v.section IS NOT NULL AND v.section <> ''
+    RETURN DISTINCT 'section' as type, v.section as id, v.section as name
+"""
+
+# Characters with special meaning in the Lucene query syntax
+LUCENE_SPECIAL = set('+-&|!(){}[]^"~*?:\\/')
+
+# Error code Neo4j 5.x uses for a missing index
+INDEX_NOT_FOUND = "Neo.ClientError.Schema.IndexNotFound"
+
+_fulltext_available: Optional[bool] = None
+_sections = VersionedCache(max_entries=1, name="search_sections")
+
+def _clean_document(record: Dict[str, Any]) -> Dict[str, Any]:
+    """Drop empty context keys and stringify ids for the response model"""
+    document = {key: value for key, value in record.items() if value is not None}
+    document["id"] = str(document.get("id", document.get("name", "")))
+    return document
+
+def _load_search_documents() -> List[Dict[str, Any]]:
+    """Read every searchable entity from the catalog for the n-gram index"""
+    graph = get_graph()
+    if not graph.available():
+        return []
+
+    def work(repos):
+        return repos.objects.search_documents() + repos.variables.search_documents()
+
+    documents = [_clean_document(record) for record in graph.execute_read(work)]
+    logger.info("Built search index with %s documents", len(documents))
+    return documents
+
+_ngram_index = VersionedIndex(_load_search_documents)
+
+def _backend() -> str:
+    return "ngram" if get_graph().name != "neo4j" else SEARCH_BACKEND
+
+def warm_cache():
+    """Build the n-gram index ahead of the first request when it is the configured backend"""
+    if _backend() == "ngram":
+        _ngram_index.get(get_catalog_version())
+
+def _lucene_escape(term: str) -> str:
+    return "".join(f"\\{char}" if char in LUCENE_SPECIAL else char for char in term)
+
+def build_lucene_query(query: str) -> str:
+    """
+    Build a Lucene query that matches each query word exactly, as a prefix,
+    as a substring or (for longer words) within one edit.
+    """
+    clauses = []
+    for token in tokenize(normalize(query)):
+        term = _lucene_escape(token)
+        alternatives = [term, f"{term}*", f"*{term}*"]
+        if len(token) >= 3:
+            alternatives.append(f"{term}~1")
+        clauses.append("(" + " OR ".join(alternatives) + ")")
+    return " AND ".join(clauses)
+
+def _fulltext_search(query: str, types: Set[str], limit: int, offset: int):
+    """Collect candidates from the full-text indexes and rank them like the n-gram index"""
+    if not get_graph().available():
+        raise HTTPException(status_code=500, detail="Failed to connect to Neo4j database")
+
+    lucene = build_lucene_query(query)
+    window = min(max(offset + limit, 50) * 2, FULLTEXT_WINDOW)
+
+    # Full-text indexes are Neo4j-only, so this reads through db directly
+    def work(tx):
+        documents = []
+        if lucene:
+            for key, (index, cypher) in FULLTEXT_QUERIES.items():
+                if key == "taxonomy":
+                    if not types & {"part", "group"}:
+                        continue
+                elif key not in types:
+                    continue
+                records = tx.run(cypher, index=index, lucene=lucene, window=window).data()
+                documents.extend(_clean_document(record) for record in records)
+        return documents
+
+    documents = execute_read(work)
+    if "section" in types:
+        documents.extend(_sections.get_or_compute("sections", get_catalog_version(), lambda: [
+            _clean_document(record) for record in execute_read(lambda tx: tx.run(SECTIONS_QUERY).data())
+        ]))
+
+    normalized_query = normalize(query)
+    scored = []
+    for document in documents:
+        if document["type"] not in types:
+            continue
+        result = score_match(normalized_query, normalize(document.get("name")))
+        if result is None:
+            continue
+        scored.append((-result[0], normalize(document["name"]), document["type"], document["id"], result, document))
+
+    scored.sort(key=lambda item: item[:4])
+    hits = []
+    for _, _, _, _, (score, match), document in scored[offset:offset + limit]:
+        hits.append({**document, "score": round(score, 4), "match": match})
+    return hits, len(scored) > offset + limit
+
+def _missing_index(error: ClientError) -> bool:
+    """Whether a full-text query failed because its index does not exist (schema setup not applied)"""
+    if error.code == INDEX_NOT_FOUND:
+        return True
+    # Older servers report it as a failed procedure call
+    return "no such fulltext schema index" in (error.message or str(error)).lower()
+
+def _ngram_search(query: str, types: Set[str], limit: int, offset: int):
+    if not get_graph().available():
+        raise HTTPException(status_code=500, detail="Failed to connect to Neo4j database")
+    # Searches the previous index while a write's rebuild runs, except for the writer's own reads
+    index = _ngram_index.get(get_catalog_version(), min_version())
+    return index.search(query, types=types, limit=limit, offset=offset)
+
+@router.get("/search", response_model=SearchResponse, response_model_exclude_none=True)
+def search(
+    q: str = Query(..., min_length=1, description="Search text"),
+    types: Optional[str] = Query(None, description=f"Comma-separated subset of: {', '.join(SEARCH_TYPES)}"),
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0)
+):
+    """
+    Ranked prefix, substring and fuzzy search across objects, variants,
+    variables, parts, groups and sections.
+    """
+    global _fulltext_available
+
+    if types:
+        requested = {t.strip().lower() for t in types.split(",") if t.strip()}
+        unknown = requested - set(SEARCH_TYPES)
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown search types: {', '.join(sorted(unknown))}")
+    else:
+        requested = set(SEARCH_TYPES)
+
+    try:
+        backend = _backend()
+        use_fulltext = backend == "fulltext" or (backend == "auto" and _fulltext_available is not False)
+        if use_fulltext:
+            try:
+                hits, has_more = _fulltext_search(q, requested, limit, offset)
+                _fulltext_available = True
+                backend = "fulltext"
+            except ClientError as e:
+                if backend == "fulltext" or not _missing_index(e):
+                    raise
+                # Full-text indexes are missing - use the in-process index from now on
+                logger.warning("Full-text search unavailable, falling back to n-gram index: %s", e)
+                _fulltext_available = False
+                use_fulltext = False
+
+        if not use_fulltext:
+            hits, has_more = _ngram_search(q, requested, limit, offset)
+            backend = "ngram"
+
+        return {
+            "query": q,
+            "backend": backend,
+            "offset": offset,
+            "limit": limit,
+            "hasMore": has_more,
+            "hits": hits
+        }
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.exception("Error searching catalog: %s", e)
+        raise HTTPException(status_code=500, detail="Search failed")
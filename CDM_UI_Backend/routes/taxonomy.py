@@ -0,0 +1,193 @@
+from fastapi import APIRouter, HTTPException, Query
+from typing import List, Dict, Any, Optional, Literal
+import logging
+from repositories import get_graph
+from cache import VersionedCache
+from catalog import get_catalog_version
+
+router = APIRouter()
+logger = logging.getLogger(__name__)
+
+OBJECT_LEVELS = ["being", "avatar", "object", "variant"]
+VARIABLE_LEVELS = ["part", "group", "variable"]
+
+# Full trees and rendered responses, both valid for one catalog version
+_tree_cache = VersionedCache(max_entries=4, name="taxonomy_tree")
+_response_cache = VersionedCache(max_entries=256, name="taxonomy_response")
+
+def _sorted_nodes(children: Dict[str, Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Freeze a key -> node mapping into a key-ordered list, recursively"""
+    nodes = []
+    for name in sorted(children, key=lambda value: (value.lower(), value)):
+        node = children[name]
+        if isinstance(node.get("children"), dict):
+            node["children"] = _sorted_nodes(node["children"])
+        nodes.append(node)
+    return nodes
+
+def _branch(children: Dict[str, Dict[str, Any]], name: str) -> Dict[str, Any]:
+    node = children.get(name)
+    if node is None:
+        node = children[name] = {"name": name, "children": {}}
+    return node
+
+def build_object_tree(records) -> List[Dict[str, Any]]:
+    """Being -> Avatar -> Object -> Variant tree from ObjectRepository.tree_rows()"""
+    beings: Dict[str, Dict[str, Any]] = {}
+    for record in records:
+        if not record["being"]:
+            continue
+        being = _branch(beings, record["being"])
+        if not record["avatar"]:
+            continue
+        avatar = _branch(being["children"], record["avatar"])
+        if record["id"] is None:
+            continue
+        # Objects are keyed by id: the same name can exist with different drivers
+        avatar["children"][record["id"]] = {
+            "name": record["object"] or "",
+            "id": record["id"],
+            "children": [{"name": variant} for variant in sorted(set(record["variants"]))]
+        }
+
+    tree = _sorted_nodes(beings)
+    for being in tree:
+        for avatar in being["children"]:
+            avatar["children"].sort(key=lambda node: (node["name"].lower(), node["id"]))
+    return tree
+
+def build_variable_tree(records) -> List[Dict[str, Any]]:
+    """Part -> Group -> Variable tree from VariableRepository.tree_rows()"""
+    parts: Dict[str, Dict[str, Any]] = {}
+    for record in records:
+        if not record["part"]:
+            continue
+        part = _branch(parts, record["part"])
+        if not record["group"]:
+            continue
+        group = _branch(part["children"], record["group"])
+        if record["id"] is None:
+            continue
+        group["children"][record["id"]] = {"name": record["variable"] or "", "id": record["id"]}
+
+    tree = _sorted_nodes(parts)
+    for part in tree:
+        for group in part["children"]:
+            group["children"].sort(key=lambda node: (node["name"].lower(), node["id"]))
+    return tree
+
+def _load_tree(kind: str) -> List[Dict[str, Any]]:
+    graph = get_graph()
+    if not graph.available():
+        raise HTTPException(status_code=500, detail="Failed to connect to Neo4j database")
+    if kind == "objects":
+        return build_object_tree(graph.execute_read(lambda repos: repos.objects.tree_rows()))
+    return build_variable_tree(graph.execute_read(lambda repos: repos.variables.tree_rows()))
+
+def warm_cache():
+    """Build both taxonomy trees ahead of the first request"""
+    version = get_catalog_version()
+    for kind in ("objects", "variables"):
+        _tree_cache.get_or_compute(kind, version, lambda kind=kind: _load_tree(kind))
+
+def render_nodes(nodes: List[Dict[str, Any]], depth: Optional[int], compact: bool) -> list:
+    """
+    Render tree nodes down to `depth` levels (None = all levels).
+    Nested form: {"name", "count", "children"?, "id"?}
+    Compact form: [name, count, children-or-null, id?]
+    """
+    rendered = []
+    for node in nodes:
+        children = node.get("children") or []
+        expand = bool(children) and (depth is None or depth > 1)
+        child_depth = None if depth is None else depth - 1
+        if compact:
+            item = [node["name"], len(children), render_nodes(children, child_depth, True) if expand else None]
+            if "id" in node:
+                item.append(node["id"])
+            elif item[2] is None:
+                item.pop()
+        else:
+            item = {"name": node["name"], "count": len(children)}
+            if "id" in node:
+                item["id"] = node["id"]
+            if expand:
+                item["children"] = render_nodes(children, child_depth, False)
+        rendered.append(item)
+    return rendered
+
+def _find_subtree(tree: List[Dict[str, Any]], path: List[str]) -> List[Dict[str, Any]]:
+    nodes = tree
+    for name in path:
+        match = next((node for node in nodes if node["name"] == name), None)
+        if match is None:
+            raise HTTPException(status_code=404, detail=f"Taxonomy node '{name}' not found")
+        nodes = match.get("children") or []
+    return nodes
+
+def _taxonomy_response(kind: str, levels: List[str], path: List[str], depth: Optional[int], format: str) -> Dict[str, Any]:
+    version = get_catalog_version()
+    cache_key = (kind, tuple(path), depth, format)
+    cached = _response_cache.get(cache_key, version)
+    if cached is not None:
+        return cached
+
+    tree = _tree_cache.get_or_compute(kind, version, lambda: _load_tree(kind))
+    nodes = _find_subtree(tree, path)
+    response = {
+        "version": version,
+        "levels": levels[len(path):],
+        "root": dict(zip(levels, path)),
+        "depth": depth,
+        "format": format,
+        "count": len(nodes),
+        "nodes": render_nodes(nodes, depth, format == "compact")
+    }
+    _response_cache.set(cache_key, version, response)
+    return response
+
+@router.get("/taxonomy/objects")
+def get_object_taxonomy(
+    being: Optional[str] = None,
+    avatar: Optional[str] = None,
+    depth: Optional[int] = Query(None, ge=1, le=4, description="Levels to return below the root (default: all)"),
+    format: Literal["nested", "compact"] = "nested"
+):
+    """
+    Objects taxonomy tree (Being -> Avatar -> Object -> Variant) with child
+    counts at every level. Pass being (and avatar) to fetch a subtree.
+    """
+    if avatar and not being:
+        raise HTTPException(status_code=400, detail="avatar requires being")
+
+    path = [value for value in (being, avatar) if value]
+    try:
+        return _taxonomy_response("objects", OBJECT_LEVELS, path, depth, format)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.exception("Error building objects taxonomy: %s", e)
+        raise HTTPException(status_code=500, detail="Database error")
+
+@router.get("/taxonomy/variables")
+def get_variable_taxonomy(
+    part: Optional[str] = None,
+    group: Optional[str] = None,
+    depth: Optional[int] = Query(None, ge=1, le=3, description="Levels to return below the root (default: all)"),
+    format: Literal["nested", "compact"] = "nested"
+):
+    """
+    Variables taxonomy tree (Part -> Group -> Variable) with child counts
+    at every level. Pass part (and group) to fetch a subtree.
+    """
+    if group and not part:
+        raise HTTPException(status_code=400, detail="group requires part")
+
+    path = [value for value in (part, group) if value]
+    try:
+        return _taxonomy_response("variables", VARIABLE_LEVELS, path, depth, format)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.exception("Error building variables taxonomy: %s", e)
+        raise HTTPException(status_code=500, detail="Database error")
@@ -1,372 +1,217 @@
-from fastapi import APIRouter, HTTPException, status, UploadFile, File, Form, Body
-from typing import List, Dict, Any, Optional
+from fastapi import APIRouter, HTTPException, status, UploadFile, File, Form, Body, Header
+from typing import List, Dict, Any, Optional, Literal, Tuple
+import logging
 import uuid
 import io
 import json
 import csv
 from pydantic import BaseModel, Field
-from db import get_driver
-from schema import VariableCreateRequest, VariableUpdateRequest, VariableResponse, CSVUploadResponse, CSVRowData, BulkVariableUpdateRequest, BulkVariableUpdateResponse, ObjectRelationshipCreateRequest
+from repositories import VARIABLE_FIELDS, NotFoundError, get_graph
+from catalog import bump_catalog_version, change
+from encoding import COLUMNAR_MEDIA_TYPE, encode_columnar, wants_columnar
+from responses import coalesced_response, serialized_response
+from logs import payload
+from tracing import span
+from schema import VariableCreateRequest, VariableUpdateRequest, VariableResponse, VariableListItem, CSVUploadResponse, CSVRowData, BulkVariableUpdateRequest, BulkVariableUpdateResponse, ObjectRelationshipCreateRequest
 
 # Pydantic models for JSON body parameters
 
 router = APIRouter()
-
-async def create_driver_relationships(session, variable_id: str, driver_string: str):
+logger = logging.getLogger(__name__)
+
+# Grid columns for ?format=columnar; the dictionary columns repeat a handful of values
+VARIABLE_COLUMNS = (
+    "id", "driver", "part", "group", "section", "variable", "formatI", "formatII",
+    "gType", "validation", "default", "graph", "status", "objectRelationships",
+    "objectRelationshipsList"
+)
+VARIABLE_DICTIONARY_COLUMNS = (
+    "driver", "part", "group", "section", "formatI", "formatII", "gType", "graph", "status"
+)
+
+def create_driver_relationships(repos, variable_id: str, driver_string: str):
     """
     Create driver relationships for a variable based on the driver string.
     Driver string format: "Sector, Domain, Country, VariableClarifier"
     """
+    logger.debug("Creating driver relationships for variable %s with driver string: %s", variable_id, driver_string)
+    if len(driver_string.split(',')) != 4:
+        logger.warning("Invalid driver string format: %s", driver_string)
+        return
+    repos.variables.link_drivers(variable_id, driver_string)
+
+def _read_variables(columnar: bool):
+    """Full variables grid, row-oriented or columnar"""
+    graph = get_graph()
+    if not graph.available():
+        raise HTTPException(status_code=500, detail="Failed to connect to Neo4j database")
+
     try:
-        print(f"Creating driver relationships for variable {variable_id} with driver string: {driver_string}")
-        # Parse driver string
-        parts = [part.strip() for part in driver_string.split(',')]
-        if len(parts) != 4:
-            print(f"Invalid driver string format: {driver_string}")
-            return
-        
-        sector_str, domain_str, country_str, variable_clarifier = parts
-        
-        # Handle Sector relationships
-        if sector_str == "ALL":
-            # Create relationships to ALL existing sectors
-            session.run("""
-                MATCH (s:Sector)
-                MATCH (v:Variable {id: $variable_id})
-                WITH s, v
-                MERGE (s)-[:RELEVANT_TO]->(v)
-            """, variable_id=variable_id)
-        else:
-            # Create relationships to individual sectors
-            sectors = [s.strip() for s in sector_str.split(',')]
-            for sector in sectors:
-                session.run("""
-                    MERGE (s:Sector {name: $sector})
-                    WITH s
-                    MATCH (v:Variable {id: $variable_id})
-                    MERGE (s)-[:RELEVANT_TO]->(v)
-                """, sector=sector, variable_id=variable_id)
-        
-        # Handle Domain relationships
-        if domain_str == "ALL":
-            # Create relationships to ALL existing domains
-            session.run("""
-                MATCH (d:Domain)
-                MATCH (v:Variable {id: $variable_id})
-                WITH d, v
-                MERGE (d)-[:RELEVANT_TO]->(v)
-            """, variable_id=variable_id)
-        else:
-            domains = [d.strip() for d in domain_str.split(',')]
-            for domain in domains:
-                session.run("""
-                    MERGE (d:Domain {name: $domain})
-                    WITH d
-                    MATCH (v:Variable {id: $variable_id})
-                    MERGE (d)-[:RELEVANT_TO]->(v)
-                """, domain=domain, variable_id=variable_id)
-        
-        # Handle Country relationships
-        if country_str == "ALL":
-            # Create relationships to ALL existing countries
-            session.run("""
-                MATCH (c:Country)
-                MATCH (v:Variable {id: $variable_id})
-                WITH c, v
-                MERGE (c)-[:RELEVANT_TO]->(v)
-            """, variable_id=variable_id)
-        else:
-            countries = [c.strip() for c in country_str.split(',')]
-            for country in countries:
-                session.run("""
-                    MERGE (c:Country {name: $country})
-                    WITH c
-                    MATCH (v:Variable {id: $variable_id})
-                    MERGE (c)-[:RELEVANT_TO]->(v)
-                """, country=country, variable_id=variable_id)
-        
-        # Handle Variable Clarifier relationship (single select)
-        # Skip if "None" or empty
-        if variable_clarifier and variable_clarifier != "None" and variable_clarifier != "":
-            session.run("""
-                MERGE (vc:VariableClarifier {name: $clarifier})
-                WITH vc
-                MATCH (v:Variable {id: $variable_id})
-                MERGE (vc)-[:RELEVANT_TO]->(v)
-            """, clarifier=variable_clarifier, variable_id=variable_id)
-            
+        def work(repos):
+            return repos.variables.grid()
+
+        variables = graph.execute_read(work)
+        if columnar:
+            return encode_columnar(variables, VARIABLE_COLUMNS, VARIABLE_DICTIONARY_COLUMNS)
+        return variables
+
     except Exception as e:
-        print(f"Error creating driver relationships: {e}")
-        raise e
+        logger.exception("Error fetching variables: %s", e)
+        raise HTTPException(status_code=500, detail=f"Failed to fetch variables: {str(e)}")
 
-@router.get("/variables", response_model=List[Dict[str, Any]])
-async def get_variables():
+@router.get("/variables", response_model=List[VariableListItem])
+async def get_variables(
+    format: Optional[Literal["json", "columnar"]] = None,
+    accept: Optional[str] = Header(None)
+):
     """
     Get all variables from the CDM with proper taxonomy structure.
+    Pass format=columnar (or Accept: application/vnd.cdm.columnar+json) for
+    the column-oriented encoding.
     """
-    driver = get_driver()
-    if not driver:
-        raise HTTPException(status_code=500, detail="Failed to connect to Neo4j database")
-
-    try:
-        with driver.session() as session:
-            # Get all variables with their taxonomy and relationships
-            result = session.run("""
-                MATCH (p:Part)-[:HAS_GROUP]->(g:Group)-[:HAS_VARIABLE]->(v:Variable)
-                OPTIONAL MATCH (o:Object)-[:HAS_SPECIFIC_VARIABLE]->(v)
-                OPTIONAL MATCH (v)<-[:RELEVANT_TO]-(s:Sector)
-                OPTIONAL MATCH (v)<-[:RELEVANT_TO]-(d:Domain)
-                OPTIONAL MATCH (v)<-[:RELEVANT_TO]-(c:Country)
-                OPTIONAL MATCH (v)<-[:RELEVANT_TO]-(vc:VariableClarifier)
-                WITH v, p, g, count(DISTINCT o) as objectRelationships,
-                     collect(DISTINCT s.name) as sectors,
-                     collect(DISTINCT d.name) as domains,
-                     collect(DISTINCT c.name) as countries,
-                     collect(DISTINCT vc.name) as variableClarifiers
-                RETURN v.id as id, v.name as variable, v.section as section,
-                       v.formatI as formatI, v.formatII as formatII, v.gType as gType,
-                       v.validation as validation, v.default as default, v.graph as graph,
-                       v.status as status, p.name as part, g.name as group,
-                       objectRelationships, sectors, domains, countries, variableClarifiers
-                ORDER BY v.id
-            """)
-
-            variables = []
-            for record in result:
-                # Get driver data from the query results
-                sectors = record["sectors"] or []
-                domains = record["domains"] or []
-                countries = record["countries"] or []
-                variable_clarifiers = record["variableClarifiers"] or []
-                
-                # Create driver string in the expected format: "Sector, Domain, Country, VariableClarifier"
-                sector_str = "ALL" if "ALL" in sectors else (", ".join(sectors) if sectors else "ALL")
-                domain_str = "ALL" if "ALL" in domains else (", ".join(domains) if domains else "ALL")
-                country_str = "ALL" if "ALL" in countries else (", ".join(countries) if countries else "ALL")
-                clarifier_str = variable_clarifiers[0] if variable_clarifiers else "None"
-                
-                driver_string = f"{sector_str}, {domain_str}, {country_str}, {clarifier_str}"
-                
-                var = {
-                    "id": record["id"],
-                    "driver": driver_string,
-                    "part": record["part"],
-                    "group": record["group"],
-                    "section": record["section"],
-                    "variable": record["variable"],
-                    "formatI": record["formatI"],
-                    "formatII": record["formatII"],
-                    "gType": record["gType"],
-                    "validation": record["validation"] or "",
-                    "default": record["default"] or "",
-                    "graph": record["graph"] or "Yes",
-                    "status": record["status"] or "Active",
-                    "objectRelationships": record["objectRelationships"],
-                    "objectRelationshipsList": []
-                }
-                variables.append(var)
+    columnar = wants_columnar(format, accept)
+    # Encoded once per catalog version; bypasses response_model validation
+    return await coalesced_response(
+        ("variables", columnar),
+        lambda: _read_variables(columnar),
+        media_type=COLUMNAR_MEDIA_TYPE if columnar else "application/json"
+    )
 
-            return variables
+def warm_cache():
+    """Build the variables grid body ahead of the first request"""
+    serialized_response(("variables", False), lambda: _read_variables(False))
+
+def _variable_response(fields: Dict[str, Any], driver: str, part: str, group: str, object_relationships: int = 0) -> VariableResponse:
+    return VariableResponse(
+        id=fields["id"],
+        driver=driver,
+        part=part,
+        group=group,
+        section=fields["section"],
+        variable=fields["variable"],
+        formatI=fields["formatI"],
+        formatII=fields["formatII"],
+        gType=fields["gType"],
+        validation=fields["validation"],
+        default=fields["default"],
+        graph=fields["graph"],
+        status=fields["status"],
+        objectRelationships=object_relationships,
+        objectRelationshipsList=[]
+    )
 
-    except Exception as e:
-        print(f"Error fetching variables: {e}")
-        raise HTTPException(status_code=500, detail=f"Failed to fetch variables: {str(e)}")
+def create_variable_unit(repos, variable_data: VariableCreateRequest) -> Tuple[VariableResponse, List[Dict[str, Any]]]:
+    """Create a variable under its Part -> Group taxonomy with its drivers; (response, changes)"""
+    # Generate unique ID
+    variable_id = str(uuid.uuid4())
+    
+    # Create taxonomy structure: Part -> Group -> Variable
+    fields = repos.variables.create(variable_id, variable_data.part, variable_data.group, {
+        "variable": variable_data.variable,
+        "section": variable_data.section,
+        "formatI": variable_data.formatI,
+        "formatII": variable_data.formatII,
+        "gType": variable_data.gType,
+        "validation": variable_data.validation or "",
+        "default": variable_data.default or "",
+        "graph": variable_data.graph or "Yes",
+        "status": variable_data.status or "Active"
+    })
+
+    # Create driver relationships
+    logger.debug("About to create driver relationships for variable %s", variable_id)
+    create_driver_relationships(repos, variable_id, variable_data.driver)
+    logger.debug("Driver relationships creation completed for variable %s", variable_id)
+
+    result = _variable_response(fields, variable_data.driver, variable_data.part, variable_data.group)
+    return result, [change("variable", result.id, "create", result.model_dump())]
 
 @router.post("/variables", response_model=VariableResponse)
-async def create_variable(variable_data: VariableCreateRequest):
+def create_variable(variable_data: VariableCreateRequest):
     """
     Create a new variable in the CDM with proper taxonomy structure.
     """
-    driver = get_driver()
-    if not driver:
+    graph = get_graph()
+    if not graph.available():
         raise HTTPException(status_code=500, detail="Failed to connect to Neo4j database")
 
     try:
-        with driver.session() as session:
-            # Generate unique ID
-            variable_id = str(uuid.uuid4())
-            
-            # Create taxonomy structure: Part -> Group -> Variable
-            result = session.run("""
-                // MERGE Part node (avoid duplicates)
-                MERGE (p:Part {name: $part})
-                
-                // MERGE Group node (avoid duplicates)
-                MERGE (g:Group {name: $group})
-                
-                // Create relationship Part -> Group
-                MERGE (p)-[:HAS_GROUP]->(g)
-                
-                // Create Variable node with all properties
-                CREATE (v:Variable {
-                    id: $id,
-                    name: $variable,
-                    section: $section,
-                    formatI: $formatI,
-                    formatII: $formatII,
-                    gType: $gType,
-                    validation: $validation,
-                    default: $default,
-                    graph: $graph,
-                    status: $status
-                })
-                
-                // Create relationship Group -> Variable
-                MERGE (g)-[:HAS_VARIABLE]->(v)
-                
-                // Return the variable data for response
-                RETURN v.id as id, v.name as variable, v.section as section,
-                       v.formatI as formatI, v.formatII as formatII, v.gType as gType,
-                       v.validation as validation, v.default as default, v.graph as graph,
-                       v.status as status, $part as part, $group as group
-            """, {
-                "id": variable_id,
-                "part": variable_data.part,
-                "group": variable_data.group,
-                "variable": variable_data.variable,
-                "section": variable_data.section,
-                "formatI": variable_data.formatI,
-                "formatII": variable_data.formatII,
-                "gType": variable_data.gType,
-                "validation": variable_data.validation or "",
-                "default": variable_data.default or "",
-                "graph": variable_data.graph or "Yes",
-                "status": variable_data.status or "Active"
-            })
-
-            record = result.single()
-            if not record:
-                raise HTTPException(status_code=500, detail="Failed to create variable")
-
-            # Create driver relationships
-            print(f"About to create driver relationships for variable {variable_id}")
-            await create_driver_relationships(session, variable_id, variable_data.driver)
-            print(f"Driver relationships creation completed for variable {variable_id}")
-
-            return VariableResponse(
-                id=record["id"],
-                driver=variable_data.driver,
-                part=record["part"],
-                group=record["group"],
-                section=record["section"],
-                variable=record["variable"],
-                formatI=record["formatI"],
-                formatII=record["formatII"],
-                gType=record["gType"],
-                validation=record["validation"],
-                default=record["default"],
-                graph=record["graph"],
-                status=record["status"],
-                objectRelationships=0,
-                objectRelationshipsList=[]
-            )
+        def work(repos):
+            return create_variable_unit(repos, variable_data)
+
+        result, changes = graph.execute_write(work)
+        bump_catalog_version(*changes)
+        return result
 
     except Exception as e:
-        print(f"Error creating variable: {e}")
+        logger.exception("Error creating variable: %s", e)
         raise HTTPException(status_code=500, detail=f"Failed to create variable: {str(e)}")
 
+def _changed_fields(data, keep_current: bool = False) -> Dict[str, Any]:
+    """VARIABLE_FIELDS that are provided (and not "Keep Current" for bulk updates)"""
+    fields = {}
+    for field in VARIABLE_FIELDS:
+        value = getattr(data, field, None)
+        if value is None or (keep_current and value.strip() == "Keep Current"):
+            continue
+        fields[field] = value
+    return fields
+
 @router.put("/variables/bulk-update", response_model=BulkVariableUpdateResponse)
-async def bulk_update_variables(bulk_data: BulkVariableUpdateRequest):
+def bulk_update_variables(bulk_data: BulkVariableUpdateRequest):
     """
     Bulk update multiple variables with the same changes.
     Only updates fields that are provided (not None) and not "Keep Current" values.
     Applies validation rules: overwrites only where new value chosen, leaves Keep Current fields untouched.
     """
-    driver = get_driver()
-    if not driver:
+    graph = get_graph()
+    if not graph.available():
         raise HTTPException(status_code=500, detail="Failed to connect to Neo4j database")
 
-    updated_count = 0
-    errors = []
-
     try:
-        with driver.session() as session:
-            for variable_id in bulk_data.variable_ids:
-                try:
-                    print(f"Processing variable ID: {variable_id}")
-                    # Get current variable data - first check if variable exists
-                    print(f"Running query for variable {variable_id}")
-                    current_result = session.run("""
-                        MATCH (v:Variable {id: $id})
-                        RETURN v
-                    """, {"id": variable_id})
-
-                    print(f"Query executed, getting single record")
-                    current_record = current_result.single()
-                    print(f"Record result: {current_record}")
-                    if not current_record:
-                        print(f"Variable {variable_id} not found in database")
-                        errors.append(f"Variable {variable_id} not found")
-                        continue
-                    
-                    print(f"Variable {variable_id} found, proceeding with update")
+        fields = _changed_fields(bulk_data, keep_current=True)
 
-                    current_variable = current_record["v"]
-
-                    # Build dynamic SET clause for only provided fields that are not "Keep Current"
-                    set_clauses = []
-                    params = {"id": variable_id}
-                    
-                    # Only update fields that are provided and not "Keep Current" values
-                    if bulk_data.variable is not None and bulk_data.variable.strip() != "Keep Current":
-                        set_clauses.append("v.name = $variable")
-                        params["variable"] = bulk_data.variable
-                    if bulk_data.section is not None and bulk_data.section.strip() != "Keep Current":
-                        set_clauses.append("v.section = $section")
-                        params["section"] = bulk_data.section
-                    if bulk_data.formatI is not None and bulk_data.formatI.strip() != "Keep Current":
-                        set_clauses.append("v.formatI = $formatI")
-                        params["formatI"] = bulk_data.formatI
-                    if bulk_data.formatII is not None and bulk_data.formatII.strip() != "Keep Current":
-                        set_clauses.append("v.formatII = $formatII")
-                        params["formatII"] = bulk_data.formatII
-                    if bulk_data.gType is not None and bulk_data.gType.strip() != "Keep Current":
-                        set_clauses.append("v.gType = $gType")
-                        params["gType"] = bulk_data.gType
-                    if bulk_data.validation is not None and bulk_data.validation.strip() != "Keep Current":
-                        set_clauses.append("v.validation = $validation")
-                        params["validation"] = bulk_data.validation
-                    if bulk_data.default is not None and bulk_data.default.strip() != "Keep Current":
-                        set_clauses.append("v.default = $default")
-                        params["default"] = bulk_data.default
-                    if bulk_data.graph is not None and bulk_data.graph.strip() != "Keep Current":
-                        set_clauses.append("v.graph = $graph")
-                        params["graph"] = bulk_data.graph
-                    if bulk_data.status is not None and bulk_data.status.strip() != "Keep Current":
-                        set_clauses.append("v.status = $status")
-                        params["status"] = bulk_data.status
-
-                    # Only update if there are fields to update
-                    if set_clauses:
-                        update_query = f"""
-                            MATCH (v:Variable {{id: $id}})
-                            SET {', '.join(set_clauses)}
-                        """
-                        session.run(update_query, params)
-
-                    # Update driver relationships if driver field is provided and not "Keep Current"
-                    if bulk_data.driver is not None and bulk_data.driver.strip() != "Keep Current":
-                        print(f"Updating driver relationships with: {bulk_data.driver}")
-                        await create_driver_relationships(session, variable_id, bulk_data.driver)
-
-                    # Handle object relationships if provided
-                    if bulk_data.objectRelationshipsList is not None and len(bulk_data.objectRelationshipsList) > 0:
-                        print(f"Processing {len(bulk_data.objectRelationshipsList)} object relationships")
-                        for relationship in bulk_data.objectRelationshipsList:
-                            try:
-                                # Create object relationship for this variable (append new relationships with deduplication)
-                                await create_object_relationship_for_variable(session, variable_id, relationship)
-                            except Exception as e:
-                                print(f"Error creating object relationship for variable {variable_id}: {str(e)}")
-                                errors.append(f"Failed to create object relationship for variable {variable_id}: {str(e)}")
-
-                    updated_count += 1
-
-                except Exception as e:
-                    print(f"Error updating variable {variable_id}: {str(e)}")
-                    errors.append(f"Failed to update variable {variable_id}: {str(e)}")
-                    continue
+        # variable id -> grid fields it changed, for the change log
+        changed = {}
 
+        # One unit for all variables: unknown ids are reported up front, any
+        # failing statement fails the whole update (it aborts the transaction)
+        def work(repos):
+            changed.clear()
+            errors = []
+            variable_ids = []
+            for variable_id in bulk_data.variable_ids:
+                if repos.variables.exists(variable_id):
+                    variable_ids.append(variable_id)
+                else:
+                    logger.debug("Variable %s not found in database", variable_id)
+                    errors.append(f"Variable {variable_id} not found")
+
+            for variable_id in variable_ids:
+                logger.debug("Processing variable ID: %s", variable_id)
+                # Only update fields that are provided and not "Keep Current" values
+                if fields:
+                    repos.variables.update(variable_id, fields)
+                changed[variable_id] = dict(fields)
+
+                # Update driver relationships if driver field is provided and not "Keep Current"
+                if bulk_data.driver is not None and bulk_data.driver.strip() != "Keep Current":
+                    logger.debug("Updating driver relationships with: %s", bulk_data.driver)
+                    create_driver_relationships(repos, variable_id, bulk_data.driver)
+                    changed[variable_id]["driver"] = bulk_data.driver
+
+                # Handle object relationships if provided
+                if bulk_data.objectRelationshipsList:
+                    logger.debug("Processing %s object relationships", len(bulk_data.objectRelationshipsList))
+                    for relationship in bulk_data.objectRelationshipsList:
+                        # Create object relationship for this variable (append new relationships with deduplication)
+                        create_object_relationship_for_variable(repos, variable_id, relationship)
+                    changed[variable_id]["objectRelationships"] = repos.variables.object_count(variable_id)
+            return len(variable_ids), errors
+
+        updated_count, errors = graph.execute_write(work)
+        if changed:
+            bump_catalog_version(*(change("variable", variable_id, "update", fields) for variable_id, fields in changed.items()))
         return BulkVariableUpdateResponse(
             success=updated_count > 0,
             message=f"Updated {updated_count} variables successfully",
@@ -376,455 +221,317 @@ async def bulk_update_variables(bulk_data: BulkVariableUpdateRequest):
         )
 
     except Exception as e:
-        print(f"Error in bulk update: {e}")
+        logger.exception("Error in bulk update: %s", e)
         raise HTTPException(status_code=500, detail=f"Failed to bulk update variables: {str(e)}")
 
+def update_variable_unit(repos, variable_id: str, variable_data: VariableUpdateRequest) -> Tuple[VariableResponse, List[Dict[str, Any]]]:
+    """Update the fields given in variable_data (and the drivers); (response, changes)"""
+    # First, get the current variable data
+    current = repos.variables.get(variable_id)
+    if not current:
+        raise NotFoundError("Variable not found")
+
+    # Only update fields that are provided in the request
+    fields = _changed_fields(variable_data)
+    record = repos.variables.update(variable_id, fields) if fields else current
+
+    # Update driver relationships if driver field is provided
+    if variable_data.driver is not None:
+        create_driver_relationships(repos, variable_id, variable_data.driver)
+        fields = {**fields, "driver": variable_data.driver}
+
+    # Use provided values or fall back to current values
+    result = _variable_response(
+        record,
+        variable_data.driver if variable_data.driver is not None else "",
+        variable_data.part if variable_data.part is not None else current["part"],
+        variable_data.group if variable_data.group is not None else current["group"],
+        repos.variables.object_count(variable_id)
+    )
+    return result, [change("variable", variable_id, "update", {**fields, "objectRelationships": result.objectRelationships})]
+
 @router.put("/variables/{variable_id}", response_model=VariableResponse)
-async def update_variable(variable_id: str, variable_data: VariableUpdateRequest):
+def update_variable(variable_id: str, variable_data: VariableUpdateRequest):
     """
     Update an existing variable in the CDM with proper taxonomy structure.
     Supports partial updates - only updates fields that are provided.
     """
-    driver = get_driver()
-    if not driver:
+    graph = get_graph()
+    if not graph.available():
         raise HTTPException(status_code=500, detail="Failed to connect to Neo4j database")
 
     try:
-        with driver.session() as session:
-            # First, get the current variable data
-            current_result = session.run("""
-                MATCH (p:Part)-[:HAS_GROUP]->(g:Group)-[:HAS_VARIABLE]->(v:Variable {id: $id})
-                RETURN v, p.name as part, g.name as group
-            """, {"id": variable_id})
-
-            current_record = current_result.single()
-            if not current_record:
-                raise HTTPException(status_code=404, detail="Variable not found")
-
-            current_variable = current_record["v"]
-            current_part = current_record["part"]
-            current_group = current_record["group"]
-
-            # Build dynamic SET clause for only provided fields
-            set_clauses = []
-            params = {"id": variable_id}
-            
-            # Only update fields that are provided in the request
-            if variable_data.variable is not None:
-                set_clauses.append("v.name = $variable")
-                params["variable"] = variable_data.variable
-            if variable_data.section is not None:
-                set_clauses.append("v.section = $section")
-                params["section"] = variable_data.section
-            if variable_data.formatI is not None:
-                set_clauses.append("v.formatI = $formatI")
-                params["formatI"] = variable_data.formatI
-            if variable_data.formatII is not None:
-                set_clauses.append("v.formatII = $formatII")
-                params["formatII"] = variable_data.formatII
-            if variable_data.gType is not None:
-                set_clauses.append("v.gType = $gType")
-                params["gType"] = variable_data.gType
-            if variable_data.validation is not None:
-                set_clauses.append("v.validation = $validation")
-                params["validation"] = variable_data.validation
-            if variable_data.default is not None:
-                set_clauses.append("v.default = $default")
-                params["default"] = variable_data.default
-            if variable_data.graph is not None:
-                set_clauses.append("v.graph = $graph")
-                params["graph"] = variable_data.graph
-            if variable_data.status is not None:
-                set_clauses.append("v.status = $status")
-                params["status"] = variable_data.status
-
-            # Only update if there are fields to update
-            if set_clauses:
-                update_query = f"""
-                    MATCH (v:Variable {{id: $id}})
-                    SET {', '.join(set_clauses)}
-                    RETURN v.id as id, v.name as variable, v.section as section,
-                           v.formatI as formatI, v.formatII as formatII, v.gType as gType,
-                           v.validation as validation, v.default as default, v.graph as graph,
-                           v.status as status
-                """
-                
-                result = session.run(update_query, params)
-                record = result.single()
-            else:
-                # No fields to update, use current data
-                record = {
-                    "id": current_variable["id"],
-                    "variable": current_variable["name"],
-                    "section": current_variable["section"],
-                    "formatI": current_variable["formatI"],
-                    "formatII": current_variable["formatII"],
-                    "gType": current_variable["gType"],
-                    "validation": current_variable["validation"],
-                    "default": current_variable["default"],
-                    "graph": current_variable["graph"],
-                    "status": current_variable["status"]
-                }
+        def work(repos):
+            return update_variable_unit(repos, variable_id, variable_data)
 
-            # Update driver relationships if driver field is provided
-            if variable_data.driver is not None:
-                await create_driver_relationships(session, variable_id, variable_data.driver)
-
-            # Get object relationships count
-            relationships_result = session.run("""
-                MATCH (o:Object)-[:HAS_SPECIFIC_VARIABLE]->(v:Variable {id: $id})
-                RETURN count(o) as count
-            """, {"id": variable_id})
-
-            relationships_record = relationships_result.single()
-            relationships_count = relationships_record["count"] if relationships_record else 0
-
-            # Use provided values or fall back to current values
-            final_part = variable_data.part if variable_data.part is not None else current_part
-            final_group = variable_data.group if variable_data.group is not None else current_group
-            final_driver = variable_data.driver if variable_data.driver is not None else ""
-
-            return VariableResponse(
-                id=record["id"],
-                driver=final_driver,
-                part=final_part,
-                group=final_group,
-                section=record["section"],
-                variable=record["variable"],
-                formatI=record["formatI"],
-                formatII=record["formatII"],
-                gType=record["gType"],
-                validation=record["validation"],
-                default=record["default"],
-                graph=record["graph"],
-                status=record["status"],
-                objectRelationships=relationships_count,
-                objectRelationshipsList=[]
-            )
+        result, changes = graph.execute_write(work)
+        bump_catalog_version(*changes)
+        return result
 
+    except NotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
     except Exception as e:
-        print(f"Error updating variable: {e}")
+        logger.exception("Error updating variable: %s", e)
         raise HTTPException(status_code=500, detail=f"Failed to update variable: {str(e)}")
 
+def delete_variable_unit(repos, variable_id: str) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+    # Delete the variable and all its relationships
+    if not repos.variables.delete(variable_id):
+        raise NotFoundError("Variable not found")
+    return {"message": "Variable deleted successfully"}, [change("variable", variable_id, "delete")]
+
 @router.delete("/variables/{variable_id}")
-async def delete_variable(variable_id: str):
+def delete_variable(variable_id: str):
     """
     Delete a variable from the CDM.
     """
-    driver = get_driver()
-    if not driver:
+    graph = get_graph()
+    if not graph.available():
         raise HTTPException(status_code=500, detail="Failed to connect to Neo4j database")
 
     try:
-        with driver.session() as session:
-            # Delete the variable and all its relationships
-            result = session.run("""
-                MATCH (v:Variable {id: $id})
-                DETACH DELETE v
-                RETURN v.id as id
-            """, {"id": variable_id})
+        def work(repos):
+            return delete_variable_unit(repos, variable_id)
 
-            record = result.single()
-            if not record:
-                raise HTTPException(status_code=404, detail="Variable not found")
-
-            return {"message": "Variable deleted successfully"}
+        result, changes = graph.execute_write(work)
+        bump_catalog_version(*changes)
+        return result
 
+    except NotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
     except Exception as e:
-        print(f"Error deleting variable: {e}")
+        logger.exception("Error deleting variable: %s", e)
         raise HTTPException(status_code=500, detail=f"Failed to delete variable: {str(e)}")
 
 @router.get("/variables/{variable_id}/object-relationships")
-async def get_object_relationships(variable_id: str):
+def get_object_relationships(variable_id: str):
     """
     Get all object relationships for a variable.
     """
-    driver = get_driver()
-    if not driver:
+    graph = get_graph()
+    if not graph.available():
         raise HTTPException(status_code=500, detail="Failed to connect to Neo4j database")
 
     try:
-        with driver.session() as session:
-            # Get all object relationships for this variable
-            result = session.run("""
-                MATCH (o:Object)-[r:HAS_SPECIFIC_VARIABLE]->(v:Variable {id: $variable_id})
-                RETURN o.being as being, o.avatar as avatar, o.object as object, r.createdBy as createdBy
-            """, {"variable_id": variable_id})
-            
-            relationships = []
-            for record in result:
-                relationships.append({
-                    "toBeing": record["being"],
-                    "toAvatar": record["avatar"], 
-                    "toObject": record["object"],
-                    "createdBy": record["createdBy"]
-                })
-            
-            print(f"Found {len(relationships)} object relationships for variable {variable_id}")
-            return {"relationships": relationships}
+        def work(repos):
+            return repos.variables.object_relationships(variable_id)
+
+        relationships = graph.execute_read(work)
+        logger.debug("Found %s object relationships for variable %s", len(relationships), variable_id)
+        return {"relationships": relationships}
             
     except Exception as e:
-        print(f"Error getting object relationships: {e}")
+        logger.exception("Error getting object relationships: %s", e)
         raise HTTPException(status_code=500, detail=f"Failed to get object relationships: {str(e)}")
 
+def link_objects_unit(repos, variable_id: str, relationship_data: ObjectRelationshipCreateRequest) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+    """HAS_SPECIFIC_VARIABLE from every object matching the criteria (ALL matches anything); (response, changes)"""
+    if not repos.variables.exists(variable_id):
+        raise NotFoundError("Variable not found")
+
+    targets = repos.objects.match(relationship_data.to_being, relationship_data.to_avatar, relationship_data.to_object)
+    for target in targets:
+        logger.debug("Creating relationship between variable %s and object %s", variable_id, target["target_id"])
+        repos.variables.link_object(variable_id, target["target_id"])
+
+    logger.debug("Successfully created %s object relationships", len(targets))
+    object_count = repos.variables.object_count(variable_id)
+    return (
+        {"message": f"Created {len(targets)} object relationships"},
+        [change("variable", variable_id, "update", {"objectRelationships": object_count})]
+    )
+
+def unlink_objects_unit(repos, variable_id: str, relationship_data: ObjectRelationshipCreateRequest) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+    """Remove the variable's links to the objects matching the criteria; (response, changes)"""
+    object_ids = repos.variables.linked_objects(
+        variable_id, relationship_data.to_being, relationship_data.to_avatar, relationship_data.to_object
+    )
+    for object_id in object_ids:
+        logger.debug("Deleting relationship between variable %s and object %s", variable_id, object_id)
+        repos.variables.unlink_object(variable_id, object_id)
+
+    logger.debug("Successfully deleted %s object relationships", len(object_ids))
+    object_count = repos.variables.object_count(variable_id)
+    return (
+        {"message": f"Deleted {len(object_ids)} object relationships"},
+        [change("variable", variable_id, "update", {"objectRelationships": object_count})]
+    )
+
 @router.post("/variables/{variable_id}/object-relationships")
-async def create_object_relationship(variable_id: str, relationship_data: ObjectRelationshipCreateRequest):
+def create_object_relationship(variable_id: str, relationship_data: ObjectRelationshipCreateRequest):
     """
     Create an object relationship for a variable with role property.
     """
-    driver = get_driver()
-    if not driver:
+    graph = get_graph()
+    if not graph.available():
         raise HTTPException(status_code=500, detail="Failed to connect to Neo4j database")
 
     try:
-        print(f"Creating object relationship for variable {variable_id} with data: {relationship_data}")
-        with driver.session() as session:
-            # Find the variable
-            variable_result = session.run("""
-                MATCH (v:Variable {id: $id})
-                RETURN v
-            """, {"id": variable_id})
-
-            if not variable_result.single():
-                raise HTTPException(status_code=404, detail="Variable not found")
-
-            # Find matching objects based on the relationship criteria
-            if relationship_data.to_being == "ALL" and relationship_data.to_avatar == "ALL" and relationship_data.to_object == "ALL":
-                # Connect to all objects
-                objects_result = session.run("MATCH (o:Object) RETURN o")
-            elif relationship_data.to_being == "ALL" and relationship_data.to_avatar == "ALL":
-                # Connect to all objects with specific object name
-                objects_result = session.run("MATCH (o:Object {object: $object}) RETURN o", {"object": relationship_data.to_object})
-            elif relationship_data.to_being == "ALL":
-                # Connect to all objects with specific avatar and object
-                objects_result = session.run("MATCH (o:Object {avatar: $avatar, object: $object}) RETURN o", 
-                    {"avatar": relationship_data.to_avatar, "object": relationship_data.to_object})
-            elif relationship_data.to_object == "ALL":
-                # Connect to all objects with specific being and avatar (regardless of object name)
-                objects_result = session.run("MATCH (o:Object {being: $being, avatar: $avatar}) RETURN o", 
-                    {"being": relationship_data.to_being, "avatar": relationship_data.to_avatar})
-            else:
-                # Connect to specific being, avatar, and object
-                objects_result = session.run("MATCH (o:Object {being: $being, avatar: $avatar, object: $object}) RETURN o", 
-                    {"being": relationship_data.to_being, "avatar": relationship_data.to_avatar, "object": relationship_data.to_object})
-
-            # Create relationships with HAS_SPECIFIC_VARIABLE relationship name
-            relationships_created = 0
-            for record in objects_result:
-                print(f"Creating relationship between variable {variable_id} and object {record['o']['id']}")
-                session.run("""
-                    MATCH (v:Variable {id: $variable_id})
-                    MATCH (o:Object {id: $object_id})
-                    MERGE (o)-[:HAS_SPECIFIC_VARIABLE {createdBy: "frontend"}]->(v)
-                """, {
-                    "variable_id": variable_id, 
-                    "object_id": record["o"]["id"]
-                })
-                relationships_created += 1
-
-            print(f"Successfully created {relationships_created} object relationships")
-            return {"message": f"Created {relationships_created} object relationships"}
+        logger.debug("Creating object relationship for variable %s with data: %s", variable_id, payload(relationship_data))
+        def work(repos):
+            return link_objects_unit(repos, variable_id, relationship_data)
+
+        result, changes = graph.execute_write(work)
+        bump_catalog_version(*changes)
+        return result
 
+    except NotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
     except Exception as e:
-        print(f"Error creating object relationship: {e}")
+        logger.exception("Error creating object relationship: %s", e)
         raise HTTPException(status_code=500, detail=f"Failed to create object relationship: {str(e)}")
 
 @router.delete("/variables/{variable_id}/object-relationships")
-async def delete_object_relationship(variable_id: str, relationship_data: ObjectRelationshipCreateRequest):
+def delete_object_relationship(variable_id: str, relationship_data: ObjectRelationshipCreateRequest):
     """
     Delete object relationships for a variable by criteria.
     """
-    driver = get_driver()
-    if not driver:
+    graph = get_graph()
+    if not graph.available():
         raise HTTPException(status_code=500, detail="Failed to connect to Neo4j database")
 
     try:
-        print(f"Deleting object relationships for variable {variable_id} with criteria: {relationship_data}")
-        with driver.session() as session:
-            # Find matching objects based on the relationship criteria
-            if relationship_data.to_being == "ALL" and relationship_data.to_avatar == "ALL" and relationship_data.to_object == "ALL":
-                # Delete all relationships for this variable
-                objects_result = session.run("MATCH (o:Object)-[r:HAS_SPECIFIC_VARIABLE]->(v:Variable {id: $variable_id}) RETURN o", {"variable_id": variable_id})
-            elif relationship_data.to_being == "ALL" and relationship_data.to_avatar == "ALL":
-                # Delete relationships to all objects with specific object name
-                objects_result = session.run("MATCH (o:Object {object: $object})-[r:HAS_SPECIFIC_VARIABLE]->(v:Variable {id: $variable_id}) RETURN o", {"object": relationship_data.to_object, "variable_id": variable_id})
-            elif relationship_data.to_being == "ALL":
-                # Delete relationships to all objects with specific avatar and object
-                objects_result = session.run("MATCH (o:Object {avatar: $avatar, object: $object})-[r:HAS_SPECIFIC_VARIABLE]->(v:Variable {id: $variable_id}) RETURN o", 
-                    {"avatar": relationship_data.to_avatar, "object": relationship_data.to_object, "variable_id": variable_id})
-            elif relationship_data.to_object == "ALL":
-                # Delete relationships to all objects with specific being and avatar (regardless of object name)
-                objects_result = session.run("MATCH (o:Object {being: $being, avatar: $avatar})-[r:HAS_SPECIFIC_VARIABLE]->(v:Variable {id: $variable_id}) RETURN o", 
-                    {"being": relationship_data.to_being, "avatar": relationship_data.to_avatar, "variable_id": variable_id})
-            else:
-                # Delete relationships to specific being, avatar, and object
-                objects_result = session.run("MATCH (o:Object {being: $being, avatar: $avatar, object: $object})-[r:HAS_SPECIFIC_VARIABLE]->(v:Variable {id: $variable_id}) RETURN o", 
-                    {"being": relationship_data.to_being, "avatar": relationship_data.to_avatar, "object": relationship_data.to_object, "variable_id": variable_id})
-
-            # Delete relationships
-            relationships_deleted = 0
-            for record in objects_result:
-                print(f"Deleting relationship between variable {variable_id} and object {record['o']['id']}")
-                session.run("""
-                    MATCH (o:Object {id: $object_id})-[r:HAS_SPECIFIC_VARIABLE]->(v:Variable {id: $variable_id})
-                    DELETE r
-                """, {
-                    "variable_id": variable_id, 
-                    "object_id": record["o"]["id"]
-                })
-                relationships_deleted += 1
-
-            print(f"Successfully deleted {relationships_deleted} object relationships")
-            return {"message": f"Deleted {relationships_deleted} object relationships"}
+        logger.debug("Deleting object relationships for variable %s with criteria: %s", variable_id, payload(relationship_data))
+        def work(repos):
+            return unlink_objects_unit(repos, variable_id, relationship_data)
+
+        result, changes = graph.execute_write(work)
+        bump_catalog_version(*changes)
+        return result
 
     except Exception as e:
-        print(f"Error deleting object relationship: {e}")
+        logger.exception("Error deleting object relationship: %s", e)
         raise HTTPException(status_code=500, detail=f"Failed to delete object relationship: {str(e)}")
 
 @router.post("/variables/bulk-upload", response_model=CSVUploadResponse)
-async def bulk_upload_variables(file: UploadFile = File(...)):
+def bulk_upload_variables(file: UploadFile = File(...)):
     """
     Bulk upload variables from CSV file.
     """
     if not file.filename.endswith('.csv'):
         raise HTTPException(status_code=400, detail="File must be a CSV file")
 
-    driver = get_driver()
-    if not driver:
+    graph = get_graph()
+    if not graph.available():
         raise HTTPException(status_code=500, detail="Failed to connect to Neo4j database")
 
     try:
-        # Read CSV content and parse it robustly
-        content = await file.read()
-        print(f"CSV content length: {len(content)}")
+        with span("csv.parse", **{"csv.file": file.filename}) as parse_span:
+            # Read CSV content and parse it robustly
+            content = file.file.read()
+            logger.debug("CSV content length: %s", len(content))
         
-        # Decode content and handle BOM
-        try:
-            text_content = content.decode('utf-8-sig')
-        except UnicodeDecodeError:
-            text_content = content.decode('utf-8')
+            # Decode content and handle BOM
+            try:
+                text_content = content.decode('utf-8-sig')
+            except UnicodeDecodeError:
+                text_content = content.decode('utf-8')
         
-        # Parse CSV manually to handle unquoted fields with spaces
-        # Normalize line endings first to handle Windows-style (\r\n) and Unix-style (\n) newlines
-        text_content = text_content.replace('\r\n', '\n').replace('\r', '\n')
+            # Parse CSV manually to handle unquoted fields with spaces
+            # Normalize line endings first to handle Windows-style (\r\n) and Unix-style (\n) newlines
+            text_content = text_content.replace('\r\n', '\n').replace('\r', '\n')
         
-        lines = text_content.strip().split('\n')
-        if not lines:
-            raise HTTPException(status_code=400, detail="Empty CSV file")
+            lines = text_content.strip().split('\n')
+            if not lines:
+                raise HTTPException(status_code=400, detail="Empty CSV file")
         
-        # Get headers from first line
-        headers = [h.strip() for h in lines[0].split(',')]
+            # Get headers from first line
+            headers = [h.strip() for h in lines[0].split(',')]
         
-        # Parse data rows
-        rows = []
-        for i, line in enumerate(lines[1:], start=2):
-            if not line.strip():
-                continue
+            # Parse data rows
+            rows = []
+            for i, line in enumerate(lines[1:], start=2):
+                if not line.strip():
+                    continue
             
-            # Simple split by comma - this handles unquoted fields with spaces
-            values = [v.strip() for v in line.split(',')]
+                # Simple split by comma - this handles unquoted fields with spaces
+                values = [v.strip() for v in line.split(',')]
             
-            # Create row dictionary
-            row = {}
-            for j, header in enumerate(headers):
-                row[header] = values[j] if j < len(values) else ""
-            rows.append(row)
+                # Create row dictionary
+                row = {}
+                for j, header in enumerate(headers):
+                    row[header] = values[j] if j < len(values) else ""
+                rows.append(row)
                     
-        print(f"Successfully parsed {len(rows)} rows from CSV")
+            logger.debug("Successfully parsed %s rows from CSV", len(rows))
+            parse_span.set("csv.rows", len(rows))
     except Exception as e:
-        print(f"Error in CSV parsing: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Error in CSV parsing: %s", e)
         raise HTTPException(status_code=400, detail=f"CSV parsing error: {str(e)}")
     
     variables = []
     errors = []
     
-    for row_num, row in enumerate(rows, start=2):  # Start at 2 because of header
-        try:
-            # Validate required fields
-            required_fields = ['Sector', 'Domain', 'Country', 'Variable Clarifier', 'Part', 'Section', 'Group', 'Variable']
-            missing_fields = [field for field in required_fields if not row.get(field, '').strip()]
+    with span("csv.validate", **{"csv.rows": len(rows)}) as validate_span:
+        for row_num, row in enumerate(rows, start=2):  # Start at 2 because of header
+            try:
+                # Validate required fields
+                required_fields = ['Sector', 'Domain', 'Country', 'Variable Clarifier', 'Part', 'Section', 'Group', 'Variable']
+                missing_fields = [field for field in required_fields if not row.get(field, '').strip()]
             
-            if missing_fields:
-                errors.append(f"Row {row_num}: Missing required fields: {', '.join(missing_fields)}")
-                continue
+                if missing_fields:
+                    errors.append(f"Row {row_num}: Missing required fields: {', '.join(missing_fields)}")
+                    continue
 
-            # Parse driver selections
-            sector = ['ALL'] if row['Sector'].strip() == 'ALL' else [s.strip() for s in row['Sector'].split(',')]
-            domain = ['ALL'] if row['Domain'].strip() == 'ALL' else [d.strip() for d in row['Domain'].split(',')]
-            country = ['ALL'] if row['Country'].strip() == 'ALL' else [c.strip() for c in row['Country'].split(',')]
-            variable_clarifier = row['Variable Clarifier'].strip() if row['Variable Clarifier'].strip() else 'None'
+                # Parse driver selections
+                sector = ['ALL'] if row['Sector'].strip() == 'ALL' else [s.strip() for s in row['Sector'].split(',')]
+                domain = ['ALL'] if row['Domain'].strip() == 'ALL' else [d.strip() for d in row['Domain'].split(',')]
+                country = ['ALL'] if row['Country'].strip() == 'ALL' else [c.strip() for c in row['Country'].split(',')]
+                variable_clarifier = row['Variable Clarifier'].strip() if row['Variable Clarifier'].strip() else 'None'
             
-            # Create driver string
-            sector_str = 'ALL' if 'ALL' in sector else ', '.join(sector)
-            domain_str = 'ALL' if 'ALL' in domain else ', '.join(domain)
-            country_str = 'ALL' if 'ALL' in country else ', '.join(country)
-            driver_string = f"{sector_str}, {domain_str}, {country_str}, {variable_clarifier}"
-
-            # Create variable data with proper handling of optional fields
-            variable_data = {
-                "id": str(uuid.uuid4()),
-                "driver": driver_string,
-                "part": row['Part'].strip(),
-                "section": row['Section'].strip(),
-                "group": row['Group'].strip(),
-                "variable": row['Variable'].strip(),
-                "formatI": row.get('Format I', '').strip() or '',
-                "formatII": row.get('Format II', '').strip() or '',
-                "gType": row.get('G-Type', '').strip() or '',
-                "validation": row.get('Validation', '').strip() or '',
-                "default": row.get('Default', '').strip() or '',
-                "graph": row.get('Graph', 'Yes').strip() or 'Yes',
-                "status": "Active"
-            }
+                # Create driver string
+                sector_str = 'ALL' if 'ALL' in sector else ', '.join(sector)
+                domain_str = 'ALL' if 'ALL' in domain else ', '.join(domain)
+                country_str = 'ALL' if 'ALL' in country else ', '.join(country)
+                driver_string = f"{sector_str}, {domain_str}, {country_str}, {variable_clarifier}"
+
+                # Create variable data with proper handling of optional fields
+                variable_data = {
+                    "id": str(uuid.uuid4()),
+                    "driver": driver_string,
+                    "part": row['Part'].strip(),
+                    "section": row['Section'].strip(),
+                    "group": row['Group'].strip(),
+                    "variable": row['Variable'].strip(),
+                    "formatI": row.get('Format I', '').strip() or '',
+                    "formatII": row.get('Format II', '').strip() or '',
+                    "gType": row.get('G-Type', '').strip() or '',
+                    "validation": row.get('Validation', '').strip() or '',
+                    "default": row.get('Default', '').strip() or '',
+                    "graph": row.get('Graph', 'Yes').strip() or 'Yes',
+                    "status": "Active"
+                }
             
-            variables.append(variable_data)
+                variables.append(variable_data)
             
-        except Exception as e:
-            errors.append(f"Row {row_num}: {str(e)}")
-            continue
+            except Exception as e:
+                errors.append(f"Row {row_num}: {str(e)}")
+                continue
+        validate_span.set("csv.valid", len(variables))
+        validate_span.set("csv.errors", len(errors))
 
-    # Insert variables into database
-    created_count = 0
-    with driver.session() as session:
+    # Insert variables into database, one unit of work per variable
+    created = []
+    with span("csv.import", **{"csv.rows": len(variables)}) as import_span:
         for var_data in variables:
-            try:
+            def work(repos):
                 # Create taxonomy structure: Part -> Group -> Variable
-                session.run("""
-                    // MERGE Part node (avoid duplicates)
-                    MERGE (p:Part {name: $part})
-                    
-                    // MERGE Group node (avoid duplicates)
-                    MERGE (g:Group {name: $group})
-                    
-                    // Create relationship Part -> Group
-                    MERGE (p)-[:HAS_GROUP]->(g)
-                    
-                    // Create Variable node with all properties
-                    CREATE (v:Variable {
-                        id: $id,
-                        name: $variable,
-                        section: $section,
-                        formatI: $formatI,
-                        formatII: $formatII,
-                        gType: $gType,
-                        validation: $validation,
-                        default: $default,
-                        graph: $graph,
-                        status: $status
-                    })
-                    
-                    // Create relationship Group -> Variable
-                    MERGE (g)-[:HAS_VARIABLE]->(v)
-                """, var_data)
-                
-                # Create driver relationships
-                await create_driver_relationships(session, var_data['id'], var_data['driver'])
-                created_count += 1
+                repos.variables.create(
+                    var_data['id'], var_data['part'], var_data['group'],
+                    {field: var_data[field] for field in VARIABLE_FIELDS}
+                )
+                create_driver_relationships(repos, var_data['id'], var_data['driver'])
+
+            try:
+                graph.execute_write(work)
+                created.append(_variable_response(var_data, var_data['driver'], var_data['part'], var_data['group']))
             except Exception as e:
                 errors.append(f"Failed to create variable {var_data['variable']}: {str(e)}")
+        created_count = len(created)
+        import_span.set("csv.created", created_count)
 
+    if created:
+        bump_catalog_version(*(change("variable", row.id, "create", row.model_dump()) for row in created))
     return CSVUploadResponse(
         success=True,
         message=f"Successfully created {created_count} variables",
@@ -834,192 +541,29 @@ async def bulk_upload_variables(file: UploadFile = File(...)):
     )
 
 @router.get("/variables/test/{variable_id}")
-async def test_variable_lookup(variable_id: str):
+def test_variable_lookup(variable_id: str):
     """Test endpoint to check if variable lookup works"""
-    driver = get_driver()
-    if not driver:
+    graph = get_graph()
+    if not graph.available():
         raise HTTPException(status_code=500, detail="Failed to connect to Neo4j database")
     
     try:
-        with driver.session() as session:
-            result = session.run("""
-                MATCH (v:Variable {id: $id})
-                RETURN v
-            """, {"id": variable_id})
-            
-            record = result.single()
-            if not record:
-                return {"found": False, "message": "Variable not found"}
-            else:
-                return {"found": True, "variable": dict(record["v"])}
-    except Exception as e:
-        return {"error": str(e)}
-
-@router.put("/variables/bulk-update", response_model=BulkVariableUpdateResponse)
-async def bulk_update_variables(bulk_data: BulkVariableUpdateRequest):
-    """
-    Bulk update multiple variables with the same changes.
-    Only updates fields that are provided (not None) and not "Keep Current" values.
-    Applies validation rules: overwrites only where new value chosen, leaves Keep Current fields untouched.
-    """
-    driver = get_driver()
-    if not driver:
-        raise HTTPException(status_code=500, detail="Failed to connect to Neo4j database")
-
-    updated_count = 0
-    errors = []
-
-    try:
-        with driver.session() as session:
-            for variable_id in bulk_data.variable_ids:
-                try:
-                    print(f"Processing variable ID: {variable_id}")
-                    # Get current variable data - first check if variable exists
-                    print(f"Running query for variable {variable_id}")
-                    current_result = session.run("""
-                        MATCH (v:Variable {id: $id})
-                        RETURN v
-                    """, {"id": variable_id})
-
-                    print(f"Query executed, getting single record")
-                    current_record = current_result.single()
-                    print(f"Record result: {current_record}")
-                    if not current_record:
-                        print(f"Variable {variable_id} not found in database")
-                        errors.append(f"Variable {variable_id} not found")
-                        continue
-                    
-                    print(f"Variable {variable_id} found, proceeding with update")
-
-                    current_variable = current_record["v"]
-
-                    # Build dynamic SET clause for only provided fields that are not "Keep Current"
-                    set_clauses = []
-                    params = {"id": variable_id}
-                    
-                    # Only update fields that are provided and not "Keep Current" values
-                    if bulk_data.variable is not None and bulk_data.variable.strip() != "Keep Current":
-                        set_clauses.append("v.name = $variable")
-                        params["variable"] = bulk_data.variable
-                    if bulk_data.section is not None and bulk_data.section.strip() != "Keep Current":
-                        set_clauses.append("v.section = $section")
-                        params["section"] = bulk_data.section
-                    if bulk_data.formatI is not None and bulk_data.formatI.strip() != "Keep Current":
-                        set_clauses.append("v.formatI = $formatI")
-                        params["formatI"] = bulk_data.formatI
-                    if bulk_data.formatII is not None and bulk_data.formatII.strip() != "Keep Current":
-                        set_clauses.append("v.formatII = $formatII")
-                        params["formatII"] = bulk_data.formatII
-                    if bulk_data.gType is not None and bulk_data.gType.strip() != "Keep Current":
-                        set_clauses.append("v.gType = $gType")
-                        params["gType"] = bulk_data.gType
-                    if bulk_data.validation is not None and bulk_data.validation.strip() != "Keep Current":
-                        set_clauses.append("v.validation = $validation")
-                        params["validation"] = bulk_data.validation
-                    if bulk_data.default is not None and bulk_data.default.strip() != "Keep Current":
-                        set_clauses.append("v.default = $default")
-                        params["default"] = bulk_data.default
-                    if bulk_data.graph is not None and bulk_data.graph.strip() != "Keep Current":
-                        set_clauses.append("v.graph = $graph")
-                        params["graph"] = bulk_data.graph
-                    if bulk_data.status is not None and bulk_data.status.strip() != "Keep Current":
-                        set_clauses.append("v.status = $status")
-                        params["status"] = bulk_data.status
-
-                    # Only update if there are fields to update
-                    if set_clauses:
-                        update_query = f"""
-                            MATCH (v:Variable {{id: $id}})
-                            SET {', '.join(set_clauses)}
-                        """
-                        session.run(update_query, params)
-
-                    # Update driver relationships if driver field is provided and not "Keep Current"
-                    if bulk_data.driver is not None and bulk_data.driver.strip() != "Keep Current":
-                        print(f"Updating driver relationships with: {bulk_data.driver}")
-                        await create_driver_relationships(session, variable_id, bulk_data.driver)
-
-                    # Handle object relationships if provided
-                    if bulk_data.objectRelationshipsList is not None and len(bulk_data.objectRelationshipsList) > 0:
-                        print(f"Processing {len(bulk_data.objectRelationshipsList)} object relationships")
-                        for relationship in bulk_data.objectRelationshipsList:
-                            try:
-                                # Create object relationship for this variable (append new relationships with deduplication)
-                                await create_object_relationship_for_variable(session, variable_id, relationship)
-                            except Exception as e:
-                                print(f"Error creating object relationship for variable {variable_id}: {str(e)}")
-                                errors.append(f"Failed to create object relationship for variable {variable_id}: {str(e)}")
-
-                    updated_count += 1
-
-                except Exception as e:
-                    print(f"Error updating variable {variable_id}: {str(e)}")
-                    errors.append(f"Failed to update variable {variable_id}: {str(e)}")
-                    continue
-
-        return BulkVariableUpdateResponse(
-            success=updated_count > 0,
-            message=f"Updated {updated_count} variables successfully",
-            updated_count=updated_count,
-            error_count=len(errors),
-            errors=errors
-        )
+        def work(repos):
+            return repos.variables.properties(variable_id)
 
+        properties = graph.execute_read(work)
+        if properties is None:
+            return {"found": False, "message": "Variable not found"}
+        return {"found": True, "variable": properties}
     except Exception as e:
-        print(f"Error in bulk update: {e}")
-        raise HTTPException(status_code=500, detail=f"Failed to bulk update variables: {str(e)}")
+        return {"error": str(e)}
 
-async def create_object_relationship_for_variable(session, variable_id: str, relationship_data: ObjectRelationshipCreateRequest):
+def create_object_relationship_for_variable(repos, variable_id: str, relationship_data: ObjectRelationshipCreateRequest):
     """
     Create an object relationship for a variable.
     Note: Variable existence is already verified in the calling function.
+    Errors propagate: inside a transaction a failed statement fails the unit.
     """
-    try:
-        # Find matching objects based on the relationship criteria
-        if relationship_data.to_being == "ALL" and relationship_data.to_avatar == "ALL" and relationship_data.to_object == "ALL":
-            # Connect to all objects
-            objects_result = session.run("MATCH (o:Object) RETURN o")
-        elif relationship_data.to_being == "ALL" and relationship_data.to_avatar == "ALL":
-            # Connect to all objects with specific object name
-            objects_result = session.run("MATCH (o:Object {object: $object}) RETURN o", {"object": relationship_data.to_object})
-        elif relationship_data.to_being == "ALL":
-            # Connect to all objects with specific avatar and object
-            objects_result = session.run("MATCH (o:Object {avatar: $avatar, object: $object}) RETURN o", 
-                {"avatar": relationship_data.to_avatar, "object": relationship_data.to_object})
-        elif relationship_data.to_object == "ALL":
-            # Connect to all objects with specific being and avatar (regardless of object name)
-            objects_result = session.run("MATCH (o:Object {being: $being, avatar: $avatar}) RETURN o", 
-                {"being": relationship_data.to_being, "avatar": relationship_data.to_avatar})
-        else:
-            # Connect to specific being, avatar, and object
-            objects_result = session.run("MATCH (o:Object {being: $being, avatar: $avatar, object: $object}) RETURN o", 
-                {"being": relationship_data.to_being, "avatar": relationship_data.to_avatar, "object": relationship_data.to_object})
-
-        # Create relationships with HAS_SPECIFIC_VARIABLE relationship name
-        relationships_created = 0
-        for record in objects_result:
-            # Check if relationship already exists to avoid duplicates
-            existing_rel = session.run("""
-                MATCH (o:Object {id: $object_id})-[r:HAS_SPECIFIC_VARIABLE]->(v:Variable {id: $variable_id})
-                RETURN r
-            """, {
-                "variable_id": variable_id, 
-                "object_id": record["o"]["id"]
-            }).single()
-            
-            if not existing_rel:
-                session.run("""
-                    MATCH (v:Variable {id: $variable_id})
-                    MATCH (o:Object {id: $object_id})
-                    MERGE (o)-[:HAS_SPECIFIC_VARIABLE {createdBy: "frontend"}]->(v)
-                """, {
-                    "variable_id": variable_id, 
-                    "object_id": record["o"]["id"]
-                })
-                relationships_created += 1
-
-        return relationships_created
-
-    except Exception as e:
-        print(f"Error creating object relationship: {e}")
-        raise e
\ No newline at end of file
+    # HAS_SPECIFIC_VARIABLE from every matching object that is not linked yet
+    targets = repos.objects.match(relationship_data.to_being, relationship_data.to_avatar, relationship_data.to_object)
+    return sum(repos.variables.link_object(variable_id, target["target_id"]) for target in targets)
@@ -7,6 +7,61 @@ from db import get_driver
 from pydantic import BaseModel, Field
 from typing import List, Optional
 
+# All world countries, seeded as pre-defined Country drivers
+COUNTRIES = [
+    "Afghanistan", "Albania", "Algeria", "Andorra", "Angola", "Antigua and Barbuda", "Argentina", "Armenia", "Australia", "Austria",
+    "Azerbaijan", "Bahamas", "Bahrain", "Bangladesh", "Barbados", "Belarus", "Belgium", "Belize", "Benin", "Bhutan",
+    "Bolivia", "Bosnia and Herzegovina", "Botswana", "Brazil", "Brunei", "Bulgaria", "Burkina Faso", "Burundi", "Cambodia", "Cameroon",
+    "Canada", "Cape Verde", "Central African Republic", "Chad", "Chile", "China", "Colombia", "Comoros", "Congo", "Costa Rica",
+    "Croatia", "Cuba", "Cyprus", "Czech Republic", "Denmark", "Djibouti", "Dominica", "Dominican Republic", "Ecuador", "Egypt",
+    "El Salvador", "Equatorial Guinea", "Eritrea", "Estonia", "Ethiopia", "Fiji", "Finland", "France", "Gabon", "Gambia",
+    "Georgia", "Germany", "Ghana", "Greece", "Grenada", "Guatemala", "Guinea", "Guinea-Bissau", "Guyana", "Haiti",
+    "Honduras", "Hungary", "Iceland", "India", "Indonesia", "Iran", "Iraq", "Ireland", "Israel", "Italy",
+    "Jamaica", "Japan", "Jordan", "Kazakhstan", "Kenya", "Kiribati", "North Korea", "South Korea", "Kuwait", "Kyrgyzstan",
+    "Laos", "Latvia", "Lebanon", "Lesotho", "Liberia", "Libya", "Liechtenstein", "Lithuania", "Luxembourg", "Macedonia",
+    "Madagascar", "Malawi", "Malaysia", "Maldives", "Mali", "Malta", "Marshall Islands", "Mauritania", "Mauritius", "Mexico",
+    "Micronesia", "Moldova", "Monaco", "Mongolia", "Montenegro", "Morocco", "Mozambique", "Myanmar", "Namibia", "Nauru",
+    "Nepal", "Netherlands", "New Zealand", "Nicaragua", "Niger", "Nigeria", "Norway", "Oman", "Pakistan", "Palau",
+    "Panama", "Papua New Guinea", "Paraguay", "Peru", "Philippines", "Poland", "Portugal", "Qatar", "Romania", "Russia",
+    "Rwanda", "Saint Kitts and Nevis", "Saint Lucia", "Saint Vincent and the Grenadines", "Samoa", "San Marino", "Sao Tome and Principe", "Saudi Arabia", "Senegal", "Serbia",
+    "Seychelles", "Sierra Leone", "Singapore", "Slovakia", "Slovenia", "Solomon Islands", "Somalia", "South Africa", "South Sudan", "Spain",
+    "Sri Lanka", "Sudan", "Suriname", "Swaziland", "Sweden", "Switzerland", "Syria", "Taiwan", "Tajikistan", "Tanzania",
+    "Thailand", "Togo", "Tonga", "Trinidad and Tobago", "Tunisia", "Turkey", "Turkmenistan", "Tuvalu", "Uganda", "Ukraine",
+    "United Arab Emirates", "United Kingdom", "United States", "Uruguay", "Uzbekistan", "Vanuatu", "Vatican City", "Venezuela", "Vietnam", "Yemen",
+    "Zambia", "Zimbabwe"
+]
+
+# Objects taxonomy: Beings and the Avatars below each of them
+BEINGS = ['Master', 'Mate', 'Process', 'Adjunct', 'Rule', 'Roster']
+
+BEING_AVATARS = [
+    # Master avatars
+    ('Master', 'Company'),
+    ('Master', 'Company Affiliate'),
+    ('Master', 'Employee'),
+    ('Master', 'Product'),
+    ('Master', 'Customer'),
+    ('Master', 'Supplier'),
+    # Mate avatars
+    ('Mate', 'Person'),
+    ('Mate', 'Thing'),
+    ('Mate', 'Reference'),
+    ('Mate', 'Register'),
+    # Process avatars
+    ('Process', 'Activity'),
+    ('Process', 'Transaction'),
+    ('Process', 'Payment'),
+    ('Process', 'Posting'),
+    # Adjunct avatars
+    ('Adjunct', 'Account'),
+    ('Adjunct', 'Attribute'),
+    # Rule avatars
+    ('Rule', 'Trigger'),
+    ('Rule', 'Validator'),
+    # Roster avatars
+    ('Roster', 'List')
+]
+
 # ObjectRelationshipCreateRequest class definition
 class ObjectRelationshipCreateRequest(BaseModel):
     to_being: str
@@ -42,7 +97,9 @@ def create_constraints_and_indexes():
                 "CREATE CONSTRAINT group_name_unique IF NOT EXISTS FOR (g:Group) REQUIRE g.name IS UNIQUE",
                 # Relationship and Variant constraints
                 "CREATE CONSTRAINT relationship_id_unique IF NOT EXISTS FOR (r:Relationship) REQUIRE r.id IS UNIQUE",
-                "CREATE CONSTRAINT variant_id_unique IF NOT EXISTS FOR (v:Variant) REQUIRE v.id IS UNIQUE"
+                "CREATE CONSTRAINT variant_id_unique IF NOT EXISTS FOR (v:Variant) REQUIRE v.id IS UNIQUE",
+                # Shared catalog version stamp, see coherence.py
+                "CREATE CONSTRAINT catalog_version_id_unique IF NOT EXISTS FOR (v:CatalogVersion) REQUIRE v.id IS UNIQUE"
             ]
             
             for constraint in constraints:
@@ -87,6 +144,21 @@ def create_constraints_and_indexes():
                 except Exception as e:
                     print(f"⚠️  Index may already exist: {e}")
             
+            # Create full-text indexes backing the /search endpoint
+            fulltext_indexes = [
+                "CREATE FULLTEXT INDEX object_name_fulltext IF NOT EXISTS FOR (o:Object) ON EACH [o.object]",
+                "CREATE FULLTEXT INDEX variant_name_fulltext IF NOT EXISTS FOR (v:Variant) ON EACH [v.name]",
+                "CREATE FULLTEXT INDEX variable_name_fulltext IF NOT EXISTS FOR (v:Variable) ON EACH [v.name]",
+                "CREATE FULLTEXT INDEX variable_taxonomy_fulltext IF NOT EXISTS FOR (n:Part|Group) ON EACH [n.name]"
+            ]
+            
+            for index in fulltext_indexes:
+                try:
+                    session.run(index)
+                    print(f"✅ Created full-text index: {index.split('INDEX')[1].split('IF')[0].strip()}")
+                except Exception as e:
+                    print(f"⚠️  Full-text index may already exist or is unsupported: {e}")
+            
             return True
             
         except Exception as e:
@@ -100,30 +172,6 @@ def seed_countries():
         print("No Neo4j connection available")
         return False
     
-    # List of all world countries
-    countries = [
-        "Afghanistan", "Albania", "Algeria", "Andorra", "Angola", "Antigua and Barbuda", "Argentina", "Armenia", "Australia", "Austria",
-        "Azerbaijan", "Bahamas", "Bahrain", "Bangladesh", "Barbados", "Belarus", "Belgium", "Belize", "Benin", "Bhutan",
-        "Bolivia", "Bosnia and Herzegovina", "Botswana", "Brazil", "Brunei", "Bulgaria", "Burkina Faso", "Burundi", "Cambodia", "Cameroon",
-        "Canada", "Cape Verde", "Central African Republic", "Chad", "Chile", "China", "Colombia", "Comoros", "Congo", "Costa Rica",
-        "Croatia", "Cuba", "Cyprus", "Czech Republic", "Denmark", "Djibouti", "Dominica", "Dominican Republic", "Ecuador", "Egypt",
-        "El Salvador", "Equatorial Guinea", "Eritrea", "Estonia", "Ethiopia", "Fiji", "Finland", "France", "Gabon", "Gambia",
-        "Georgia", "Germany", "Ghana", "Greece", "Grenada", "Guatemala", "Guinea", "Guinea-Bissau", "Guyana", "Haiti",
-        "Honduras", "Hungary", "Iceland", "India", "Indonesia", "Iran", "Iraq", "Ireland", "Israel", "Italy",
-        "Jamaica", "Japan", "Jordan", "Kazakhstan", "Kenya", "Kiribati", "North Korea", "South Korea", "Kuwait", "Kyrgyzstan",
-        "Laos", "Latvia", "Lebanon", "Lesotho", "Liberia", "Libya", "Liechtenstein", "Lithuania", "Luxembourg", "Macedonia",
-        "Madagascar", "Malawi", "Malaysia", "Maldives", "Mali", "Malta", "Marshall Islands", "Mauritania", "Mauritius", "Mexico",
-        "Micronesia", "Moldova", "Monaco", "Mongolia", "Montenegro", "Morocco", "Mozambique", "Myanmar", "Namibia", "Nauru",
-        "Nepal", "Netherlands", "New Zealand", "Nicaragua", "Niger", "Nigeria", "Norway", "Oman", "Pakistan", "Palau",
-        "Panama", "Papua New Guinea", "Paraguay", "Peru", "Philippines", "Poland", "Portugal", "Qatar", "Romania", "Russia",
-        "Rwanda", "Saint Kitts and Nevis", "Saint Lucia", "Saint Vincent and the Grenadines", "Samoa", "San Marino", "Sao Tome and Principe", "Saudi Arabia", "Senegal", "Serbia",
-        "Seychelles", "Sierra Leone", "Singapore", "Slovakia", "Slovenia", "Solomon Islands", "Somalia", "South Africa", "South Sudan", "Spain",
-        "Sri Lanka", "Sudan", "Suriname", "Swaziland", "Sweden", "Switzerland", "Syria", "Taiwan", "Tajikistan", "Tanzania",
-        "Thailand", "Togo", "Tonga", "Trinidad and Tobago", "Tunisia", "Turkey", "Turkmenistan", "Tuvalu", "Uganda", "Ukraine",
-        "United Arab Emirates", "United Kingdom", "United States", "Uruguay", "Uzbekistan", "Vanuatu", "Vatican City", "Venezuela", "Vietnam", "Yemen",
-        "Zambia", "Zimbabwe"
-    ]
-    
     with driver.session() as session:
         try:
             # Check if countries already exist
@@ -136,11 +184,10 @@ def seed_countries():
             session.run("MATCH (c:Country) DETACH DELETE c")
             print("🗑️  Cleared existing countries")
             
-            # Create all countries
-            for country in countries:
-                session.run("CREATE (c:Country {name: $name})", name=country)
+            # Create all countries in one statement
+            session.run("UNWIND $names AS name CREATE (c:Country {name: name})", names=COUNTRIES)
             
-            print(f"✅ Seeded {len(countries)} countries")
+            print(f"✅ Seeded {len(COUNTRIES)} countries")
             return True
             
         except Exception as e:
@@ -164,51 +211,17 @@ def seed_objects_taxonomy():
             print("🗑️  Cleared existing Objects taxonomy")
             
             # Create Beings
-            beings = ['Master', 'Mate', 'Process', 'Adjunct', 'Rule', 'Roster']
-            for being in beings:
-                session.run("CREATE (b:Being {name: $name})", name=being)
-            print(f"✅ Created {len(beings)} Beings")
+            session.run("UNWIND $names AS name CREATE (b:Being {name: name})", names=BEINGS)
+            print(f"✅ Created {len(BEINGS)} Beings")
             
             # Create Avatars with their Being relationships
-            avatar_data = [
-                # Master avatars
-                ('Master', 'Company'),
-                ('Master', 'Company Affiliate'),
-                ('Master', 'Employee'),
-                ('Master', 'Product'),
-                ('Master', 'Customer'),
-                ('Master', 'Supplier'),
-                # Mate avatars
-                ('Mate', 'Person'),
-                ('Mate', 'Thing'),
-                ('Mate', 'Reference'),
-                ('Mate', 'Register'),
-                # Process avatars
-                ('Process', 'Activity'),
-                ('Process', 'Transaction'),
-                ('Process', 'Payment'),
-                ('Process', 'Posting'),
-                # Adjunct avatars
-                ('Adjunct', 'Account'),
-                ('Adjunct', 'Attribute'),
-                # Rule avatars
-                ('Rule', 'Trigger'),
-                ('Rule', 'Validator'),
-                # Roster avatars
-                ('Roster', 'List')
-            ]
-            
-            for being_name, avatar_name in avatar_data:
-                # Create Avatar
-                session.run("CREATE (a:Avatar {name: $name})", name=avatar_name)
-                # Create relationship
-                session.run("""
-                    MATCH (b:Being {name: $being_name})
-                    MATCH (a:Avatar {name: $avatar_name})
-                    CREATE (b)-[:HAS_AVATAR]->(a)
-                """, being_name=being_name, avatar_name=avatar_name)
+            session.run("""
+                UNWIND $pairs AS pair
+                MATCH (b:Being {name: pair[0]})
+                CREATE (b)-[:HAS_AVATAR]->(a:Avatar {name: pair[1]})
+            """, pairs=[list(pair) for pair in BEING_AVATARS])
             
-            print(f"✅ Created {len(avatar_data)} Avatars with Being relationships")
+            print(f"✅ Created {len(BEING_AVATARS)} Avatars with Being relationships")
             
             return True
             
@@ -405,6 +418,27 @@ class ObjectResponse(BaseModel):
     relationshipsList: List[dict] = []
     variantsList: List[dict] = []
 
+class ObjectRelationshipItem(BaseModel):
+    id: str
+    type: Optional[str] = None
+    role: Optional[str] = None
+    toBeing: Optional[str] = None
+    toAvatar: Optional[str] = None
+    toObject: Optional[str] = None
+
+class ObjectVariantItem(BaseModel):
+    id: str
+    name: Optional[str] = None
+
+class ObjectListItem(ObjectResponse):
+    """Row of the objects grid (GET /objects); legacy nodes may lack taxonomy fields"""
+    driver: Optional[str] = None
+    being: Optional[str] = None
+    avatar: Optional[str] = None
+    object: Optional[str] = None
+    relationshipsList: List[ObjectRelationshipItem] = []
+    variantsList: List[ObjectVariantItem] = []
+
 class CSVRowData(BaseModel):
     """Schema for validating individual CSV rows"""
     Sector: str = Field(..., description="Sector name or 'ALL'")
@@ -492,6 +526,13 @@ class VariableResponse(BaseModel):
     objectRelationships: int
     objectRelationshipsList: List[dict] = []
 
+class VariableListItem(VariableResponse):
+    """Row of the variables grid (GET /variables); optional properties may be unset"""
+    section: Optional[str] = None
+    formatI: Optional[str] = None
+    formatII: Optional[str] = None
+    gType: Optional[str] = None
+
 class VariableCSVRowData(BaseModel):
     """Schema for a single CSV row for variable upload"""
     Sector: str = Field(..., description="Sector name or 'ALL'")
@@ -525,5 +566,36 @@ class CSVUploadResponse(BaseModel):
     errors: List[str] = []
     created_objects: List[dict] = []
 
+# Typeahead Models
+class TypeaheadCompletion(BaseModel):
+    """Schema for a single typeahead completion"""
+    value: str
+    count: int = Field(..., description="Number of objects under this value in the requested scope")
+
+# Search Models
+class SearchHit(BaseModel):
+    """Schema for a single ranked search hit"""
+    type: str = Field(..., description="object, variant, variable, part, group or section")
+    id: str
+    name: str
+    score: float
+    match: str = Field(..., description="exact, prefix, substring or fuzzy")
+    being: Optional[str] = None
+    avatar: Optional[str] = None
+    object: Optional[str] = None
+    objectId: Optional[str] = None
+    part: Optional[str] = None
+    group: Optional[str] = None
+    section: Optional[str] = None
+
+class SearchResponse(BaseModel):
+    """Schema for a page of search results"""
+    query: str
+    backend: str
+    offset: int
+    limit: int
+    hasMore: bool
+    hits: List[SearchHit] = []
+
 if __name__ == "__main__":
     setup_schema()
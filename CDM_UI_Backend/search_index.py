@@ -0,0 +1,419 @@
+"""
+In-process n-gram search index for the CDM_UI backend.
+
+Used as the fallback search backend when Neo4j full-text indexes are not
+available (local Neo4j without the schema setup applied, older versions).
+Provides ranked exact, prefix, substring and fuzzy matching over entity names,
+plus the incrementally maintained typeahead index for taxonomy pickers.
+"""
+
+import heapq
+import logging
+import re
+import threading
+from bisect import bisect_left, insort
+from collections import Counter
+from itertools import chain
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Minimum trigram (Dice) similarity for a fuzzy hit
+FUZZY_THRESHOLD = 0.35
+
+# Base scores for the match tiers (before the length penalty)
+_NAME_PREFIX = 0.9
+_WORD_PREFIX = 0.8
+_SUBSTRING = 0.6
+_FUZZY_WEIGHT = 0.5
+
+_TOKEN_SPLIT = re.compile(r"[^0-9a-z]+")
+
+def normalize(text: Optional[str]) -> str:
+    """Lower-case and collapse whitespace so matching is case-insensitive"""
+    if not text:
+        return ""
+    return " ".join(str(text).lower().split())
+
+def tokenize(text: str) -> List[str]:
+    """Split normalized text into alphanumeric word tokens"""
+    return [token for token in _TOKEN_SPLIT.split(text) if token]
+
+def trigrams(text: str) -> Set[str]:
+    """Padded trigrams of normalized text (padding marks word boundaries)"""
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+def _length_penalty(query: str, name: str) -> float:
+    """Small penalty so shorter names rank higher within a match tier"""
+    return min(len(name) - len(query), 100) / 1000 if len(name) > len(query) else 0.0
+
+def score_match(query: str, name: str) -> Optional[Tuple[float, str]]:
+    """
+    Score how well a normalized query matches a normalized name.
+    Returns (score, match_kind) or None when the name does not match.
+    Tiers: exact > prefix > word prefix > substring > fuzzy; shorter names
+    rank higher within a tier.
+    """
+    if not query or not name:
+        return None
+
+    length_penalty = _length_penalty(query, name)
+
+    if name == query:
+        return 1.0, "exact"
+    if name.startswith(query):
+        return _NAME_PREFIX - length_penalty, "prefix"
+    if any(token.startswith(query) for token in tokenize(name)):
+        return _WORD_PREFIX - length_penalty, "prefix"
+    if query in name:
+        return _SUBSTRING - length_penalty, "substring"
+
+    if len(query) < 3:
+        return None
+    query_grams = trigrams(query)
+    name_grams = trigrams(name)
+    similarity = 2 * len(query_grams & name_grams) / (len(query_grams) + len(name_grams))
+    if similarity < FUZZY_THRESHOLD:
+        return None
+    return round(_FUZZY_WEIGHT * similarity, 4), "fuzzy"
+
+class NgramIndex:
+    """
+    Immutable n-gram index over search documents.
+    Each document is a dict with at least "type", "id" and "name"; any other
+    keys are returned unchanged as hit context.
+    """
+
+    def __init__(self, documents: Iterable[Dict[str, Any]]):
+        self._documents: List[Dict[str, Any]] = []
+        self._names: List[str] = []
+        self._gram_counts: List[int] = []
+        self._postings: Dict[str, List[int]] = {}
+        keys: List[Tuple[str, int, float]] = []
+
+        for document in documents:
+            name = normalize(document.get("name"))
+            if not name:
+                continue
+            doc_index = len(self._documents)
+            self._documents.append(document)
+            self._names.append(name)
+
+            grams = trigrams(name)
+            self._gram_counts.append(len(grams))
+            for gram in grams:
+                self._postings.setdefault(gram, []).append(doc_index)
+
+            # Full name and each word token feed the sorted prefix table
+            keys.append((name, doc_index, _NAME_PREFIX))
+            for token in set(tokenize(name)):
+                if token != name:
+                    keys.append((token, doc_index, _WORD_PREFIX))
+
+        keys.sort()
+        self._prefix_keys = [key for key, _, _ in keys]
+        self._prefix_docs = [doc_index for _, doc_index, _ in keys]
+        self._prefix_bases = [base for _, _, base in keys]
+
+    def __len__(self) -> int:
+        return len(self._documents)
+
+    def _score_prefix(self, query: str, scored: Dict[int, Tuple[float, str]]):
+        """Score documents whose full name or one of its words starts with the query"""
+        start = bisect_left(self._prefix_keys, query)
+        end = bisect_left(self._prefix_keys, query + "\uffff", start)
+        names = self._names
+        query_length = len(query)
+        for doc_index, base in zip(self._prefix_docs[start:end], self._prefix_bases[start:end]):
+            name_length = len(names[doc_index])
+            if name_length == query_length and base == _NAME_PREFIX:
+                scored[doc_index] = (1.0, "exact")
+                continue
+            score = base - min(name_length - query_length, 100) / 1000
+            current = scored.get(doc_index)
+            if current is None or current[0] < score:
+                scored[doc_index] = (score, "prefix")
+
+    def _score_grams(self, query: str, scored: Dict[int, Tuple[float, str]]):
+        """Score substring and fuzzy matches from shared trigram counts"""
+        query_grams = trigrams(query)
+        counts = Counter(chain.from_iterable(self._postings.get(gram, ()) for gram in query_grams))
+
+        # A substring hit shares every unpadded query trigram; a fuzzy hit
+        # needs a Dice similarity of at least FUZZY_THRESHOLD
+        substring_grams = len({query[i:i + 3] for i in range(len(query) - 2)})
+        query_size = len(query_grams)
+        min_shared = min(substring_grams, FUZZY_THRESHOLD * (query_size + 1) / 2)
+        names = self._names
+        gram_counts = self._gram_counts
+        for doc_index, count in counts.items():
+            if count < min_shared or doc_index in scored:
+                continue
+            name = names[doc_index]
+            if count >= substring_grams and query in name:
+                scored[doc_index] = (_SUBSTRING - _length_penalty(query, name), "substring")
+                continue
+            similarity = 2 * count / (query_size + gram_counts[doc_index])
+            if similarity >= FUZZY_THRESHOLD:
+                scored[doc_index] = (round(_FUZZY_WEIGHT * similarity, 4), "fuzzy")
+
+    def search(
+        self,
+        query: str,
+        types: Optional[Set[str]] = None,
+        limit: int = 20,
+        offset: int = 0,
+    ) -> Tuple[List[Dict[str, Any]], bool]:
+        """
+        Return (hits, has_more) for one page of ranked results.
+        Each hit is the document plus "score" and "match" keys.
+        """
+        normalized_query = normalize(query)
+        if not normalized_query:
+            return [], False
+
+        documents = self._documents
+        needed = offset + limit
+
+        scored: Dict[int, Tuple[float, str]] = {}
+        self._score_prefix(normalized_query, scored)
+        if types:
+            scored = {i: result for i, result in scored.items() if documents[i]["type"] in types}
+
+        # Substring and fuzzy hits always rank below prefix hits, so they are
+        # only needed when the prefix tier cannot fill the requested page
+        if len(normalized_query) >= 3 and len(scored) <= needed:
+            self._score_grams(normalized_query, scored)
+            if types:
+                scored = {i: result for i, result in scored.items() if documents[i]["type"] in types}
+
+        # Only the requested page needs ordering, not every matching document
+        names = self._names
+        ranked = heapq.nsmallest(
+            needed,
+            scored.items(),
+            key=lambda item: (-item[1][0], names[item[0]], documents[item[0]]["type"], item[0]),
+        )
+
+        hits = []
+        for doc_index, (score, match) in ranked[offset:]:
+            hit = dict(documents[doc_index])
+            hit["score"] = round(score, 4)
+            hit["match"] = match
+            hits.append(hit)
+        return hits, len(scored) > needed
+
+class VersionedIndex:
+    """
+    Holds one NgramIndex per catalog version. Once an index exists, a
+    newer catalog version is picked up by one background rebuild while
+    readers keep searching the previous index; only readers that need a
+    version the old index does not have (their own writes) wait for it.
+    """
+
+    def __init__(self, loader: Callable[[], Iterable[Dict[str, Any]]]):
+        self._loader = loader
+        self._lock = threading.Lock()
+        self._rebuilding = threading.Lock()
+        self._version: Optional[int] = None
+        self._index: Optional[NgramIndex] = None
+
+    def _build(self, version: int):
+        # Called with _lock held; the catalog is at least version when the loader reads it
+        if self._index is None or self._version < version:
+            self._index = NgramIndex(self._loader())
+            self._version = version
+
+    def _rebuild_in_background(self, version: int):
+        if not self._rebuilding.acquire(blocking=False):
+            return
+
+        def rebuild():
+            try:
+                with self._lock:
+                    self._build(version)
+            except Exception as e:
+                logger.warning("Search index rebuild for version %s failed: %s", version, e)
+            finally:
+                self._rebuilding.release()
+
+        threading.Thread(target=rebuild, name="search-index-rebuild", daemon=True).start()
+
+    def get(self, version: int, min_version: Optional[int] = None) -> NgramIndex:
+        """
+        The index for version. With min_version given, an older index at
+        least that recent is returned right away and the rebuild runs in
+        the background; otherwise the caller builds (or waits for) it.
+        """
+        index, built = self._index, self._version
+        if index is not None and built == version:
+            return index
+        if index is not None and min_version is not None and built >= min_version:
+            self._rebuild_in_background(version)
+            return index
+        with self._lock:
+            self._build(version)
+            return self._index
+
+class _CompletionBucket:
+    """Sorted distinct values with object counts for one typeahead scope"""
+
+    def __init__(self):
+        self.keys: List[Tuple[str, str]] = []
+        self.counts: Dict[str, int] = {}
+        self.pinned: Set[str] = set()
+
+    def add(self, value: str, delta: int):
+        count = self.counts.get(value)
+        if count is None:
+            if delta <= 0 and value not in self.pinned:
+                return
+            insort(self.keys, (normalize(value), value))
+            count = 0
+        count = max(count + delta, 0)
+        if count == 0 and value not in self.pinned:
+            del self.counts[value]
+            position = bisect_left(self.keys, (normalize(value), value))
+            del self.keys[position]
+        else:
+            self.counts[value] = count
+
+    def complete(self, prefix: str, limit: int, order: str) -> List[Dict[str, Any]]:
+        start = bisect_left(self.keys, (prefix,))
+        end = bisect_left(self.keys, (prefix + "\uffff",), start)
+        if order == "alpha":
+            window = self.keys[start:min(end, start + limit)]
+        else:
+            window = heapq.nsmallest(
+                limit, self.keys[start:end], key=lambda key: (-self.counts[key[1]], key)
+            )
+        return [{"value": value, "count": self.counts[value]} for _, value in window]
+
+class TypeaheadIndex:
+    """
+    In-memory prefix index over the Objects taxonomy (Being, Avatar, Object).
+    Loaded once with a bulk read, then kept current incrementally by the
+    object write routes through add_object / remove_object; invalidate()
+    makes the next lookup load it again.
+    """
+
+    FIELDS = ("being", "avatar", "object")
+
+    def __init__(self, loader: Callable[[], Tuple[Iterable[Tuple[str, str, str]], Iterable[Tuple[str, Optional[str]]]]]):
+        self._loader = loader
+        self._lock = threading.Lock()
+        self._load_lock = threading.Lock()
+        self._buckets: Optional[Dict[Tuple[str, Optional[str], Optional[str]], _CompletionBucket]] = None
+        self._loading = False
+        self._stale = False
+
+    @staticmethod
+    def _scopes(being: str, avatar: str):
+        """Every (field, being scope, avatar scope) bucket a taxonomy triple belongs to"""
+        yield ("being", None, None), being
+        yield ("avatar", None, None), avatar
+        yield ("avatar", being, None), avatar
+        yield ("object", None, None), None
+        yield ("object", being, None), None
+        yield ("object", None, avatar), None
+        yield ("object", being, avatar), None
+
+    def _apply(self, buckets, being: str, avatar: str, object_name: str, delta: int, pin: bool = False):
+        for scope, value in self._scopes(being, avatar):
+            value = value if value is not None else object_name
+            if value is None:
+                continue
+            bucket = buckets.get(scope)
+            if bucket is None:
+                if delta <= 0 and not pin:
+                    continue
+                bucket = buckets[scope] = _CompletionBucket()
+            if pin:
+                bucket.pinned.add(value)
+            bucket.add(value, delta)
+
+    def _build(self):
+        objects, taxonomy = self._loader()
+        buckets: Dict[Tuple[str, Optional[str], Optional[str]], _CompletionBucket] = {}
+        # Being/Avatar taxonomy nodes stay listed even with no objects under them
+        for being, avatar in taxonomy:
+            if avatar is None:
+                bucket = buckets.setdefault(("being", None, None), _CompletionBucket())
+                bucket.pinned.add(being)
+                bucket.add(being, 0)
+            else:
+                self._apply(buckets, being, avatar, None, 0, pin=True)
+        for being, avatar, object_name in objects:
+            if being and avatar and object_name:
+                self._apply(buckets, being, avatar, object_name, 1)
+        return buckets
+
+    def _ensure_loaded(self):
+        buckets = self._buckets
+        if buckets is not None and not self._stale:
+            return buckets
+        with self._load_lock:
+            with self._lock:
+                if self._buckets is not None and not self._stale:
+                    return self._buckets
+                self._loading = True
+                self._stale = False
+            try:
+                buckets = self._build()
+            finally:
+                with self._lock:
+                    self._loading = False
+            with self._lock:
+                self._buckets = buckets
+            return buckets
+
+    def load(self):
+        """Build the index now instead of on the first lookup"""
+        self._ensure_loaded()
+
+    def add_object(self, being: str, avatar: str, object_name: str):
+        """Record a newly created object"""
+        self._update(being, avatar, object_name, 1)
+
+    def remove_object(self, being: str, avatar: str, object_name: str):
+        """Record a deleted object"""
+        self._update(being, avatar, object_name, -1)
+
+    def invalidate(self):
+        """Force a full reload on the next lookup"""
+        with self._lock:
+            self._stale = True
+
+    def _update(self, being: str, avatar: str, object_name: str, delta: int):
+        with self._lock:
+            if self._loading:
+                # A bulk load is reading concurrently and may or may not see this write
+                self._stale = True
+                return
+            if self._buckets is None or not (being and avatar and object_name):
+                return
+            self._apply(self._buckets, being, avatar, object_name, delta)
+
+    def complete(
+        self,
+        field: str,
+        prefix: str = "",
+        being: Optional[str] = None,
+        avatar: Optional[str] = None,
+        limit: int = 10,
+        order: str = "count",
+    ) -> List[Dict[str, Any]]:
+        """Top completions for a field within an optional being/avatar scope"""
+        if field == "being":
+            scope = ("being", None, None)
+        elif field == "avatar":
+            scope = ("avatar", being, None)
+        else:
+            scope = ("object", being, avatar)
+        buckets = self._ensure_loaded()
+        with self._lock:
+            bucket = buckets.get(scope)
+            if bucket is None:
+                return []
+            return bucket.complete(normalize(prefix), limit, order)
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Seed a CDM catalog with generated data at any scale
+Generates a deterministic synthetic catalog (synthetic.py: skewed
+being/avatar popularity, driver selectivity, variant counts and
+relationship fan-out) and writes it to one of:
+  neo4j   - batched UNWIND transactions against CDM_NEO4J_* (schema constraints first);
+            not yet run against a live server, try it on a scratch database first
+  csv     - upload files for the driver, object, variable and variant endpoints under --out
+  memory  - a snapshot file for the memory backend (CDM_MEMORY_SNAPSHOT)
+
+Usage (from CDM_UI_Backend):
+  python seed.py --objects 100000 [--target neo4j] [--clear] [--batch-size 5000]
+  python seed.py --objects 10000 --target csv --out seed-data
+  python seed.py --objects 10000 --target memory --snapshot catalog.json
+Profile options (--skew, --max-fanout, ...) override synthetic.PROFILE.
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import synthetic
+
+def clear_neo4j():
+    """Delete every node in batches so large graphs don't need one huge transaction"""
+    from db import get_driver
+
+    driver = get_driver()
+    if not driver:
+        print("❌ No Neo4j connection available")
+        return False
+    with driver.session() as session:
+        session.run("MATCH (n) CALL { WITH n DETACH DELETE n } IN TRANSACTIONS OF 10000 ROWS").consume()
+    print("🗑️  Cleared all data from Neo4j database")
+    return True
+
+def seed_neo4j(catalog, args):
+    from schema import create_constraints_and_indexes
+
+    if args.clear and not clear_neo4j():
+        return False
+    if not create_constraints_and_indexes():
+        print("❌ Failed to create constraints and indexes")
+        return False
+    started = time.perf_counter()
+
+    def progress(phase, rows):
+        print(f"  {phase:<22} {rows:>10} rows  {time.perf_counter() - started:8.1f}s")
+
+    synthetic.write_neo4j(catalog, args.batch_size, progress)
+    return True
+
+def seed_csv(catalog, args):
+    for name, path in synthetic.write_csv(catalog, args.out).items():
+        print(f"  {name:<22} {path}")
+    print("Upload drivers.json first (POST /drivers/{type}/bulk), then objects.csv and variables.csv")
+    return True
+
+def seed_memory(catalog, args):
+    os.environ["CDM_GRAPH_BACKEND"] = "memory"
+    from repositories.memory import MemoryGraph
+
+    if os.path.exists(args.snapshot) and not args.clear:
+        print(f"❌ {args.snapshot} exists; pass --clear to replace it")
+        return False
+    graph = MemoryGraph(snapshot="")
+    graph.start()
+    synthetic.load(graph, catalog, args.batch_size)
+    graph.snapshot = args.snapshot
+    graph.close()
+    print(f"  {len(graph.store.nodes)} nodes, {len(graph.store.edges)} edges written to {args.snapshot}")
+    return True
+
+TARGETS = {"neo4j": seed_neo4j, "csv": seed_csv, "memory": seed_memory}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--objects", type=int, default=10000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--target", choices=sorted(TARGETS), default="neo4j",
+                        help="neo4j is unverified: it has not been run against a live server yet")
+    parser.add_argument("--batch-size", type=int, default=5000)
+    parser.add_argument("--out", default="seed-data", help="directory for --target csv")
+    parser.add_argument("--snapshot", default="catalog.json", help="file for --target memory")
+    parser.add_argument("--clear", action="store_true", help="delete existing data (neo4j) or snapshot (memory) first")
+    for name, default in synthetic.PROFILE.items():
+        parser.add_argument(f"--{name.replace('_', '-')}", dest=name, type=type(default), default=default)
+    args = parser.parse_args()
+
+    print(f"Generating {args.objects} objects (seed {args.seed})...")
+    started = time.perf_counter()
+    catalog = synthetic.generate(args.objects, args.seed, **{name: getattr(args, name) for name in synthetic.PROFILE})
+    counts = synthetic.summary(catalog)
+    counts["relationships"] = sum(1 for _ in synthetic.resolve_relationships(catalog))
+    print("  " + ", ".join(f"{value} {name}" for name, value in counts.items()) + f" in {time.perf_counter() - started:.1f}s")
+
+    print(f"Writing to {args.target}...")
+    started = time.perf_counter()
+    if not TARGETS[args.target](catalog, args):
+        sys.exit(1)
+    print(f"🎉 Seeded in {time.perf_counter() - started:.1f}s")
+
+if __name__ == "__main__":
+    main()
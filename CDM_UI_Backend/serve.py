@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Production entry point for the CDM_UI backend.
+
+Runs the API under uvicorn with one worker process per CPU core (by
+default), using uvloop and httptools when they are installed.
+
+The parent process only supervises: it never imports the application, so
+every worker builds its own Neo4j driver, connection pool, log writer thread
+and read caches in its lifespan, after the worker has started. The
+deployment-wide connection budget CDM_NEO4J_POOL_BUDGET is split evenly
+across the workers (see db.MAX_CONNECTION_POOL_SIZE).
+
+Signals to the parent process:
+  SIGHUP             rolling restart, one worker at a time (e.g. after a deploy)
+  SIGTERM / SIGINT   graceful shutdown; each worker drains as in lifespan.py
+  SIGTTIN / SIGTTOU  add / remove a worker; the per-worker pool size is fixed
+                     at startup, so adding workers can exceed the pool budget
+
+Configuration:
+  CDM_HOST / CDM_PORT       bind address (default 0.0.0.0:8000)
+  CDM_WORKERS               worker processes (default: number of CPU cores)
+  CDM_LOOP / CDM_HTTP       event loop and HTTP parser (default uvloop / httptools
+                            when importable, otherwise asyncio / h11)
+  CDM_GRACEFUL_TIMEOUT      seconds a stopping worker may take to finish in-flight
+                            requests (default 30)
+  CDM_MAX_REQUESTS          recycle a worker after this many requests, with up to
+                            10% jitter so workers do not restart together (default 0: never)
+  CDM_KEEPALIVE_TIMEOUT     idle keep-alive connection timeout in seconds (default 5)
+  CDM_ACCESS_LOG            uvicorn access log per request (default false; request
+                            latency is in /metrics and traces)
+
+Usage (from CDM_UI_Backend): python serve.py
+"""
+
+import importlib.util
+import os
+from typing import Optional
+
+import uvicorn
+
+def _installed(module: str) -> bool:
+    return importlib.util.find_spec(module) is not None
+
+def _default_workers() -> int:
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+HOST = os.getenv("CDM_HOST", "0.0.0.0")
+PORT = int(os.getenv("CDM_PORT", "8000"))
+WORKERS = int(os.getenv("CDM_WORKERS", "0")) or _default_workers()
+LOOP = os.getenv("CDM_LOOP", "uvloop" if _installed("uvloop") else "asyncio")
+HTTP = os.getenv("CDM_HTTP", "httptools" if _installed("httptools") else "h11")
+GRACEFUL_TIMEOUT = int(os.getenv("CDM_GRACEFUL_TIMEOUT", "30"))
+MAX_REQUESTS = int(os.getenv("CDM_MAX_REQUESTS", "0"))
+KEEPALIVE_TIMEOUT = int(os.getenv("CDM_KEEPALIVE_TIMEOUT", "5"))
+ACCESS_LOG = os.getenv("CDM_ACCESS_LOG", "false").lower() in ("1", "true", "yes")
+
+def run(app: str = "main:app", workers: Optional[int] = None, port: Optional[int] = None):
+    """Serve `app` (an import string, imported inside each worker)"""
+    workers = workers or WORKERS
+    # Workers inherit the environment; db.py sizes its pool from this
+    os.environ["CDM_WORKERS"] = str(workers)
+    print(f"Starting {workers} worker(s) on {HOST}:{port or PORT} (loop={LOOP}, http={HTTP})", flush=True)
+    uvicorn.run(
+        app,
+        host=HOST,
+        port=port or PORT,
+        workers=workers,
+        loop=LOOP,
+        http=HTTP,
+        timeout_graceful_shutdown=GRACEFUL_TIMEOUT,
+        limit_max_requests=MAX_REQUESTS or None,
+        limit_max_requests_jitter=MAX_REQUESTS // 10,
+        timeout_keep_alive=KEEPALIVE_TIMEOUT,
+        access_log=ACCESS_LOG,
+        proxy_headers=True,
+    )
+
+if __name__ == "__main__":
+    run()
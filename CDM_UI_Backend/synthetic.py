@@ -0,0 +1,464 @@
+"""
+Deterministic synthetic CDM catalogs for the CDM_UI backend.
+
+generate(objects, seed) returns the same catalog for the same arguments.
+Popularity is skewed the way real catalogs are: a few beings and avatars
+hold most objects (Zipf over the taxonomy from schema.py plus generated
+avatars), specific driver selections favour a few popular values while a
+share of objects uses ALL per dimension, and variant counts and
+relationship fan-out are heavy tailed with a few hub objects attracting
+most of the relationships and variable links. Occasional pattern
+relationships target a whole avatar (toObject ALL).
+
+A catalog can be written three ways:
+  load()        - through the repositories of a GraphBackend (memory or neo4j)
+  write_neo4j() - straight to Neo4j with batched UNWIND statements
+  write_csv()   - as files for the driver, object, variable and variant uploads
+
+Profile (keyword arguments of generate, defaults in PROFILE):
+  skew          - Zipf exponent for avatars, driver values, parts, groups and hubs
+  *_wildcard    - share of ALL per driver dimension; ALL countries fans out to every Country
+  variant_tail / max_variants - Pareto shape and cap of variants per object
+  fanout_tail / max_fanout    - Pareto shape and cap of specific relationships per object
+  pattern_share - share of objects with one pattern relationship to a whole avatar
+  variables     - variables per object
+"""
+
+import csv
+import itertools
+import json
+import os
+import random
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence
+
+from repositories import ALL, DRIVER_LABELS, GraphBackend, format_driver_string, is_clarifier
+
+PROFILE = {
+    "skew": 1.1,
+    "sector_wildcard": 0.3,
+    "domain_wildcard": 0.3,
+    "country_wildcard": 0.03,
+    "clarifier_share": 0.3,
+    "variant_tail": 1.3,
+    "max_variants": 40,
+    "fanout_tail": 1.2,
+    "max_fanout": 200,
+    "pattern_share": 0.01,
+    "variables": 0.5
+}
+
+# Objects per generated avatar, on average
+OBJECTS_PER_AVATAR = 50
+
+RELATIONSHIP_TYPES = ("Inter-Table", "Intra-Table")
+ROLES = ("Owner", "Member", "Parent", "Child")
+PARTS = ("Identity", "Finance", "Contact", "Status", "Location", "Classification", "Schedule", "Measure")
+FORMATS = (("Text", "Short"), ("Text", "Long"), ("Number", "Integer"), ("Number", "Decimal"), ("Date", "Date"), ("List", "Static"))
+
+def _zipf(values: Sequence[Any], skew: float) -> List[float]:
+    """Cumulative Zipf weights for values in popularity order, for rng.choices"""
+    return list(itertools.accumulate(1 / rank ** skew for rank in range(1, len(values) + 1)))
+
+def _tail(rng: random.Random, shape: float, cap: int) -> int:
+    """0, 1, 2, ... with P(n >= k) = (k + 1) ** -shape, capped"""
+    return min(cap, int(rng.paretovariate(shape)) - 1)
+
+def _pick(rng: random.Random, values: List[str], weights: List[float], wildcard: float, most: int) -> List[str]:
+    if rng.random() < wildcard:
+        return [ALL]
+    count = min(most, int(rng.paretovariate(2.0)))
+    picked = set()
+    while len(picked) < count:
+        picked.add(rng.choices(values, cum_weights=weights)[0])
+    return sorted(picked)
+
+def generate(objects: int, seed: int = 42, **profile) -> Dict[str, Any]:
+    from schema import BEING_AVATARS, BEINGS, COUNTRIES
+
+    unknown = set(profile) - set(PROFILE)
+    if unknown:
+        raise TypeError(f"Unknown profile settings: {', '.join(sorted(unknown))}")
+    settings = {**PROFILE, **profile}
+    skew = settings["skew"]
+
+    rng = random.Random(seed)
+    sectors = [f"Sector {i:02d}" for i in range(12)]
+    domains = [f"Domain {i:02d}" for i in range(20)]
+    object_clarifiers = [f"Object Clarifier {i}" for i in range(6)]
+    variable_clarifiers = [f"Variable Clarifier {i}" for i in range(6)]
+    countries = list(COUNTRIES)
+    # Popularity order for countries is random but fixed by the seed
+    popular_countries = rng.sample(countries, len(countries))
+    sector_weights, domain_weights, country_weights = _zipf(sectors, skew), _zipf(domains, skew), _zipf(countries, skew)
+
+    # The schema taxonomy first (the most popular avatars), then generated ones under Zipf-popular beings
+    avatars = list(BEING_AVATARS)
+    being_weights = _zipf(BEINGS, skew)
+    for i in range(max(0, objects // OBJECTS_PER_AVATAR - len(avatars))):
+        avatars.append((rng.choices(BEINGS, cum_weights=being_weights)[0], f"Avatar {i:04d}"))
+    assigned = rng.choices(avatars, cum_weights=_zipf(avatars, skew), k=objects)
+
+    object_rows = []
+    for i, (being, avatar) in enumerate(assigned):
+        object_rows.append({
+            "id": f"obj-{i:06d}",
+            "being": being,
+            "avatar": avatar,
+            "object": f"Object {i:06d}",
+            "sectors": _pick(rng, sectors, sector_weights, settings["sector_wildcard"], 4),
+            "domains": _pick(rng, domains, domain_weights, settings["domain_wildcard"], 3),
+            "countries": _pick(rng, popular_countries, country_weights, settings["country_wildcard"], 5),
+            "clarifier": rng.choice(object_clarifiers) if rng.random() < settings["clarifier_share"] else None,
+            "variants": [f"Variant {i:06d}-{k}" for k in range(_tail(rng, settings["variant_tail"], settings["max_variants"]))]
+        })
+
+    # Hubs: a random popularity order over the objects
+    hubs = rng.sample(object_rows, len(object_rows))
+    hub_weights = _zipf(hubs, skew)
+
+    relationships = []
+    for source in object_rows:
+        fanout = _tail(rng, settings["fanout_tail"], settings["max_fanout"])
+        for target in (rng.choices(hubs, cum_weights=hub_weights, k=fanout) if fanout else ()):
+            relationships.append({
+                "source": source["id"], "type": rng.choice(RELATIONSHIP_TYPES), "role": rng.choice(ROLES),
+                "toBeing": target["being"], "toAvatar": target["avatar"], "toObject": target["object"]
+            })
+        if rng.random() < settings["pattern_share"]:
+            # Uniform over avatars so one pattern rarely fans out to the largest avatar
+            being, avatar = avatars[rng.randrange(len(avatars))]
+            relationships.append({
+                "source": source["id"], "type": "Inter-Table", "role": rng.choice(ROLES),
+                "toBeing": being, "toAvatar": avatar, "toObject": ALL
+            })
+
+    groups = [f"Group {i:03d}" for i in range(max(objects // 200, 10))]
+    group_weights, part_weights = _zipf(groups, skew), _zipf(PARTS, skew)
+    variable_rows = []
+    for i in range(int(objects * settings["variables"])):
+        format_i, format_ii = rng.choice(FORMATS)
+        linked = _tail(rng, 1.5, 20)
+        variable_rows.append({
+            "id": f"var-{i:06d}",
+            "part": rng.choices(PARTS, cum_weights=part_weights)[0],
+            "group": rng.choices(groups, cum_weights=group_weights)[0],
+            "driver": ", ".join([
+                _pick(rng, sectors, sector_weights, settings["sector_wildcard"], 1)[0],
+                _pick(rng, domains, domain_weights, settings["domain_wildcard"], 1)[0],
+                _pick(rng, popular_countries, country_weights, settings["country_wildcard"], 1)[0],
+                rng.choice(variable_clarifiers) if rng.random() < settings["clarifier_share"] else "None"
+            ]),
+            "fields": {
+                "variable": f"Variable {i:06d}",
+                "section": f"Section {rng.randrange(12):02d}",
+                "formatI": format_i,
+                "formatII": format_ii,
+                "gType": "Attribute",
+                "validation": "",
+                "default": "",
+                "graph": "Yes",
+                "status": "Active"
+            },
+            "objects": sorted({row["id"] for row in (rng.choices(hubs, cum_weights=hub_weights, k=linked) if linked else ())})
+        })
+
+    return {
+        "seed": seed,
+        "profile": settings,
+        "drivers": {
+            "Sector": sectors, "Domain": domains,
+            "ObjectClarifier": object_clarifiers, "VariableClarifier": variable_clarifiers
+        },
+        "countries": countries,
+        "avatars": avatars,
+        "objects": object_rows,
+        "relationships": relationships,
+        "variables": variable_rows
+    }
+
+def driver_string(row: Dict[str, Any]) -> str:
+    return format_driver_string(row["sectors"], row["domains"], row["countries"], row["clarifier"])
+
+def resolve_relationships(catalog: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+    """RELATES_TO edges the relationship rules expand to, with the ids load() gives them"""
+    by_name, by_avatar = {}, {}
+    for row in catalog["objects"]:
+        by_name[(row["being"], row["avatar"], row["object"])] = row["id"]
+        by_avatar.setdefault((row["being"], row["avatar"]), []).append(row["id"])
+    for n, rel in enumerate(catalog["relationships"]):
+        if rel["toObject"] == ALL:
+            targets = by_avatar.get((rel["toBeing"], rel["toAvatar"]), [])
+        else:
+            target = by_name.get((rel["toBeing"], rel["toAvatar"], rel["toObject"]))
+            targets = [target] if target else []
+        for k, target in enumerate(targets):
+            yield {**rel, "id": f"rel-{n:07d}-{k}", "target": target}
+
+def summary(catalog: Dict[str, Any]) -> Dict[str, int]:
+    return {
+        "objects": len(catalog["objects"]),
+        "variants": sum(len(row["variants"]) for row in catalog["objects"]),
+        "relationshipRules": len(catalog["relationships"]),
+        "variables": len(catalog["variables"]),
+        "variableLinks": sum(len(row["objects"]) for row in catalog["variables"])
+    }
+
+def _batches(rows: Iterable[Any], batch_size: int) -> Iterator[List[Any]]:
+    rows = iter(rows)
+    while True:
+        batch = list(itertools.islice(rows, batch_size))
+        if not batch:
+            return
+        yield batch
+
+def load(graph: GraphBackend, catalog: Dict[str, Any], batch_size: int = 1000) -> Dict[str, int]:
+    """Write the catalog in units of work of batch_size rows; returns entity counts"""
+    def drivers(repos):
+        for label, names in catalog["drivers"].items():
+            for name in names:
+                if not repos.drivers.exists(label, name):
+                    repos.drivers.create(label, name)
+
+    graph.execute_write(drivers)
+
+    def objects(repos, rows):
+        for row in rows:
+            repos.objects.create(row["id"], driver_string(row), row["being"], row["avatar"], row["object"], "Active")
+            repos.objects.link_drivers(row["id"], row["sectors"], row["domains"], row["countries"], row["clarifier"])
+            for k, name in enumerate(row["variants"]):
+                repos.objects.create_variant(f"{row['id']}-v{k}", name)
+                repos.objects.attach_variant(row["id"], f"{row['id']}-v{k}")
+
+    def relationships(repos, rows):
+        for rel in rows:
+            repos.objects.relate(
+                rel["source"], rel["target"], rel["id"], rel["type"], rel["role"],
+                rel["toBeing"], rel["toAvatar"], rel["toObject"]
+            )
+
+    def counts(repos, rows):
+        for row in rows:
+            repos.objects.update_counts(row["id"])
+
+    def variables(repos, rows):
+        for row in rows:
+            repos.variables.create(row["id"], row["part"], row["group"], row["fields"])
+            repos.variables.link_drivers(row["id"], row["driver"])
+            for object_id in row["objects"]:
+                repos.variables.link_object(row["id"], object_id, "seed")
+
+    for work, rows in ((objects, catalog["objects"]), (relationships, resolve_relationships(catalog)),
+                       (counts, catalog["objects"]), (variables, catalog["variables"])):
+        for batch in _batches(rows, batch_size):
+            graph.execute_write(lambda repos: work(repos, batch))
+
+    return summary(catalog)
+
+# Batched UNWIND statements for write_neo4j; every statement takes $rows
+_MERGE_DRIVERS = "UNWIND $rows AS name MERGE (:{label} {{name: name}})"
+
+_MERGE_AVATARS = """
+    UNWIND $rows AS row
+    MERGE (b:Being {name: row.being})
+    MERGE (a:Avatar {name: row.avatar})
+    MERGE (b)-[:HAS_AVATAR]->(a)
+"""
+
+_CREATE_OBJECTS = """
+    UNWIND $rows AS row
+    MATCH (a:Avatar {name: row.avatar})
+    CREATE (o:Object {
+        id: row.id,
+        name: row.object,
+        driver: row.driver,
+        being: row.being,
+        avatar: row.avatar,
+        object: row.object,
+        status: 'Active',
+        relationships: row.relationships,
+        variants: size(row.variants)
+    })
+    CREATE (a)-[:HAS_OBJECT]->(o)
+    WITH o, row
+    UNWIND range(0, size(row.variants) - 1) AS k
+    CREATE (o)-[:HAS_VARIANT]->(:Variant {id: row.id + '-v' + toString(k), name: row.variants[k]})
+"""
+
+_LINK_DRIVERS = """
+    UNWIND $rows AS row
+    MATCH (d:{label} {{name: row.name}})
+    MATCH (n:{target} {{id: row.id}})
+    CREATE (d)-[:RELEVANT_TO]->(n)
+"""
+
+_CREATE_RELATIONSHIPS = """
+    UNWIND $rows AS row
+    MATCH (source:Object {id: row.source})
+    MATCH (target:Object {id: row.target})
+    CREATE (source)-[:RELATES_TO {
+        id: row.id,
+        type: row.type,
+        role: row.role,
+        toBeing: row.toBeing,
+        toAvatar: row.toAvatar,
+        toObject: row.toObject
+    }]->(target)
+"""
+
+_CREATE_VARIABLES = """
+    UNWIND $rows AS row
+    MERGE (p:Part {name: row.part})
+    MERGE (g:Group {name: row.group})
+    MERGE (p)-[:HAS_GROUP]->(g)
+    CREATE (v:Variable {
+        id: row.id,
+        name: row.fields.variable,
+        section: row.fields.section,
+        formatI: row.fields.formatI,
+        formatII: row.fields.formatII,
+        gType: row.fields.gType,
+        validation: row.fields.validation,
+        default: row.fields.default,
+        graph: row.fields.graph,
+        status: row.fields.status
+    })
+    CREATE (g)-[:HAS_VARIABLE]->(v)
+"""
+
+_LINK_VARIABLE_OBJECTS = """
+    UNWIND $rows AS row
+    MATCH (o:Object {id: row.object})
+    MATCH (v:Variable {id: row.variable})
+    CREATE (o)-[:HAS_SPECIFIC_VARIABLE {createdBy: 'seed'}]->(v)
+"""
+
+def _run_batch(tx, statement: str, rows: List[Any]):
+    tx.run(statement, rows=rows).consume()
+
+def write_neo4j(catalog: Dict[str, Any], batch_size: int = 5000,
+                progress: Optional[Callable[[str, int], None]] = None) -> Dict[str, int]:
+    """
+    Write the catalog straight to Neo4j, batch_size rows per UNWIND
+    statement and one write transaction per batch. Expects an empty catalog
+    (ids are created, not merged) and the constraints from
+    schema.create_constraints_and_indexes, which back every MATCH by id and
+    name. ALL selections and pattern relationships are expanded here, so the
+    server only sees index lookups. Returns rows written per phase.
+    Unverified: not yet run against a live Neo4j server.
+    """
+    from db import execute_write
+    from repositories.cypher import bump_catalog_version_stamp
+
+    written = {}
+
+    def write(phase: str, statement: str, rows: Iterable[Any]):
+        count = 0
+        for batch in _batches(rows, batch_size):
+            execute_write(_run_batch, statement, batch)
+            count += len(batch)
+        written[phase] = written.get(phase, 0) + count
+        if progress:
+            progress(phase, written[phase])
+
+    names = {**catalog["drivers"], "Country": catalog["countries"]}
+    for label, values in names.items():
+        write("drivers", _MERGE_DRIVERS.format(label=label), values)
+    write("avatars", _MERGE_AVATARS, ({"being": being, "avatar": avatar} for being, avatar in catalog["avatars"]))
+
+    relationships = {}
+    for rel in resolve_relationships(catalog):
+        relationships[rel["source"]] = relationships.get(rel["source"], 0) + 1
+    write("objects", _CREATE_OBJECTS, (
+        {
+            "id": row["id"], "driver": driver_string(row), "being": row["being"], "avatar": row["avatar"],
+            "object": row["object"], "variants": row["variants"], "relationships": relationships.get(row["id"], 0)
+        }
+        for row in catalog["objects"]
+    ))
+
+    def object_links(label: str, key: str) -> Iterator[Dict[str, str]]:
+        for row in catalog["objects"]:
+            for name in (names[label] if ALL in row[key] else row[key]):
+                yield {"id": row["id"], "name": name}
+
+    for label, key in (("Sector", "sectors"), ("Domain", "domains"), ("Country", "countries")):
+        write("objectDriverLinks", _LINK_DRIVERS.format(label=label, target="Object"), object_links(label, key))
+    write("objectDriverLinks", _LINK_DRIVERS.format(label="ObjectClarifier", target="Object"), (
+        {"id": row["id"], "name": row["clarifier"]} for row in catalog["objects"] if is_clarifier(row["clarifier"])
+    ))
+
+    write("relationships", _CREATE_RELATIONSHIPS, resolve_relationships(catalog))
+    write("variables", _CREATE_VARIABLES, catalog["variables"])
+
+    def variable_links(position: int, label: str) -> Iterator[Dict[str, str]]:
+        for row in catalog["variables"]:
+            value = [part.strip() for part in row["driver"].split(",")][position]
+            if label == "VariableClarifier" and not is_clarifier(value):
+                continue
+            for name in (names[label] if value == ALL else [value]):
+                yield {"id": row["id"], "name": name}
+
+    for position, label in enumerate(("Sector", "Domain", "Country", "VariableClarifier")):
+        write("variableDriverLinks", _LINK_DRIVERS.format(label=label, target="Variable"), variable_links(position, label))
+    write("variableObjectLinks", _LINK_VARIABLE_OBJECTS, (
+        {"variable": row["id"], "object": object_id} for row in catalog["variables"] for object_id in row["objects"]
+    ))
+    # Running API workers pick the new catalog up on their next coherence check
+    execute_write(bump_catalog_version_stamp, "synthetic")
+    return written
+
+def _joined(values: List[str]) -> str:
+    return ALL if ALL in values else ", ".join(values)
+
+def write_csv(catalog: Dict[str, Any], directory: str) -> Dict[str, str]:
+    """
+    Write the catalog as upload files under directory and return their paths:
+      drivers.json       - {driverType: [names]} for POST /drivers/{driverType}/bulk
+      objects.csv        - POST /objects/upload
+      variables.csv      - POST /variables/bulk-upload
+      variants.csv       - Being, Avatar, Object, Variant; split per object for
+                           POST /objects/{id}/variants/upload once the ids are known
+      relationships.csv  - Being, Avatar, Object plus the relationship fields,
+                           for POST /objects/{id}/relationships (no CSV endpoint)
+    """
+    os.makedirs(directory, exist_ok=True)
+    paths = {name: os.path.join(directory, name) for name in (
+        "drivers.json", "objects.csv", "variables.csv", "variants.csv", "relationships.csv"
+    )}
+    driver_types = {label: driver_type for driver_type, label in DRIVER_LABELS.items()}
+
+    with open(paths["drivers.json"], "w", encoding="utf-8") as f:
+        json.dump({driver_types[label]: names for label, names in catalog["drivers"].items()}, f, indent=2)
+
+    def table(name: str, header: List[str], rows: Iterable[List[Any]]):
+        with open(paths[name], "w", encoding="utf-8", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(header)
+            writer.writerows(rows)
+
+    objects = {row["id"]: row for row in catalog["objects"]}
+    table("objects.csv", ["Sector", "Domain", "Country", "Object Clarifier", "Being", "Avatar", "Object"], (
+        [_joined(row["sectors"]), _joined(row["domains"]), _joined(row["countries"]), row["clarifier"] or "",
+         row["being"], row["avatar"], row["object"]]
+        for row in catalog["objects"]
+    ))
+    table("variables.csv", [
+        "Sector", "Domain", "Country", "Variable Clarifier", "Part", "Section", "Group", "Variable",
+        "Format I", "Format II", "G-Type", "Validation", "Default", "Graph"
+    ], (
+        [part.strip() for part in row["driver"].split(",")] + [
+            row["part"], row["fields"]["section"], row["group"], row["fields"]["variable"],
+            row["fields"]["formatI"], row["fields"]["formatII"], row["fields"]["gType"],
+            row["fields"]["validation"], row["fields"]["default"], row["fields"]["graph"]
+        ]
+        for row in catalog["variables"]
+    ))
+    table("variants.csv", ["Being", "Avatar", "Object", "Variant"], (
+        [row["being"], row["avatar"], row["object"], name] for row in catalog["objects"] for name in row["variants"]
+    ))
+    table("relationships.csv", ["Being", "Avatar", "Object", "Type", "Role", "To Being", "To Avatar", "To Object"], (
+        [objects[rel["source"]]["being"], objects[rel["source"]]["avatar"], objects[rel["source"]]["object"],
+         rel["type"], rel["role"], rel["toBeing"], rel["toAvatar"], rel["toObject"]]
+        for rel in catalog["relationships"]
+    ))
+    return paths
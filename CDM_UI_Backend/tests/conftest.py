@@ -0,0 +1,47 @@
+"""
+Shared fixtures: the API on the in-memory graph backend, seeded with a
+small generated catalog. The environment is set before main is imported.
+"""
+
+import os
+import uuid
+
+ADMIN_TOKEN = "test-admin-token"
+
+os.environ["CDM_GRAPH_BACKEND"] = "memory"
+os.environ["CDM_WARM_CACHES"] = "false"
+os.environ["CDM_ADMIN_TOKEN"] = ADMIN_TOKEN
+
+import pytest
+from fastapi.testclient import TestClient
+import main
+import synthetic
+from catalog import bump_catalog_version, reload_change
+from repositories import get_graph
+
+@pytest.fixture(scope="session")
+def app_client():
+    with TestClient(main.app) as client:
+        synthetic.load(get_graph(), synthetic.generate(200))
+        bump_catalog_version(reload_change())
+        yield client
+
+@pytest.fixture
+def client(app_client):
+    # Forget the read-your-writes cookie of earlier tests
+    app_client.cookies.clear()
+    return app_client
+
+@pytest.fixture
+def new_object():
+    """Create request for an object whose name no other test uses"""
+    return {
+        "sector": ["ALL"], "domain": ["ALL"], "country": ["ALL"], "being": "Master",
+        "avatar": "Company", "object": f"Test {uuid.uuid4().hex[:8]}", "variants": ["Alpha"]
+    }
+
+def object_rows(client):
+    """GET /objects as {id: row}"""
+    response = client.get("/api/v1/objects")
+    assert response.status_code == 200
+    return {row["id"]: row for row in response.json()}
@@ -0,0 +1,75 @@
+from routes import batch
+from catalog import EPOCH, get_catalog_version
+from conftest import object_rows
+
+def _names(client):
+    return {row["object"] for row in object_rows(client).values()}
+
+def test_batch_applies_every_operation(client, new_object):
+    response = client.post("/api/v1/batch", json={"operations": [
+        {"op": "object.create", "ref": "created", "data": new_object},
+        {"op": "object.addVariant", "id": {"$ref": "created"}, "data": {"variant_name": "Beta"}}
+    ]})
+    assert response.status_code == 200
+    body = response.json()
+    object_id = body["results"][0]["result"]["id"]
+    assert body["version"] == get_catalog_version()
+
+    row = object_rows(client)[object_id]
+    assert row["object"] == new_object["object"]
+    assert {variant["name"] for variant in row["variantsList"]} == {"Alpha", "Beta"}
+
+def test_failing_operation_rolls_back_the_batch(client, new_object):
+    version = get_catalog_version()
+    response = client.post("/api/v1/batch", json={"operations": [
+        {"op": "object.create", "ref": "created", "data": new_object},
+        {"op": "object.addVariant", "id": {"$ref": "created"}, "data": {"variant_name": "Beta"}},
+        {"op": "object.update", "id": "no-such-object", "data": {"driver": "ALL, ALL, ALL, None"}}
+    ]})
+    assert response.status_code == 404
+    detail = response.json()["detail"]
+    assert (detail["index"], detail["op"], detail["status"]) == (2, "object.update", 404)
+
+    # Nothing of the earlier operations is left and no version was used up
+    assert new_object["object"] not in _names(client)
+    assert get_catalog_version() == version
+    changes = client.get("/api/v1/changes", params={"since": version, "epoch": EPOCH}).json()
+    assert (changes["fullReload"], changes["changes"]) == (False, [])
+
+def test_invalid_operation_data_rolls_back_the_batch(client, new_object):
+    response = client.post("/api/v1/batch", json={"operations": [
+        {"op": "object.create", "data": new_object},
+        {"op": "driver.create", "data": {"type": "nonsense", "name": "X"}}
+    ]})
+    assert response.status_code == 422
+    assert response.json()["detail"]["index"] == 1
+    assert new_object["object"] not in _names(client)
+
+def test_references_only_reach_earlier_operations(client, new_object):
+    response = client.post("/api/v1/batch", json={"operations": [
+        {"op": "object.addVariant", "id": {"$ref": "created"}, "data": {"variant_name": "Beta"}},
+        {"op": "object.create", "ref": "created", "data": new_object}
+    ]})
+    assert response.status_code == 400
+    detail = response.json()["detail"]
+    assert (detail["index"], detail["detail"]) == (0, "Unknown reference 'created'")
+    assert new_object["object"] not in _names(client)
+
+def test_duplicate_references_are_rejected_up_front(client, new_object):
+    version = get_catalog_version()
+    response = client.post("/api/v1/batch", json={"operations": [
+        {"op": "object.create", "ref": "created", "data": new_object},
+        {"op": "object.create", "ref": "created", "data": {**new_object, "object": new_object["object"] + " 2"}}
+    ]})
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Duplicate reference 'created'"
+    assert get_catalog_version() == version
+
+def test_batches_over_the_limit_are_rejected(client, new_object, monkeypatch):
+    monkeypatch.setattr(batch, "MAX_OPERATIONS", 1)
+    response = client.post("/api/v1/batch", json={"operations": [
+        {"op": "object.create", "data": new_object},
+        {"op": "object.create", "data": {**new_object, "object": new_object["object"] + " 2"}}
+    ]})
+    assert response.status_code == 413
+    assert new_object["object"] not in _names(client)
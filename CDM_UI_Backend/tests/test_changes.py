@@ -0,0 +1,71 @@
+import uuid
+from catalog import EPOCH, get_catalog_version
+from conftest import object_rows
+
+def _changes(client, since):
+    response = client.get("/api/v1/changes", params={"since": since, "epoch": EPOCH})
+    assert response.status_code == 200
+    body = response.json()
+    assert body["fullReload"] is False
+    return body["changes"]
+
+def test_object_changes_carry_the_stored_grid_fields(client, new_object):
+    since = get_catalog_version()
+    created = client.post("/api/v1/objects", json=new_object).json()
+    client.post(f"/api/v1/objects/{created['id']}/variants", json={"variant_name": "Beta"})
+    row = object_rows(client)[created["id"]]
+
+    create, update = _changes(client, since)
+    assert (create["entity"], create["op"], create["id"]) == ("object", "create", created["id"])
+    assert create["fields"]["object"] == new_object["object"]
+    # Ids in the entries are the stored ones, so a patched grid matches a reloaded one
+    assert [variant["name"] for variant in create["fields"]["variantsList"]] == ["Alpha"]
+    assert create["fields"]["variantsList"][0]["id"] == next(
+        variant["id"] for variant in row["variantsList"] if variant["name"] == "Alpha"
+    )
+    assert (update["op"], update["id"]) == ("update", created["id"])
+    assert update["fields"]["variantsList"] == row["variantsList"]
+    assert update["fields"]["variants"] == 2
+    assert update["version"] == get_catalog_version()
+
+def test_object_delete_is_recorded(client, new_object):
+    created = client.post("/api/v1/objects", json=new_object).json()
+    since = get_catalog_version()
+    assert client.delete(f"/api/v1/objects/{created['id']}").status_code == 200
+
+    (entry,) = _changes(client, since)
+    assert (entry["entity"], entry["op"], entry["id"]) == ("object", "delete", created["id"])
+
+def test_upload_without_new_variants_records_nothing(client, new_object):
+    created = client.post("/api/v1/objects", json=new_object).json()
+    since = get_catalog_version()
+    files = {"file": ("variants.csv", b"Variant\nAlpha\n", "text/csv")}
+    assert client.post(f"/api/v1/objects/{created['id']}/variants/upload", files=files).status_code == 200
+
+    assert _changes(client, since) == []
+    assert get_catalog_version() == since
+
+def test_versions_without_the_epoch_get_a_full_reload(client):
+    body = client.get("/api/v1/changes", params={"since": get_catalog_version()}).json()
+    assert (body["fullReload"], body["changes"]) == (True, [])
+    body = client.get("/api/v1/changes", params={"since": 0, "epoch": "another-process"}).json()
+    assert body["fullReload"] is True
+
+def test_driver_changes_are_recorded(client):
+    since = get_catalog_version()
+    name = f"Sector {uuid.uuid4().hex[:8]}"
+    assert client.post("/api/v1/drivers/sectors", json={"name": name}).status_code == 200
+
+    (entry,) = _changes(client, since)
+    assert (entry["entity"], entry["op"], entry["id"]) == ("driver", "create", name)
+    assert entry["fields"] == {"type": "sectors"}
+
+def test_changes_followed_by_a_reload_get_a_full_reload(client):
+    name = f"Sector {uuid.uuid4().hex[:8]}"
+    client.post("/api/v1/drivers/sectors", json={"name": name})
+    since = get_catalog_version()
+    # Renaming a driver rewrites the driver strings of every row using it
+    assert client.put(f"/api/v1/drivers/sectors/{name}", json={"name": name + " renamed"}).status_code == 200
+
+    body = client.get("/api/v1/changes", params={"since": since, "epoch": EPOCH}).json()
+    assert (body["fullReload"], body["changes"]) == (True, [])
@@ -0,0 +1,78 @@
+import asyncio
+import pytest
+import coherence
+from catalog import changes_since, get_catalog_version
+from conftest import object_rows
+from repositories import get_graph
+from routes.objects import create_object_unit
+from schema import ObjectCreateRequest
+
+class _StampedGraph:
+    """Stands in for a shared backend: the other processes' stamps are set by the test"""
+
+    def __init__(self, stamps):
+        self.stamps = dict(stamps)
+
+    def shared_version(self):
+        return dict(self.stamps)
+
+@pytest.fixture
+def checked(monkeypatch):
+    """A SharedVersion checking the stamps of a fake shared backend on every call"""
+    graph = _StampedGraph({"worker-a": 3, "worker-b": 7})
+    monkeypatch.setattr(coherence, "INTERVAL_SECONDS", 0)
+    monkeypatch.setattr("repositories.get_graph", lambda: graph)
+    shared = coherence.SharedVersion()
+    shared.supported = True
+    shared.initialize(graph)
+
+    def check():
+        """Whether a check now makes clients reload (GET /changes answers fullReload)"""
+        version = get_catalog_version()
+        asyncio.run(shared.ensure_fresh())
+        return get_catalog_version() != version and changes_since(version) is None
+
+    return graph, shared, check
+
+def test_unchanged_stamps_keep_the_caches(checked):
+    graph, shared, check = checked
+    assert not check()
+    assert shared.external == 0
+
+def test_a_write_elsewhere_reloads(checked):
+    graph, shared, check = checked
+    graph.stamps["worker-b"] += 1
+    assert check()
+    assert shared.external == 1
+    assert not check()
+
+def test_a_new_process_writing_reloads(checked):
+    graph, shared, check = checked
+    graph.stamps["worker-c"] = 1
+    assert check()
+
+def test_removed_stamps_are_no_change(checked):
+    graph, shared, check = checked
+    # A pruned stamp no longer hides a write made at the same time
+    del graph.stamps["worker-a"]
+    assert not check()
+    del graph.stamps["worker-b"]
+    graph.stamps["worker-a"] = 1
+    assert check()
+
+def test_a_reload_reaches_the_grid_and_typeahead_caches(client, checked, new_object):
+    graph, shared, check = checked
+    scope = {"prefix": new_object["object"], "being": new_object["being"]}
+    assert client.get("/api/v1/objects/typeahead/objects", params=scope).json() == []
+    rows = object_rows(client)
+
+    # Another worker writes to the shared catalog: nothing of this process sees it
+    request = ObjectCreateRequest.model_validate(new_object)
+    created = get_graph().execute_write(lambda repos: create_object_unit(repos, request))[0]
+    assert object_rows(client) == rows
+
+    graph.stamps["worker-a"] += 1
+    assert check()
+    assert created["id"] in object_rows(client)
+    completions = client.get("/api/v1/objects/typeahead/objects", params=scope).json()
+    assert completions == [{"value": new_object["object"], "count": 1}]
@@ -0,0 +1,39 @@
+import pytest
+from encoding import COLUMNAR_MEDIA_TYPE, encode_columnar
+
+def _decode(body):
+    rows = []
+    for index in range(body["count"]):
+        row = {}
+        for column, values in zip(body["columns"], body["data"]):
+            value = values[index]
+            if column in body["dictionaries"]:
+                value = body["dictionaries"][column][value]
+            row[column] = value
+        rows.append(row)
+    return rows
+
+def test_encode_columnar_round_trip():
+    rows = [{"id": "1", "status": "Active", "n": 2}, {"id": "2", "status": "Active"}, {"id": "3", "status": None, "n": 0}]
+    body = encode_columnar(rows, ("id", "status", "n"), ("status",))
+    assert body["dictionaries"] == {"status": ["Active", None]}
+    assert body["data"][1] == [0, 0, 1]
+    assert _decode(body) == [{"id": "1", "status": "Active", "n": 2}, {"id": "2", "status": "Active", "n": None},
+                             {"id": "3", "status": None, "n": 0}]
+
+@pytest.mark.parametrize("grid", ["objects", "variables"])
+def test_columnar_grid_decodes_to_the_row_grid(client, grid):
+    rows = client.get(f"/api/v1/{grid}").json()
+    columnar = client.get(f"/api/v1/{grid}", params={"format": "columnar"})
+    assert columnar.headers["content-type"].startswith(COLUMNAR_MEDIA_TYPE)
+    decoded = _decode(columnar.json())
+    assert decoded == [{column: row.get(column) for column in columnar.json()["columns"]} for row in rows]
+
+def test_accept_header_selects_columnar_and_format_wins(client):
+    accept = {"Accept": COLUMNAR_MEDIA_TYPE}
+    assert client.get("/api/v1/objects", headers=accept).json()["format"] == "columnar"
+    assert isinstance(client.get("/api/v1/objects", params={"format": "json"}, headers=accept).json(), list)
+
+def test_object_drivers_are_not_dictionary_encoded(client):
+    body = client.get("/api/v1/objects", params={"format": "columnar"}).json()
+    assert set(body["dictionaries"]) == {"being", "avatar", "status"}
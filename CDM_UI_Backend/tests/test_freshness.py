@@ -0,0 +1,70 @@
+import time
+import pytest
+import freshness
+from catalog import EPOCH, get_catalog_version
+
+@pytest.fixture
+def stale_while_revalidate(monkeypatch):
+    monkeypatch.setattr(freshness, "STALE_WHILE_REVALIDATE", True)
+    monkeypatch.setattr(freshness, "STALE_MAX_SECONDS", 30.0)
+
+def _ids(response):
+    return {row["id"] for row in response.json()}
+
+def _write(client, new_object):
+    """Create an object; the client keeps the read-your-writes cookie"""
+    response = client.post("/api/v1/objects", json=new_object)
+    assert response.status_code == 201
+    assert response.cookies[freshness.COOKIE] == f"{EPOCH}:{get_catalog_version()}"
+    return response.json()["id"]
+
+def _rebuilt(client, version):
+    deadline = time.monotonic() + 5
+    while time.monotonic() < deadline:
+        response = client.get("/api/v1/objects")
+        if response.headers["x-catalog-version"] == str(version):
+            return response
+        time.sleep(0.01)
+    raise AssertionError("the body was not rebuilt")
+
+def test_other_clients_get_the_previous_body_while_it_rebuilds(client, stale_while_revalidate, new_object):
+    before = client.get("/api/v1/objects")
+    created = _write(client, new_object)
+    version = get_catalog_version()
+    client.cookies.clear()
+
+    stale = client.get("/api/v1/objects")
+    assert stale.headers["x-catalog-version"] == before.headers["x-catalog-version"]
+    assert stale.headers["x-catalog-latest-version"] == str(version)
+    assert "age" in stale.headers
+    assert created not in _ids(stale)
+
+    assert created in _ids(_rebuilt(client, version))
+
+def test_the_writer_never_gets_a_body_older_than_its_write(client, stale_while_revalidate, new_object):
+    client.get("/api/v1/objects")
+    created = _write(client, new_object)
+    response = client.get("/api/v1/objects")
+    assert response.headers["x-catalog-version"] == str(get_catalog_version())
+    assert "x-catalog-latest-version" not in response.headers
+    assert created in _ids(response)
+
+def test_the_minimum_version_header_works_like_the_cookie(client, stale_while_revalidate, new_object):
+    client.get("/api/v1/objects")
+    created = _write(client, new_object)
+    client.cookies.clear()
+    response = client.get("/api/v1/objects", headers={"X-Min-Catalog-Version": f"{EPOCH}:{get_catalog_version()}"})
+    assert created in _ids(response)
+
+def test_bodies_outdated_too_long_are_not_served(client, stale_while_revalidate, new_object, monkeypatch):
+    client.get("/api/v1/objects")
+    created = _write(client, new_object)
+    client.cookies.clear()
+    monkeypatch.setattr(freshness, "STALE_MAX_SECONDS", -1.0)
+    assert created in _ids(client.get("/api/v1/objects"))
+
+def test_without_the_mode_every_read_is_current(client, new_object):
+    client.get("/api/v1/objects")
+    created = _write(client, new_object)
+    client.cookies.clear()
+    assert created in _ids(client.get("/api/v1/objects"))
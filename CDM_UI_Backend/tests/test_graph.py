@@ -0,0 +1,58 @@
+from routes.graph import encode_neighborhood
+
+def _neighborhood(client, **params):
+    response = client.get("/api/v1/graph/neighborhood", params=params)
+    assert response.status_code == 200
+    return response.json()
+
+def _sources(body):
+    """Edge sources of either format"""
+    if "source" in body["edges"]:
+        return body["edges"]["source"]
+    offsets = body["edges"]["offsets"]
+    return [node for node in range(body["nodeCount"]) for _ in range(offsets[node + 1] - offsets[node])]
+
+def test_csr_offsets():
+    graph = {
+        "nodes": [("a", "Object", "A", 0), ("b", "Variant", "B", 1), ("c", "Variant", "C", 1)],
+        "edges": [(0, 1, "HAS_VARIANT"), (0, 2, "HAS_VARIANT"), (2, 1, "RELATES_TO")]
+    }
+    csr = encode_neighborhood(graph, "csr")
+    assert csr["edges"] == {"offsets": [0, 2, 2, 3], "target": [1, 2, 1], "type": [0, 0, 1]}
+    assert csr["relationshipTypes"] == ["HAS_VARIANT", "RELATES_TO"]
+    assert csr["labels"] == ["Object", "Variant"]
+    assert encode_neighborhood(graph, "columnar")["edges"]["source"] == [0, 0, 2]
+
+def test_object_neighborhood(client, new_object):
+    new_object["variants"] = ["Alpha", "Beta"]
+    created = client.post("/api/v1/objects", json=new_object).json()
+    body = _neighborhood(client, seeds=f"{created['id']},missing-seed", types="HAS_VARIANT")
+    assert body["missingSeeds"] == ["missing-seed"]
+    assert not body["truncated"]
+    assert body["nodes"]["id"][0] == created["id"]
+    assert sorted(body["nodes"]["name"][1:]) == ["Alpha", "Beta"]
+    assert body["nodes"]["depth"] == [0, 1, 1]
+    assert body["edges"]["source"] == [0, 0]
+    assert sorted(body["edges"]["target"]) == [1, 2]
+
+def test_truncation_keeps_edges_inside_the_node_table(client, new_object):
+    new_object["variants"] = ["Alpha", "Beta", "Gamma"]
+    created = client.post("/api/v1/objects", json=new_object).json()
+    body = _neighborhood(client, seeds=created["id"], types="HAS_VARIANT", maxNodes=2)
+    assert body["truncated"]
+    assert body["nodeCount"] == 2
+    assert body["edgeCount"] == 1
+    assert max(body["edges"]["target"]) < body["nodeCount"]
+
+def test_csr_matches_columnar(client):
+    columnar = _neighborhood(client, seeds="Being:Master", depth=2)
+    csr = _neighborhood(client, seeds="Being:Master", depth=2, format="csr")
+    assert csr["edgeCount"] == columnar["edgeCount"] > 0
+    assert csr["nodes"] == columnar["nodes"]
+    assert _sources(csr) == _sources(columnar)
+    assert csr["edges"]["target"] == columnar["edges"]["target"]
+    assert len(csr["edges"]["offsets"]) == csr["nodeCount"] + 1
+
+def test_bad_requests(client):
+    assert client.get("/api/v1/graph/neighborhood", params={"seeds": "no-such-node"}).status_code == 404
+    assert client.get("/api/v1/graph/neighborhood", params={"seeds": "Being:Master", "types": "LIKES"}).status_code == 400
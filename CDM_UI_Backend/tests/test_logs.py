@@ -0,0 +1,33 @@
+import reprlib
+import logs
+from logs import payload
+from routes.batch import BatchRequest
+
+class _Counted:
+    """Counts how often the encoder had to render it"""
+    rendered = 0
+
+    def __str__(self):
+        _Counted.rendered += 1
+        return "item"
+
+def test_payload_stops_rendering_at_the_limit(monkeypatch):
+    monkeypatch.setattr(logs, "PAYLOAD_CHARS", 100)
+    _Counted.rendered = 0
+    text = str(payload([_Counted() for _ in range(10000)]))
+    assert text.endswith("... (truncated)")
+    assert len(text) == 100 + len("... (truncated)")
+    assert _Counted.rendered < 20
+
+def test_payload_renders_models_as_json(monkeypatch):
+    monkeypatch.setattr(logs, "PAYLOAD_CHARS", 200)
+    request = BatchRequest(operations=[{"op": "object.delete", "id": str(index)} for index in range(10000)])
+    text = str(payload(request))
+    assert text.startswith('{"operations": [{"op": "object.delete", "ref": null, "id": "0"')
+    assert text.endswith("... (truncated)")
+
+def test_small_payloads_are_complete():
+    assert str(payload({"a": 1, "b": [1, 2]})) == '{"a": 1, "b": [1, 2]}'
+    cycle = []
+    cycle.append(cycle)
+    assert str(payload(cycle)) == reprlib.repr(cycle)
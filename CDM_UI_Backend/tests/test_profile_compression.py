@@ -0,0 +1,66 @@
+import asyncio
+import threading
+import pytest
+import responses
+from conftest import ADMIN_TOKEN
+from instrumentation import RequestQueryStats, _current_stats, current_stats
+
+GZIP = {"Accept-Encoding": "gzip"}
+PROFILE = {**GZIP, "X-Admin-Token": ADMIN_TOKEN}
+
+def _plain(client):
+    response = client.get("/api/v1/objects", headers=GZIP)
+    assert response.status_code == 200
+    assert response.headers["content-encoding"] == "gzip"
+    return response
+
+def _profiled(client):
+    response = client.get("/api/v1/objects", params={"profile": "1"}, headers=PROFILE)
+    assert response.status_code == 200
+    return response
+
+@pytest.mark.parametrize("profile_first", [False, True])
+def test_profiled_responses_do_not_share_the_compressed_cache(client, profile_first):
+    if profile_first:
+        profiled, plain = _profiled(client), _plain(client)
+    else:
+        plain, profiled = _plain(client), _profiled(client)
+
+    assert isinstance(plain.json(), list)
+    assert "etag" in plain.headers
+
+    body = profiled.json()
+    assert set(body) == {"data", "profile"}
+    assert body["data"] == plain.json()
+    assert profiled.headers["cache-control"] == "no-store"
+    assert "etag" not in profiled.headers
+
+    # The cached body served afterwards is still the plain one
+    again = _plain(client)
+    assert again.json() == plain.json()
+    assert again.headers["etag"] == plain.headers["etag"]
+
+def test_profile_needs_the_admin_token(client):
+    response = client.get("/api/v1/objects", params={"profile": "1"}, headers=GZIP)
+    assert response.status_code == 403
+    assert isinstance(_plain(client).json(), list)
+
+def test_profiled_builds_run_in_a_worker_thread_of_the_request_context():
+    built = []
+
+    def build():
+        built.append((threading.get_ident(), current_stats()))
+        return [{"id": "1"}]
+
+    async def handler():
+        stats = RequestQueryStats("GET", "/api/v1/objects")
+        stats.profile = True
+        _current_stats.set(stats)
+        response = await responses.coalesced_response(("profiled-build",), build)
+        return threading.get_ident(), stats, response
+
+    loop_thread, stats, response = asyncio.run(handler())
+    ((build_thread, build_stats),) = built
+    assert build_thread != loop_thread
+    assert build_stats is stats
+    assert response.body == b'[{"id":"1"}]'
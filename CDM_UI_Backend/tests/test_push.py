@@ -0,0 +1,104 @@
+import asyncio
+import json
+import push
+from catalog import EPOCH, bump_catalog_version, change, get_catalog_version
+
+def _events(chunks):
+    """(event name, data) of each server-sent event, skipping retry and keep-alive lines"""
+    events = []
+    for chunk in chunks:
+        fields = dict(line.split(": ", 1) for line in chunk.strip().split("\n") if not line.startswith(":"))
+        if "event" in fields:
+            events.append((fields["event"], json.loads(fields["data"])))
+    return events
+
+async def _collect(subscriber, since=None, epoch=None, count=1):
+    stream = push.stream(subscriber, since, epoch)
+    chunks = [await stream.__anext__()]
+    try:
+        while len(_events(chunks)) < count:
+            chunks.append(await asyncio.wait_for(stream.__anext__(), 2))
+    finally:
+        await stream.aclose()
+    return _events(chunks)
+
+def test_coalesce_merges_changes_to_one_entity():
+    entries = [
+        {"version": 1, **change("object", "1", "create", {"object": "A", "status": "Active"})},
+        {"version": 2, **change("object", "1", "update", {"status": "Inactive"})},
+        {"version": 3, **change("object", "2", "update", {"status": "Active"})},
+        {"version": 4, **change("object", "2", "delete")},
+    ]
+    assert push.coalesce(entries) == [
+        {"version": 2, **change("object", "1", "create", {"object": "A", "status": "Inactive"})},
+        {"version": 4, **change("object", "2", "delete")},
+    ]
+
+def test_changes_within_the_window_are_sent_as_one_event(monkeypatch):
+    monkeypatch.setattr(push, "COALESCE_SECONDS", 0.05)
+
+    async def run():
+        subscriber = push.subscribe(frozenset(("object",)))
+        collecting = asyncio.ensure_future(_collect(subscriber))
+        await asyncio.sleep(0.01)
+        bump_catalog_version(change("object", "x", "create", {"object": "X"}))
+        bump_catalog_version(change("variable", "v", "update", {"status": "Active"}))
+        bump_catalog_version(change("object", "x", "update", {"status": "Inactive"}))
+        return await collecting
+
+    ((name, data),) = asyncio.run(run())
+    assert name == "changes"
+    assert data["epoch"] == EPOCH and data["version"] == get_catalog_version()
+    assert [(entry["id"], entry["op"]) for entry in data["changes"]] == [("x", "create")]
+    assert data["changes"][0]["fields"] == {"object": "X", "status": "Inactive"}
+
+def test_replay_from_another_epoch_is_a_reload():
+    async def run():
+        return await _collect(push.subscribe(push.ENTITIES), since=0, epoch="another-process")
+
+    assert [name for name, _ in asyncio.run(run())] == ["reload"]
+
+def test_a_full_queue_drops_the_subscriber(monkeypatch):
+    monkeypatch.setattr(push, "BUFFER_SIZE", 2)
+
+    async def run():
+        subscriber = push.subscribe(push.ENTITIES)
+        subscriber.offer([{"version": version, **change("object", str(version), "delete")} for version in range(3)])
+        stream = push.stream(subscriber, None)
+        chunks = [chunk async for chunk in stream]
+        return subscriber, chunks
+
+    subscriber, chunks = asyncio.run(run())
+    assert subscriber.closed
+    # Queued changes are discarded: the client replays them with Last-Event-ID
+    assert _events(chunks) == []
+    assert subscriber not in push._subscribers
+
+def test_subscribers_are_capped(monkeypatch):
+    monkeypatch.setattr(push, "MAX_SUBSCRIBERS", len(push._subscribers))
+
+    async def run():
+        return push.subscribe(push.ENTITIES)
+
+    assert asyncio.run(run()) is None
+
+def test_open_streams_check_the_coherence_stamp(monkeypatch):
+    stamps = {"worker-a": 1}
+    monkeypatch.setattr(push, "WATCH_SECONDS", 0.01)
+    monkeypatch.setattr("coherence.INTERVAL_SECONDS", 0)
+    monkeypatch.setattr("repositories.get_graph", lambda: type("Shared", (), {"shared_version": lambda self: dict(stamps)})())
+    monkeypatch.setattr(push.shared_version, "supported", True)
+    monkeypatch.setattr(push.shared_version, "known", dict(stamps))
+
+    async def run():
+        subscriber = push.subscribe(push.ENTITIES)
+        collecting = asyncio.ensure_future(_collect(subscriber))
+        await asyncio.sleep(0.05)
+        # Another worker writes; no read reaches this one
+        stamps["worker-a"] += 1
+        events = await collecting
+        await asyncio.sleep(0.05)
+        return events
+
+    assert [name for name, _ in asyncio.run(run())] == ["reload"]
+    assert push._watcher is None
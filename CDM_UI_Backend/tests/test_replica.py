@@ -0,0 +1,104 @@
+import threading
+import time
+import pytest
+from repositories.memory import MemoryGraph
+from repositories.replica import ReplicatedGraph
+
+class _Primary(MemoryGraph):
+    """Memory primary handing out scripted commit stamps; a write can be held before it returns"""
+
+    name = "primary"
+
+    def __init__(self):
+        super().__init__(snapshot="")
+        self.stamps = iter(range(1, 1000))
+        self.hold = {}
+        self.export_gate = threading.Event()
+        self.export_gate.set()
+        self.exports = 0
+
+    def execute_stamped_write(self, work):
+        with self.store.transaction():
+            result = work(self.repositories)
+        stamp = next(self.stamps)
+        gate = self.hold.pop(stamp, None)
+        if gate is not None:
+            gate.wait(5)
+        return result, stamp
+
+    def export(self):
+        self.export_gate.wait(5)
+        self.exports += 1
+        return super().export()
+
+@pytest.fixture
+def replicated():
+    primary = _Primary()
+    primary.start()
+    graph = ReplicatedGraph(primary)
+    graph.start()
+    return primary, graph
+
+def _create(graph, name):
+    graph.execute_write(lambda repos: repos.drivers.create("Sector", name))
+
+def _names(graph):
+    return sorted(graph.execute_read(lambda repos: repos.drivers.names("Sector")))
+
+def _copy_names(graph):
+    return sorted(graph.replica.execute_read(lambda repos: repos.drivers.names("Sector")))
+
+def _settle(graph):
+    deadline = time.monotonic() + 5
+    while graph._reloading.locked() and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+def test_writes_are_replayed_on_the_copy(replicated):
+    primary, graph = replicated
+    _create(graph, "A")
+    _create(graph, "B")
+    assert _copy_names(graph) == ["A", "B"]
+    assert (graph.committed, graph.applied, graph.diverged) == (2, 2, False)
+
+def test_a_write_committed_out_of_order_waits_for_the_earlier_one(replicated):
+    primary, graph = replicated
+    release = primary.hold[1] = threading.Event()
+    first = threading.Thread(target=_create, args=(graph, "first"))
+    first.start()
+    while graph._in_flight == 0:
+        time.sleep(0.001)
+    _create(graph, "second")
+    # Stamp 2 is held back until stamp 1 is handed over
+    assert _copy_names(graph) == []
+    assert list(graph._held) == [2]
+
+    release.set()
+    first.join(5)
+    assert _copy_names(graph) == ["first", "second"]
+    assert (graph.applied, graph.diverged, graph._held) == (2, False, {})
+
+def test_a_missing_stamp_diverges_and_reads_go_to_the_primary(replicated):
+    primary, graph = replicated
+    # Stamp 1 was taken by a write that never reports back
+    next(primary.stamps)
+    primary.export_gate.clear()
+    _create(graph, "A")
+    assert graph.diverged
+    assert _copy_names(graph) == []
+    assert _names(graph) == ["A"]
+
+    primary.export_gate.set()
+    _settle(graph)
+    assert primary.exports == 2
+    assert not graph.diverged
+    assert _copy_names(graph) == ["A"]
+
+def test_a_stale_stamp_diverges(replicated):
+    primary, graph = replicated
+    _create(graph, "A")
+    primary.stamps = iter([1])
+    _create(graph, "B")
+    _settle(graph)
+    assert primary.exports == 2
+    assert not graph.diverged
+    assert _copy_names(graph) == ["A", "B"]
@@ -0,0 +1,82 @@
+import threading
+from neo4j.exceptions import ClientError
+from routes.search import _missing_index, build_lucene_query
+from search_index import NgramIndex, VersionedIndex
+
+DOCUMENTS = [
+    {"type": "object", "id": "1", "name": "Customer"},
+    {"type": "object", "id": "2", "name": "Customer Account"},
+    {"type": "variable", "id": "3", "name": "Account Customer Id"},
+    {"type": "variable", "id": "5", "name": "Precustomer Flag"},
+    {"type": "variable", "id": "4", "name": "Customr"},
+    {"type": "section", "id": "Billing", "name": "Billing"},
+]
+
+def _search(client, **params):
+    response = client.get("/api/v1/search", params=params)
+    assert response.status_code == 200
+    return response.json()
+
+def test_ngram_ranking_tiers():
+    hits, has_more = NgramIndex(DOCUMENTS).search("customer", limit=10)
+    assert [(hit["id"], hit["match"]) for hit in hits[:3]] == [("1", "exact"), ("2", "prefix"), ("3", "prefix")]
+    assert ("5", "substring") in [(hit["id"], hit["match"]) for hit in hits]
+    assert ("4", "fuzzy") in [(hit["id"], hit["match"]) for hit in hits]
+    assert not has_more
+    assert [hit["score"] for hit in hits] == sorted((hit["score"] for hit in hits), reverse=True)
+
+def test_ngram_types_and_paging():
+    index = NgramIndex(DOCUMENTS)
+    assert {hit["type"] for hit in index.search("customer", types={"variable"})[0]} == {"variable"}
+    first, has_more = index.search("customer", limit=2)
+    second, _ = index.search("customer", limit=2, offset=2)
+    assert has_more
+    assert not {hit["id"] for hit in first} & {hit["id"] for hit in second}
+
+def test_search_endpoint_finds_a_new_object(client, new_object):
+    created = client.post("/api/v1/objects", json=new_object).json()
+    body = _search(client, q=new_object["object"], types="object")
+    assert body["backend"] == "ngram"
+    assert body["hits"][0]["id"] == created["id"]
+    assert body["hits"][0]["match"] == "exact"
+
+def test_unknown_search_types_are_rejected(client):
+    assert client.get("/api/v1/search", params={"q": "x", "types": "object,planet"}).status_code == 400
+
+def test_stale_index_is_served_while_it_rebuilds():
+    release = threading.Event()
+    loads = []
+
+    def loader():
+        loads.append(len(loads))
+        if len(loads) > 1:
+            release.wait(5)
+        return [{"type": "object", "id": str(len(loads)), "name": f"Build {len(loads)}"}]
+
+    index = VersionedIndex(loader)
+    first = index.get(1)
+    # Readers without a newer own write get the previous index right away
+    assert index.get(2, min_version=0) is first
+    # A reader that wrote version 2 waits for the rebuild
+    waiting = threading.Thread(target=lambda: loads.append(index.get(2, min_version=2)))
+    waiting.start()
+    assert waiting.is_alive()
+    release.set()
+    waiting.join(5)
+    rebuilt = loads[-1]
+    assert rebuilt is not first and rebuilt.search("build 2")[0]
+    assert index.get(2) is rebuilt
+    assert len(loads) == 3
+
+def test_only_missing_indexes_disable_full_text():
+    missing = ClientError._hydrate_neo4j(
+        code="Neo.ClientError.Procedure.ProcedureCallFailed",
+        message="Caused by: java.lang.IllegalArgumentException: There is no such fulltext schema index: object_name_fulltext"
+    )
+    assert _missing_index(missing)
+    assert _missing_index(ClientError._hydrate_neo4j(code="Neo.ClientError.Schema.IndexNotFound", message="gone"))
+    assert not _missing_index(ClientError._hydrate_neo4j(code="Neo.ClientError.Statement.SyntaxError", message="bad"))
+
+def test_lucene_query_matches_every_word():
+    assert build_lucene_query("ab") == "(ab OR ab* OR *ab*)"
+    assert build_lucene_query("C++ Key") == "(c OR c* OR *c*) AND (key OR key* OR *key* OR key~1)"
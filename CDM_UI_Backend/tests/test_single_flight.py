@@ -0,0 +1,77 @@
+import asyncio
+import threading
+import responses
+from cache import SingleFlight
+
+def test_concurrent_callers_share_one_computation():
+    calls = []
+    release = threading.Event()
+
+    def compute():
+        calls.append(1)
+        release.wait(5)
+        return object()
+
+    async def run():
+        flights = SingleFlight("test")
+        callers = [asyncio.ensure_future(flights.run("key", 1, compute)) for _ in range(5)]
+        await asyncio.sleep(0.02)
+        release.set()
+        results = await asyncio.gather(*callers)
+        # Finished flights are forgotten: a later call computes again
+        again = await flights.run("key", 1, lambda: "again")
+        return results, again
+
+    results, again = asyncio.run(run())
+    assert len(calls) == 1
+    assert all(result is results[0] for result in results)
+    assert again == "again"
+
+def test_versions_do_not_share_and_failures_reach_every_caller():
+    async def run():
+        flights = SingleFlight("test")
+        first, second = await asyncio.gather(flights.run("key", 1, lambda: 1), flights.run("key", 2, lambda: 2))
+
+        def fail():
+            raise ValueError("boom")
+
+        failures = await asyncio.gather(*(flights.run("key", 3, fail) for _ in range(3)), return_exceptions=True)
+        return first, second, failures
+
+    first, second, failures = asyncio.run(run())
+    assert (first, second) == (1, 2)
+    assert [type(error) for error in failures] == [ValueError] * 3
+
+def test_a_cancelled_caller_does_not_cancel_the_others():
+    release = threading.Event()
+
+    async def run():
+        flights = SingleFlight("test")
+        leader = asyncio.ensure_future(flights.run("key", 1, lambda: release.wait(5) and "done"))
+        follower = asyncio.ensure_future(flights.run("key", 1, lambda: "unused"))
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        release.set()
+        return await follower
+
+    assert asyncio.run(run()) == "done"
+
+def test_identical_grid_reads_build_once():
+    builds = []
+    release = threading.Event()
+
+    def build():
+        builds.append(1)
+        release.wait(5)
+        return [{"id": "1"}]
+
+    async def run():
+        key = ("single-flight-test",)
+        requests = [asyncio.ensure_future(responses.coalesced_response(key, build)) for _ in range(4)]
+        await asyncio.sleep(0.02)
+        release.set()
+        return await asyncio.gather(*requests)
+
+    bodies = {response.body for response in asyncio.run(run())}
+    assert bodies == {b'[{"id":"1"}]'}
+    assert len(builds) == 1
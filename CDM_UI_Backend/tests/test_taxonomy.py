@@ -0,0 +1,53 @@
+from routes.taxonomy import build_object_tree, render_nodes
+
+ROWS = [
+    {"being": "Mate", "avatar": "Person", "id": "2", "object": "buyer", "variants": ["B", "A", "A"]},
+    {"being": "Mate", "avatar": "Person", "id": "1", "object": "Buyer", "variants": []},
+    {"being": "Master", "avatar": "Company", "id": None, "object": None, "variants": []},
+    {"being": "Mate", "avatar": None, "id": None, "object": None, "variants": []},
+]
+
+def _taxonomy(client, kind, **params):
+    response = client.get(f"/api/v1/taxonomy/{kind}", params=params)
+    assert response.status_code == 200
+    return response.json()
+
+def test_object_tree_is_sorted_and_keeps_same_named_objects():
+    tree = build_object_tree(ROWS)
+    assert [being["name"] for being in tree] == ["Master", "Mate"]
+    assert tree[0]["children"] == [{"name": "Company", "children": []}]
+    objects = tree[1]["children"][0]["children"]
+    assert [(node["name"], node["id"]) for node in objects] == [("Buyer", "1"), ("buyer", "2")]
+    assert objects[1]["children"] == [{"name": "A"}, {"name": "B"}]
+
+def test_render_depth_and_compact_form():
+    tree = build_object_tree(ROWS)
+    assert render_nodes(tree, 1, False) == [{"name": "Master", "count": 1}, {"name": "Mate", "count": 1}]
+    compact = render_nodes(tree, None, True)
+    assert compact[0] == ["Master", 1, [["Company", 0]]]
+    assert compact[1][2][0][2][1] == ["buyer", 2, [["A", 0], ["B", 0]], "2"]
+
+def test_object_tree_counts_every_object(client):
+    objects = client.get("/api/v1/objects").json()
+    body = _taxonomy(client, "objects", depth=3)
+    assert body["levels"] == ["being", "avatar", "object", "variant"]
+    assert sum(avatar["count"] for being in body["nodes"] for avatar in being["children"]) == len(objects)
+
+def test_subtree_and_missing_nodes(client, new_object):
+    created = client.post("/api/v1/objects", json=new_object).json()
+    body = _taxonomy(client, "objects", being=new_object["being"], avatar=new_object["avatar"])
+    assert body["root"] == {"being": new_object["being"], "avatar": new_object["avatar"]}
+    assert body["levels"] == ["object", "variant"]
+    node = next(node for node in body["nodes"] if node.get("id") == created["id"])
+    assert node["children"] == [{"name": "Alpha", "count": 0}]
+
+    assert client.get("/api/v1/taxonomy/objects", params={"being": "No Such Being"}).status_code == 404
+    assert client.get("/api/v1/taxonomy/objects", params={"avatar": new_object["avatar"]}).status_code == 400
+
+def test_variable_tree(client):
+    variables = client.get("/api/v1/variables").json()
+    body = _taxonomy(client, "variables", format="compact")
+    assert body["levels"] == ["part", "group", "variable"]
+    assert sum(len(group[2] or []) for part in body["nodes"] for group in part[2] or []) == len(variables)
+    part = body["nodes"][0][0]
+    assert _taxonomy(client, "variables", part=part, depth=1)["count"] == body["nodes"][0][1]
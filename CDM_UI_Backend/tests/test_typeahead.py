@@ -0,0 +1,37 @@
+from catalog import bump_catalog_version, reload_change
+from repositories import get_graph
+from routes.objects import create_object_unit
+from schema import ObjectCreateRequest
+
+def _completions(client, field, **params):
+    response = client.get(f"/api/v1/objects/typeahead/{field}", params={"limit": 100, **params})
+    assert response.status_code == 200
+    return {completion["value"]: completion["count"] for completion in response.json()}
+
+def test_completions_are_prefix_matched_and_counted(client):
+    beings = _completions(client, "beings")
+    assert sum(beings.values()) == len(client.get("/api/v1/objects").json())
+    assert set(_completions(client, "beings", prefix="ma")) == {being for being in beings if being.lower().startswith("ma")}
+    counts = list(_completions(client, "beings").values())
+    assert counts == sorted(counts, reverse=True)
+
+def test_completions_follow_object_writes(client, new_object):
+    scope = {"prefix": new_object["object"], "being": new_object["being"], "avatar": new_object["avatar"]}
+    assert _completions(client, "objects", **scope) == {}
+
+    created = client.post("/api/v1/objects", json=new_object).json()
+    assert _completions(client, "objects", **scope) == {new_object["object"]: 1}
+
+    client.delete(f"/api/v1/objects/{created['id']}")
+    assert _completions(client, "objects", **scope) == {}
+
+def test_catalog_reload_rebuilds_the_index(client, new_object):
+    scope = {"prefix": new_object["object"], "being": new_object["being"]}
+    assert _completions(client, "objects", **scope) == {}
+
+    # A write that bypasses the routes (another worker, a script) is announced as a reload
+    request = ObjectCreateRequest.model_validate(new_object)
+    get_graph().execute_write(lambda repos: create_object_unit(repos, request))
+    bump_catalog_version(reload_change())
+
+    assert _completions(client, "objects", **scope) == {new_object["object"]: 1}
@@ -0,0 +1,190 @@
+"""
+Lightweight request tracing for the CDM_UI backend.
+
+Spans form a tree per request: an HTTP span per route (TracingMiddleware),
+child spans for every Cypher statement and transaction (instrumentation.py)
+and spans for the stages of CSV uploads. Finished spans go to a local
+exporter, so no collector is needed:
+
+  CDM_TRACE_EXPORTER   none (default), console or jsonl
+  CDM_TRACE_FILE       JSONL output path (default traces.jsonl)
+
+An incoming W3C traceparent header is continued; every traced response
+carries its trace id in X-Trace-Id.
+"""
+
+import json
+import logging
+import os
+import secrets
+import threading
+import time
+from contextvars import ContextVar
+from typing import Any, Dict, Optional
+
+TRACE_EXPORTER = os.getenv("CDM_TRACE_EXPORTER", "none").lower()
+TRACE_FILE = os.getenv("CDM_TRACE_FILE", "traces.jsonl")
+
+class Span:
+    __slots__ = ("trace_id", "span_id", "parent_id", "name", "start", "attributes", "status", "_started", "_token", "_ended")
+
+    def __init__(self, name: str, trace_id: str, parent_id: Optional[str], attributes: Dict[str, Any]):
+        self.trace_id = trace_id
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent_id
+        self.name = name
+        self.start = time.time()
+        self.attributes = attributes
+        self.status = "ok"
+        self._started = time.perf_counter()
+        self._token = None
+        self._ended = False
+
+    def set(self, key: str, value: Any):
+        self.attributes[key] = value
+
+    def end(self, error: Optional[BaseException] = None):
+        if self._ended:
+            return
+        self._ended = True
+        if error is not None:
+            self.status = "error"
+            self.attributes["error"] = f"{type(error).__name__}: {error}"
+        _exporter.export(self, time.perf_counter() - self._started)
+
+    def __enter__(self):
+        self._token = _current_span.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        _current_span.reset(self._token)
+        self.end(exc)
+        return False
+
+class _NoopSpan:
+    """Returned while tracing is disabled so call sites need no checks"""
+
+    def set(self, key, value):
+        pass
+
+    def end(self, error=None):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+NOOP_SPAN = _NoopSpan()
+
+_current_span: ContextVar[Optional[Span]] = ContextVar("cdm_current_span", default=None)
+
+logger = logging.getLogger(__name__)
+
+class ConsoleExporter:
+    def export(self, span: Span, duration: float):
+        logger.info(
+            "%s %s <- %-16s %s %.2f ms %s", span.trace_id[:8], span.span_id, span.parent_id or "-",
+            span.name, duration * 1000, span.status, extra=span.attributes
+        )
+
+class JsonlExporter:
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def export(self, span: Span, duration: float):
+        line = json.dumps({
+            "traceId": span.trace_id,
+            "spanId": span.span_id,
+            "parentId": span.parent_id,
+            "name": span.name,
+            "start": span.start,
+            "durationMs": round(duration * 1000, 3),
+            "status": span.status,
+            "attributes": span.attributes
+        }, default=str)
+        with self._lock:
+            with open(self.path, "a", encoding="utf-8") as handle:
+                handle.write(line + "\n")
+
+def _make_exporter():
+    if TRACE_EXPORTER == "console":
+        return ConsoleExporter()
+    if TRACE_EXPORTER == "jsonl":
+        return JsonlExporter(TRACE_FILE)
+    return None
+
+_exporter = _make_exporter()
+
+def enabled() -> bool:
+    return _exporter is not None
+
+def start_span(name: str, parent: Optional[Span] = None, trace_id: Optional[str] = None, parent_id: Optional[str] = None, **attributes):
+    """
+    New span under `parent` (default: the current span). Use as a context
+    manager to make it current, or call end() explicitly.
+    """
+    if _exporter is None:
+        return NOOP_SPAN
+    if parent is None:
+        parent = _current_span.get()
+    if parent is not None and parent is not NOOP_SPAN:
+        trace_id, parent_id = parent.trace_id, parent.span_id
+    return Span(name, trace_id or secrets.token_hex(16), parent_id, attributes)
+
+def current_trace_id() -> Optional[str]:
+    current = _current_span.get()
+    return current.trace_id if current is not None else None
+
+def span(name: str, **attributes):
+    """Child span of the current span, as a context manager"""
+    return start_span(name, **attributes)
+
+def _parse_traceparent(value: str):
+    parts = value.split("-")
+    if len(parts) == 4 and len(parts[1]) == 32 and len(parts[2]) == 16:
+        return parts[1], parts[2]
+    return None, None
+
+class TracingMiddleware:
+    """Root span per HTTP request, named after the matched route template"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if _exporter is None or scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        from metrics import route_template
+
+        headers = dict(scope.get("headers") or [])
+        trace_id, parent_id = _parse_traceparent(headers.get(b"traceparent", b"").decode("latin-1"))
+        root = start_span(
+            f"{scope.get('method', '')} {scope.get('path', '')}",
+            trace_id=trace_id, parent_id=parent_id,
+            **{"http.method": scope.get("method", ""), "http.target": scope.get("path", "")}
+        )
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                root.set("http.status_code", message["status"])
+                message["headers"] = list(message.get("headers") or []) + [(b"x-trace-id", root.trace_id.encode())]
+            await send(message)
+
+        error = None
+        with root:
+            try:
+                await self.app(scope, receive, send_wrapper)
+            except BaseException as e:
+                error = e
+                raise
+            finally:
+                template = route_template(scope)
+                root.name = f"{scope.get('method', '')} {template}"
+                root.set("http.route", template)
+                if error is None and root.attributes.get("http.status_code", 200) >= 500:
+                    root.status = "error"